@@ -1,10 +1,17 @@
-﻿"""Simulation von drei Körpern auf einer 8-förmigen Bahn."""
+﻿"""Simulation von drei Körpern auf einer 8-förmigen Bahn.
+
+Die von Hand gewählten Anfangsbedingungen werden zunächst mit dem
+Schießverfahren aus periodische_bahnen.py so korrigiert, dass die
+Bahn exakt periodisch ist.
+"""
 
 import numpy as np
 import scipy.integrate
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
+from gravitation import Gravitation
+from periodische_bahnen import finde_periodische_bahn
 
 # Konstanten: 1 Tag, 1 Jahr [s] und die Astronomische Einheit [m].
 tag = 24 * 60 * 60
@@ -38,14 +45,49 @@ r0 = d * np.array([[1.0, 0.0],
                    [0.0, 0.0],
                    [-1.0, 0.0]])
 
-# Lege die Geschwindigkeit der Masse fest, die sich zum Zeitpunkt
-# t=0 im Koordinatenursprung befindet.
+# Näherungswerte für die Richtung und den Betrag der
+# Geschwindigkeit der Masse, die sich zum Zeitpunkt t=0 im
+# Koordinatenursprung befindet.
 alpha = np.radians(56.9)
 betrag_v_mitte = 1.27 * np.sqrt(G * m0 / d)
-v_mitte = betrag_v_mitte * np.array([np.cos(alpha), np.sin(alpha)])
 
-# Anfangsgeschwindigkeit der Körper.
-v0 = np.array([-v_mitte / 2, v_mitte, -v_mitte / 2])
+# Näherungswert für die Umlaufdauer [s].
+T = 1.0 * jahr
+
+
+def anfangszustand(p):
+    """Berechne den Zustandsvektor zum Zeitpunkt t=0.
+
+    Args:
+        p (np.ndarray):
+            Richtung [rad] und Betrag [m/s] der Geschwindigkeit der
+            mittleren Masse.
+    """
+    v_mitte = p[1] * np.array([np.cos(p[0]), np.sin(p[0])])
+    v0 = np.array([-v_mitte / 2, v_mitte, -v_mitte / 2])
+    return np.concatenate((r0.reshape(-1), v0.reshape(-1)))
+
+
+# Erzeuge ein Objekt, das die Gravitationsbeschleunigungen aller
+# Körper vektorisiert berechnet.
+gravitation = Gravitation(m, G, n_dim)
+
+# Korrigiere die Anfangsbedingungen. Da sich alle Körper
+# nacheinander auf derselben Bahn bewegen, genügt es, ein Drittel
+# der Periode zu integrieren: Danach befindet sich Körper 1 am
+# Anfangsort von Körper 0, Körper 2 am Anfangsort von Körper 1 und
+# Körper 0 am Anfangsort von Körper 2.
+p, T, eigenwerte, n_integrationen = finde_periodische_bahn(
+    gravitation, anfangszustand, [alpha, betrag_v_mitte], T,
+    permutation=[1, 2, 0], anteil=1 / 3)
+alpha, betrag_v_mitte = p
+print(f'Korrigierte Anfangsbedingungen nach {n_integrationen} '
+      f'Integrationen:')
+print(f'alpha = {np.degrees(alpha):.8f}°, |v| = '
+      f'{betrag_v_mitte / np.sqrt(G * m0 / d):.10f} * sqrt(G m0 / d)')
+print(f'Periode: {T / tag:.6f} Tage')
+print(f'Beträge der Eigenwerte der Monodromiematrix: '
+      f'{np.array2string(np.abs(eigenwerte), precision=6)}')
 
 # Farben für die drei Körper.
 farben = ['red', 'green', 'blue']
@@ -53,20 +95,11 @@ farben = ['red', 'green', 'blue']
 
 def dgl(t, u):
     """Berechne die rechte Seite der Differentialgleichung."""
-    r, v = np.split(u, 2)
-    r = r.reshape(n_koerper, n_dim)
-    a = np.zeros((n_koerper, n_dim))
-    for i in range(n_koerper):
-        for j in range(i):
-            dr = r[j] - r[i]
-            gr = G / np.linalg.norm(dr) ** 3 * dr
-            a[i] += gr * m[j]
-            a[j] -= gr * m[i]
-    return np.concatenate([v, a.reshape(-1)])
+    return gravitation.dgl(t, u)
 
 
 # Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
-u0 = np.concatenate((r0.reshape(-1), v0.reshape(-1)))
+u0 = anfangszustand(p)
 
 # Löse die Bewegungsgleichung numerisch.
 result = scipy.integrate.solve_ivp(dgl, [0, t_max], u0, rtol=1e-9,
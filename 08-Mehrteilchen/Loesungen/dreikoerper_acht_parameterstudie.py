@@ -0,0 +1,158 @@
+﻿"""Parameterstudie zur 8-förmigen Bahn von drei Körpern.
+
+Die Anfangsbedingungen aus dreikoerper_acht.py werden für viele
+Richtungen und Beträge der Geschwindigkeit des mittleren Körpers
+gleichzeitig simuliert. Entfernt sich ein Körper sehr weit vom
+Schwerpunkt, so ist das System zerfallen und die Simulation dieses
+Szenarios wird beendet. Für jedes Szenario wird der kleinste
+Abstand zweier Körper und ggf. der Zeitpunkt des Zerfalls in einer
+Tabelle ausgegeben. Der kleinste Abstand wird wie in
+swingby_parameterstudie.py mit Ereignisfunktionen bestimmt, die bei
+jeder nächsten Annäherung eines Paares auslösen, sodass er nicht
+von der Zeitschrittweite der Ausgabe abhängt.
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from schar import GravitationSchar, loese_schar
+
+# Konstanten: 1 Tag, 1 Jahr [s] und die Astronomische Einheit [m].
+tag = 24 * 60 * 60
+jahr = 365.25 * tag
+AE = 1.495978707e11
+
+# Anzahl der Körper und Raumdimension.
+n_koerper = 3
+n_dim = 2
+
+# Simulationszeit und Zeitschrittweite [s].
+t_max = 10 * jahr
+dt = 1 * tag
+
+# Newtonsche Gravitationskonstante [m³ / (kg * s²)].
+G = 6.6743e-11
+
+# Massen der Körper [kg].
+m0 = 2e30
+m = m0 * np.ones(n_koerper)
+
+# Abstand der Körper vom Schwerpunkt.
+d = 1 * AE
+
+# Ab diesem Abstand eines Körpers vom Schwerpunkt gilt das System
+# als zerfallen [m].
+abstand_zerfall = 5 * AE
+
+# Untersuchte Richtungen [rad] und Beträge der Geschwindigkeit des
+# mittleren Körpers in Einheiten von sqrt(G * m0 / d).
+werte_alpha = np.radians(np.arange(50, 64.1, 1))
+werte_faktor = np.arange(1.15, 1.401, 0.025)
+alpha, faktor = [x.reshape(-1) for x in np.meshgrid(
+    werte_alpha, werte_faktor, indexing='ij')]
+n_szenarien = alpha.size
+
+# Anfangspositionen und -geschwindigkeiten aller Szenarien.
+r0 = np.zeros((n_szenarien, n_koerper, n_dim))
+r0[:, 0, 0] = d
+r0[:, 2, 0] = -d
+betrag_v_mitte = faktor * np.sqrt(G * m0 / d)
+v_mitte = betrag_v_mitte[:, np.newaxis] * np.stack(
+    [np.cos(alpha), np.sin(alpha)], axis=1)
+v0 = np.stack([-v_mitte / 2, v_mitte, -v_mitte / 2], axis=1)
+
+gravitation = GravitationSchar(m, G, n_dim)
+
+
+def zerfall(t, u):
+    """Ereignisfunktion: Ein Körper entfernt sich sehr weit."""
+    r = u[:, :n_koerper * n_dim].reshape(-1, n_koerper, n_dim)
+    schwerpunkt = m @ r / np.sum(m)
+    abstand = np.linalg.norm(r - schwerpunkt[:, np.newaxis], axis=2)
+    return np.max(abstand, axis=1) - abstand_zerfall
+
+
+def naechste_annaeherung(i, j):
+    """Erzeuge eine Ereignisfunktion für das Paar i, j.
+
+    Die Ereignisfunktion ist das Skalarprodukt aus
+    Relativposition und Relativgeschwindigkeit, also die Hälfte der
+    Zeitableitung des Abstandsquadrats. Sie wechselt bei jedem
+    Minimum des Abstands von negativ nach positiv.
+    """
+    def ereignis(t, u):
+        """Ereignisfunktion: Der Abstand des Paares ist minimal."""
+        r = u[:, :n_koerper * n_dim].reshape(-1, n_koerper, n_dim)
+        v = u[:, n_koerper * n_dim:].reshape(-1, n_koerper, n_dim)
+        return np.sum((r[:, i] - r[:, j]) * (v[:, i] - v[:, j]),
+                      axis=1)
+
+    ereignis.direction = 1
+    return ereignis
+
+
+zerfall.terminal = True
+zerfall.direction = 1
+
+# Die Ereignisfunktionen für die Annäherung aller Paare folgen auf
+# die Ereignisfunktion für den Zerfall.
+paare = [(i, j) for i in range(n_koerper) for j in range(i)]
+ereignisse = [zerfall] + [naechste_annaeherung(i, j) for i, j in paare]
+
+# Kleinster Abstand zweier Körper in jedem Szenario [m].
+abstand_min = np.full(n_szenarien, np.inf)
+
+
+def abstand_merken(n, idx, t, u):
+    """Aktualisiere den kleinsten Abstand bei einer Annäherung."""
+    if n == 0:
+        return
+    i, j = paare[n - 1]
+    r = u[:, :n_koerper * n_dim].reshape(-1, n_koerper, n_dim)
+    abstand = np.linalg.norm(r[:, i] - r[:, j], axis=1)
+    abstand_min[idx] = np.minimum(abstand_min[idx], abstand)
+
+
+# Löse die Bewegungsgleichung für alle Szenarien gleichzeitig.
+u0 = np.concatenate([r0.reshape(n_szenarien, -1),
+                     v0.reshape(n_szenarien, -1)], axis=1)
+t = np.arange(0, t_max, dt)
+rechenzeit = time.perf_counter()
+u, t_ereignis, u_ereignis, n_schritte = loese_schar(
+    gravitation.dgl, t_max, u0, t, ereignisse, rtol=1e-9, atol=1e-6,
+    bei_ereignis=abstand_merken)
+rechenzeit = time.perf_counter() - rechenzeit
+print(f'Rechenzeit: {rechenzeit:.1f} s für {n_szenarien} Szenarien '
+      f'mit {np.sum(n_schritte)} Schritten')
+
+# Ein Paar, dessen Abstand nach dem Start nur wächst oder bis zum
+# Ende nur abnimmt, hat kein Minimum im Inneren. Berücksichtige
+# daher auch die Abstände zu den Ausgabezeitpunkten.
+r = u[:, :n_koerper * n_dim].reshape(n_szenarien, n_koerper, n_dim,
+                                     -1)
+for i, j in paare:
+    abstand = np.linalg.norm(r[:, i] - r[:, j], axis=1)
+    abstand_min = np.minimum(abstand_min, np.nanmin(abstand, axis=1))
+
+# Gib die Tabelle aus.
+print('alpha [°]; Faktor; min. Abstand [AE]; Zerfall [Jahre]')
+for a, f, a_min, t_z in zip(alpha, faktor, abstand_min,
+                            t_ereignis[0]):
+    zerfallen = '-' if np.isnan(t_z) else f'{t_z / jahr:.2f}'
+    print(f'{np.degrees(a):5.1f}; {f:6.3f}; {a_min / AE:8.2e}; '
+          f'{zerfallen}')
+
+# Stelle dar, nach welcher Zeit das System zerfällt.
+t_zerfall = np.where(np.isnan(t_ereignis[0]), t_max, t_ereignis[0])
+fig = plt.figure()
+fig.set_tight_layout(True)
+ax = fig.add_subplot(1, 1, 1)
+ax.set_title('Zeit bis zum Zerfall [Jahre]')
+ax.set_xlabel(r'$\alpha$ [°]')
+ax.set_ylabel(r'$v_0 / \sqrt{G m_0 / d}$')
+bild = ax.pcolormesh(
+    np.degrees(werte_alpha), werte_faktor,
+    t_zerfall.reshape(werte_alpha.size, werte_faktor.size).T / jahr,
+    shading='nearest')
+fig.colorbar(bild)
+plt.show()
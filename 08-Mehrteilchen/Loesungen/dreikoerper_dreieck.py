@@ -1,10 +1,15 @@
-﻿"""Simulation von drei Körpern auf einer Kreisbahn."""
+﻿"""Simulation von drei Körpern auf einer Kreisbahn.
+
+Die Kreisbahn ist instabil, und im weiteren Verlauf kommen sich
+jeweils zwei Körper sehr nahe. Diese Begegnungen werden mit der
+KS-Transformation regularisiert.
+"""
 
 import numpy as np
-import scipy.integrate
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
+from regularisierung import KSRegularisierung
 
 # Konstanten: 1 Tag, 1 Jahr [s] und die Astronomische Einheit [m].
 tag = 24 * 60 * 60
@@ -19,6 +24,9 @@ n_dim = 2
 t_max = 50 * jahr
 dt = 2 * tag
 
+# Unterhalb dieses Abstands wird eine Begegnung regularisiert [m].
+abstand_grenze = 0.3 * AE
+
 # Newtonsche Gravitationskonstante [m³ / (kg * s²)].
 G = 6.6743e-11
 
@@ -48,36 +56,13 @@ v0 = betrag_v0 * np.array([-np.sin(alpha), np.cos(alpha)]).T
 # Farben für die drei Körper.
 farben = ['red', 'green', 'blue']
 
-
-def dgl(t, u):
-    """Berechne die rechte Seite der Differentialgleichung."""
-    r, v = np.split(u, 2)
-    r = r.reshape(n_koerper, n_dim)
-    a = np.zeros((n_koerper, n_dim))
-    for i in range(n_koerper):
-        for j in range(i):
-            dr = r[j] - r[i]
-            gr = G / np.linalg.norm(dr) ** 3 * dr
-            a[i] += gr * m[j]
-            a[j] -= gr * m[i]
-    return np.concatenate([v, a.reshape(-1)])
-
-
-# Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
-u0 = np.concatenate((r0.reshape(-1), v0.reshape(-1)))
-
 # Löse die Bewegungsgleichung numerisch.
-result = scipy.integrate.solve_ivp(dgl, [0, t_max], u0, rtol=1e-9,
-                                   t_eval=np.arange(0, t_max, dt))
-t = result.t
-r, v = np.split(result.y, 2)
-
-# Wandle r und v in ein 3-dimensionales Array um:
-#    1. Index - Himmelskörper
-#    2. Index - Koordinatenrichtung
-#    3. Index - Zeitpunkt
-r = r.reshape(n_koerper, n_dim, -1)
-v = v.reshape(n_koerper, n_dim, -1)
+loeser = KSRegularisierung(m, G, n_dim, abstand_grenze=abstand_grenze,
+                           rtol=1e-9)
+t, r, v = loeser.loese(r0, v0, np.arange(0, t_max, dt))
+print(f'{loeser.n_begegnungen} regularisierte Begegnungen, '
+      f'{loeser.n_auswertungen + loeser.n_auswertungen_regularisiert}'
+      f' Auswertungen der rechten Seite')
 
 # Berechne die verschiedenen Energiebeiträge.
 E_kin = 1/2 * m @ np.sum(v * v, axis=1)
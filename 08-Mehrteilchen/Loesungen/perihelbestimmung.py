@@ -9,13 +9,15 @@ Kometen an.
 import numpy as np
 import datetime
 import matplotlib.pyplot as plt
+from ephemeridenspeicher import lade_ephemeriden
+from ereignisse import finde_extrema
 
 # Lies die Simulationsdaten ein.
-dat = np.load('ephemeriden.npz')
+dat = lade_ephemeriden('ephemeriden')
 tag, AE = dat['tag'], dat['AE']
 datum_t0 = datetime.datetime.fromtimestamp(float(dat['datum_t0']))
 namen = dat['namen']
-t, r = dat['t'], dat['r']
+t, r, v = dat['t'], dat['r'], dat['v']
 
 # Suche aus dem Array `namen` die entsprechenden Indizes heraus.
 index_komet = np.where(namen == 'Tempel 1')[0][0]
@@ -27,17 +29,17 @@ index_sonne = np.where(namen == 'Sonne')[0][0]
 d_erde = np.linalg.norm(r[index_komet] - r[index_erde], axis=0)
 d_sonne = np.linalg.norm(r[index_komet] - r[index_sonne], axis=0)
 
-# Gib die Zeitpunkte aus, bei denen der Abstand zwischen
+# Bestimme die Zeitpunkte, bei denen der Abstand zwischen
 # Komet und Sonne minimal ist.
-zeitpunkte_perihel = []
-for i_min in range(1, len(d_erde) - 1):
-    if d_sonne[i_min - 1] > d_sonne[i_min] < d_sonne[i_min + 1]:
-        # Bestimme das Kalenderdatum zum aktuellen Zeitpunkt
-        # und gib dieses Zusammen mit der Anzahl der vergangenen
-        # Tage aus.
-        datum = datum_t0 + datetime.timedelta(seconds=t[i_min])
-        print(f"Periheldurchgang nach {t[i_min]/tag:.0f} Tagen "
-              f"am {datum:%d.%m.%Y %H:%M}")
+extrema = finde_extrema(t, r, v, paare=[[index_sonne, index_komet]])
+zeitpunkte_perihel = extrema['t'][extrema['minimum']]
+for t_perihel in zeitpunkte_perihel:
+    # Bestimme das Kalenderdatum zum aktuellen Zeitpunkt
+    # und gib dieses Zusammen mit der Anzahl der vergangenen
+    # Tage aus.
+    datum = datum_t0 + datetime.timedelta(seconds=t_perihel)
+    print(f"Periheldurchgang nach {t_perihel/tag:.0f} Tagen "
+          f"am {datum:%d.%m.%Y %H:%M}")
 
 # Erzeuge eine Figure und eine Axes.
 fig = plt.figure()
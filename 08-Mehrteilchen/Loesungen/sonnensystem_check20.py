@@ -1,7 +1,7 @@
 ﻿"""Überprüfung der Sonnensystem-Simulation.
 
 Das Programm liest die Daten des Programms `sonnensystem_sim.py`
-aus der Datei `ephemeriden.npz` ein und stellt die Positionen der
+aus dem Verzeichnis `ephemeriden` ein und stellt die Positionen der
 Himmelskörper nach einer Zeitdauer von 20 Jahren im Vergleich zu den
 in der Horizon-Datenbank verfügbaren Positionen dar.
 """
@@ -10,9 +10,10 @@ import datetime
 import numpy as np
 import matplotlib.pyplot as plt
 import mpl_toolkits.mplot3d
+from ephemeridenspeicher import lade_ephemeriden, naechster_index
 
 # Lies die Simulationsdaten ein.
-dat = np.load('ephemeriden.npz')
+dat = lade_ephemeriden('ephemeriden')
 datum_t0 = datetime.datetime.fromtimestamp(float(dat['datum_t0']))
 dt, namen = dat['dt'], dat['namen']
 AE, m, t, r, v = dat['AE'], dat['m'], dat['t'], dat['r'],  dat['v']
@@ -65,7 +66,7 @@ for ort, name, farbe in zip(r, namen, farben):
 # Suche den Index in den Simulationsdaten, der am nächsten am
 # gesuchten Zeitpunkt liegt.
 delta_t = (datum_t1 - datum_t0).total_seconds()
-index_zeit = np.argmin(np.abs(t - delta_t))
+index_zeit = naechster_index(t, delta_t)
 
 # Gib eine Tabelle der Positionsabweichungen aus.
 for i in range(len(namen)):
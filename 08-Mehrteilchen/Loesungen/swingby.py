@@ -1,11 +1,17 @@
-﻿"""Simulation eines Swing-by-Manövers."""
+﻿"""Simulation eines Swing-by-Manövers.
+
+Die nahe Begegnung der Raumsonde mit dem Planeten wird mit der
+KS-Transformation regularisiert, sodass die Anzahl der
+Auswertungen der rechten Seite auch bei sehr kleinen Abständen
+beschränkt bleibt.
+"""
 
 import math
 import numpy as np
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
-import scipy.integrate
+from regularisierung import KSRegularisierung
 
 # Konstanten: 1 Stunde, 1 Tag und 1 Jahr [s].
 stunde = 60 * 60
@@ -31,6 +37,9 @@ abstand_planet = 20.18e9
 # Radius des Planeten.
 radius_planet = 6.9911e7
 
+# Unterhalb dieses Abstands wird die Begegnung regularisiert [m].
+abstand_grenze = 50 * radius_planet
+
 # Anfangsgeschwindigkeiten der Körper.
 betrag_v0_sonde = 9e3
 betrag_v0_planet = 13e3
@@ -48,23 +57,20 @@ v0_planet = betrag_v0_planet * np.array([-1.0, 0.0])
 v0_sonde = betrag_v0_sonde * np.array([np.cos(alpha),
                                        np.sin(alpha)])
 
-
-def dgl(t, u):
-    """Berechne die rechte Seite der Differentialgleichung."""
-    r1, r2, v1, v2 = np.split(u, 4)
-    a1 = G * m_sonde / np.linalg.norm(r2 - r1) ** 3 * (r2 - r1)
-    a2 = G * m_planet / np.linalg.norm(r1 - r2) ** 3 * (r1 - r2)
-    return np.concatenate([v1, v2, a1, a2])
-
-
-# Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
-u0 = np.concatenate((r0_planet, r0_sonde, v0_planet, v0_sonde))
+# Lege die Massen und den Anfangszustand der Körper fest.
+m = np.array([m_planet, m_sonde])
+r0 = np.array([r0_planet, r0_sonde])
+v0 = np.array([v0_planet, v0_sonde])
 
 # Löse die Bewegungsgleichung numerisch.
-result = scipy.integrate.solve_ivp(dgl, [0, t_max], u0, rtol=1e-9,
-                                   t_eval=np.arange(0, t_max, dt))
-t = result.t
-r_sonde, r_planet, v_sonde, v_planet = np.split(result.y, 4)
+loeser = KSRegularisierung(m, G, n_dim=2,
+                           abstand_grenze=abstand_grenze, rtol=1e-9)
+t, r, v = loeser.loese(r0, v0, np.arange(0, t_max, dt))
+r_planet, r_sonde = r
+v_planet, v_sonde = v
+print(f'Auswertungen der rechten Seite: '
+      f'{loeser.n_auswertungen} ohne und '
+      f'{loeser.n_auswertungen_regularisiert} mit Regularisierung')
 
 # Berechne den Abstand der Raumsonde vom Planeten.
 abstand = np.linalg.norm(r_sonde - r_planet, axis=0)
@@ -76,7 +82,7 @@ print(f"Min. Abstand: {abstand_min / radius_planet:.1f} "
       "Planetenradien")
 
 # Berechne den Geschwindigkeitsbetrag der Raumsonde.
-betrag_v_sonde = np.linalg.norm(v_planet, axis=0)
+betrag_v_sonde = np.linalg.norm(v_sonde, axis=0)
 
 # Erzeuge eine Figure und eine Axes für die Animation.
 fig_anim = plt.figure()
@@ -0,0 +1,155 @@
+﻿"""Parameterstudie zum Swing-by-Manöver.
+
+Das Swing-by-Manöver aus swingby.py wird für viele Kombinationen
+von Anflugwinkel, Geschwindigkeit der Raumsonde und Anfangsabstand
+des Planeten gleichzeitig simuliert. Für jedes Szenario werden der
+minimale Abstand vom Planeten, der Geschwindigkeitsgewinn der
+Raumsonde und das Ergebnis der Begegnung in einer Tabelle
+ausgegeben und in der Datei swingby_parameterstudie.csv
+gespeichert.
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from schar import GravitationSchar, loese_schar
+
+# Konstanten: 1 Stunde und 1 Tag [s].
+stunde = 60 * 60
+tag = 24 * stunde
+
+# Simulationszeit und Zeitschrittweite [s].
+t_max = 36 * tag
+dt = 1 * stunde
+
+# Masse des Planeten und der Raumsonde [kg].
+m_planet = 1.898e27
+m_sonde = 1e3
+
+# Radius des Planeten [m].
+radius_planet = 6.9911e7
+
+# Gravitationskonstante [m³ / (kg * s²)].
+G = 6.6743e-11
+
+# Anfangsentfernung der Raumsonde vom Koordinatenursprung [m] und
+# Geschwindigkeit des Planeten [m/s].
+abstand_sonde = 15e9
+betrag_v0_planet = 13e3
+
+# Untersuchte Anflugwinkel [rad], Geschwindigkeiten der Raumsonde
+# [m/s] und Anfangsentfernungen des Planeten [m].
+werte_alpha = np.radians(np.arange(30, 91, 5))
+werte_v0_sonde = 1e3 * np.array([7.0, 8.0, 9.0, 10.0, 11.0])
+werte_abstand_planet = 1e9 * np.array([20.0, 20.1, 20.18, 20.3,
+                                       20.5])
+
+# Erzeuge alle Kombinationen der Parameter. Jedes Szenario
+# entspricht einem Element der Arrays.
+alpha, betrag_v0_sonde, abstand_planet = [
+    x.reshape(-1) for x in np.meshgrid(werte_alpha, werte_v0_sonde,
+                                       werte_abstand_planet,
+                                       indexing='ij')]
+n_szenarien = alpha.size
+
+# Anfangspositionen und -geschwindigkeiten aller Szenarien
+# (n_szenarien × n_koerper × n_dim). Körper 0 ist der Planet.
+r0 = np.zeros((n_szenarien, 2, 2))
+v0 = np.zeros((n_szenarien, 2, 2))
+r0[:, 0, 0] = abstand_planet
+r0[:, 1, 0] = -abstand_sonde * np.cos(alpha)
+r0[:, 1, 1] = -abstand_sonde * np.sin(alpha)
+v0[:, 0, 0] = -betrag_v0_planet
+v0[:, 1, 0] = betrag_v0_sonde * np.cos(alpha)
+v0[:, 1, 1] = betrag_v0_sonde * np.sin(alpha)
+
+gravitation = GravitationSchar([m_planet, m_sonde], G, n_dim=2)
+
+
+def relativ(u):
+    """Gib den Ort und die Geschwindigkeit der Sonde relativ zum
+    Planeten zurück."""
+    r, v = np.split(u, 2, axis=1)
+    return r[:, 2:] - r[:, :2], v[:, 2:] - v[:, :2]
+
+
+def aufprall(t, u):
+    """Ereignisfunktion: Die Sonde trifft auf den Planeten."""
+    dr, dv = relativ(u)
+    return np.linalg.norm(dr, axis=1) - radius_planet
+
+
+def naechste_annaeherung(t, u):
+    """Ereignisfunktion: Der Abstand ist minimal."""
+    dr, dv = relativ(u)
+    return np.sum(dr * dv, axis=1)
+
+
+aufprall.terminal = True
+aufprall.direction = -1
+naechste_annaeherung.direction = 1
+
+# Löse die Bewegungsgleichung für alle Szenarien gleichzeitig.
+u0 = np.concatenate([r0.reshape(n_szenarien, -1),
+                     v0.reshape(n_szenarien, -1)], axis=1)
+t = np.arange(0, t_max, dt)
+rechenzeit = time.perf_counter()
+u, t_ereignis, u_ereignis, n_schritte = loese_schar(
+    gravitation.dgl, t_max, u0, t, [aufprall, naechste_annaeherung],
+    rtol=1e-9, atol=1e-6)
+rechenzeit = time.perf_counter() - rechenzeit
+print(f'Rechenzeit: {rechenzeit:.1f} s für {n_szenarien} Szenarien '
+      f'mit {np.sum(n_schritte)} Schritten')
+
+# Minimaler Abstand: Beim Aufprall ist es der Radius des Planeten.
+# Findet im Simulationszeitraum keine nächste Annäherung statt, so
+# wird der kleinste Abstand der Ausgabezeitpunkte verwendet.
+dr_min, _ = relativ(u_ereignis[1])
+abstand_min = np.linalg.norm(dr_min, axis=1)
+abgestuerzt = ~np.isnan(t_ereignis[0])
+abstand_min[abgestuerzt] = radius_planet
+ohne = np.isnan(abstand_min)
+abstand_aus = np.linalg.norm(u[:, 2:4] - u[:, 0:2], axis=1)
+abstand_min[ohne] = np.nanmin(abstand_aus[ohne], axis=1)
+
+# Geschwindigkeitsgewinn der Sonde und spezifische Energie relativ
+# zum Planeten am Ende der Simulation.
+v_ende = u[:, 6:8, -1]
+delta_v = np.linalg.norm(v_ende, axis=1) - betrag_v0_sonde
+dr_ende, dv_ende = relativ(u[:, :, -1])
+energie = (np.sum(dv_ende ** 2, axis=1) / 2
+           - G * m_planet / np.linalg.norm(dr_ende, axis=1))
+ergebnis = np.where(abgestuerzt, 'Aufprall',
+                    np.where(energie > 0, 'entkommen', 'eingefangen'))
+
+# Gib die Tabelle aus und speichere sie.
+kopf = ('alpha [°]; v0 [km/s]; Abstand Planet [Gm]; '
+        'min. Abstand [R]; Delta v [km/s]; Ergebnis')
+zeilen = [f'{np.degrees(a):5.1f}; {v / 1e3:5.1f}; {d / 1e9:6.2f}; '
+          f'{a_min / radius_planet:8.2f}; {dv / 1e3:7.3f}; {e}'
+          for a, v, d, a_min, dv, e in zip(
+              alpha, betrag_v0_sonde, abstand_planet, abstand_min,
+              delta_v, ergebnis)]
+print(kopf)
+print('\n'.join(zeilen))
+with open('swingby_parameterstudie.csv', 'w',
+          encoding='utf-8') as datei:
+    datei.write(kopf + '\n' + '\n'.join(zeilen) + '\n')
+
+# Stelle den Geschwindigkeitsgewinn für den Anfangsabstand des
+# Planeten aus swingby.py als Funktion von Anflugwinkel und
+# Geschwindigkeit dar.
+auswahl = abstand_planet == werte_abstand_planet[2]
+fig = plt.figure()
+fig.set_tight_layout(True)
+ax = fig.add_subplot(1, 1, 1)
+ax.set_title('Geschwindigkeitsgewinn [km/s]')
+ax.set_xlabel('Anflugwinkel [°]')
+ax.set_ylabel('$v_0$ der Sonde [km/s]')
+bild = ax.pcolormesh(
+    np.degrees(werte_alpha), werte_v0_sonde / 1e3,
+    delta_v[auswahl].reshape(werte_alpha.size,
+                             werte_v0_sonde.size).T / 1e3,
+    shading='nearest')
+fig.colorbar(bild)
+plt.show()
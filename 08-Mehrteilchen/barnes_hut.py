@@ -0,0 +1,426 @@
+﻿"""Barnes-Hut-Verfahren für die Gravitation sehr vieler Körper.
+
+Die Klasse `Gravitation` berechnet die Kräfte zwischen allen
+Paaren von Körpern. Der Rechenaufwand wächst daher quadratisch mit
+der Anzahl der Körper. Beim Barnes-Hut-Verfahren wird der Raum
+rekursiv in Würfel (Oktalbaum) bzw. Quadrate (Quadtree) zerlegt.
+Ein Würfel der Kantenlänge s, dessen Schwerpunkt von einem Körper
+den Abstand d hat, wird als eine einzige Punktmasse behandelt,
+wenn s / d < theta gilt. Andernfalls werden die Teilwürfel
+betrachtet. Würfel mit höchstens `blattgroesse` Körpern werden
+nicht weiter zerlegt, und ihre Körper wechselwirken direkt. Der
+Rechenaufwand wächst dann nur noch wie n_koerper * log(n_koerper).
+
+Um Python-Schleifen über die Körper zu vermeiden, wird der Baum
+mit Array-Operationen aufgebaut: Die Körper werden nach ihrem
+Morton-Code sortiert. Dieser entsteht, indem man die Bits der
+ganzzahligen Koordinaten verschränkt. Alle Körper eines Würfels
+liegen dann in der sortierten Reihenfolge direkt hintereinander,
+und der Würfel ist durch den Anfang und das Ende dieses Bereichs
+festgelegt. Auch der Durchlauf durch den Baum wird für viele
+Körper gleichzeitig durchgeführt, indem eine Liste aller noch zu
+untersuchenden Paare aus einem Blatt und einem Würfel Ebene für
+Ebene abgearbeitet wird.
+"""
+
+import numpy as np
+
+
+def _spreize_bits(x, n_dim):
+    """Füge zwischen den Bits von x jeweils n_dim - 1 Nullen ein.
+
+    Args:
+        x (np.ndarray): Nichtnegative ganze Zahlen (dtype uint64).
+        n_dim (int): Anzahl der Raumdimensionen (2 oder 3).
+
+    Returns:
+        np.ndarray: Die gespreizten Zahlen.
+    """
+    x = x.copy()
+    if n_dim == 2:
+        masken = [(16, 0x0000ffff0000ffff), (8, 0x00ff00ff00ff00ff),
+                  (4, 0x0f0f0f0f0f0f0f0f), (2, 0x3333333333333333),
+                  (1, 0x5555555555555555)]
+    else:
+        masken = [(32, 0x001f00000000ffff), (16, 0x001f0000ff0000ff),
+                  (8, 0x100f00f00f00f00f), (4, 0x10c30c30c30c30c3),
+                  (2, 0x1249249249249249)]
+    for schiebung, maske in masken:
+        x |= x << np.uint64(schiebung)
+        x &= np.uint64(maske)
+    return x
+
+
+def morton_codes(r, ursprung, kante, n_ebenen):
+    """Berechne die Morton-Codes der Ortsvektoren.
+
+    Args:
+        r (np.ndarray):
+            Ortsvektoren (n × n_dim).
+        ursprung (np.ndarray):
+            Ecke des Würfels, der alle Körper enthält (n_dim).
+        kante (float):
+            Kantenlänge dieses Würfels.
+        n_ebenen (int):
+            Anzahl der Bits pro Koordinate.
+
+    Returns:
+        np.ndarray: Die Morton-Codes (n) mit dem dtype uint64.
+    """
+    n_dim = r.shape[1]
+    max_wert = 2 ** n_ebenen - 1
+    gitter = np.floor((r - ursprung) / kante * 2 ** n_ebenen)
+    gitter = np.clip(gitter, 0, max_wert).astype(np.uint64)
+    codes = np.zeros(r.shape[0], dtype=np.uint64)
+    for k in range(n_dim):
+        codes |= _spreize_bits(gitter[:, k], n_dim) << np.uint64(k)
+    return codes
+
+
+def _bereiche(anfang, anzahl):
+    """Verkette die Indexbereiche anfang[i] bis anfang[i] + anzahl[i].
+
+    Das Ergebnis ist dasselbe wie
+    np.concatenate([np.arange(a, a + n) for a, n in zip(anfang,
+    anzahl)]), kommt aber ohne Python-Schleife aus.
+    """
+    versatz = np.cumsum(anzahl) - anzahl
+    return (np.repeat(anfang - versatz, anzahl)
+            + np.arange(np.sum(anzahl)))
+
+
+class BarnesHut:
+    """Gravitationsbeschleunigung nach dem Barnes-Hut-Verfahren.
+
+    Die Klasse hat dieselbe Schnittstelle wie die Klasse
+    `Gravitation` und kann diese daher in den Simulationsprogrammen
+    ersetzen.
+
+    Args:
+        m (np.ndarray):
+            Massen der Körper [kg] (n_koerper).
+        G (float):
+            Gravitationskonstante [m³ / (kg * s²)].
+        n_dim (int):
+            Anzahl der Raumdimensionen (2 oder 3).
+        theta (float):
+            Öffnungswinkel. Bei theta = 0 wird jede Kraft direkt
+            berechnet. Größere Werte sind schneller, aber ungenauer.
+        blattgroesse (int):
+            Maximale Anzahl der Körper in einem Würfel, der nicht
+            weiter zerlegt wird.
+        glaettung (float):
+            Glättungslänge [m]. Das Potential wird durch
+            -G m / sqrt(d² + glaettung²) ersetzt, um sehr große
+            Kräfte bei engen Begegnungen zu vermeiden.
+        blockgroesse (int):
+            Anzahl der Körper, für die der Baum gemeinsam
+            durchlaufen wird. Größere Werte benötigen mehr Speicher.
+    """
+
+    def __init__(self, m, G=6.6743e-11, n_dim=3, theta=0.5,
+                 blattgroesse=8, glaettung=0.0, blockgroesse=4096):
+        if n_dim not in (2, 3):
+            raise ValueError('Nur 2 oder 3 Dimensionen sind möglich.')
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Körper [kg] (n_koerper)."""
+        self.G = G
+        """float: Gravitationskonstante [m³ / (kg * s²)]."""
+        self.n_dim = n_dim
+        """int: Anzahl der Raumdimensionen."""
+        self.theta = theta
+        """float: Öffnungswinkel."""
+        self.blattgroesse = blattgroesse
+        """int: Maximale Anzahl der Körper in einem Blatt."""
+        self.glaettung = glaettung
+        """float: Glättungslänge [m]."""
+        self.blockgroesse = blockgroesse
+        """int: Anzahl der gemeinsam behandelten Körper."""
+
+        # Anzahl der Bits pro Koordinate, sodass ein Morton-Code in
+        # eine 64-Bit-Zahl passt.
+        self._n_ebenen = 63 // n_dim
+
+        self.n_knoten = 0
+        """int: Anzahl der Knoten des zuletzt aufgebauten Baums."""
+        self.n_wechselwirkungen = 0
+        """int: Anzahl der berechneten Paarwechselwirkungen."""
+
+    @property
+    def n_koerper(self):
+        """int: Anzahl der Körper."""
+        return self.m.size
+
+    def _baue_baum(self, r):
+        """Baue den Baum für die Ortsvektoren r auf.
+
+        Die Körper werden nach ihrem Morton-Code sortiert. Jeder
+        Knoten des Baums umfasst einen zusammenhängenden Bereich
+        der sortierten Körper. Die Kinder eines Knotens stehen in
+        den Knotenarrays direkt hintereinander.
+        """
+        n_dim = self.n_dim
+        n_ebenen = self._n_ebenen
+
+        # Würfel, der alle Körper enthält. Er wird etwas
+        # vergrößert, damit alle Körper echt im Inneren liegen.
+        r_min = np.min(r, axis=0)
+        kante = np.max(np.max(r, axis=0) - r_min)
+        kante = kante * (1 + 1e-10) + np.finfo(float).tiny
+        codes = morton_codes(r, r_min, kante, n_ebenen)
+
+        reihenfolge = np.argsort(codes, kind='stable')
+        self._reihenfolge = reihenfolge
+        self._codes = codes[reihenfolge]
+        self._r = r[reihenfolge]
+        self._m = self.m[reihenfolge]
+
+        # Für die Summen über die Bereiche mit np.add.reduceat wird
+        # eine Null angehängt, damit auch Bereiche bis zum Ende des
+        # Arrays möglich sind.
+        m_null = np.append(self._m, 0)
+        mr_null = np.vstack([self._m[:, np.newaxis] * self._r,
+                             np.zeros((1, n_dim))])
+
+        # Listen mit den Arrays der Knoten jeder Ebene.
+        anfang = [np.array([0])]
+        ende = [np.array([self.n_koerper])]
+        ebene_liste = [np.array([0])]
+        kind_anfang = []
+        kind_anzahl = []
+        n_knoten = 1
+
+        for ebene in range(n_ebenen + 1):
+            a, e = anfang[-1], ende[-1]
+            teilen = (e - a > self.blattgroesse) & (ebene < n_ebenen)
+            anzahl = np.zeros(a.size, dtype=int)
+            if not np.any(teilen):
+                kind_anfang.append(np.zeros(a.size, dtype=int))
+                kind_anzahl.append(anzahl)
+                break
+
+            # Schlüssel der Würfel der nächsten Ebene. Ein neuer
+            # Würfel beginnt überall dort, wo sich der Schlüssel
+            # ändert.
+            verschiebung = np.uint64(n_dim * (n_ebenen - ebene - 1))
+            schluessel = self._codes >> verschiebung
+            wechsel = np.ones(self.n_koerper + 1, dtype=bool)
+            wechsel[1:-1] = schluessel[1:] != schluessel[:-1]
+            alle_anfaenge = np.nonzero(wechsel)[0]
+
+            # Nur die Würfel innerhalb der zu teilenden Knoten.
+            bereich = _bereiche(a[teilen], e[teilen] - a[teilen])
+            neu_anfang = bereich[wechsel[bereich]]
+            idx = np.searchsorted(alle_anfaenge, neu_anfang,
+                                  side='right')
+            neu_ende = alle_anfaenge[idx]
+
+            eltern = np.searchsorted(a, neu_anfang, side='right') - 1
+            anzahl = np.bincount(eltern, minlength=a.size)
+            kind_anfang.append(n_knoten + np.cumsum(anzahl) - anzahl)
+            kind_anzahl.append(anzahl)
+
+            anfang.append(neu_anfang)
+            ende.append(neu_ende)
+            ebene_liste.append(np.full(neu_anfang.size, ebene + 1))
+            n_knoten += neu_anfang.size
+
+        anfang = np.concatenate(anfang)
+        ende = np.concatenate(ende)
+        self._anfang = anfang
+        self._ende = ende
+        self._ebene = np.concatenate(ebene_liste)
+        self._kind_anfang = np.concatenate(kind_anfang)
+        self._kind_anzahl = np.concatenate(kind_anzahl)
+        self._blatt = self._kind_anzahl == 0
+        self.n_knoten = anfang.size
+
+        # Masse, Schwerpunkt und Kantenlänge jedes Knotens.
+        indizes = np.stack([anfang, ende], axis=1).reshape(-1)
+        masse = np.add.reduceat(m_null, indizes)[::2]
+        mr = np.add.reduceat(mr_null, indizes, axis=0)[::2]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            schwerpunkt = mr / masse[:, np.newaxis]
+        # Knoten ohne Masse liefern keinen Beitrag. Ihr
+        # Schwerpunkt wird auf die Position des ersten Körpers
+        # gesetzt, um ungültige Werte zu vermeiden.
+        ohne_masse = masse == 0
+        schwerpunkt[ohne_masse] = self._r[anfang[ohne_masse]]
+        self._masse = masse
+        self._schwerpunkt = schwerpunkt
+        self._kante = kante / 2.0 ** self._ebene
+        self._verschiebung = (n_dim * (n_ebenen - self._ebene)
+                              ).astype(np.uint64)
+        self._schluessel = (self._codes[anfang]
+                            >> self._verschiebung)
+
+        # Mittelpunkt und Radius einer Kugel, die alle Körper eines
+        # Blatts enthält. Die Blätter überdecken lückenlos alle
+        # Körper, sodass np.minimum.reduceat verwendet werden kann.
+        blaetter = np.nonzero(self._blatt)[0]
+        blaetter = blaetter[np.argsort(anfang[blaetter])]
+        r_min = np.minimum.reduceat(self._r, anfang[blaetter])
+        r_max = np.maximum.reduceat(self._r, anfang[blaetter])
+        self._zentrum = np.zeros((self.n_knoten, n_dim))
+        self._ausdehnung = np.zeros(self.n_knoten)
+        self._zentrum[blaetter] = (r_min + r_max) / 2
+        self._ausdehnung[blaetter] = np.linalg.norm(r_max - r_min,
+                                                    axis=1) / 2
+
+    def _beitrag(self, a, ziel, dr, m_quelle):
+        """Addiere G m / d³ * dr zu den Beschleunigungen a[ziel]."""
+        abstand2 = np.sum(dr * dr, axis=1) + self.glaettung ** 2
+        with np.errstate(divide='ignore', invalid='ignore'):
+            faktor = self.G * m_quelle / (abstand2 * np.sqrt(abstand2))
+        faktor[abstand2 == 0] = 0
+        for k in range(self.n_dim):
+            a[:, k] += np.bincount(ziel, weights=faktor * dr[:, k],
+                                   minlength=a.shape[0])
+        self.n_wechselwirkungen += ziel.size
+
+    def _durchlaufe_baum(self, gruppen, a):
+        """Berechne die Beschleunigungen der Körper einiger Blätter.
+
+        Der Baum wird nicht für jeden Körper einzeln, sondern für
+        alle Körper eines Blatts (einer Gruppe) gemeinsam
+        durchlaufen. Ein Knoten wird als Punktmasse behandelt, wenn
+        das Kriterium s / d < theta für den Punkt der Gruppe
+        erfüllt ist, der dem Schwerpunkt des Knotens am nächsten
+        liegt.
+
+        Args:
+            gruppen (np.ndarray):
+                Indizes der Blätter, deren Körper in der sortierten
+                Reihenfolge direkt aufeinander folgen.
+            a (np.ndarray):
+                Array (n × n_dim) mit den Beschleunigungen der
+                Körper dieser Blätter, zu dem die Beiträge addiert
+                werden.
+        """
+        erster = self._anfang[gruppen[0]]
+
+        # Liste der noch zu untersuchenden Paare aus einer Gruppe g
+        # und einem Knoten k.
+        g = gruppen
+        k = np.zeros(gruppen.size, dtype=int)
+
+        while g.size > 0:
+            dr = self._schwerpunkt[k] - self._zentrum[g]
+            abstand = (np.sqrt(np.sum(dr * dr, axis=1))
+                       - self._ausdehnung[g])
+
+            # Ein Knoten darf nicht als Punktmasse behandelt werden,
+            # wenn er die Gruppe selbst enthält.
+            codes = self._codes[self._anfang[g]]
+            enthalten = ((codes >> self._verschiebung[k])
+                         == self._schluessel[k])
+            akzeptiert = ~enthalten & (self._kante[k]
+                                       < self.theta * abstand)
+
+            # Wechselwirkung aller Körper der Gruppe mit dem
+            # Schwerpunkt des Knotens.
+            ga, ka = g[akzeptiert], k[akzeptiert]
+            anzahl = self._ende[ga] - self._anfang[ga]
+            ziel = _bereiche(self._anfang[ga], anzahl)
+            ka = np.repeat(ka, anzahl)
+            self._beitrag(a, ziel - erster,
+                          self._schwerpunkt[ka] - self._r[ziel],
+                          self._masse[ka])
+
+            # Blätter, die nicht als Punktmasse behandelt werden
+            # können, wechselwirken direkt mit den Körpern der
+            # Gruppe.
+            offen = ~akzeptiert
+            blatt = offen & self._blatt[k]
+            ziel, quelle = self._paare(g[blatt], k[blatt])
+            self._beitrag(a, ziel - erster,
+                          self._r[quelle] - self._r[ziel],
+                          self._m[quelle])
+
+            # Alle übrigen Knoten werden durch ihre Kinder ersetzt.
+            innen = offen & ~self._blatt[k]
+            g, k = g[innen], k[innen]
+            anzahl = self._kind_anzahl[k]
+            k = _bereiche(self._kind_anfang[k], anzahl)
+            g = np.repeat(g, anzahl)
+
+    def _paare(self, g, k):
+        """Bilde alle Paare aus Körpern der Knoten g und k.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Die sortierten Indizes
+            der Körper aus g und der Körper aus k.
+        """
+        n_g = self._ende[g] - self._anfang[g]
+        n_k = self._ende[k] - self._anfang[k]
+        anzahl = n_g * n_k
+        nummer = np.arange(np.sum(anzahl)) - np.repeat(
+            np.cumsum(anzahl) - anzahl, anzahl)
+        n_k = np.repeat(n_k, anzahl)
+        ziel = np.repeat(self._anfang[g], anzahl) + nummer // n_k
+        quelle = np.repeat(self._anfang[k], anzahl) + nummer % n_k
+        return ziel, quelle
+
+    def beschleunigung(self, r, out=None):
+        """Berechne die Beschleunigungen aller Körper.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren der Körper [m] (n_koerper × n_dim).
+            out (np.ndarray):
+                Array (n_koerper × n_dim), in das das Ergebnis
+                geschrieben wird. Bei None wird ein neues Array
+                angelegt.
+
+        Returns:
+            np.ndarray: Beschleunigungen [m/s²] (n_koerper × n_dim).
+        """
+        if out is None:
+            out = np.empty((self.n_koerper, self.n_dim))
+        self._baue_baum(np.asarray(r))
+
+        # Teile die Blätter in Blöcke mit jeweils etwa
+        # `blockgroesse` Körpern auf.
+        blaetter = np.nonzero(self._blatt)[0]
+        blaetter = blaetter[np.argsort(self._anfang[blaetter])]
+        block = self._anfang[blaetter] // self.blockgroesse
+        grenzen = np.nonzero(np.diff(block))[0] + 1
+
+        a = np.zeros((self.n_koerper, self.n_dim))
+        for gruppen in np.split(blaetter, grenzen):
+            start = self._anfang[gruppen[0]]
+            ende = self._ende[gruppen[-1]]
+            self._durchlaufe_baum(gruppen, a[start:ende])
+
+        # Bringe die Körper wieder in die ursprüngliche Reihenfolge.
+        out[self._reihenfolge] = a
+        return out
+
+    def dgl(self, t, u, out=None):
+        """Berechne die rechte Seite der Differentialgleichung.
+
+        Der Zustandsvektor u enthält zuerst alle Ortsvektoren und
+        danach alle Geschwindigkeitsvektoren, wie in den Programmen
+        zur Simulation des Sonnensystems.
+
+        Args:
+            t (float):
+                Zeitpunkt [s].
+            u (np.ndarray):
+                Zustandsvektor (2 * n_koerper * n_dim).
+            out (np.ndarray):
+                Array, in das das Ergebnis geschrieben wird. Bei
+                None wird ein neues Array angelegt.
+
+        Returns:
+            np.ndarray: Zeitableitung des Zustandsvektors.
+        """
+        if out is None:
+            out = np.empty_like(u)
+        r, v = np.split(u, 2)
+        r = r.reshape(self.n_koerper, self.n_dim)
+        out_r, out_v = np.split(out, 2)
+        out_r[:] = v
+        self.beschleunigung(r, out=out_v.reshape(self.n_koerper,
+                                                 self.n_dim))
+        return out
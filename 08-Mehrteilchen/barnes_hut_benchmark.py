@@ -0,0 +1,100 @@
+﻿"""Genauigkeit und Rechenzeit des Barnes-Hut-Verfahrens.
+
+Das Programm berechnet die Beschleunigungen der Sterne eines
+kugelförmigen Sternhaufens (Plummer-Modell) einmal direkt mit der
+Klasse `Gravitation` und einmal mit der Klasse `BarnesHut` für
+verschiedene Öffnungswinkel theta. Ausgegeben werden die
+Rechenzeiten und der relative Fehler der Beschleunigungen. Die
+Ergebnisse werden zusätzlich grafisch dargestellt.
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from gravitation import Gravitation
+from barnes_hut import BarnesHut
+
+# Anzahlen der Sterne und Öffnungswinkel, die getestet werden.
+liste_n_koerper = [1000, 4000, 16000]
+liste_theta = [0.3, 0.5, 0.7, 1.0]
+
+# Maximale Anzahl der Sterne in einem Blatt des Baums.
+blattgroesse = 8
+
+# Dimension des Raumes und Gravitationskonstante. Es werden
+# dimensionslose Einheiten verwendet.
+n_dim = 3
+G = 1.0
+
+rng = np.random.default_rng(2)
+
+
+def plummer(n_koerper):
+    """Erzeuge zufällige Positionen gemäß dem Plummer-Modell."""
+    radius = 1 / np.sqrt(rng.uniform(0, 1, n_koerper) ** (-2 / 3) - 1)
+    richtung = rng.normal(size=(n_koerper, n_dim))
+    richtung /= np.linalg.norm(richtung, axis=1, keepdims=True)
+    return radius[:, np.newaxis] * richtung
+
+
+def stoppe_zeit(funktion, r):
+    """Gib das Ergebnis und die Rechenzeit eines Aufrufs zurück."""
+    zeit = time.perf_counter()
+    ergebnis = funktion(r).copy()
+    return ergebnis, time.perf_counter() - zeit
+
+
+zeiten_direkt = []
+zeiten_baum = np.empty((len(liste_n_koerper), len(liste_theta)))
+fehler = np.empty((len(liste_n_koerper), len(liste_theta)))
+
+for i, n_koerper in enumerate(liste_n_koerper):
+    r = plummer(n_koerper)
+    m = np.full(n_koerper, 1 / n_koerper)
+
+    direkt = Gravitation(m, G, n_dim, blockgroesse=500)
+    a_direkt, zeit = stoppe_zeit(direkt.beschleunigung, r)
+    zeiten_direkt.append(zeit)
+    print(f'N = {n_koerper:6d}, direkt:      {zeit:8.3f} s')
+
+    for j, theta in enumerate(liste_theta):
+        baum = BarnesHut(m, G, n_dim, theta=theta,
+                         blattgroesse=blattgroesse)
+        a, zeiten_baum[i, j] = stoppe_zeit(baum.beschleunigung, r)
+
+        # Relativer Fehler der Beschleunigung jedes Sterns. Es wird
+        # der Median über alle Sterne angegeben.
+        fehler_stern = (np.linalg.norm(a - a_direkt, axis=1)
+                        / np.linalg.norm(a_direkt, axis=1))
+        fehler[i, j] = np.median(fehler_stern)
+        print(f'N = {n_koerper:6d}, theta = {theta:3.1f}: '
+              f'{zeiten_baum[i, j]:8.3f} s, '
+              f'Fehler {fehler[i, j]:.1e}')
+
+# Stelle die Rechenzeiten und die Fehler grafisch dar.
+fig = plt.figure(figsize=(10, 4))
+fig.set_tight_layout(True)
+
+ax_zeit = fig.add_subplot(1, 2, 1)
+ax_zeit.set_xlabel('Anzahl der Körper')
+ax_zeit.set_ylabel('Rechenzeit [s]')
+ax_zeit.set_xscale('log')
+ax_zeit.set_yscale('log')
+ax_zeit.grid()
+ax_zeit.plot(liste_n_koerper, zeiten_direkt, 'o-k', label='direkt')
+for j, theta in enumerate(liste_theta):
+    ax_zeit.plot(liste_n_koerper, zeiten_baum[:, j], 'o-',
+                 label=f'θ = {theta}')
+ax_zeit.legend()
+
+ax_fehler = fig.add_subplot(1, 2, 2)
+ax_fehler.set_xlabel('θ')
+ax_fehler.set_ylabel('Median des relativen Fehlers')
+ax_fehler.set_yscale('log')
+ax_fehler.grid()
+for i, n_koerper in enumerate(liste_n_koerper):
+    ax_fehler.plot(liste_theta, fehler[i], 'o-',
+                   label=f'N = {n_koerper}')
+ax_fehler.legend()
+
+plt.show()
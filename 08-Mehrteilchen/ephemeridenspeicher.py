@@ -0,0 +1,186 @@
+﻿"""Speicherung von Ephemeriden für schnellen, teilweisen Zugriff.
+
+Eine mit `np.savez` erzeugte Datei muss beim Zugriff auf ein Array
+immer vollständig gelesen werden, auch wenn nur ein einzelner
+Körper oder ein kurzer Zeitraum benötigt wird. Die hier definierten
+Funktionen legen die Ephemeriden stattdessen in einem Verzeichnis
+ab: Die Zeitpunkte, Orte und Geschwindigkeiten werden jeweils als
+unkomprimierte .npy-Datei gespeichert und alle übrigen Daten in
+der Datei info.json. Beim Laden werden die Arrays mit `np.memmap`
+eingeblendet. Erst beim Zugriff auf ein Element wird der
+entsprechende Teil der Datei gelesen, und das Ausschneiden eines
+Körpers oder eines Zeitfensters erzeugt keine Kopie.
+"""
+
+import json
+import os
+import numpy as np
+
+# Namen der Arrays, die als .npy-Dateien gespeichert werden.
+_ARRAYS = ['t', 'r', 'v']
+
+
+def _speichere_info(verzeichnis, daten):
+    """Schreibe die übrigen Daten in die Datei info.json."""
+    info = {name: np.asarray(wert).tolist()
+            for name, wert in daten.items()}
+    with open(os.path.join(verzeichnis, 'info.json'), 'w',
+              encoding='utf-8') as datei:
+        json.dump(info, datei, ensure_ascii=False, indent=2)
+
+
+def _lade_info(verzeichnis):
+    """Lies die übrigen Daten aus der Datei info.json."""
+    with open(os.path.join(verzeichnis, 'info.json'),
+              encoding='utf-8') as datei:
+        return json.load(datei)
+
+
+def speichere_ephemeriden(verzeichnis, t, r, v, **daten):
+    """Speichere Ephemeriden in einem Verzeichnis.
+
+    Args:
+        verzeichnis (str):
+            Name des Verzeichnisses. Es wird ggf. angelegt.
+        t (np.ndarray):
+            Zeitpunkte [s] (n_t).
+        r (np.ndarray):
+            Ortsvektoren [m] (n_koerper × n_dim × n_t).
+        v (np.ndarray):
+            Geschwindigkeiten [m/s] (n_koerper × n_dim × n_t).
+        **daten:
+            Weitere Daten, z.B. die Namen und Massen der Körper.
+            Sie müssen sich in JSON umwandeln lassen.
+    """
+    os.makedirs(verzeichnis, exist_ok=True)
+    for name, wert in zip(_ARRAYS, [t, r, v]):
+        np.save(os.path.join(verzeichnis, f'{name}.npy'), wert)
+    _speichere_info(verzeichnis, daten)
+
+
+def lege_ephemeriden_an(verzeichnis, n_koerper, n_dim, n_t, **daten):
+    """Lege leere Ephemeriden an, die anschließend befüllt werden.
+
+    Die zurückgegebenen Arrays sind in die Dateien eingeblendet.
+    Sie können z.B. der Funktion `symplektisch.integriere` als
+    Ausgabearrays übergeben werden, sodass die Ergebnisse direkt
+    in die Dateien geschrieben werden.
+
+    Args:
+        verzeichnis (str):
+            Name des Verzeichnisses. Es wird ggf. angelegt.
+        n_koerper (int):
+            Anzahl der Körper.
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+        n_t (int):
+            Anzahl der Zeitpunkte.
+        **daten:
+            Weitere Daten, z.B. die Namen und Massen der Körper.
+
+    Returns:
+        tuple[np.memmap, np.memmap, np.memmap]:
+            Die Arrays für die Zeitpunkte, Orte und
+            Geschwindigkeiten.
+    """
+    os.makedirs(verzeichnis, exist_ok=True)
+    formen = [(n_t,), (n_koerper, n_dim, n_t), (n_koerper, n_dim, n_t)]
+    arrays = tuple(
+        np.lib.format.open_memmap(
+            os.path.join(verzeichnis, f'{name}.npy'), mode='w+',
+            dtype=np.float64, shape=form)
+        for name, form in zip(_ARRAYS, formen))
+    _speichere_info(verzeichnis, daten)
+    return arrays
+
+
+def lade_ephemeriden(verzeichnis):
+    """Öffne gespeicherte Ephemeriden.
+
+    Das Ergebnis kann wie das Ergebnis von `np.load` für eine
+    .npz-Datei verwendet werden. Die Arrays 't', 'r' und 'v' werden
+    jedoch nur eingeblendet und nicht gelesen.
+
+    Args:
+        verzeichnis (str):
+            Name des Verzeichnisses.
+
+    Returns:
+        dict: Die Arrays 't', 'r' und 'v' als schreibgeschützte
+        `np.memmap` und alle übrigen Daten als `np.ndarray`.
+    """
+    dat = {name: np.asarray(wert)
+           for name, wert in _lade_info(verzeichnis).items()}
+    for name in _ARRAYS:
+        dat[name] = np.load(os.path.join(verzeichnis, f'{name}.npy'),
+                            mmap_mode='r')
+        if 'n_gueltig' in dat:
+            dat[name] = dat[name][..., :int(dat['n_gueltig'])]
+    return dat
+
+
+def kuerze_ephemeriden(verzeichnis, n_t):
+    """Beschränke die Ephemeriden auf die ersten n_t Zeitpunkte.
+
+    Dies ist erforderlich, wenn eine Simulation, deren Ergebnisse
+    mit `lege_ephemeriden_an` direkt in die Dateien geschrieben
+    werden, vorzeitig abgebrochen wird. Die Anzahl der gültigen
+    Zeitpunkte wird in der Datei info.json vermerkt, und
+    `lade_ephemeriden` blendet nur diese Zeitpunkte ein. Die
+    .npy-Dateien werden nicht verändert, sodass bereits
+    eingeblendete Arrays gültig bleiben.
+
+    Args:
+        verzeichnis (str):
+            Name des Verzeichnisses.
+        n_t (int):
+            Anzahl der gültigen Zeitpunkte.
+    """
+    info = _lade_info(verzeichnis)
+    info['n_gueltig'] = int(n_t)
+    _speichere_info(verzeichnis, info)
+
+
+def zeitfenster(t, t_start, t_ende):
+    """Bestimme den Indexbereich der Zeitpunkte in [t_start, t_ende].
+
+    Da die Zeitpunkte aufsteigend sortiert sind, genügt eine
+    binäre Suche, bei der nur wenige Elemente von t gelesen werden.
+
+    Args:
+        t (np.ndarray):
+            Aufsteigend sortierte Zeitpunkte [s].
+        t_start (float):
+            Anfang des Zeitfensters [s].
+        t_ende (float):
+            Ende des Zeitfensters [s].
+
+    Returns:
+        slice: Der Indexbereich, z.B. für r[:, :, bereich].
+    """
+    anfang = np.searchsorted(t, t_start, side='left')
+    ende = np.searchsorted(t, t_ende, side='right')
+    return slice(int(anfang), int(ende))
+
+
+def naechster_index(t, t_gesucht):
+    """Bestimme den Index des Zeitpunkts, der t_gesucht am nächsten ist.
+
+    Wie bei `zeitfenster` wird eine binäre Suche verwendet, sodass
+    das Array t nicht vollständig gelesen werden muss.
+
+    Args:
+        t (np.ndarray):
+            Aufsteigend sortierte Zeitpunkte [s].
+        t_gesucht (float):
+            Gesuchter Zeitpunkt [s].
+
+    Returns:
+        int: Der Index des nächstgelegenen Zeitpunkts.
+    """
+    i = int(np.searchsorted(t, t_gesucht))
+    if i == 0:
+        return 0
+    if i == len(t) or t_gesucht - t[i - 1] <= t[i] - t_gesucht:
+        return i - 1
+    return i
@@ -0,0 +1,167 @@
+﻿"""Suche nach nahen Begegnungen und Apsiden in Ephemeriden.
+
+Der Abstand zweier Körper ist genau dann minimal oder maximal, wenn
+die Radialgeschwindigkeit, also die Komponente der
+Relativgeschwindigkeit in Richtung des Verbindungsvektors, ihr
+Vorzeichen wechselt. Die Funktion `finde_extrema` sucht diese
+Vorzeichenwechsel für viele Paare von Körpern und alle Zeitpunkte
+gleichzeitig mit Array-Operationen. Anschließend wird der genaue
+Zeitpunkt jedes Extremums bestimmt. Dazu wird die Bahn zwischen
+den beiden benachbarten Zeitpunkten durch ein kubisches
+Hermite-Polynom interpoliert, das mit den Orten und
+Geschwindigkeiten an beiden Zeitpunkten übereinstimmt, und die
+Nullstelle der Radialgeschwindigkeit mit dem Bisektionsverfahren
+berechnet.
+
+Die Paare und Zeitpunkte werden in Blöcken bearbeitet, sodass
+auch sehr lange Simulationen vieler Körper untersucht werden
+können, die z.B. mit `ephemeridenspeicher.lade_ephemeriden`
+eingeblendet wurden.
+"""
+
+import numpy as np
+
+# Datentyp der Tabelle, die von `finde_extrema` zurückgegeben wird.
+EREIGNIS_DTYPE = np.dtype([('i', int), ('j', int), ('t', float),
+                           ('abstand', float), ('minimum', bool)])
+
+
+def _hermite(p0, m0, p1, m1, h, s):
+    """Interpoliere Ort und Geschwindigkeit mit Hermite-Polynomen.
+
+    Args:
+        p0, p1 (np.ndarray):
+            Orte am Anfang und Ende der Intervalle (n × n_dim).
+        m0, m1 (np.ndarray):
+            Geschwindigkeiten am Anfang und Ende (n × n_dim).
+        h (np.ndarray):
+            Länge der Intervalle (n).
+        s (np.ndarray):
+            Relative Position im Intervall zwischen 0 und 1 (n).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Ort und Geschwindigkeit
+        (jeweils n × n_dim).
+    """
+    s = s[:, np.newaxis]
+    h = h[:, np.newaxis]
+    s2 = s * s
+    s3 = s2 * s
+    p = ((2 * s3 - 3 * s2 + 1) * p0 + (s3 - 2 * s2 + s) * h * m0
+         + (-2 * s3 + 3 * s2) * p1 + (s3 - s2) * h * m1)
+    m = ((6 * s2 - 6 * s) * p0 / h + (3 * s2 - 4 * s + 1) * m0
+         + (-6 * s2 + 6 * s) * p1 / h + (3 * s2 - 2 * s) * m1)
+    return p, m
+
+
+def _verfeinere(t0, t1, p0, m0, p1, m1, n_iter):
+    """Bestimme die Nullstelle der Radialgeschwindigkeit.
+
+    Es wird vorausgesetzt, dass p·m an den beiden Intervallgrenzen
+    ein unterschiedliches Vorzeichen hat.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Die Zeitpunkte und die
+        Abstände der Extrema.
+    """
+    h = t1 - t0
+    links = np.zeros(h.size)
+    rechts = np.ones(h.size)
+    g_links = np.sum(p0 * m0, axis=1)
+    for _ in range(n_iter):
+        mitte = (links + rechts) / 2
+        p, m = _hermite(p0, m0, p1, m1, h, mitte)
+        g = np.sum(p * m, axis=1)
+        gleich = np.sign(g) == np.sign(g_links)
+        links = np.where(gleich, mitte, links)
+        g_links = np.where(gleich, g, g_links)
+        rechts = np.where(gleich, rechts, mitte)
+    s = (links + rechts) / 2
+    p, _ = _hermite(p0, m0, p1, m1, h, s)
+    return t0 + s * h, np.linalg.norm(p, axis=1)
+
+
+def finde_extrema(t, r, v=None, paare=None, max_abstand=None,
+                  blockgroesse=2 ** 22, n_iter=40):
+    """Finde alle Minima und Maxima der Abstände von Körperpaaren.
+
+    Args:
+        t (np.ndarray):
+            Aufsteigend sortierte Zeitpunkte [s] (n_t).
+        r (np.ndarray):
+            Ortsvektoren [m] (n_koerper × n_dim × n_t).
+        v (np.ndarray):
+            Geschwindigkeiten [m/s] (n_koerper × n_dim × n_t). Bei
+            None werden sie aus den Orten durch numerisches
+            Differenzieren bestimmt.
+        paare (np.ndarray):
+            Indizes der zu untersuchenden Paare (n_paare × 2). Bei
+            None werden alle Paare i < j untersucht.
+        max_abstand (float):
+            Falls angegeben, werden nur Extrema zurückgegeben, bei
+            denen der Abstand kleiner als dieser Wert ist, z.B.
+            um nur nahe Begegnungen zu finden.
+        blockgroesse (int):
+            Ungefähre Anzahl der Elemente der Arrays, die
+            gleichzeitig im Speicher gehalten werden.
+        n_iter (int):
+            Anzahl der Bisektionsschritte zur Verfeinerung.
+
+    Returns:
+        np.ndarray:
+            Tabelle mit dem Datentyp `EREIGNIS_DTYPE`, nach der
+            Zeit sortiert. Die Felder 'i' und 'j' enthalten die
+            Indizes der Körper, 't' den Zeitpunkt und 'abstand' den
+            Abstand des Extremums. Das Feld 'minimum' ist True für
+            Minima (z.B. Perihel, nahe Begegnung) und False für
+            Maxima (z.B. Aphel).
+    """
+    n_koerper, n_dim, n_t = r.shape
+    if paare is None:
+        paare = np.stack(np.triu_indices(n_koerper, k=1), axis=1)
+    paare = np.asarray(paare).reshape(-1, 2)
+
+    # Wähle die Blöcke so, dass ein Block aus höchstens
+    # `blockgroesse` Elementen besteht. Aufeinanderfolgende
+    # Zeitblöcke überlappen sich um einen Zeitpunkt.
+    b_paare = max(1, min(paare.shape[0],
+                         blockgroesse // (n_dim * n_t)))
+    b_zeit = max(2, blockgroesse // (n_dim * b_paare))
+
+    ergebnisse = []
+    for start_paar in range(0, paare.shape[0], b_paare):
+        i, j = paare[start_paar:start_paar + b_paare].T
+        for start in range(0, n_t - 1, b_zeit - 1):
+            zeit = slice(start, min(start + b_zeit, n_t))
+            dr = r[j, :, zeit] - r[i, :, zeit]
+            if v is None:
+                dv = np.gradient(dr, t[zeit], axis=2)
+            else:
+                dv = v[j, :, zeit] - v[i, :, zeit]
+
+            # Vorzeichenwechsel der Radialgeschwindigkeit.
+            g = np.einsum('pdk,pdk->pk', dr, dv)
+            minimum = (g[:, :-1] < 0) & (g[:, 1:] >= 0)
+            maximum = (g[:, :-1] > 0) & (g[:, 1:] <= 0)
+            p, k = np.nonzero(minimum | maximum)
+            if p.size == 0:
+                continue
+
+            t_zeit = t[zeit]
+            t_ext, abstand = _verfeinere(
+                t_zeit[k], t_zeit[k + 1], dr[p, :, k], dv[p, :, k],
+                dr[p, :, k + 1], dv[p, :, k + 1], n_iter)
+
+            tabelle = np.empty(p.size, dtype=EREIGNIS_DTYPE)
+            tabelle['i'] = i[p]
+            tabelle['j'] = j[p]
+            tabelle['t'] = t_ext
+            tabelle['abstand'] = abstand
+            tabelle['minimum'] = minimum[p, k]
+            ergebnisse.append(tabelle)
+
+    tabelle = np.concatenate([np.empty(0, dtype=EREIGNIS_DTYPE)]
+                             + ergebnisse)
+    if max_abstand is not None:
+        tabelle = tabelle[tabelle['abstand'] < max_abstand]
+    return tabelle[np.argsort(tabelle['t'], kind='stable')]
@@ -0,0 +1,175 @@
+﻿"""Überwachung der Erhaltungsgrößen während einer N-Körper-Simulation.
+
+Im Programm sonnensystem_anim.py werden Energie, Impuls und
+Drehimpuls erst nach der Simulation aus den vollständigen
+Zeitreihen berechnet. Die Klasse `Erhaltungsgroessen` berechnet
+diese Größen stattdessen während der Simulation in regelmäßigen
+Abständen aus dem aktuellen Zustand und speichert nur die bisher
+größten Abweichungen von den Anfangswerten. Der Speicherbedarf ist
+daher unabhängig von der Dauer der Simulation.
+
+Überschreitet die relative Änderung der Energie einen
+vorgegebenen Wert, so kann die Simulation abgebrochen oder mit
+einer kleineren Schrittweite wiederholt werden. Dazu wird ein
+Objekt dieser Klasse der Funktion `symplektisch.integriere`
+übergeben.
+"""
+
+import numpy as np
+from gravitation import Gravitation
+
+
+class Erhaltungsgroessen:
+    """Laufende Überwachung von Energie, Impuls und Drehimpuls.
+
+    Args:
+        m (np.ndarray):
+            Massen der Körper [kg] (n_koerper).
+        G (float):
+            Gravitationskonstante [m³ / (kg * s²)].
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+        alle (int):
+            Die Erhaltungsgrößen werden nach jeweils `alle`
+            Zeitschritten überprüft.
+        max_drift (float):
+            Maximal erlaubte relative Änderung der Energie. Bei None
+            werden die Größen nur aufgezeichnet.
+        aktion (str):
+            Reaktion auf eine Überschreitung von `max_drift`:
+            'abbrechen' beendet die Simulation, 'verkleinern'
+            wiederholt die letzten Zeitschritte mit halbierter
+            Schrittweite.
+        max_halbierungen (int):
+            Maximale Anzahl der Halbierungen der Schrittweite.
+            Danach wird die Simulation abgebrochen.
+    """
+
+    def __init__(self, m, G=6.6743e-11, n_dim=3, alle=100,
+                 max_drift=None, aktion='abbrechen',
+                 max_halbierungen=10):
+        if aktion not in ('abbrechen', 'verkleinern'):
+            raise ValueError(f'Unbekannte Aktion: {aktion}')
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Körper [kg] (n_koerper)."""
+        self.gravitation = Gravitation(self.m, G, n_dim)
+        """Gravitation: Berechnung der potentiellen Energie."""
+        self.alle = alle
+        """int: Anzahl der Zeitschritte zwischen zwei Prüfungen."""
+        self.max_drift = max_drift
+        """float: Maximal erlaubte relative Energieänderung."""
+        self.aktion = aktion
+        """str: Reaktion auf eine Überschreitung von max_drift."""
+        self.max_halbierungen = max_halbierungen
+        """int: Maximale Anzahl der Halbierungen der Schrittweite."""
+
+        self.anfangswerte = None
+        """dict: Die Erhaltungsgrößen zum Zeitpunkt t=0."""
+        self.drift_min = 0.0
+        """float: Kleinste relative Energieänderung."""
+        self.drift_max = 0.0
+        """float: Größte relative Energieänderung."""
+        self.max_abweichung_impuls = 0.0
+        """float: Größte Änderung des Gesamtimpulses relativ zur
+        Summe der Impulsbeträge aller Körper."""
+        self.max_abweichung_drehimpuls = 0.0
+        """float: Größte relative Änderung des Drehimpulses."""
+        self.max_abweichung_schwerpunkt = 0.0
+        """float: Größte Abweichung des Schwerpunkts von der
+        geradlinig gleichförmigen Bewegung [m]."""
+        self.n_pruefungen = 0
+        """int: Anzahl der durchgeführten Prüfungen."""
+        self.n_halbierungen = 0
+        """int: Anzahl der bisherigen Halbierungen."""
+        self.abgebrochen = False
+        """bool: Wurde die Simulation abgebrochen?"""
+
+    def berechne(self, r, v):
+        """Berechne die Erhaltungsgrößen für einen Zustand.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren [m] (n_koerper × n_dim).
+            v (np.ndarray):
+                Geschwindigkeiten [m/s] (n_koerper × n_dim).
+
+        Returns:
+            dict: Energie 'E', Impuls 'P', Summe der
+            Impulsbeträge 'P_summe', Drehimpuls 'L' und
+            Schwerpunkt 'R'.
+        """
+        E_kin = 1 / 2 * self.m @ np.sum(v * v, axis=1)
+        E_pot = self.gravitation.potentielle_energie(r)
+        return {'E': E_kin + E_pot,
+                'P': self.m @ v,
+                'P_summe': self.m @ np.linalg.norm(v, axis=1),
+                'L': self.m @ np.cross(r, v),
+                'R': self.m @ r / np.sum(self.m)}
+
+    def start(self, r, v):
+        """Lege die Anfangswerte fest und setze die Statistik zurück."""
+        self.anfangswerte = self.berechne(r, v)
+        self.drift_min = self.drift_max = 0.0
+        self.max_abweichung_impuls = 0.0
+        self.max_abweichung_drehimpuls = 0.0
+        self.max_abweichung_schwerpunkt = 0.0
+        self.n_pruefungen = 0
+        self.n_halbierungen = 0
+        self.abgebrochen = False
+
+    def pruefe(self, t, r, v):
+        """Überprüfe die Erhaltungsgrößen zum Zeitpunkt t.
+
+        Args:
+            t (float):
+                Zeitpunkt [s] seit dem Beginn der Simulation.
+            r (np.ndarray):
+                Ortsvektoren [m] (n_koerper × n_dim).
+            v (np.ndarray):
+                Geschwindigkeiten [m/s] (n_koerper × n_dim).
+
+        Returns:
+            str: 'weiter', wenn die Simulation fortgesetzt werden
+            kann, sonst 'abbrechen' oder 'verkleinern'.
+        """
+        a = self.anfangswerte
+        werte = self.berechne(r, v)
+        drift = (werte['E'] - a['E']) / abs(a['E'])
+
+        if self.max_drift is not None and abs(drift) > self.max_drift:
+            if (self.aktion == 'verkleinern'
+                    and self.n_halbierungen < self.max_halbierungen):
+                self.n_halbierungen += 1
+                return 'verkleinern'
+            self.abgebrochen = True
+            return 'abbrechen'
+
+        # Aktualisiere die Statistik nur für akzeptierte Zustände.
+        self.n_pruefungen += 1
+        self.drift_min = min(self.drift_min, drift)
+        self.drift_max = max(self.drift_max, drift)
+        self.max_abweichung_impuls = max(
+            self.max_abweichung_impuls,
+            np.linalg.norm(werte['P'] - a['P']) / a['P_summe'])
+        betrag_L = max(np.linalg.norm(a['L']), np.finfo(float).tiny)
+        self.max_abweichung_drehimpuls = max(
+            self.max_abweichung_drehimpuls,
+            np.linalg.norm(werte['L'] - a['L']) / betrag_L)
+        R_erwartet = a['R'] + a['P'] / np.sum(self.m) * t
+        self.max_abweichung_schwerpunkt = max(
+            self.max_abweichung_schwerpunkt,
+            np.linalg.norm(werte['R'] - R_erwartet))
+        return 'weiter'
+
+    def __str__(self):
+        return (f'Energie: relative Änderung zwischen '
+                f'{self.drift_min:.2e} und {self.drift_max:.2e}\n'
+                f'Impuls: maximale relative Änderung '
+                f'{self.max_abweichung_impuls:.2e}\n'
+                f'Drehimpuls: maximale relative Änderung '
+                f'{self.max_abweichung_drehimpuls:.2e}\n'
+                f'Schwerpunkt: maximale Abweichung '
+                f'{self.max_abweichung_schwerpunkt:.2e} m\n'
+                f'{self.n_pruefungen} Prüfungen, '
+                f'{self.n_halbierungen} Halbierungen der Schrittweite'
+                + (', abgebrochen' if self.abgebrochen else ''))
@@ -5,6 +5,7 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
 import matplotlib.cm
+import matplotlib.collections
 
 # Anzahl der Teilchen.
 n_teilchen = 150
@@ -286,26 +287,25 @@ mapper = mpl.cm.ScalarMappable(cmap=mpl.cm.jet)
 mapper.set_array(m)
 mapper.autoscale()
 
-# Erzeuge für jedes Teilchen einen Kreis mit passendem Radius.
-kreise = []
-for radius, masse in zip(radien, m):
-    kreis = mpl.patches.Circle([0, 0], radius, visible=False,
-                               color=mapper.to_rgba(masse))
-    ax.add_patch(kreis)
-    kreise.append(kreis)
+# Stelle alle Teilchen mit einer einzigen Collection von Kreisen
+# mit passendem Radius dar. Die Durchmesser werden in
+# Datenkoordinaten angegeben.
+kreise = mpl.collections.EllipseCollection(
+    2 * radien, 2 * radien, np.zeros(n_teilchen), units='xy',
+    offsets=r[0], offset_transform=ax.transData,
+    facecolors=mapper.to_rgba(m))
+ax.add_collection(kreise)
 
 
 def update(n):
     """Aktualisiere die Grafik zum n-ten Zeitschritt."""
     # Aktualisiere die Positionen der Teilchen.
-    for kreis, ort in zip(kreise, r[n]):
-        kreis.set_center(ort)
-        kreis.set_visible(True)
+    kreise.set_offsets(r[n])
 
     # Aktualisiere die Trajektorie des Pollenkörpers (Index 0).
     plot_bahn.set_data(r[:n + 1, 0, 0], r[:n + 1, 0, 1])
 
-    return kreise + [plot_bahn]
+    return kreise, plot_bahn
 
 
 # Erstelle die Animation und starte sie.
@@ -5,6 +5,7 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
 import matplotlib.cm
+import matplotlib.collections
 
 # Anzahl der Teilchen.
 n_teilchen = 200
@@ -284,13 +285,14 @@ mapper = mpl.cm.ScalarMappable(cmap=mpl.cm.jet)
 mapper.set_array(m)
 mapper.autoscale()
 
-# Erzeuge für jedes Teilchen einen Kreis mit passendem Radius.
-kreise = []
-for radius, masse in zip(radien, m):
-    kreis = mpl.patches.Circle([0, 0], radius, visible=False,
-                               color=mapper.to_rgba(masse))
-    ax_teilchen.add_patch(kreis)
-    kreise.append(kreis)
+# Stelle alle Teilchen mit einer einzigen Collection von Kreisen
+# mit passendem Radius dar. Die Durchmesser werden in
+# Datenkoordinaten angegeben.
+kreise = mpl.collections.EllipseCollection(
+    2 * radien, 2 * radien, np.zeros(n_teilchen), units='xy',
+    offsets=r[0], offset_transform=ax_teilchen.transData,
+    facecolors=mapper.to_rgba(m))
+ax_teilchen.add_collection(kreise)
 
 # Erzeuge eine zweite Axes für die kinetische Energie.
 ax_energie = fig.add_subplot(1, 2, 2)
@@ -312,9 +314,7 @@ plot_gerade, = ax_energie.plot([], [], '-', linewidth=3)
 def update(n):
     """Aktualisiere die Grafik zum n-ten Zeitschritt."""
     # Aktualisiere die Positionen der Teilchen.
-    for kreis, ort in zip(kreise, r[n]):
-        kreis.set_center(ort)
-        kreis.set_visible(True)
+    kreise.set_offsets(r[n])
 
     # Aktualisiere die Punkte für die Energieverteilung.
     plot_energie.set_data(m, E_kin[n])
@@ -323,7 +323,7 @@ def update(n):
     steigung, yabschnitt = np.polyfit(m, E_kin[n], 1)
     plot_gerade.set_data(m, yabschnitt + steigung * m)
 
-    return kreise + [plot_energie, plot_gerade]
+    return kreise, plot_energie, plot_gerade
 
 
 # Erstelle die Animation und starte sie.
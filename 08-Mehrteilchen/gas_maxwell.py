@@ -4,6 +4,7 @@ import numpy as np
 import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
+import matplotlib.collections
 
 # Anzahl der Teilchen.
 n_teilchen = 200
@@ -278,12 +279,15 @@ ax_teilchen.set_ylim(-2.1, 2.1)
 ax_teilchen.set_aspect('equal')
 ax_teilchen.grid()
 
-# Erzeuge für jedes Teilchen einen Kreis.
-kreise = []
-for radius in radien:
-    kreis = mpl.patches.Circle([0, 0], radius, visible=False)
-    ax_teilchen.add_patch(kreis)
-    kreise.append(kreis)
+# Stelle alle Teilchen mit einer einzigen Collection von Kreisen
+# dar. Die Durchmesser werden in Datenkoordinaten angegeben. Die
+# Farbe der Teilchen gibt den Geschwindigkeitsbetrag an.
+kreise = mpl.collections.EllipseCollection(
+    2 * radien, 2 * radien, np.zeros(n_teilchen), units='xy',
+    offsets=r[0], offset_transform=ax_teilchen.transData,
+    cmap='jet')
+kreise.set_clim(0, v_max)
+ax_teilchen.add_collection(kreise)
 
 # Erzeuge eine zweite Axes für das Histogramm.
 ax_hist = fig.add_subplot(1, 2, 2)
@@ -293,27 +297,27 @@ ax_hist.set_ylabel('Anzahl der Teilchen')
 ax_hist.set_ylim(0, n_max)
 ax_hist.grid()
 
-# Erzeuge einen Histogrammplot.
-plot_bars = ax_hist.hist([], bins=n_bins, range=[0, v_max],
-                         edgecolor='white')[-1]
+# Erzeuge einen Histogrammplot. Die Balken werden als ein
+# einziges Grafikelement dargestellt, dessen Höhen mit einem
+# Aufruf von `set_data` aktualisiert werden können.
+kanten = np.linspace(0, v_max, n_bins + 1)
+plot_hist = ax_hist.stairs(np.zeros(n_bins), kanten, fill=True)
 
 
 def update(n):
     """Aktualisiere die Grafik zum n-ten Zeitschritt."""
-    # Aktualisiere die Positionen der Teilchen.
-    for kreis, ort in zip(kreise, r[n]):
-        kreis.set_center(ort)
-        kreis.set_visible(True)
+    # Aktualisiere die Positionen und Farben der Teilchen.
+    betrag_v = np.linalg.norm(v[n], axis=1)
+    kreise.set_offsets(r[n])
+    kreise.set_array(betrag_v)
 
     # Berechne das Histogramm für den aktuellen Zeitschritt.
-    hist_werte, kanten = np.histogram(np.linalg.norm(v[n], axis=1),
-                                      bins=n_bins, range=[0, v_max])
+    hist_werte, _ = np.histogram(betrag_v, bins=kanten)
 
     # Aktualisiere die Balken des Histogramms.
-    for bar, wert in zip(plot_bars, hist_werte):
-        bar.set_height(wert)
+    plot_hist.set_data(hist_werte)
 
-    return kreise + list(plot_bars)
+    return kreise, plot_hist
 
 
 # Erstelle die Animation und starte sie.
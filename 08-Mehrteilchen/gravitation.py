@@ -0,0 +1,318 @@
+﻿"""Vektorisierte Berechnung der Gravitationskräfte von N Körpern.
+
+In den Programmen zur Simulation des Sonnensystems und der
+Mehrkörperprobleme wird die Beschleunigung in der Funktion `dgl`
+mit einer doppelten Python-Schleife über alle Paare von Körpern
+berechnet. Die Klasse `Gravitation` berechnet dieselben
+Beschleunigungen mit Array-Operationen. Alle Zwischenergebnisse
+werden in Arrays gespeichert, die einmalig beim Erzeugen des
+Objekts angelegt werden, sodass bei einem Aufruf kein neuer
+Speicher angefordert werden muss. Da der Abstand von Körper i zu
+Körper j gleich dem Abstand von Körper j zu Körper i ist, wird
+der Faktor G / |r_j - r_i|³ nur für die Paare mit i < j berechnet.
+
+Für sehr viele Körper wird das Array der Abstandsvektoren aller
+Paare (n_koerper × n_koerper × n_dim) zu groß. Mit dem Argument
+`blockgroesse` werden die Beschleunigungen dann blockweise für
+jeweils `blockgroesse` Körper berechnet.
+
+Körper mit der Masse null werden als Testteilchen behandelt: Sie
+werden von den massiven Körpern angezogen, üben aber selbst keine
+Kraft aus. Ihre Beschleunigungen werden daher nur aus den
+Abständen zu den massiven Körpern berechnet
+(n_test × n_massiv), sodass der Rechenaufwand linear mit der
+Anzahl der Testteilchen wächst. Auf diese Weise lassen sich z.B.
+viele Asteroiden oder Kometen im Sonnensystem simulieren.
+"""
+
+import numpy as np
+
+
+class Gravitation:
+    """Gravitationsbeschleunigung eines Systems von Punktmassen.
+
+    Args:
+        m (np.ndarray):
+            Massen der Körper [kg] (n_koerper).
+        G (float):
+            Gravitationskonstante [m³ / (kg * s²)].
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+        blockgroesse (int):
+            Anzahl der Körper, deren Beschleunigung gemeinsam
+            berechnet wird. Bei None werden alle Körper auf einmal
+            behandelt.
+    """
+
+    def __init__(self, m, G=6.6743e-11, n_dim=3, blockgroesse=None):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Körper [kg] (n_koerper)."""
+        self.G = G
+        """float: Gravitationskonstante [m³ / (kg * s²)]."""
+        self.n_dim = n_dim
+        """int: Anzahl der Raumdimensionen."""
+        self.index_massiv = np.nonzero(self.m != 0)[0]
+        """np.ndarray: Indizes der Körper mit einer Masse."""
+        self.index_test = np.nonzero(self.m == 0)[0]
+        """np.ndarray: Indizes der masselosen Testteilchen."""
+        self._m_massiv = self.m[self.index_massiv]
+        n = self.index_massiv.size
+
+        if blockgroesse is None or blockgroesse >= n:
+            self.blockgroesse = max(n, 1)
+        else:
+            self.blockgroesse = blockgroesse
+        """int: Anzahl der gemeinsam berechneten Körper."""
+        b = self.blockgroesse
+
+        # Arrays für die Abstandsvektoren, die Betragsquadrate der
+        # Abstände und die Faktoren m_j * G / |r_j - r_i|³.
+        self._dr = np.empty((b, n, n_dim))
+        self._abstand2 = np.empty((b, n))
+        self._faktor = np.empty((b, n))
+        self._a = np.empty((self.n_koerper, n_dim))
+
+        # Indizes der Paare mit i < j im Array der Größe n × n. Sie
+        # werden nur benötigt, wenn alle Körper auf einmal
+        # behandelt werden.
+        if b == n:
+            i, j = np.triu_indices(n, k=1)
+            self._index_oben = i * n + j
+            self._index_unten = j * n + i
+            self._paare = np.empty(i.size)
+            self._wurzel = np.empty(i.size)
+            self._faktor.fill(0)
+
+        # Arrays für die Testteilchen, die in Blöcken von
+        # mindestens 1024 Teilchen behandelt werden.
+        b_test = min(self.index_test.size, max(b, 1024))
+        self._blockgroesse_test = b_test
+        self._dr_test = np.empty((b_test, n, n_dim))
+        self._abstand2_test = np.empty((b_test, n))
+        self._faktor_test = np.empty((b_test, n))
+        self._r_massiv = np.empty((n, n_dim))
+        self._a_massiv = np.empty((n, n_dim))
+
+    @property
+    def n_koerper(self):
+        """int: Anzahl der Körper."""
+        return self.m.size
+
+    def _faktoren_symmetrisch(self):
+        """Berechne G / |r_j - r_i|³ nur für die Paare mit i < j."""
+        paare = self._paare
+        np.take(self._abstand2, self._index_oben, out=paare)
+        np.sqrt(paare, out=self._wurzel)
+        np.multiply(paare, self._wurzel, out=paare)
+        np.divide(self.G, paare, out=paare)
+
+        # Übertrage das Ergebnis auf beide Hälften der Matrix. Die
+        # Diagonale bleibt null.
+        np.put(self._faktor, self._index_oben, paare)
+        np.put(self._faktor, self._index_unten, paare)
+
+    def beschleunigung(self, r, out=None):
+        """Berechne die Beschleunigungen aller Körper.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren der Körper [m] (n_koerper × n_dim).
+            out (np.ndarray):
+                Array (n_koerper × n_dim), in das das Ergebnis
+                geschrieben wird. Bei None wird ein intern
+                gespeichertes Array verwendet, das beim nächsten
+                Aufruf überschrieben wird.
+
+        Returns:
+            np.ndarray: Beschleunigungen [m/s²] (n_koerper × n_dim).
+        """
+        if out is None:
+            out = self._a
+
+        # Ohne Testteilchen wird direkt mit r und out gearbeitet.
+        if self.index_test.size == 0:
+            self._beschleunigung_massiv(r, out)
+            return out
+
+        r_massiv = self._r_massiv
+        np.take(r, self.index_massiv, axis=0, out=r_massiv)
+        self._beschleunigung_massiv(r_massiv, self._a_massiv)
+        out[self.index_massiv] = self._a_massiv
+        self._beschleunigung_test(r, r_massiv, out)
+        return out
+
+    def _beschleunigung_massiv(self, r, out):
+        """Berechne die Beschleunigungen der massiven Körper."""
+        n = self.index_massiv.size
+        for start in range(0, n, self.blockgroesse):
+            ende = min(start + self.blockgroesse, n)
+            b = ende - start
+            dr = self._dr[:b]
+            abstand2 = self._abstand2[:b]
+            faktor = self._faktor[:b]
+
+            # dr[i, j] ist der Vektor r[j] - r[start + i].
+            np.subtract(r, r[start:ende, np.newaxis], out=dr)
+            np.einsum('ijk,ijk->ij', dr, dr, out=abstand2)
+
+            if b == n:
+                self._faktoren_symmetrisch()
+            else:
+                # Vermeide die Division durch null für i = j.
+                idx = np.arange(b)
+                abstand2[idx, start + idx] = 1
+                np.sqrt(abstand2, out=faktor)
+                np.multiply(faktor, abstand2, out=faktor)
+                np.divide(self.G, faktor, out=faktor)
+                faktor[idx, start + idx] = 0
+
+            # a[i] = sum_j m[j] * G / |r_j - r_i|³ * (r_j - r_i)
+            np.multiply(faktor, self._m_massiv, out=faktor)
+            np.einsum('ij,ijk->ik', faktor, dr, out=out[start:ende])
+
+    def _beschleunigung_test(self, r, r_massiv, out):
+        """Berechne die Beschleunigungen der Testteilchen.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren aller Körper (n_koerper × n_dim).
+            r_massiv (np.ndarray):
+                Ortsvektoren der massiven Körper (n_massiv × n_dim).
+            out (np.ndarray):
+                Array (n_koerper × n_dim), in dessen Zeilen für die
+                Testteilchen das Ergebnis geschrieben wird.
+        """
+        n_test = self.index_test.size
+        for start in range(0, n_test, self._blockgroesse_test):
+            idx = self.index_test[start:start
+                                  + self._blockgroesse_test]
+            b = idx.size
+            dr = self._dr_test[:b]
+            abstand2 = self._abstand2_test[:b]
+            faktor = self._faktor_test[:b]
+
+            # dr[i, j] ist der Vektor vom Testteilchen i zum
+            # massiven Körper j.
+            np.subtract(r_massiv, r[idx, np.newaxis], out=dr)
+            np.einsum('ijk,ijk->ij', dr, dr, out=abstand2)
+            np.sqrt(abstand2, out=faktor)
+            np.multiply(faktor, abstand2, out=faktor)
+            np.divide(self.G, faktor, out=faktor)
+            np.multiply(faktor, self._m_massiv, out=faktor)
+            out[idx] = np.einsum('ij,ijk->ik', faktor, dr)
+
+    def beschleunigung_auswahl(self, r, index):
+        """Berechne die Beschleunigungen einer Auswahl von Körpern.
+
+        Es werden nur die Beschleunigungen der Körper mit den
+        angegebenen Indizes berechnet, diese aber aus den Kräften
+        aller massiven Körper. Das wird z.B. benötigt, wenn jeder
+        Körper eine eigene Schrittweite hat.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren aller Körper [m] (n_koerper × n_dim).
+            index (np.ndarray):
+                Indizes der ausgewählten Körper (n_auswahl).
+
+        Returns:
+            np.ndarray: Beschleunigungen [m/s²] (n_auswahl × n_dim).
+        """
+        if self.index_test.size == 0:
+            r_massiv = r
+        else:
+            r_massiv = r[self.index_massiv]
+
+        # dr[i, j] ist der Vektor vom ausgewählten Körper i zum
+        # massiven Körper j. Der Beitrag des Körpers selbst, für den
+        # der Abstand null ist, wird weggelassen.
+        dr = r_massiv[np.newaxis] - r[index, np.newaxis]
+        abstand2 = np.einsum('ijk,ijk->ij', dr, dr)
+        selbst = abstand2 == 0
+        abstand2[selbst] = 1
+        faktor = self.G * self._m_massiv / (abstand2
+                                            * np.sqrt(abstand2))
+        faktor[selbst] = 0
+        return np.einsum('ij,ijk->ik', faktor, dr)
+
+    def potentielle_energie(self, r):
+        """Berechne die gesamte potentielle Energie.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren der Körper [m] (n_koerper × n_dim).
+
+        Returns:
+            float: Potentielle Energie [J].
+        """
+        # Die Testteilchen tragen nicht zur Energie bei.
+        r = r[self.index_massiv]
+        m = self._m_massiv
+        i, j = np.triu_indices(m.size, k=1)
+        abstand = np.linalg.norm(r[j] - r[i], axis=1)
+        return -self.G * np.sum(m[i] * m[j] / abstand)
+
+    def jacobi_matrix(self, r):
+        """Berechne die Ableitungen der Beschleunigungen nach den Orten.
+
+        Die Matrix wird z.B. für die Variationsgleichungen benötigt,
+        die beschreiben, wie sich kleine Änderungen des
+        Anfangszustands im Laufe der Zeit auswirken.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren der Körper [m] (n_koerper × n_dim).
+
+        Returns:
+            np.ndarray: Die Ableitungen da_i / dr_j [1/s²] als Matrix
+            (n_koerper * n_dim × n_koerper * n_dim).
+        """
+        n, n_dim = r.shape
+        dr = r[np.newaxis] - r[:, np.newaxis]
+        abstand2 = np.einsum('ijk,ijk->ij', dr, dr)
+        np.fill_diagonal(abstand2, np.inf)
+        faktor = self.G * self.m / (abstand2 * np.sqrt(abstand2))
+
+        # Ableitung des Beitrags von Körper j zur Beschleunigung
+        # von Körper i nach dem Ort von Körper j.
+        einheit = np.eye(n_dim)
+        block = faktor[:, :, np.newaxis, np.newaxis] * (
+            einheit - 3 * dr[:, :, :, np.newaxis] * dr[:, :, np.newaxis]
+            / abstand2[:, :, np.newaxis, np.newaxis])
+
+        # Die Ableitung nach dem eigenen Ort hat das umgekehrte
+        # Vorzeichen.
+        i = np.arange(n)
+        block[i, i] = -np.sum(block, axis=1)
+        return block.transpose(0, 2, 1, 3).reshape(n * n_dim, n * n_dim)
+
+    def dgl(self, t, u, out=None):
+        """Berechne die rechte Seite der Differentialgleichung.
+
+        Der Zustandsvektor u enthält zuerst alle Ortsvektoren und
+        danach alle Geschwindigkeitsvektoren, wie in den Programmen
+        zur Simulation des Sonnensystems.
+
+        Args:
+            t (float):
+                Zeitpunkt [s].
+            u (np.ndarray):
+                Zustandsvektor (2 * n_koerper * n_dim).
+            out (np.ndarray):
+                Array, in das das Ergebnis geschrieben wird. Bei
+                None wird ein neues Array angelegt. Das ist für
+                `solve_ivp` notwendig, da die Ergebnisse mehrerer
+                Aufrufe gleichzeitig benötigt werden.
+
+        Returns:
+            np.ndarray: Zeitableitung des Zustandsvektors.
+        """
+        if out is None:
+            out = np.empty_like(u)
+        r, v = np.split(u, 2)
+        r = r.reshape(self.n_koerper, self.n_dim)
+        out_r, out_v = np.split(out, 2)
+        out_r[:] = v
+        self.beschleunigung(r, out=out_v.reshape(self.n_koerper,
+                                                 self.n_dim))
+        return out
@@ -0,0 +1,83 @@
+﻿"""Simulation vieler weicher Kugeln mit dem Velocity-Verlet-Verfahren.
+
+Im Gegensatz zum Programm mehrteilchenstoss_dgl.py werden die
+Kontaktkräfte mit einer Nachbarliste vektorisiert berechnet,
+sodass auch einige tausend Teilchen in Echtzeit simuliert werden
+können.
+"""
+
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import matplotlib.animation
+import matplotlib.collections
+from weiche_kugeln import WeicheKugeln
+
+# Anzahl der Raumdimensionen und Anzahl der Teilchen.
+n_dim = 2
+n_teilchen = 2000
+
+# Simulationszeit und Zeitschrittweite der Darstellung [s].
+t_max = 10
+dt = 0.02
+
+# Federkonstante beim Aufprall [N/m].
+D = 5e3
+
+# Für jede Wand wird der Abstand vom Koordinatenursprung und ein
+# nach außen zeigender Normalenvektor angegeben.
+wandabstaende = np.array([0.0, 2.0, 0.0, 2.0])
+wandnormalen = np.array([[-1.0, 0], [1.0, 0], [0, -1.0], [0, 1.0]])
+
+# Positioniere die Massen zufällig im Bereich
+# x=0,05 ... 1,95 und y = 0,05 ... 1,95 [m].
+r0 = 0.05 + 1.9 * np.random.rand(n_teilchen, n_dim)
+
+# Wähle zufällige Geschwindigkeiten im Bereich
+# vx = -0,5 ... 0,5 und vy = -0,5 ... 0,5 [m/s].
+v0 = -0.5 + np.random.rand(n_teilchen, n_dim)
+
+# Wähle zufällige Radien im Bereich von 0,005 bis 0,01 [m].
+radien = 0.005 + 0.005 * np.random.rand(n_teilchen)
+
+# Wähle zufällige Massen im Bereich von 0,2 bis 2,0 [kg].
+m = 0.2 + 1.8 * np.random.rand(n_teilchen)
+
+# Erzeuge das Simulationsobjekt.
+kugeln = WeicheKugeln(r0, v0, radien, m, D,
+                      waende=(wandabstaende, wandnormalen))
+
+# Erzeuge eine Figure und eine Axes.
+fig = plt.figure()
+ax = fig.add_subplot(1, 1, 1)
+ax.set_xlabel('$x$ [m]')
+ax.set_ylabel('$y$ [m]')
+ax.set_xlim(0, 2)
+ax.set_ylim(0, 2)
+ax.set_aspect('equal')
+ax.grid()
+
+# Stelle alle Teilchen mit einer einzigen Collection dar. Die
+# Durchmesser werden in Datenkoordinaten angegeben.
+kreise = mpl.collections.EllipseCollection(
+    2 * radien, 2 * radien, np.zeros(n_teilchen), units='xy',
+    offsets=kugeln.r, offset_transform=ax.transData)
+ax.add_collection(kreise)
+
+# Erzeuge ein Textfeld für die Anzeige der Energie.
+text_energie = ax.text(0.02, 1.02, '', transform=ax.transAxes)
+
+
+def update(n):
+    """Berechne und zeige den nächsten Zeitschritt an."""
+    kugeln.zeitschritt(dt)
+    kreise.set_offsets(kugeln.r)
+    text_energie.set_text(f'$E$ = {kugeln.energie:.4f} J')
+    return kreise, text_energie
+
+
+# Erstelle die Animation und starte sie.
+ani = mpl.animation.FuncAnimation(fig, update,
+                                  frames=int(t_max / dt),
+                                  interval=30, blit=True)
+plt.show()
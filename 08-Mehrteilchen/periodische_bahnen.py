@@ -0,0 +1,195 @@
+﻿"""Suche periodischer Bahnen mit dem Schießverfahren.
+
+Im Programm dreikoerper_acht.py wurden die Anfangsbedingungen der
+8-förmigen Bahn durch Ausprobieren bestimmt. Die Funktion
+`finde_periodische_bahn` korrigiert solche Näherungen mit dem
+Newton-Verfahren: Gesucht sind Parameter p des Anfangszustands
+u0(p) und eine Periode T, sodass der Zustand nach der Zeit T
+wieder mit dem Anfangszustand übereinstimmt. Die dafür benötigten
+Ableitungen des Endzustands nach dem Anfangszustand liefert die
+Zustandsübergangsmatrix, die zusammen mit der Bewegung aus den
+Variationsgleichungen berechnet wird.
+
+Die Symmetrien des Problems werden auf zwei Arten ausgenutzt:
+
+    - Der Anfangszustand wird nur durch wenige Parameter
+      beschrieben. Schwerpunkt, Gesamtimpuls, Orientierung und
+      Größe der Bahn sowie der Anfangszeitpunkt auf der Bahn
+      werden dadurch festgehalten.
+    - Bewegen sich gleich schwere Körper nacheinander auf
+      derselben Bahn (Choreographie), so genügt es, nur einen
+      Bruchteil der Periode zu integrieren und zu fordern, dass
+      die Körper danach ihre Plätze getauscht haben.
+
+Die Eigenwerte der Monodromiematrix, der
+Zustandsübergangsmatrix nach einer vollen Periode, geben an, ob die
+periodische Bahn stabil ist.
+"""
+
+import numpy as np
+import scipy.integrate
+
+
+def fluss(gravitation, u0, t_ende, rtol=1e-12, atol=1e-12):
+    """Berechne den Endzustand und die Zustandsübergangsmatrix.
+
+    Die Zustandsübergangsmatrix Phi = du(t) / du0 erfüllt die
+    Variationsgleichung dPhi/dt = J(t) Phi, wobei J die
+    Jacobi-Matrix der rechten Seite der Bewegungsgleichung ist.
+
+    Args:
+        gravitation (Gravitation):
+            Objekt zur Berechnung der Beschleunigungen.
+        u0 (np.ndarray):
+            Anfangszustand (n_u) wie bei `Gravitation.dgl`.
+        t_ende (float):
+            Integrationszeit [s].
+        rtol (float):
+            Relative Toleranz für `solve_ivp`.
+        atol (float):
+            Absolute Toleranz für `solve_ivp`. Der Zustand wird
+            vorher so skaliert, dass alle Komponenten von der
+            Größenordnung eins sind.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Der Endzustand (n_u) und die
+        Zustandsübergangsmatrix (n_u × n_u).
+    """
+    n_u = u0.size
+    n_r = n_u // 2
+
+    # Skaliere Orte und Geschwindigkeiten, damit die absolute
+    # Toleranz für alle Komponenten sinnvoll ist.
+    skala = np.concatenate([
+        np.full(n_r, np.max(np.abs(u0[:n_r]))),
+        np.full(n_r, np.max(np.abs(u0[n_r:])))])
+
+    def dgl(t, y):
+        """Bewegungsgleichung und Variationsgleichung."""
+        u = y[:n_u] * skala
+        phi = y[n_u:].reshape(n_u, n_u)
+        r = u[:n_r].reshape(gravitation.n_koerper, -1)
+        du = gravitation.dgl(t, u) / skala
+
+        # Die Jacobi-Matrix der Bewegungsgleichung hat die Form
+        # [[0, 1], [da/dr, 0]]. Sie wird in skalierten Koordinaten
+        # angewendet.
+        jacobi = gravitation.jacobi_matrix(r)
+        dphi = np.empty_like(phi)
+        dphi[:n_r] = phi[n_r:] * (skala[n_r:, np.newaxis]
+                                  / skala[:n_r, np.newaxis])
+        dphi[n_r:] = (jacobi * skala[:n_r]) @ phi[:n_r] / skala[
+            n_r:, np.newaxis]
+        return np.concatenate([du, dphi.reshape(-1)])
+
+    y0 = np.concatenate([u0 / skala, np.eye(n_u).reshape(-1)])
+    result = scipy.integrate.solve_ivp(dgl, [0, t_ende], y0,
+                                       method='DOP853', rtol=rtol,
+                                       atol=atol)
+    y = result.y[:, -1]
+    phi = (y[n_u:].reshape(n_u, n_u) * skala[:, np.newaxis]
+           / skala[np.newaxis, :])
+    return y[:n_u] * skala, phi
+
+
+def finde_periodische_bahn(gravitation, anfangszustand, p0, T0,
+                           permutation=None, anteil=1,
+                           toleranz=1e-10, max_iter=20):
+    """Korrigiere eine Näherung für eine periodische Bahn.
+
+    Gesucht sind die Parameter p und die Periode T, für die der
+    Zustand zum Zeitpunkt anteil * T mit dem Anfangszustand u0(p)
+    übereinstimmt, nachdem die Körper gemäß `permutation`
+    vertauscht wurden. Die Gleichungen werden mit dem
+    Gauß-Newton-Verfahren gelöst, wobei die Ableitungen nach dem
+    Anfangszustand aus der Zustandsübergangsmatrix und die
+    Ableitungen von u0 nach p durch zentrale Differenzenquotienten
+    bestimmt werden.
+
+    Args:
+        gravitation (Gravitation):
+            Objekt zur Berechnung der Beschleunigungen.
+        anfangszustand (callable):
+            Funktion, die zu einem Parametervektor p den
+            Anfangszustand u0 wie bei `Gravitation.dgl` berechnet.
+        p0 (np.ndarray):
+            Startwerte der Parameter.
+        T0 (float):
+            Startwert der Periode [s].
+        permutation (np.ndarray):
+            Körper permutation[i] befindet sich nach der Zeit
+            anteil * T am Anfangsort von Körper i. Bei None wird
+            keine Vertauschung vorgenommen.
+        anteil (float):
+            Bruchteil der Periode, über den integriert wird, z.B.
+            1/3 für eine Choreographie von drei Körpern.
+        toleranz (float):
+            Das Verfahren endet, wenn die relative Abweichung
+            zwischen End- und Anfangszustand kleiner ist.
+        max_iter (int):
+            Maximale Anzahl von Newton-Iterationen.
+
+    Returns:
+        tuple[np.ndarray, float, np.ndarray, int]:
+            Die korrigierten Parameter, die Periode [s], die
+            Eigenwerte der Monodromiematrix und die Anzahl der
+            Integrationen.
+
+    Raises:
+        RuntimeError: Wenn das Verfahren nicht konvergiert.
+    """
+    p = np.array(p0, dtype=float)
+    T = float(T0)
+    u0 = anfangszustand(p)
+    n_koerper = gravitation.n_koerper
+    n_dim = u0.size // (2 * n_koerper)
+    if permutation is None:
+        permutation = np.arange(n_koerper)
+
+    # Die Vertauschung der Körper als Indexarray für den
+    # Zustandsvektor.
+    index = np.arange(u0.size).reshape(2, n_koerper, n_dim)
+    index = index[:, permutation].reshape(-1)
+
+    # Gewichte, mit denen Orts- und Geschwindigkeitsabweichungen
+    # vergleichbar werden.
+    n_r = u0.size // 2
+    gewicht = 1 / np.concatenate([
+        np.full(n_r, np.max(np.abs(u0[:n_r]))),
+        np.full(n_r, np.max(np.abs(u0[n_r:])))])
+
+    n_integrationen = 0
+    for _ in range(max_iter):
+        u0 = anfangszustand(p)
+        u, phi = fluss(gravitation, u0, anteil * T)
+        n_integrationen += 1
+        abweichung = (u[index] - u0) * gewicht
+        if np.max(np.abs(abweichung)) < toleranz:
+            break
+
+        # Ableitung von u0 nach den Parametern.
+        du0_dp = np.empty((u0.size, p.size))
+        for k in range(p.size):
+            h = 1e-7 * max(abs(p[k]), 1)
+            e = np.zeros(p.size)
+            e[k] = h
+            du0_dp[:, k] = (anfangszustand(p + e)
+                            - anfangszustand(p - e)) / (2 * h)
+
+        # Jacobi-Matrix der Abweichung nach (p, T).
+        du_dt = gravitation.dgl(anteil * T, u)
+        jacobi = np.empty((u0.size, p.size + 1))
+        jacobi[:, :-1] = phi[index] @ du0_dp - du0_dp
+        jacobi[:, -1] = anteil * du_dt[index]
+        jacobi *= gewicht[:, np.newaxis]
+
+        schritt = np.linalg.lstsq(jacobi, -abweichung, rcond=None)[0]
+        p += schritt[:-1]
+        T += schritt[-1]
+    else:
+        raise RuntimeError('Das Newton-Verfahren konvergiert nicht.')
+
+    # Monodromiematrix für die volle Periode.
+    _, monodromie = fluss(gravitation, anfangszustand(p), T)
+    n_integrationen += 1
+    return p, T, np.linalg.eigvals(monodromie), n_integrationen
@@ -0,0 +1,433 @@
+﻿"""Regularisierung naher Begegnungen mit der KS-Transformation.
+
+Kommen sich zwei Körper sehr nahe, so ändern sich Ort und
+Geschwindigkeit innerhalb kürzester Zeit sehr stark, und
+`solve_ivp` muss die Schrittweite drastisch verkleinern. Die
+Anzahl der Schritte wächst dabei umso stärker, je näher sich die
+Körper kommen. Bei der Kustaanheimo-Stiefel-Transformation (KS)
+wird die Relativbewegung der beiden Körper durch einen
+vierdimensionalen Vektor u beschrieben, für den x = L(u) u gilt.
+Gleichzeitig wird eine fiktive Zeit s mit dt = r ds eingeführt.
+In diesen Variablen wird die ungestörte Keplerbewegung zu einem
+harmonischen Oszillator, der keine Singularität mehr besitzt,
+sodass auch sehr nahe Begegnungen mit wenigen Schritten
+berechnet werden können.
+
+Die Klasse `KSRegularisierung` integriert die Bewegung zunächst
+wie gewohnt mit `solve_ivp`. Unterschreitet der Abstand zweier
+Körper eine vorgegebene Grenze, so wird die Relativbewegung dieses
+Paares in KS-Variablen und die Bewegung seines Schwerpunkts und
+aller übrigen Körper in der fiktiven Zeit s berechnet, bis sich
+das Paar wieder weit genug entfernt hat.
+"""
+
+import numpy as np
+import scipy.integrate
+from gravitation import Gravitation
+
+
+def _ks_matrix(u):
+    """Berechne die KS-Matrix L(u) (4 × 4)."""
+    u1, u2, u3, u4 = u
+    return np.array([[u1, -u2, -u3, u4],
+                     [u2, u1, -u4, -u3],
+                     [u3, u4, u1, u2],
+                     [u4, -u3, u2, -u1]])
+
+
+def ks_transformation(x, v):
+    """Wandle einen Relativvektor in KS-Variablen um.
+
+    Von den unendlich vielen Vektoren u mit x = L(u) u wird einer
+    ausgewählt, der für jede Richtung von x numerisch stabil
+    berechnet werden kann.
+
+    Args:
+        x (np.ndarray):
+            Relativer Ortsvektor [m] (3).
+        v (np.ndarray):
+            Relativgeschwindigkeit [m/s] (3).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Der Vektor u und seine
+        Ableitung nach der fiktiven Zeit s (jeweils 4).
+    """
+    r = np.linalg.norm(x)
+    u = np.zeros(4)
+    if x[0] >= 0:
+        u[0] = np.sqrt((r + x[0]) / 2)
+        u[1] = x[1] / (2 * u[0])
+        u[2] = x[2] / (2 * u[0])
+    else:
+        u[1] = np.sqrt((r - x[0]) / 2)
+        u[0] = x[1] / (2 * u[1])
+        u[3] = x[2] / (2 * u[1])
+    u_strich = _ks_matrix(u).T @ np.append(v, 0) / 2
+    return u, u_strich
+
+
+def ks_ruecktransformation(u, u_strich):
+    """Berechne Ort und Geschwindigkeit aus den KS-Variablen.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Relativer Ortsvektor [m] und
+        Relativgeschwindigkeit [m/s] (jeweils 3).
+    """
+    L = _ks_matrix(u)
+    x = L @ u
+    v = 2 * L @ u_strich / (u @ u)
+    return x[:3], v[:3]
+
+
+class KSRegularisierung:
+    """N-Körper-Simulation mit Regularisierung naher Begegnungen.
+
+    Es wird immer nur das Paar mit dem kleinsten Abstand
+    regularisiert. Kommen sich während einer Begegnung zwei andere
+    Körper näher als die Hälfte des Abstands des regularisierten
+    Paares, so wird zu diesem Paar gewechselt.
+
+    Args:
+        m (np.ndarray):
+            Massen der Körper [kg] (n_koerper).
+        G (float):
+            Gravitationskonstante [m³ / (kg * s²)].
+        n_dim (int):
+            Anzahl der Raumdimensionen (2 oder 3).
+        abstand_grenze (float):
+            Unterhalb dieses Abstands [m] wird ein Paar
+            regularisiert.
+        rtol (float):
+            Relative Toleranz für `solve_ivp`.
+        atol (float):
+            Absolute Toleranz für `solve_ivp`.
+    """
+
+    def __init__(self, m, G=6.6743e-11, n_dim=3, abstand_grenze=1e9,
+                 rtol=1e-9, atol=1e-6):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Körper [kg] (n_koerper)."""
+        self.G = G
+        """float: Gravitationskonstante [m³ / (kg * s²)]."""
+        self.n_dim = n_dim
+        """int: Anzahl der Raumdimensionen."""
+        self.abstand_grenze = abstand_grenze
+        """float: Abstand [m], ab dem regularisiert wird."""
+        self.rtol = rtol
+        """float: Relative Toleranz für `solve_ivp`."""
+        self.atol = atol
+        """float: Absolute Toleranz für `solve_ivp`."""
+        self.gravitation = Gravitation(self.m, G, 3)
+        """Gravitation: Beschleunigungen ohne Regularisierung."""
+
+        self.n_auswertungen = 0
+        """int: Auswertungen der rechten Seite ohne
+        Regularisierung."""
+        self.n_auswertungen_regularisiert = 0
+        """int: Auswertungen der rechten Seite während der
+        regularisierten Begegnungen."""
+        self.n_begegnungen = 0
+        """int: Anzahl der regularisierten Abschnitte."""
+
+    @property
+    def n_koerper(self):
+        """int: Anzahl der Körper."""
+        return self.m.size
+
+    def _abstaende(self, r):
+        """Berechne die Abstände aller Paare (n_koerper × n_koerper).
+
+        Auf der Diagonale steht unendlich.
+        """
+        dr = r[np.newaxis] - r[:, np.newaxis]
+        abstand = np.linalg.norm(dr, axis=2)
+        np.fill_diagonal(abstand, np.inf)
+        return abstand
+
+    def _beschleunigung_ohne_paar(self, r, i, j):
+        """Berechne die Beschleunigungen ohne die Kraft zwischen i
+        und j.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren [m] (n_koerper × 3).
+            i, j (int):
+                Indizes des Paares.
+
+        Returns:
+            np.ndarray: Beschleunigungen [m/s²] (n_koerper × 3).
+        """
+        dr = r[np.newaxis] - r[:, np.newaxis]
+        abstand2 = np.sum(dr * dr, axis=2)
+        np.fill_diagonal(abstand2, np.inf)
+        abstand2[i, j] = abstand2[j, i] = np.inf
+        faktor = self.G * self.m / (abstand2 * np.sqrt(abstand2))
+        return np.einsum('ij,ijk->ik', faktor, dr)
+
+    def _normal(self, t_start, r, v, t_ende, t_aus):
+        """Integriere ohne Regularisierung bis zur nächsten Begegnung.
+
+        Returns:
+            tuple: Die Lösung von `solve_ivp` und der Zustand
+            (t, r, v) am Ende des Abschnitts.
+        """
+        n = self.n_koerper
+
+        def begegnung(t, u):
+            """Ereignisfunktion: Ein Paar kommt sich zu nahe."""
+            r = u[:n * 3].reshape(n, 3)
+            return np.min(self._abstaende(r)) - self.abstand_grenze
+
+        begegnung.terminal = True
+        begegnung.direction = -1
+
+        u0 = np.concatenate([r.reshape(-1), v.reshape(-1)])
+        result = scipy.integrate.solve_ivp(
+            self.gravitation.dgl, [t_start, t_ende], u0,
+            rtol=self.rtol, atol=self.atol, t_eval=t_aus,
+            events=begegnung)
+        self.n_auswertungen += result.nfev
+
+        if result.status == 1:
+            t, u = result.t_events[0][0], result.y_events[0][0]
+        else:
+            t, u = t_ende, result.y[:, -1]
+        r, v = np.split(u, 2)
+        return result, t, r.reshape(n, 3), v.reshape(n, 3)
+
+    def _ks_zustand(self, y, i, j, rest):
+        """Berechne Orte und Geschwindigkeiten aller Körper aus dem
+        Zustandsvektor der regularisierten Bewegung.
+
+        Der Zustandsvektor y enthält die Orte und Geschwindigkeiten
+        der übrigen Körper, Ort und Geschwindigkeit des
+        Schwerpunkts des Paares, die KS-Variablen u und u', die
+        Energie h der Relativbewegung pro Masse und die Zeit t.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]: Orte und
+            Geschwindigkeiten (jeweils n_koerper × 3).
+        """
+        k = rest.size
+        r = np.empty((self.n_koerper, 3))
+        v = np.empty((self.n_koerper, 3))
+        r[rest] = y[:3 * k].reshape(k, 3)
+        v[rest] = y[3 * k:6 * k].reshape(k, 3)
+        R, V = y[6 * k:6 * k + 3], y[6 * k + 3:6 * k + 6]
+        x, dx = ks_ruecktransformation(y[6 * k + 6:6 * k + 10],
+                                       y[6 * k + 10:6 * k + 14])
+        M = self.m[i] + self.m[j]
+        r[i] = R - self.m[j] / M * x
+        r[j] = R + self.m[i] / M * x
+        v[i] = V - self.m[j] / M * dx
+        v[j] = V + self.m[i] / M * dx
+        return r, v
+
+    def _regularisiert(self, t_start, r, v, i, j):
+        """Integriere die Begegnung des Paares i, j in KS-Variablen.
+
+        Returns:
+            tuple: Die Lösung von `solve_ivp` als Funktion der
+            fiktiven Zeit s, die Indizes der übrigen Körper, der
+            Indexbereich von u im Zustandsvektor und der Zeitpunkt
+            am Ende des Abschnitts.
+        """
+        rest = np.setdiff1d(np.arange(self.n_koerper), [i, j])
+        k = rest.size
+        index_u = slice(6 * k + 6, 6 * k + 10)
+        index_u_strich = slice(6 * k + 10, 6 * k + 14)
+        m_i, m_j = self.m[i], self.m[j]
+        M = m_i + m_j
+        mu = self.G * M
+
+        x, dx = r[j] - r[i], v[j] - v[i]
+        u, u_strich = ks_transformation(x, dx)
+        h = np.sum(dx * dx) / 2 - mu / np.linalg.norm(x)
+        y0 = np.concatenate([
+            r[rest].reshape(-1), v[rest].reshape(-1),
+            (m_i * r[i] + m_j * r[j]) / M,
+            (m_i * v[i] + m_j * v[j]) / M,
+            u, u_strich, [h, t_start]])
+
+        def dgl(s, y):
+            """Ableitung des Zustands nach der fiktiven Zeit s."""
+            r_alle, v_alle = self._ks_zustand(y, i, j, rest)
+            u, u_strich = y[index_u], y[index_u_strich]
+            h = y[6 * k + 14]
+            abstand = u @ u
+
+            # Die Kraft zwischen i und j ist in der KS-Bewegung
+            # enthalten. Die Störbeschleunigung P der
+            # Relativbewegung entsteht nur durch die übrigen Körper.
+            a = self._beschleunigung_ohne_paar(r_alle, i, j)
+            LP = _ks_matrix(u).T @ np.append(a[j] - a[i], 0)
+            A = (m_i * a[i] + m_j * a[j]) / M
+
+            # Wegen dt = r ds sind alle Ableitungen nach der Zeit
+            # mit dem Abstand r zu multiplizieren.
+            return np.concatenate([
+                abstand * v_alle[rest].reshape(-1),
+                abstand * a[rest].reshape(-1),
+                abstand * y[6 * k + 3:6 * k + 6],
+                abstand * A,
+                u_strich,
+                h / 2 * u + abstand / 2 * LP,
+                [2 * u_strich @ LP, abstand]])
+
+        def trennung(s, y):
+            """Ereignisfunktion: Das Paar hat sich entfernt."""
+            u = y[index_u]
+            return u @ u - self.abstand_grenze
+
+        def ende(s, y):
+            """Ereignisfunktion: Das Ende ist erreicht."""
+            return y[-1] - self._t_ende
+
+        def wechsel(s, y):
+            """Ereignisfunktion: Ein anderes Paar ist sich näher."""
+            r_alle, _ = self._ks_zustand(y, i, j, rest)
+            abstand = self._abstaende(r_alle)
+            abstand[i, j] = abstand[j, i] = np.inf
+            u = y[index_u]
+            return np.min(abstand) - u @ u / 2
+
+        ereignisse = [trennung, ende]
+        if k > 0:
+            ereignisse.append(wechsel)
+        for ereignis in ereignisse:
+            ereignis.terminal = True
+            ereignis.direction = 1
+        wechsel.direction = -1
+
+        result = scipy.integrate.solve_ivp(
+            dgl, [0, np.inf], y0, rtol=self.rtol, atol=self.atol,
+            events=ereignisse, dense_output=True)
+        self.n_auswertungen_regularisiert += result.nfev
+        self.n_begegnungen += 1
+
+        return result, rest, index_u, result.y[-1, -1]
+
+    def _fiktive_zeiten(self, result, t_gesucht, index_u,
+                        max_iter=50):
+        """Bestimme die fiktiven Zeiten s zu gegebenen Zeiten t.
+
+        Die Gleichung t(s) = t_gesucht wird mit dem
+        Newton-Verfahren gelöst. Wegen dt/ds = r ist t(s) monoton
+        wachsend, sodass die lineare Interpolation der
+        Stützstellen einen guten Startwert liefert. Die fiktiven
+        Zeiten werden auf das Intervall der Integration beschränkt.
+
+        Args:
+            result (scipy.integrate.OdeResult):
+                Ergebnis der regularisierten Integration mit
+                stetiger Ausgabe.
+            t_gesucht (np.ndarray):
+                Zeitpunkte [s] innerhalb des Intervalls (m).
+            index_u (slice):
+                Lage der KS-Variablen u im Zustandsvektor.
+            max_iter (int):
+                Maximale Anzahl der Newton-Schritte.
+
+        Returns:
+            np.ndarray: Fiktive Zeiten s (m).
+
+        Raises:
+            RuntimeError:
+                Wenn das Newton-Verfahren nicht konvergiert.
+        """
+        s_min, s_max = result.t[0], result.t[-1]
+        t_start, t_ende = result.y[-1, 0], result.y[-1, -1]
+        toleranz = 1e-12 * max(abs(t_start), abs(t_ende),
+                               t_ende - t_start)
+        s = np.interp(t_gesucht, result.y[-1], result.t)
+        for _ in range(max_iter):
+            y = result.sol(s).reshape(-1, s.size)
+            fehler = y[-1] - t_gesucht
+            if np.all(np.abs(fehler) <= toleranz):
+                return s
+            s = np.clip(s - fehler / np.sum(y[index_u] ** 2, axis=0),
+                        s_min, s_max)
+        raise RuntimeError('Die fiktive Zeit eines Ausgabezeitpunkts '
+                           'konnte nicht bestimmt werden.')
+
+    def loese(self, r0, v0, t_aus):
+        """Löse die Bewegungsgleichung.
+
+        Args:
+            r0 (np.ndarray):
+                Anfangsorte [m] (n_koerper × n_dim).
+            v0 (np.ndarray):
+                Anfangsgeschwindigkeiten [m/s] (n_koerper × n_dim).
+            t_aus (np.ndarray):
+                Aufsteigend sortierte Zeitpunkte [s], zu denen die
+                Lösung ausgegeben wird. Der erste Zeitpunkt ist der
+                Anfangszeitpunkt, der letzte das Ende der
+                Simulation.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]:
+                Die Zeitpunkte, die Orte (n_koerper × n_dim × n_t)
+                und die Geschwindigkeiten (n_koerper × n_dim × n_t).
+        """
+        n = self.n_koerper
+        t_aus = np.asarray(t_aus, dtype=float)
+        r_aus = np.empty((n, 3, t_aus.size))
+        v_aus = np.empty((n, 3, t_aus.size))
+
+        # Intern wird immer dreidimensional gerechnet.
+        r = np.zeros((n, 3))
+        v = np.zeros((n, 3))
+        r[:, :self.n_dim] = r0
+        v[:, :self.n_dim] = v0
+        t = t_aus[0]
+        self._t_ende = t_aus[-1]
+
+        # Anzahl der bereits ausgegebenen Zeitpunkte.
+        n_fertig = 0
+
+        # Nach dem Ende einer Begegnung wird das Paar bei der Suche
+        # nach dem nächsten zu regularisierenden Paar ignoriert,
+        # da sein Abstand gerade gleich der Grenze ist.
+        abstand = self._abstaende(r)
+        regularisieren = np.min(abstand) < self.abstand_grenze
+        while n_fertig < t_aus.size:
+            if not regularisieren:
+                result, t, r, v = self._normal(
+                    t, r, v, self._t_ende, t_aus[n_fertig:])
+                m = len(result.t)
+                if m > 0:
+                    r_aus[:, :, n_fertig:n_fertig + m] = (
+                        result.y[:3 * n].reshape(n, 3, m))
+                    v_aus[:, :, n_fertig:n_fertig + m] = (
+                        result.y[3 * n:].reshape(n, 3, m))
+                n_fertig += m
+                regularisieren = result.status == 1
+                abstand = self._abstaende(r)
+                continue
+
+            i, j = np.unravel_index(np.argmin(abstand), abstand.shape)
+            result, rest, index_u, t = self._regularisiert(
+                t, r, v, i, j)
+            if result.t_events[1].size > 0:
+                m = t_aus.size - n_fertig
+            else:
+                m = np.searchsorted(t_aus[n_fertig:], t, side='right')
+
+            if m > 0:
+                t_gesucht = t_aus[n_fertig:n_fertig + m]
+                s = self._fiktive_zeiten(result, t_gesucht, index_u)
+                y = result.sol(s).reshape(-1, m)
+                for p in range(m):
+                    k = n_fertig + p
+                    r_aus[:, :, k], v_aus[:, :, k] = self._ks_zustand(
+                        y[:, p], i, j, rest)
+            n_fertig += m
+
+            r, v = self._ks_zustand(result.y[:, -1], i, j, rest)
+            abstand = self._abstaende(r)
+            if result.t_events[0].size > 0:
+                abstand[i, j] = abstand[j, i] = np.inf
+            regularisieren = np.min(abstand) < self.abstand_grenze
+
+        return (t_aus, r_aus[:, :self.n_dim],
+                v_aus[:, :self.n_dim])
@@ -0,0 +1,303 @@
+﻿"""Gleichzeitige Integration vieler unabhängiger Szenarien.
+
+Um z.B. den Einfluss des Anflugwinkels bei einem Swing-by-Manöver
+zu untersuchen, müsste man `solve_ivp` für jeden Parametersatz
+einzeln aufrufen. Bei kleinen Systemen mit wenigen Körpern wird die
+Rechenzeit dann fast vollständig vom Aufwand der Python-Aufrufe
+bestimmt. Die Funktion `loese_schar` integriert stattdessen eine
+ganze Schar von K Szenarien gleichzeitig. Die rechte Seite der
+Differentialgleichung wird mit Array-Operationen für alle
+Szenarien auf einmal ausgewertet. Jedes Szenario hat dennoch eine
+eigene Schrittweitensteuerung und eigene Ereignisse, die das
+Szenario beenden können.
+
+Es wird dasselbe Runge-Kutta-Verfahren der Ordnung 5(4) nach
+Dormand und Prince mit derselben Schrittweitensteuerung wie bei
+`solve_ivp` mit `method='RK45'` verwendet.
+"""
+
+import numpy as np
+import scipy.integrate
+
+# Koeffizienten des Verfahrens von Dormand und Prince.
+_C = scipy.integrate.RK45.C
+_A = scipy.integrate.RK45.A
+_B = scipy.integrate.RK45.B
+_E = scipy.integrate.RK45.E
+_P = scipy.integrate.RK45.P
+
+# Parameter der Schrittweitensteuerung wie bei `solve_ivp`.
+_SICHERHEIT = 0.9
+_MIN_FAKTOR = 0.2
+_MAX_FAKTOR = 10
+
+
+class GravitationSchar:
+    """Gravitation für eine Schar von N-Körper-Systemen.
+
+    Alle Szenarien bestehen aus denselben Körpern, die sich aber an
+    unterschiedlichen Orten befinden können.
+
+    Args:
+        m (np.ndarray):
+            Massen der Körper [kg] (n_koerper).
+        G (float):
+            Gravitationskonstante [m³ / (kg * s²)].
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+    """
+
+    def __init__(self, m, G=6.6743e-11, n_dim=3):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Körper [kg] (n_koerper)."""
+        self.G = G
+        """float: Gravitationskonstante [m³ / (kg * s²)]."""
+        self.n_dim = n_dim
+        """int: Anzahl der Raumdimensionen."""
+
+    @property
+    def n_koerper(self):
+        """int: Anzahl der Körper."""
+        return self.m.size
+
+    def beschleunigung(self, r):
+        """Berechne die Beschleunigungen aller Körper.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren [m] (K × n_koerper × n_dim).
+
+        Returns:
+            np.ndarray: Beschleunigungen [m/s²]
+            (K × n_koerper × n_dim).
+        """
+        # dr[k, i, j] ist der Vektor von Körper i zu Körper j im
+        # Szenario k.
+        dr = r[:, np.newaxis] - r[:, :, np.newaxis]
+        abstand2 = np.einsum('kijd,kijd->kij', dr, dr)
+        i = np.arange(self.n_koerper)
+        abstand2[:, i, i] = np.inf
+        faktor = self.G * self.m / (abstand2 * np.sqrt(abstand2))
+        return np.einsum('kij,kijd->kid', faktor, dr)
+
+    def dgl(self, t, u):
+        """Berechne die rechte Seite der Differentialgleichung.
+
+        Der Zustandsvektor jedes Szenarios enthält wie bei
+        `Gravitation.dgl` zuerst alle Orte und dann alle
+        Geschwindigkeiten.
+
+        Args:
+            t (np.ndarray):
+                Zeitpunkte der Szenarien [s] (K).
+            u (np.ndarray):
+                Zustandsvektoren (K × 2 * n_koerper * n_dim).
+
+        Returns:
+            np.ndarray: Zeitableitungen der Zustandsvektoren.
+        """
+        r, v = np.split(u, 2, axis=1)
+        r = r.reshape(-1, self.n_koerper, self.n_dim)
+        a = self.beschleunigung(r)
+        return np.concatenate([v, a.reshape(v.shape)], axis=1)
+
+
+def _fehlernorm(x, skala):
+    """Berechne die quadratisch gemittelte Norm jeder Zeile."""
+    return np.sqrt(np.mean((x / skala) ** 2, axis=1))
+
+
+def _anfangsschrittweite(dgl, t, y, f, t_ende, rtol, atol):
+    """Schätze die Anfangsschrittweite wie `solve_ivp` ab."""
+    skala = atol + np.abs(y) * rtol
+    d0 = _fehlernorm(y, skala)
+    d1 = _fehlernorm(f, skala)
+    h0 = np.where((d0 < 1e-5) | (d1 < 1e-5), 1e-6,
+                  0.01 * d0 / np.maximum(d1, 1e-300))
+    h0 = np.minimum(h0, t_ende - t)
+    f1 = dgl(t + h0, y + h0[:, np.newaxis] * f)
+    d2 = _fehlernorm(f1 - f, skala) / h0
+    d = np.maximum(d1, d2)
+    h1 = np.where(d <= 1e-15, np.maximum(1e-6, h0 * 1e-3),
+                  (0.01 / np.maximum(d, 1e-300)) ** (1 / 5))
+    return np.minimum(np.minimum(100 * h0, h1), t_ende - t)
+
+
+def _dichte_ausgabe(y, h, Q, theta):
+    """Werte die dichte Ausgabe eines Schritts aus.
+
+    Args:
+        y (np.ndarray): Zustände am Anfang der Schritte (n × n_y).
+        h (np.ndarray): Schrittweiten (n).
+        Q (np.ndarray): Koeffizienten (n × n_y × 4).
+        theta (np.ndarray): Relative Zeitpunkte im Schritt (n).
+
+    Returns:
+        np.ndarray: Zustände zu den Zeitpunkten (n × n_y).
+    """
+    potenzen = theta[:, np.newaxis] ** np.arange(1, 5)
+    return y + h[:, np.newaxis] * np.einsum('kij,kj->ki', Q, potenzen)
+
+
+def loese_schar(dgl, t_ende, y0, t_eval, ereignisse=(), rtol=1e-6,
+                atol=1e-9, max_schritte=1000000, bei_ereignis=None):
+    """Integriere K Szenarien gleichzeitig vom Zeitpunkt 0 bis t_ende.
+
+    Args:
+        dgl (callable):
+            Rechte Seite dgl(t, y) der Differentialgleichung. Die
+            Zeitpunkte t haben die Form (n) und die Zustände y die
+            Form (n × n_y), wobei n die Anzahl der gerade aktiven
+            Szenarien ist. Das Ergebnis hat dieselbe Form wie y.
+        t_ende (float):
+            Endzeitpunkt [s].
+        y0 (np.ndarray):
+            Anfangszustände aller Szenarien (K × n_y).
+        t_eval (np.ndarray):
+            Aufsteigend sortierte Zeitpunkte, zu denen die Lösung
+            ausgegeben wird (n_t).
+        ereignisse (list):
+            Ereignisfunktionen ereignis(t, y) mit derselben Signatur
+            wie dgl, die für jedes Szenario einen Wert zurückgeben.
+            Wie bei `solve_ivp` können die Attribute `terminal` und
+            `direction` gesetzt werden. Ein Ereignis mit
+            `terminal = True` beendet nur das betroffene Szenario.
+        rtol (float):
+            Relative Toleranz.
+        atol (float):
+            Absolute Toleranz.
+        max_schritte (int):
+            Maximale Anzahl von Schrittversuchen.
+        bei_ereignis (callable):
+            Funktion bei_ereignis(n, idx, t, y), die bei jedem
+            Auftreten eines Ereignisses aufgerufen wird, nicht nur
+            beim ersten. Dabei ist n der Index der
+            Ereignisfunktion, idx die Indizes der betroffenen
+            Szenarien, t die Zeitpunkte und y die Zustände
+            (len(idx) × n_y).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+            - Die Zustände zu den Zeitpunkten t_eval
+              (K × n_y × n_t). Nach dem Ende eines Szenarios durch
+              ein Ereignis sind die Einträge NaN.
+            - Der Zeitpunkt des ersten Auftretens jedes Ereignisses
+              in jedem Szenario (n_ereignisse × K) oder NaN.
+            - Die Zustände zu diesen Zeitpunkten
+              (n_ereignisse × K × n_y).
+            - Die Anzahl der akzeptierten Schritte jedes Szenarios
+              (K).
+    """
+    y = np.array(y0, dtype=float)
+    K, n_y = y.shape
+    t_eval = np.asarray(t_eval, dtype=float)
+    n_t = t_eval.size
+    n_e = len(ereignisse)
+
+    y_aus = np.full((K, n_y, n_t), np.nan)
+    t_ereignis = np.full((n_e, K), np.nan)
+    y_ereignis = np.full((n_e, K, n_y), np.nan)
+    n_schritte = np.zeros(K, dtype=int)
+
+    t = np.zeros(K)
+    f = dgl(t, y)
+    h = _anfangsschrittweite(dgl, t, y, f, t_ende, rtol, atol)
+    g = np.array([e(t, y) for e in ereignisse]).reshape(n_e, K)
+    aktiv = np.ones(K, dtype=bool)
+
+    # Index des nächsten Ausgabezeitpunkts jedes Szenarios.
+    naechster = np.zeros(K, dtype=int)
+    if n_t > 0 and t_eval[0] <= 0:
+        y_aus[:, :, 0] = y
+        naechster[:] = 1
+
+    for _ in range(max_schritte):
+        idx = np.nonzero(aktiv)[0]
+        if idx.size == 0:
+            break
+        ti, yi, hi = t[idx], y[idx], h[idx]
+
+        # Ein Schritt des Verfahrens für alle aktiven Szenarien.
+        k = np.empty((_E.size, idx.size, n_y))
+        k[0] = f[idx]
+        for s in range(1, _C.size):
+            dy = np.einsum('s,skj->kj', _A[s, :s], k[:s])
+            k[s] = dgl(ti + _C[s] * hi, yi + hi[:, np.newaxis] * dy)
+        y_neu = yi + hi[:, np.newaxis] * np.einsum('s,skj->kj', _B,
+                                                   k[:_B.size])
+        t_neu = ti + hi
+        f_neu = dgl(t_neu, y_neu)
+        k[-1] = f_neu
+
+        # Schätze den Fehler ab und passe die Schrittweite an.
+        skala = atol + np.maximum(np.abs(yi), np.abs(y_neu)) * rtol
+        fehler = _fehlernorm(hi[:, np.newaxis]
+                             * np.einsum('s,skj->kj', _E, k), skala)
+        with np.errstate(divide='ignore'):
+            faktor = _SICHERHEIT * fehler ** (-1 / 5)
+        ok = fehler < 1
+        faktor = np.where(ok, np.minimum(_MAX_FAKTOR, faktor),
+                          np.maximum(_MIN_FAKTOR, faktor))
+        h[idx] = hi * np.nan_to_num(faktor, posinf=_MAX_FAKTOR)
+
+        if not np.any(ok):
+            continue
+        idx, ti, yi, hi = idx[ok], ti[ok], yi[ok], hi[ok]
+        t_neu, y_neu, f_neu = t_neu[ok], y_neu[ok], f_neu[ok]
+        Q = np.einsum('skj,sp->kjp', k[:, ok], _P)
+        n_schritte[idx] += 1
+
+        # Suche Vorzeichenwechsel der Ereignisfunktionen und
+        # bestimme den Zeitpunkt mit dem Bisektionsverfahren.
+        t_stopp = t_neu.copy()
+        for n, ereignis in enumerate(ereignisse):
+            g_neu = ereignis(t_neu, y_neu)
+            g_alt = g[n, idx]
+            richtung = getattr(ereignis, 'direction', 0)
+            wechsel = np.sign(g_alt) != np.sign(g_neu)
+            if richtung > 0:
+                wechsel &= g_neu > g_alt
+            elif richtung < 0:
+                wechsel &= g_neu < g_alt
+            g[n, idx] = g_neu
+            w = np.nonzero(wechsel)[0]
+            if w.size == 0:
+                continue
+            links = np.zeros(w.size)
+            rechts = np.ones(w.size)
+            for _ in range(50):
+                mitte = (links + rechts) / 2
+                y_mitte = _dichte_ausgabe(yi[w], hi[w], Q[w], mitte)
+                g_mitte = ereignis(ti[w] + mitte * hi[w], y_mitte)
+                gleich = np.sign(g_mitte) == np.sign(g_alt[w])
+                links = np.where(gleich, mitte, links)
+                rechts = np.where(gleich, rechts, mitte)
+            t_e = ti[w] + rechts * hi[w]
+            y_e = _dichte_ausgabe(yi[w], hi[w], Q[w], rechts)
+            neu = np.isnan(t_ereignis[n, idx[w]])
+            t_ereignis[n, idx[w[neu]]] = t_e[neu]
+            y_ereignis[n, idx[w[neu]]] = y_e[neu]
+            if bei_ereignis is not None:
+                bei_ereignis(n, idx[w], t_e, y_e)
+            if getattr(ereignis, 'terminal', False):
+                t_stopp[w] = np.minimum(t_stopp[w], t_e)
+
+        # Schreibe alle Ausgabezeitpunkte, die in diesem Schritt
+        # liegen, mithilfe der dichten Ausgabe.
+        while True:
+            n_aus = naechster[idx]
+            m = n_aus < n_t
+            m[m] = t_eval[n_aus[m]] <= t_stopp[m]
+            if not np.any(m):
+                break
+            theta = (t_eval[n_aus[m]] - ti[m]) / hi[m]
+            y_aus[idx[m], :, n_aus[m]] = _dichte_ausgabe(
+                yi[m], hi[m], Q[m], theta)
+            naechster[idx[m]] += 1
+
+        t[idx], y[idx], f[idx] = t_neu, y_neu, f_neu
+        fertig = (t_stopp < t_neu) | (t_neu >= t_ende)
+        aktiv[idx[fertig]] = False
+        h[idx] = np.minimum(h[idx], t_ende - t_neu)
+
+    return y_aus, t_ereignis, y_ereignis, n_schritte
@@ -1,7 +1,7 @@
 ﻿"""Animierte Darstellung des Sonnensystems.
 
 Das Programm liest die Daten des Programms sonnensystem_sim.py
-aus der Datei ephemeriden.npz ein und stellt das Sonnensystem
+aus dem Verzeichnis ephemeriden ein und stellt das Sonnensystem
 animiert dar.
 """
 
@@ -11,9 +11,10 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
 import mpl_toolkits.mplot3d
+from ephemeridenspeicher import lade_ephemeriden
 
 # Lies die Simulationsdaten ein.
-dat = np.load('ephemeriden.npz')
+dat = lade_ephemeriden('ephemeriden')
 tag, jahr, AE, G = dat['tag'], dat['jahr'], dat['AE'], dat['G']
 dt, namen = dat['dt'], dat['namen']
 m, t, r, v = dat['m'], dat['t'], dat['r'],  dat['v']
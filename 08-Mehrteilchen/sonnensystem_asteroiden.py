@@ -0,0 +1,100 @@
+﻿"""Simulation vieler Asteroiden im Sonnensystem.
+
+Das Programm liest den Anfangszustand des Sonnensystems aus dem
+Verzeichnis ephemeriden des Programms sonnensystem_sim.py ein und
+fügt zufällig verteilte Asteroiden im Asteroidengürtel hinzu. Die
+Asteroiden werden als masselose Testteilchen behandelt: Sie werden
+von der Sonne und den Planeten angezogen, beeinflussen diese aber
+nicht. Der Rechenaufwand wächst daher nur linear mit der Anzahl
+der Asteroiden. Die Simulation wird mit dem Wisdom-Holman-
+Verfahren durchgeführt, und das Ergebnis wird in der Draufsicht
+dargestellt.
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from symplektisch import WisdomHolman, integriere
+from ephemeridenspeicher import lade_ephemeriden
+
+# Anzahl der Asteroiden.
+n_asteroiden = 10000
+
+# Lies die Simulationsdaten ein.
+dat = lade_ephemeriden('ephemeriden')
+tag, jahr, AE, G = dat['tag'], dat['jahr'], dat['AE'], dat['G']
+namen, m = list(dat['namen']), dat['m']
+r_planeten, v_planeten = dat['r'][:, :, 0], dat['v'][:, :, 0]
+
+# Simulationszeit und Zeitschrittweite [s]. Die Bahnen der Planeten
+# werden nur nach jedem `ausgabe_alle`-ten Schritt gespeichert.
+t_max = 20 * jahr
+dt = 2 * tag
+ausgabe_alle = 5
+
+# Erzeuge Asteroiden auf nahezu kreisförmigen Bahnen um die Sonne
+# mit Bahnradien zwischen 2,1 AE und 3,3 AE und kleinen
+# Bahnneigungen.
+rng = np.random.default_rng(1)
+bahnradius = AE * rng.uniform(2.1, 3.3, n_asteroiden)
+winkel = rng.uniform(0, 2 * np.pi, n_asteroiden)
+neigung = np.radians(rng.normal(0, 5, n_asteroiden))
+richtung_r = np.stack([np.cos(winkel) * np.cos(neigung),
+                       np.sin(winkel) * np.cos(neigung),
+                       np.sin(neigung)], axis=1)
+richtung_v = np.stack([-np.sin(winkel), np.cos(winkel),
+                       np.zeros(n_asteroiden)], axis=1)
+betrag_v = np.sqrt(G * m[0] / bahnradius)
+betrag_v *= rng.normal(1, 0.03, n_asteroiden)
+r_asteroiden = (r_planeten[0]
+                + bahnradius[:, np.newaxis] * richtung_r)
+v_asteroiden = (v_planeten[0]
+                + betrag_v[:, np.newaxis] * richtung_v)
+
+# Füge die Asteroiden mit der Masse null hinzu.
+m_gesamt = np.concatenate([m, np.zeros(n_asteroiden)])
+r0 = np.concatenate([r_planeten, r_asteroiden])
+v0 = np.concatenate([v_planeten, v_asteroiden])
+n_koerper, n_dim = r0.shape
+
+# Löse die Bewegungsgleichung bis zum Zeitpunkt t_max. Für die
+# Asteroiden werden nur der Anfangs- und der Endzustand benötigt.
+# Alle Zwischenzustände würden bei 10000 Asteroiden mehrere hundert
+# Megabyte belegen.
+integrator = WisdomHolman(m_gesamt, G, n_dim)
+n_schritte = int(t_max / dt)
+rechenzeit = time.perf_counter()
+t, r, v = integriere(integrator, r0, v0, dt, n_schritte, n_schritte)
+rechenzeit = time.perf_counter() - rechenzeit
+print(f'Rechenzeit: {rechenzeit:.1f} s für {n_schritte} Schritte '
+      f'mit {n_koerper} Körpern')
+
+# Da die Asteroiden die Planeten nicht beeinflussen, ergibt sich die
+# Bahn des Jupiters aus einer Simulation, die nur die Sonne und die
+# Planeten enthält.
+_, r_bahnen, _ = integriere(WisdomHolman(m, G, n_dim), r_planeten,
+                            v_planeten, dt, n_schritte, ausgabe_alle)
+r_jupiter = r_bahnen[namen.index('Jupiter')]
+
+# Stelle die Bahn des Jupiters und die Positionen der Asteroiden
+# zu Beginn und am Ende der Simulation dar.
+fig = plt.figure(figsize=(10, 5))
+fig.set_tight_layout(True)
+titel = ['Beginn', f'nach {t_max / jahr:.0f} Jahren']
+for i, k in enumerate([0, -1]):
+    ax = fig.add_subplot(1, 2, i + 1)
+    ax.set_title(titel[i])
+    ax.set_xlabel('$x$ [AE]')
+    ax.set_ylabel('$y$ [AE]')
+    ax.set_aspect('equal')
+    ax.set_xlim(-6, 6)
+    ax.set_ylim(-6, 6)
+    ax.grid()
+    ax.plot(r_jupiter[0] / AE, r_jupiter[1] / AE, '-',
+            color='brown', linewidth=0.5)
+    ax.plot(r[len(namen):, 0, k] / AE, r[len(namen):, 1, k] / AE,
+            '.k', markersize=0.5)
+    ax.plot(r[:len(namen), 0, k] / AE, r[:len(namen), 1, k] / AE,
+            'o', color='red', markersize=3)
+
+plt.show()
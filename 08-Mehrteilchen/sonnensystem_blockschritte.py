@@ -0,0 +1,82 @@
+﻿"""Individuelle Schrittweiten für die Körper des Sonnensystems.
+
+Bei einer gemeinsamen Schrittweite bestimmt der Merkur mit seiner
+Umlaufzeit von 88 Tagen die Schrittweite für alle Körper, auch für
+den Neptun mit einer Umlaufzeit von 165 Jahren. Das Programm
+vergleicht das Leapfrog-Verfahren mit gemeinsamer Schrittweite und
+das Blockschrittverfahren, bei dem jeder Körper eine eigene
+Schrittweite erhält. Der Anfangszustand wird aus dem Verzeichnis
+ephemeriden des Programms sonnensystem_sim.py gelesen. Für beide
+Verfahren wird die Anzahl der pro Jahr berechneten Beschleunigungen
+ausgegeben und die Abweichung der Orte nach 20 Jahren von den
+Ergebnissen von sonnensystem_sim.py dargestellt.
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from symplektisch import BlockSchritte, Leapfrog, integriere
+from ephemeridenspeicher import lade_ephemeriden, naechster_index
+
+# Lies die Simulationsdaten ein.
+dat = lade_ephemeriden('ephemeriden')
+tag, jahr, AE, G = dat['tag'], dat['jahr'], dat['AE'], dat['G']
+namen, m = list(dat['namen']), dat['m']
+r0, v0 = dat['r'][:, :, 0], dat['v'][:, :, 0]
+n_koerper, n_dim = r0.shape
+
+# Gemeinsame Schrittweite für das Leapfrog-Verfahren und größte
+# Schrittweite für das Blockschrittverfahren [s].
+dt_leapfrog = tag / 4
+dt_block = 64 * tag
+
+# Simulationszeit [s]. Sie ist ein Vielfaches beider Schrittweiten.
+t_max = dt_block * round(20 * jahr / dt_block)
+
+# Integriere mit beiden Verfahren und speichere nur den Endzustand.
+integratoren = {
+    'Leapfrog': (Leapfrog(m, G, n_dim), dt_leapfrog),
+    'Blockschritte': (BlockSchritte(m, G, n_dim, eta=0.04), dt_block),
+}
+r_ende = {}
+for name, (integrator, dt) in integratoren.items():
+    n_schritte = round(t_max / dt)
+    rechenzeit = time.perf_counter()
+    t, r, v = integriere(integrator, r0, v0, dt, n_schritte,
+                         ausgabe_alle=n_schritte)
+    rechenzeit = time.perf_counter() - rechenzeit
+    r_ende[name] = r[:, :, -1]
+    if name == 'Leapfrog':
+        n_beschleunigungen = integrator.n_kraftberechnungen * n_koerper
+    else:
+        n_beschleunigungen = integrator.n_beschleunigungen
+    print(f'{name}: {n_beschleunigungen / (t_max / jahr):.0f} '
+          f'Beschleunigungen pro Jahr, Rechenzeit {rechenzeit:.1f} s')
+
+# Gib die zuletzt gewählten Schrittweiten des Blockverfahrens aus.
+block = integratoren['Blockschritte'][0]
+for name, stufe in zip(namen, block.stufe):
+    print(f'{name:10s} {dt_block / 2 ** stufe / tag:8.3f} Tage')
+
+# Bestimme die Abweichung vom Ergebnis von sonnensystem_sim.py
+# relativ zum Abstand von der Sonne.
+k = naechster_index(dat['t'], t_max)
+r_ref = dat['r'][:, :, k]
+abstand = np.linalg.norm(r_ref[1:] - r_ref[0], axis=1)
+
+fig = plt.figure(figsize=(10, 5))
+fig.set_tight_layout(True)
+ax = fig.add_subplot(1, 1, 1)
+ax.set_title(f'Abweichung nach {t_max / jahr:.0f} Jahren')
+ax.set_ylabel('relative Abweichung des Ortes')
+ax.set_yscale('log')
+ax.grid(axis='y')
+x = np.arange(1, n_koerper)
+for verschiebung, (name, r) in zip([-0.2, 0.2], r_ende.items()):
+    fehler = np.linalg.norm(r[1:] - r_ref[1:], axis=1) / abstand
+    ax.bar(x + verschiebung, fehler, width=0.4, label=name)
+ax.set_xticks(x)
+ax.set_xticklabels(namen[1:], rotation=45)
+ax.legend()
+
+plt.show()
@@ -1,13 +1,18 @@
 ﻿"""Simulation des Sonnensystems.
 
 Das Programm simuliert das Sonnensystem für einen Zeitraum von
-50 Jahren und speichert die Ergebnisse in der Datei
-ephemeriden.npz ab.
+50 Jahren und speichert die Ergebnisse im Verzeichnis ephemeriden
+ab (siehe ephemeridenspeicher.py). Zusätzlich werden die Bahnen in
+kompakter Form als stückweise Tschebyschow-Polynome in der Datei
+ephemeriden_tschebyschow.npz abgelegt.
 """
 
 import numpy as np
 import scipy.integrate
 import datetime
+from gravitation import Gravitation
+from ephemeridenspeicher import speichere_ephemeriden
+from tschebyschow import TschebyschowEphemeriden
 
 # Zeiteinheiten [s] und die Astronomische Einheit [m].
 tag = 24 * 60 * 60
@@ -73,18 +78,14 @@ r0 -= m @ r0 / np.sum(m)
 v0 -= m @ v0 / np.sum(m)
 
 
+# Erzeuge ein Objekt, das die Gravitationsbeschleunigungen aller
+# Körper vektorisiert berechnet.
+gravitation = Gravitation(m, G, n_dim)
+
+
 def dgl(t, u):
     """Berechne die rechte Seite der Differentialgleichung."""
-    r, v = np.split(u, 2)
-    r = r.reshape(n_koerper, n_dim)
-    a = np.zeros((n_koerper, n_dim))
-    for i in range(n_koerper):
-        for j in range(i):
-            dr = r[j] - r[i]
-            gr = G / np.linalg.norm(dr) ** 3 * dr
-            a[i] += gr * m[j]
-            a[j] -= gr * m[i]
-    return np.concatenate([v, a.reshape(-1)])
+    return gravitation.dgl(t, u)
 
 
 # Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
@@ -92,7 +93,8 @@ u0 = np.concatenate((r0.reshape(-1), v0.reshape(-1)))
 
 # Löse die Bewegungsgleichung bis zum Zeitpunkt t_max.
 result = scipy.integrate.solve_ivp(dgl, [0, t_max], u0, rtol=1e-9,
-                                   t_eval=np.arange(0, t_max, dt))
+                                   t_eval=np.arange(0, t_max, dt),
+                                   dense_output=True)
 t = result.t
 r, v = np.split(result.y, 2)
 
@@ -104,6 +106,21 @@ r = r.reshape(n_koerper, n_dim, -1)
 v = v.reshape(n_koerper, n_dim, -1)
 
 # Speichere die Simulationsdaten ab.
-np.savez('ephemeriden.npz',
-         G=G, AE=AE, namen=namen, m=m, t=t, r=r, v=v, dt=dt,
-         tag=tag, jahr=jahr, datum_t0=datum_t0.timestamp())
+speichere_ephemeriden('ephemeriden', t, r, v,
+                      G=G, AE=AE, namen=namen, m=m, dt=dt, tag=tag,
+                      jahr=jahr, datum_t0=datum_t0.timestamp())
+
+
+def orte(t):
+    """Ortsvektoren aus der dichten Ausgabe von `solve_ivp`."""
+    return result.sol(t)[:n_koerper * n_dim].reshape(n_koerper,
+                                                     n_dim, -1)
+
+
+# Passe die Tschebyschow-Polynome an die dichte Ausgabe an und
+# speichere sie mit einer Genauigkeit von 1 km ab.
+ephemeriden = TschebyschowEphemeriden.aus_funktion(
+    orte, 0, t_max, toleranz=1e3)
+ephemeriden.speichere('ephemeriden_tschebyschow.npz',
+                      G=G, AE=AE, namen=namen, m=m, tag=tag,
+                      jahr=jahr, datum_t0=datum_t0.timestamp())
@@ -0,0 +1,578 @@
+﻿"""Symplektische Integrationsverfahren für N-Körper-Probleme.
+
+Die Funktion `solve_ivp` passt die Schrittweite so an, dass eine
+vorgegebene Genauigkeit erreicht wird. Über lange Zeiträume
+wächst der Fehler der Energie trotzdem immer weiter an. Die hier
+definierten Verfahren verwenden eine feste Schrittweite und sind
+symplektisch: Der Fehler der Energie bleibt für beliebig lange
+Simulationen beschränkt. Es stehen folgende Verfahren zur
+Verfügung:
+
+    - `Leapfrog`: Das Leapfrog- bzw. Velocity-Verlet-Verfahren
+      (2. Ordnung).
+    - `Yoshida4`, `Yoshida6`: Verfahren 4. bzw. 6. Ordnung, die
+      durch Hintereinanderausführen mehrerer Leapfrog-Schritte
+      mit geeignet gewählten Schrittweiten entstehen.
+    - `BlockSchritte`: Leapfrog-Verfahren, bei dem jeder Körper
+      eine eigene Schrittweite erhält, die sich nach seiner
+      Umlaufzeit richtet.
+    - `WisdomHolman`: Für Systeme, die von einem Zentralkörper
+      dominiert werden. Die Bewegung jedes Körpers um den
+      Zentralkörper wird exakt als Keplerbewegung berechnet und
+      nur die Wechselwirkung der übrigen Körper untereinander
+      wird durch Kicks berücksichtigt. Es werden demokratisch
+      heliozentrische Koordinaten verwendet.
+
+Mit der Funktion `integriere` werden die Ergebnisse direkt in
+vorab angelegte Arrays geschrieben, die denselben Aufbau haben wie
+die Arrays `r` und `v` im Programm sonnensystem_sim.py.
+"""
+
+import math
+import numpy as np
+from gravitation import Gravitation
+
+
+class Leapfrog:
+    """Leapfrog-Verfahren (Kick-Drift-Kick) für N Körper.
+
+    Die Beschleunigung am Ende eines Schritts wird für den Anfang
+    des nächsten Schritts wiederverwendet, sodass pro Schritt nur
+    eine Kraftberechnung notwendig ist.
+
+    Args:
+        m (np.ndarray):
+            Massen der Körper [kg] (n_koerper).
+        G (float):
+            Gravitationskonstante [m³ / (kg * s²)].
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+    """
+
+    # Relative Schrittweiten der Leapfrog-Teilschritte.
+    _gewichte = [1.0]
+
+    def __init__(self, m, G=6.6743e-11, n_dim=3):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Körper [kg] (n_koerper)."""
+        self.G = G
+        """float: Gravitationskonstante [m³ / (kg * s²)]."""
+        self.gravitation = Gravitation(self.m, G, n_dim)
+        """Gravitation: Berechnung der Beschleunigungen."""
+        self.n_kraftberechnungen = 0
+        """int: Anzahl der bisherigen Kraftberechnungen."""
+        self.r = np.zeros((self.m.size, n_dim))
+        """np.ndarray: Ortsvektoren [m] (n_koerper × n_dim)."""
+        self.v = np.zeros((self.m.size, n_dim))
+        """np.ndarray: Geschwindigkeiten [m/s] (n_koerper × n_dim)."""
+        self._a = np.zeros((self.m.size, n_dim))
+
+    def start(self, r, v):
+        """Lege den Anfangszustand fest.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren [m] (n_koerper × n_dim).
+            v (np.ndarray):
+                Geschwindigkeiten [m/s] (n_koerper × n_dim).
+        """
+        self.r[:] = r
+        self.v[:] = v
+        self._berechne_beschleunigung()
+
+    def _berechne_beschleunigung(self):
+        self.gravitation.beschleunigung(self.r, out=self._a)
+        self.n_kraftberechnungen += 1
+
+    def _leapfrog(self, dt):
+        """Führe einen einzelnen Kick-Drift-Kick-Schritt aus."""
+        self.v += dt / 2 * self._a
+        self.r += dt * self.v
+        self._berechne_beschleunigung()
+        self.v += dt / 2 * self._a
+
+    def schritt(self, dt):
+        """Führe einen Zeitschritt der Länge dt aus."""
+        for w in self._gewichte:
+            self._leapfrog(w * dt)
+
+    def zustand(self, r, v):
+        """Schreibe den aktuellen Zustand in die Arrays r und v."""
+        r[:] = self.r
+        v[:] = self.v
+
+
+class Yoshida4(Leapfrog):
+    """Symplektisches Verfahren 4. Ordnung nach Yoshida (1990)."""
+
+    _w1 = 1 / (2 - 2 ** (1 / 3))
+    _w0 = -2 ** (1 / 3) * _w1
+    _gewichte = [_w1, _w0, _w1]
+
+
+class Yoshida6(Leapfrog):
+    """Symplektisches Verfahren 6. Ordnung nach Yoshida (1990).
+
+    Es wird die Lösung A aus der Originalarbeit verwendet.
+    """
+
+    _w1 = -1.17767998417887
+    _w2 = 0.235573213359357
+    _w3 = 0.784513610477560
+    _w0 = 1 - 2 * (_w1 + _w2 + _w3)
+    _gewichte = [_w3, _w2, _w1, _w0, _w1, _w2, _w3]
+
+
+class BlockSchritte:
+    """Leapfrog-Verfahren mit individuellen Schrittweiten.
+
+    Jeder Körper erhält eine eigene Schrittweite dt / 2**k, die sich
+    nach seiner Umlaufzeit richtet. Als Maß dafür dient |v| / |a|,
+    was für eine Kreisbahn gerade der Umlaufzeit geteilt durch 2π
+    entspricht. Die Schrittweiten sind Zweierpotenzen, sodass die
+    Schritte aller Körper am Ende eines Zeitschritts der Länge dt
+    wieder gemeinsam enden (Blockschrittverfahren).
+
+    Die Orte aller Körper werden jeweils bis zum nächsten Zeitpunkt
+    vorgerückt, an dem der Schritt eines Körpers endet. Nur für die
+    Körper, deren Schritt dort endet, wird die Beschleunigung neu
+    berechnet. Danach wird ihre Schrittweite neu gewählt. Eine
+    größere Schrittweite ist dabei nur erlaubt, wenn der aktuelle
+    Zeitpunkt ein Vielfaches dieser Schrittweite ist. Bei
+    hierarchischen Systemen, wie dem Sonnensystem, werden so
+    viel weniger Beschleunigungen berechnet als mit einer
+    gemeinsamen Schrittweite für alle Körper.
+
+    Das Verfahren ist zeitumkehrbar, aber wegen der wechselnden
+    Schrittweiten nicht mehr exakt symplektisch.
+
+    Args:
+        m (np.ndarray):
+            Massen der Körper [kg] (n_koerper).
+        G (float):
+            Gravitationskonstante [m³ / (kg * s²)].
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+        eta (float):
+            Genauigkeitsparameter. Die Schrittweite jedes Körpers
+            ist höchstens eta * |v| / |a|.
+        max_stufen (int):
+            Die kleinste Schrittweite ist dt / 2**max_stufen.
+    """
+
+    def __init__(self, m, G=6.6743e-11, n_dim=3, eta=0.01,
+                 max_stufen=12):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Körper [kg] (n_koerper)."""
+        self.G = G
+        """float: Gravitationskonstante [m³ / (kg * s²)]."""
+        self.eta = eta
+        """float: Genauigkeitsparameter."""
+        self.max_stufen = max_stufen
+        """int: Maximale Anzahl der Halbierungen von dt."""
+        self.gravitation = Gravitation(self.m, G, n_dim)
+        """Gravitation: Berechnung der Beschleunigungen."""
+        self.n_kraftberechnungen = 0
+        """int: Anzahl der Aufrufe der Kraftberechnung."""
+        self.n_beschleunigungen = 0
+        """int: Anzahl der für einzelne Körper berechneten
+        Beschleunigungen."""
+        self.r = np.zeros((self.m.size, n_dim))
+        """np.ndarray: Ortsvektoren [m] (n_koerper × n_dim)."""
+        self.v = np.zeros((self.m.size, n_dim))
+        """np.ndarray: Geschwindigkeiten [m/s] (n_koerper × n_dim)."""
+        self.stufe = np.zeros(self.m.size, dtype=int)
+        """np.ndarray: Die Schrittweite des Körpers i ist
+        dt / 2**stufe[i]."""
+        self._a = np.zeros((self.m.size, n_dim))
+
+    def start(self, r, v):
+        """Lege den Anfangszustand fest.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren [m] (n_koerper × n_dim).
+            v (np.ndarray):
+                Geschwindigkeiten [m/s] (n_koerper × n_dim).
+        """
+        self.r[:] = r
+        self.v[:] = v
+        self.gravitation.beschleunigung(self.r, out=self._a)
+        self.n_kraftberechnungen += 1
+        self.n_beschleunigungen += self.m.size
+
+    def _waehle_stufen(self, dt, index, takt):
+        """Wähle die Schrittweiten der Körper mit den Indizes index.
+
+        Args:
+            dt (float):
+                Länge des gesamten Zeitschritts [s].
+            index (np.ndarray):
+                Indizes der Körper.
+            takt (int):
+                Aktueller Zeitpunkt in Einheiten der kleinsten
+                Schrittweite dt / 2**max_stufen.
+        """
+        betrag_v = np.linalg.norm(self.v[index], axis=1)
+        betrag_a = np.linalg.norm(self._a[index], axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            verhaeltnis = dt * betrag_a / (self.eta * betrag_v)
+            stufe = np.ceil(np.log2(verhaeltnis))
+        stufe = np.nan_to_num(stufe, nan=0.0, posinf=self.max_stufen,
+                              neginf=0.0)
+        stufe = np.clip(stufe, 0, self.max_stufen).astype(int)
+
+        # Eine Stufe ist nur erlaubt, wenn der aktuelle Zeitpunkt
+        # ein Vielfaches der zugehörigen Schrittweite ist.
+        # Gegebenenfalls wird die Schrittweite verkleinert.
+        while True:
+            nicht_erlaubt = takt % 2 ** (self.max_stufen - stufe) != 0
+            if not np.any(nicht_erlaubt):
+                break
+            stufe[nicht_erlaubt] += 1
+        self.stufe[index] = stufe
+
+    def schritt(self, dt):
+        """Führe einen Zeitschritt der Länge dt aus.
+
+        Am Ende des Zeitschritts sind die Orte und Geschwindigkeiten
+        aller Körper wieder auf denselben Zeitpunkt synchronisiert.
+        """
+        n_takte = 2 ** self.max_stufen
+        dt_min = dt / n_takte
+        alle = np.arange(self.m.size)
+        self._waehle_stufen(dt, alle, 0)
+        takte = 2 ** (self.max_stufen - self.stufe)
+        self.v += (takte * dt_min / 2)[:, np.newaxis] * self._a
+        ende = takte.copy()
+
+        takt = 0
+        while takt < n_takte:
+            # Drift aller Körper bis zum nächsten Schrittende.
+            takt_neu = np.min(ende)
+            self.r += (takt_neu - takt) * dt_min * self.v
+            takt = takt_neu
+
+            # Abschließender Kick der aktiven Körper.
+            aktiv = np.nonzero(ende == takt)[0]
+            self._a[aktiv] = self.gravitation.beschleunigung_auswahl(
+                self.r, aktiv)
+            self.n_kraftberechnungen += 1
+            self.n_beschleunigungen += aktiv.size
+            h = takte[aktiv] * dt_min / 2
+            self.v[aktiv] += h[:, np.newaxis] * self._a[aktiv]
+            if takt == n_takte:
+                break
+
+            # Neue Schrittweite und eröffnender Kick.
+            self._waehle_stufen(dt, aktiv, takt)
+            takte[aktiv] = 2 ** (self.max_stufen - self.stufe[aktiv])
+            h = takte[aktiv] * dt_min / 2
+            self.v[aktiv] += h[:, np.newaxis] * self._a[aktiv]
+            ende[aktiv] = takt + takte[aktiv]
+
+    def zustand(self, r, v):
+        """Schreibe den aktuellen Zustand in die Arrays r und v."""
+        r[:] = self.r
+        v[:] = self.v
+
+
+# Koeffizienten der Taylorreihen der Stumpff-Funktionen C(z) und
+# S(z) in der Reihenfolge, die für das Horner-Schema benötigt wird.
+_stumpff_koeffizienten = [
+    np.array([[1 / math.factorial(2 * k + 2)],
+              [1 / math.factorial(2 * k + 3)]])
+    for k in range(6, -1, -1)]
+
+
+def stumpff(z):
+    """Berechne die Stumpff-Funktionen C(z) und S(z).
+
+    Args:
+        z (np.ndarray): Argumente der Funktionen (n).
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: Die Werte C(z) und S(z) (n).
+    """
+    z = np.asarray(z, dtype=float)
+
+    # Für kleine |z| wird die Taylorreihe verwendet, um Auslöschung
+    # zu vermeiden. Bei Planetenbahnen und kurzen Zeitschritten ist
+    # das der Normalfall.
+    # C und S werden gemeinsam mit dem Horner-Schema ausgewertet.
+    CS = np.zeros((2, z.size))
+    for koeff in _stumpff_koeffizienten:
+        CS = koeff - z * CS
+    C, S = CS
+    gross = np.abs(z) >= 0.1
+    if not np.any(gross):
+        return C, S
+
+    zg = z[gross]
+    w = np.sqrt(np.abs(zg))
+    with np.errstate(over='ignore'):
+        C[gross] = np.where(zg > 0, 1 - np.cos(w), np.cosh(w) - 1)
+        S[gross] = np.where(zg > 0, w - np.sin(w), np.sinh(w) - w)
+    C[gross] /= np.abs(zg)
+    S[gross] /= w ** 3
+    return C, S
+
+
+def kepler_drift(r, v, mu, dt, chi=None, toleranz=1e-8, max_iter=50):
+    """Bewege Körper exakt auf Keplerbahnen um einen Zentralkörper.
+
+    Es werden universelle Variablen verwendet, sodass Ellipsen-,
+    Parabel- und Hyperbelbahnen gleichermaßen behandelt werden.
+    Die Arrays r und v werden überschrieben.
+
+    Args:
+        r (np.ndarray):
+            Ortsvektoren relativ zum Zentralkörper [m] (n × n_dim).
+        v (np.ndarray):
+            Geschwindigkeiten [m/s] (n × n_dim).
+        mu (float):
+            Gravitationsparameter G * M des Zentralkörpers [m³/s²].
+        dt (float):
+            Zeitdauer [s].
+        chi (np.ndarray):
+            Startwerte der universellen Anomalie (n). Bei wiederholten
+            Aufrufen mit gleichem dt ist das Ergebnis des letzten
+            Aufrufs ein sehr guter Startwert. Bei None wird ein
+            Startwert geschätzt.
+        toleranz (float):
+            Die Iteration wird beendet, sobald die relative Änderung
+            von chi kleiner als dieser Wert ist. Da das
+            Newton-Verfahren quadratisch konvergiert, liegt der
+            verbleibende relative Fehler dann in der Größenordnung
+            von toleranz².
+        max_iter (int):
+            Maximale Anzahl von Newton-Iterationen.
+
+    Returns:
+        np.ndarray: Die universelle Anomalie chi jedes Körpers (n).
+    """
+    wurzel_mu = np.sqrt(mu)
+    r0 = np.linalg.norm(r, axis=1)
+    vr0 = np.sum(r * v, axis=1) / r0
+    alpha = 2 / r0 - np.sum(v * v, axis=1) / mu
+
+    # Löse die universelle Keplergleichung für chi mit dem
+    # Newton-Verfahren.
+    if chi is None:
+        chi = wurzel_mu * np.abs(alpha) * dt
+        chi[alpha <= 0] = wurzel_mu * dt / r0[alpha <= 0]
+    else:
+        chi = np.array(chi, dtype=float)
+    for _ in range(max_iter):
+        z = alpha * chi ** 2
+        C, S = stumpff(z)
+        F = (r0 * vr0 / wurzel_mu * chi ** 2 * C
+             + (1 - alpha * r0) * chi ** 3 * S
+             + r0 * chi - wurzel_mu * dt)
+        dF = (r0 * vr0 / wurzel_mu * chi * (1 - z * S)
+              + (1 - alpha * r0) * chi ** 2 * C + r0)
+        delta = F / dF
+        chi -= delta
+        if np.all(np.abs(delta) <= toleranz * np.abs(chi)):
+            break
+
+    # Berechne die Lagrange-Koeffizienten f, g und ihre
+    # Zeitableitungen.
+    z = alpha * chi ** 2
+    C, S = stumpff(z)
+    f = 1 - chi ** 2 / r0 * C
+    g = dt - chi ** 3 / wurzel_mu * S
+    r_neu = f.reshape(-1, 1) * r + g.reshape(-1, 1) * v
+    r_neu_betrag = np.linalg.norm(r_neu, axis=1)
+    df = wurzel_mu / (r_neu_betrag * r0) * chi * (z * S - 1)
+    dg = 1 - chi ** 2 / r_neu_betrag * C
+    v[:] = df.reshape(-1, 1) * r + dg.reshape(-1, 1) * v
+    r[:] = r_neu
+    return chi
+
+
+class WisdomHolman:
+    """Wisdom-Holman-Verfahren in demokratisch heliozentrischen
+    Koordinaten.
+
+    Der Körper mit dem Index 0 ist der Zentralkörper (z.B. die
+    Sonne). Die Hamiltonfunktion wird in drei Teile zerlegt: die
+    Keplerbewegung jedes Körpers um den Zentralkörper, die
+    Wechselwirkung der übrigen Körper untereinander und einen
+    Term, der die Bewegung des Zentralkörpers beschreibt. Die
+    Keplerbewegung wird exakt berechnet. Das Verfahren hat die
+    Ordnung 2, der Fehler ist aber proportional zum Verhältnis der
+    Masse der übrigen Körper zur Masse des Zentralkörpers und damit
+    sehr viel kleiner als beim Leapfrog-Verfahren.
+
+    Args:
+        m (np.ndarray):
+            Massen der Körper [kg] (n_koerper).
+        G (float):
+            Gravitationskonstante [m³ / (kg * s²)].
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+    """
+
+    def __init__(self, m, G=6.6743e-11, n_dim=3):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Körper [kg] (n_koerper)."""
+        self.G = G
+        """float: Gravitationskonstante [m³ / (kg * s²)]."""
+        self.mu = G * self.m[0]
+        """float: Gravitationsparameter des Zentralkörpers."""
+        self.gravitation = Gravitation(self.m[1:], G, n_dim)
+        """Gravitation: Wechselwirkung ohne Zentralkörper."""
+        self.n_kraftberechnungen = 0
+        """int: Anzahl der bisherigen Kraftberechnungen."""
+
+        n = self.m.size - 1
+        self.Q = np.zeros((n, n_dim))
+        """np.ndarray: Heliozentrische Orte [m]."""
+        self.V = np.zeros((n, n_dim))
+        """np.ndarray: Baryzentrische Geschwindigkeiten [m/s]."""
+        self._r_schwerpunkt = np.zeros(n_dim)
+        self._v_schwerpunkt = np.zeros(n_dim)
+        self._a = np.zeros((n, n_dim))
+        self._chi = None
+        self._dt = None
+
+    def start(self, r, v):
+        """Lege den Anfangszustand fest.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren [m] (n_koerper × n_dim).
+            v (np.ndarray):
+                Geschwindigkeiten [m/s] (n_koerper × n_dim).
+        """
+        m_gesamt = np.sum(self.m)
+        self._r_schwerpunkt[:] = self.m @ r / m_gesamt
+        self._v_schwerpunkt[:] = self.m @ v / m_gesamt
+        self.Q[:] = r[1:] - r[0]
+        self.V[:] = v[1:] - self._v_schwerpunkt
+        self._chi = None
+
+    def _kick(self, dt):
+        """Wechselwirkung der Körper ohne den Zentralkörper."""
+        self.gravitation.beschleunigung(self.Q, out=self._a)
+        self.n_kraftberechnungen += 1
+        self.V += dt * self._a
+
+    def _drift_zentralkoerper(self, dt):
+        """Bewegung aufgrund des Impulses des Zentralkörpers."""
+        self.Q += dt / self.m[0] * (self.m[1:] @ self.V)
+
+    def schritt(self, dt):
+        """Führe einen Zeitschritt der Länge dt aus."""
+        self._kick(dt / 2)
+        self._drift_zentralkoerper(dt / 2)
+        if self._dt != dt:
+            self._chi = None
+        self._dt = dt
+        self._chi = kepler_drift(self.Q, self.V, self.mu, dt,
+                                 chi=self._chi)
+        self._drift_zentralkoerper(dt / 2)
+        self._kick(dt / 2)
+        self._r_schwerpunkt += dt * self._v_schwerpunkt
+
+    def zustand(self, r, v):
+        """Schreibe den aktuellen Zustand in die Arrays r und v.
+
+        Die Orte und Geschwindigkeiten werden in das ursprüngliche
+        Koordinatensystem zurückgerechnet.
+        """
+        m_gesamt = np.sum(self.m)
+        r[0] = self._r_schwerpunkt - self.m[1:] @ self.Q / m_gesamt
+        r[1:] = self.Q + r[0]
+        v[0] = self._v_schwerpunkt - self.m[1:] @ self.V / self.m[0]
+        v[1:] = self.V + self._v_schwerpunkt
+
+
+def integriere(integrator, r0, v0, dt, n_schritte, ausgabe_alle=1,
+               r_aus=None, v_aus=None, monitor=None):
+    """Integriere die Bewegungsgleichung mit fester Schrittweite.
+
+    Args:
+        integrator:
+            Ein Objekt der Klassen `Leapfrog`, `Yoshida4`,
+            `Yoshida6`, `BlockSchritte` oder `WisdomHolman`.
+        r0 (np.ndarray):
+            Anfangsorte [m] (n_koerper × n_dim).
+        v0 (np.ndarray):
+            Anfangsgeschwindigkeiten [m/s] (n_koerper × n_dim).
+        dt (float):
+            Zeitschrittweite [s].
+        n_schritte (int):
+            Anzahl der Zeitschritte.
+        ausgabe_alle (int):
+            Nur jeder `ausgabe_alle`-te Zeitpunkt wird gespeichert.
+        r_aus (np.ndarray):
+            Array (n_koerper × n_dim × n_ausgabe), in das die Orte
+            geschrieben werden. Der erste Eintrag enthält den
+            Anfangszustand. Bei None wird ein Array angelegt.
+        v_aus (np.ndarray):
+            Array wie `r_aus` für die Geschwindigkeiten.
+        monitor (erhaltungsgroessen.Erhaltungsgroessen):
+            Objekt, das nach jeweils `monitor.alle` Zeitschritten
+            die Erhaltungsgrößen überprüft. Verlangt es eine
+            kleinere Schrittweite, so wird die Simulation ab der
+            letzten erfolgreichen Prüfung mit halbierter
+            Schrittweite wiederholt. Wird die Simulation
+            abgebrochen, so werden nur die bis dahin berechneten
+            Zeitpunkte zurückgegeben.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]:
+            Die Zeitpunkte, die Orte und die Geschwindigkeiten.
+    """
+    n_koerper, n_dim = np.shape(r0)
+    n_ausgabe = n_schritte // ausgabe_alle + 1
+    if r_aus is None:
+        r_aus = np.empty((n_koerper, n_dim, n_ausgabe))
+    if v_aus is None:
+        v_aus = np.empty((n_koerper, n_dim, n_ausgabe))
+    t = dt * ausgabe_alle * np.arange(n_ausgabe)
+
+    integrator.start(r0, v0)
+    integrator.zustand(r_aus[:, :, 0], v_aus[:, :, 0])
+
+    # Zustand bei der letzten erfolgreichen Prüfung, zu dem bei
+    # einer Verkleinerung der Schrittweite zurückgekehrt wird.
+    if monitor is not None:
+        monitor.start(r0, v0)
+        r_pruef = np.array(r0, dtype=float)
+        v_pruef = np.array(v0, dtype=float)
+        r_sicher, v_sicher = r_pruef.copy(), v_pruef.copy()
+        i_sicher = 0
+
+    # Jeder Zeitschritt wird in `teilung` gleiche Teilschritte
+    # zerlegt.
+    teilung = 1
+    i = 0
+    while i < n_schritte:
+        for _ in range(teilung):
+            integrator.schritt(dt / teilung)
+        i += 1
+        if i % ausgabe_alle == 0:
+            k = i // ausgabe_alle
+            integrator.zustand(r_aus[:, :, k], v_aus[:, :, k])
+
+        if monitor is None or (i % monitor.alle != 0
+                               and i != n_schritte):
+            continue
+        integrator.zustand(r_pruef, v_pruef)
+        aktion = monitor.pruefe(i * dt, r_pruef, v_pruef)
+        if aktion == 'abbrechen':
+            k = i_sicher // ausgabe_alle + 1
+            return t[:k], r_aus[:, :, :k], v_aus[:, :, :k]
+        if aktion == 'verkleinern':
+            teilung *= 2
+            i = i_sicher
+            integrator.start(r_sicher, v_sicher)
+        else:
+            r_sicher[:] = r_pruef
+            v_sicher[:] = v_pruef
+            i_sicher = i
+
+    return t, r_aus, v_aus
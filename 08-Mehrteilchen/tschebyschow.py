@@ -0,0 +1,242 @@
+﻿"""Kompakte Speicherung von Ephemeriden mit Tschebyschow-Polynomen.
+
+Das Programm sonnensystem_sim.py speichert die Orte und
+Geschwindigkeiten aller Himmelskörper für jede Stunde ab. Viel
+kompakter ist es, die Simulationszeit in Segmente gleicher Länge
+zu unterteilen und die Ortskoordinaten jedes Körpers in jedem
+Segment durch ein Tschebyschow-Polynom darzustellen. Ähnlich
+werden auch die Ephemeriden des Jet Propulsion Laboratory (SPK)
+gespeichert. Die Geschwindigkeiten ergeben sich aus der Ableitung
+der Polynome.
+
+Für jeden Körper wird die Segmentlänge automatisch so gewählt,
+dass eine vorgegebene Genauigkeit erreicht wird. Schnell bewegte
+Körper wie der Merkur erhalten daher kürzere Segmente als die
+äußeren Planeten.
+"""
+
+import numpy as np
+import numpy.polynomial.chebyshev as cheb
+
+
+def _tschebyschow_knoten(n):
+    """Gib die n Tschebyschow-Knoten im Intervall [-1, 1] zurück.
+
+    Zusätzlich wird die Matrix zurückgegeben, mit der man aus den
+    Funktionswerten an den Knoten die Koeffizienten des
+    interpolierenden Tschebyschow-Polynoms erhält.
+    """
+    k = np.arange(n)
+    x = np.cos(np.pi * (k + 0.5) / n)
+    matrix = 2 / n * np.cos(np.pi * k[:, np.newaxis] * (k + 0.5) / n)
+    matrix[0] /= 2
+    return x, matrix
+
+
+class TschebyschowEphemeriden:
+    """Ephemeriden aus stückweisen Tschebyschow-Polynomen.
+
+    Args:
+        t0 (float):
+            Anfangszeitpunkt [s].
+        t1 (float):
+            Endzeitpunkt [s].
+        koeffizienten (np.ndarray):
+            Koeffizienten der Polynome aller Segmente aller Körper
+            (n_segmente_gesamt × n_dim × (grad + 1)).
+        n_segmente (np.ndarray):
+            Anzahl der Segmente jedes Körpers (n_koerper). Die
+            Segmente der Körper sind in `koeffizienten`
+            hintereinander angeordnet.
+    """
+
+    def __init__(self, t0, t1, koeffizienten, n_segmente):
+        self.t0 = float(t0)
+        """float: Anfangszeitpunkt [s]."""
+        self.t1 = float(t1)
+        """float: Endzeitpunkt [s]."""
+        self.koeffizienten = koeffizienten
+        """np.ndarray: Koeffizienten (n_segmente_gesamt × n_dim ×
+        (grad + 1))."""
+        self.n_segmente = np.asarray(n_segmente)
+        """np.ndarray: Anzahl der Segmente jedes Körpers."""
+        self._erstes_segment = np.concatenate(
+            [[0], np.cumsum(self.n_segmente)[:-1]])
+
+    @property
+    def n_koerper(self):
+        """int: Anzahl der Körper."""
+        return self.n_segmente.size
+
+    @property
+    def n_dim(self):
+        """int: Anzahl der Raumdimensionen."""
+        return self.koeffizienten.shape[1]
+
+    @property
+    def grad(self):
+        """int: Grad der Polynome."""
+        return self.koeffizienten.shape[2] - 1
+
+    def segmentlaenge(self, i):
+        """Gib die Segmentlänge [s] des Körpers i zurück."""
+        return (self.t1 - self.t0) / self.n_segmente[i]
+
+    @classmethod
+    def aus_funktion(cls, funktion, t0, t1, grad=12, toleranz=1e3,
+                     max_stufen=20):
+        """Passe die Polynome an eine Funktion r(t) an.
+
+        Die Funktion wird an den Tschebyschow-Knoten jedes Segments
+        ausgewertet. Die Anzahl der Segmente wird für jeden Körper
+        so lange verdoppelt, bis die Abweichung zwischen Polynom und
+        Funktion an zusätzlichen Kontrollpunkten zwischen den Knoten
+        kleiner als die Toleranz ist.
+
+        Args:
+            funktion (callable):
+                Funktion, die für ein Array von Zeitpunkten (n_t)
+                die Ortsvektoren aller Körper
+                (n_koerper × n_dim × n_t) zurückgibt, z.B. die
+                dichte Ausgabe von `solve_ivp`.
+            t0 (float):
+                Anfangszeitpunkt [s].
+            t1 (float):
+                Endzeitpunkt [s].
+            grad (int):
+                Grad der Polynome.
+            toleranz (float):
+                Maximal erlaubte Abweichung der Orte [m].
+            max_stufen (int):
+                Es werden höchstens 2**max_stufen Segmente verwendet.
+
+        Returns:
+            TschebyschowEphemeriden: Die angepassten Ephemeriden.
+        """
+        x, matrix = _tschebyschow_knoten(grad + 1)
+        # Der Fehler der Interpolation ist an den Extremstellen des
+        # Tschebyschow-Polynoms vom Grad grad + 1 am größten. Diese
+        # Stellen werden als Kontrollpunkte verwendet.
+        x_kontrolle = np.cos(np.pi * np.arange(grad + 2) / (grad + 1))
+        x_alle = np.concatenate([x, x_kontrolle])
+        vandermonde = cheb.chebvander(x_kontrolle, grad)
+
+        koeffizienten = None
+        n_segmente = None
+        for stufe in range(max_stufen + 1):
+            n = 2 ** stufe
+            laenge = (t1 - t0) / n
+            mitte = t0 + laenge * (np.arange(n) + 0.5)
+            t = (mitte[:, np.newaxis]
+                 + laenge / 2 * x_alle).reshape(-1)
+            werte = funktion(t)
+            n_koerper, n_dim = werte.shape[:2]
+            werte = werte.reshape(n_koerper, n_dim, n, x_alle.size)
+
+            # Koeffizienten (n_koerper × n × n_dim × (grad + 1)) und
+            # Abweichung an den Kontrollpunkten.
+            c = np.einsum('kj,idsj->isdk', matrix,
+                          werte[..., :grad + 1])
+            naeherung = np.einsum('isdk,jk->idsj', c, vandermonde)
+            abweichung = np.linalg.norm(
+                naeherung - werte[..., grad + 1:], axis=1)
+            fehler = np.max(abweichung, axis=(1, 2))
+
+            if koeffizienten is None:
+                koeffizienten = [None] * n_koerper
+                n_segmente = np.zeros(n_koerper, dtype=int)
+            for i in range(n_koerper):
+                if koeffizienten[i] is None and (
+                        fehler[i] <= toleranz or stufe == max_stufen):
+                    koeffizienten[i] = c[i]
+                    n_segmente[i] = n
+            if all(k is not None for k in koeffizienten):
+                break
+
+        return cls(t0, t1, np.concatenate(koeffizienten), n_segmente)
+
+    def _segmente(self, i, t):
+        """Bestimme die Segmente und die normierte Zeit x."""
+        t = np.asarray(t, dtype=float)
+        laenge = self.segmentlaenge(i)
+        s = np.floor((t - self.t0) / laenge).astype(int)
+        s = np.clip(s, 0, self.n_segmente[i] - 1)
+        x = 2 * (t - self.t0 - s * laenge) / laenge - 1
+        return self._erstes_segment[i] + s, x
+
+    @staticmethod
+    def _clenshaw(c, x):
+        """Werte die Polynome mit den Koeffizienten c[j] bei x[j] aus.
+
+        Args:
+            c (np.ndarray): Koeffizienten (n_t × n_dim × n_koeff).
+            x (np.ndarray): Normierte Zeiten (n_t).
+
+        Returns:
+            np.ndarray: Funktionswerte (n_dim × n_t).
+        """
+        x = x[:, np.newaxis]
+        b1 = np.zeros(c.shape[:2])
+        b2 = np.zeros(c.shape[:2])
+        for k in range(c.shape[2] - 1, 0, -1):
+            b1, b2 = c[:, :, k] + 2 * x * b1 - b2, b1
+        return (c[:, :, 0] + x * b1 - b2).T
+
+    def ort(self, i, t):
+        """Berechne den Ort des Körpers i zu den Zeitpunkten t.
+
+        Args:
+            i (int):
+                Index des Körpers.
+            t (np.ndarray):
+                Zeitpunkte [s] (n_t).
+
+        Returns:
+            np.ndarray: Ortsvektoren [m] (n_dim × n_t).
+        """
+        s, x = self._segmente(i, np.atleast_1d(t))
+        return self._clenshaw(self.koeffizienten[s], x)
+
+    def geschwindigkeit(self, i, t):
+        """Berechne die Geschwindigkeit des Körpers i.
+
+        Args:
+            i (int):
+                Index des Körpers.
+            t (np.ndarray):
+                Zeitpunkte [s] (n_t).
+
+        Returns:
+            np.ndarray: Geschwindigkeiten [m/s] (n_dim × n_t).
+        """
+        s, x = self._segmente(i, np.atleast_1d(t))
+        c = cheb.chebder(self.koeffizienten[s], axis=2)
+        return self._clenshaw(c, x) * 2 / self.segmentlaenge(i)
+
+    def speichere(self, dateiname, **daten):
+        """Speichere die Ephemeriden in einer .npz-Datei.
+
+        Args:
+            dateiname (str):
+                Name der Datei.
+            **daten:
+                Weitere Daten, die in der Datei abgelegt werden,
+                z.B. die Namen und Massen der Körper.
+        """
+        np.savez(dateiname, t0=self.t0, t1=self.t1,
+                 koeffizienten=self.koeffizienten,
+                 n_segmente=self.n_segmente, **daten)
+
+    @classmethod
+    def lade(cls, dateiname):
+        """Lade Ephemeriden aus einer .npz-Datei.
+
+        Returns:
+            tuple[TschebyschowEphemeriden, dict]: Die Ephemeriden
+            und ein Dictionary mit allen übrigen Daten der Datei.
+        """
+        dat = dict(np.load(dateiname))
+        ephemeriden = cls(dat.pop('t0'), dat.pop('t1'),
+                          dat.pop('koeffizienten'),
+                          dat.pop('n_segmente'))
+        return ephemeriden, dat
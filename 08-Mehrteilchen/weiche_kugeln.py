@@ -0,0 +1,320 @@
+﻿"""Stöße weicher Kugeln mit Nachbarliste und Velocity-Verlet.
+
+Die Teilchen stoßen sich wie im Programm mehrteilchenstoss_dgl.py
+über eine Federkraft ab, sobald sie sich überlappen. Anstatt in
+jedem Aufruf der rechten Seite der Differentialgleichung alle
+Teilchenpaare in einer Python-Schleife zu durchlaufen, wird eine
+Nachbarliste (Verlet-Liste) verwendet: Es werden nur die Paare
+betrachtet, deren Abstand kleiner als die Summe der Radien plus
+einer zusätzlichen Hautdicke ist. Die Liste muss erst dann neu
+aufgebaut werden, wenn sich ein Teilchen seit dem letzten Aufbau
+um mehr als die halbe Hautdicke bewegt hat. Die Kräfte aller
+Paare werden vektorisiert berechnet. Die Arrays für die Paare
+werden nur beim Neuaufbau der Liste angelegt und danach in jedem
+Zeitschritt wiederverwendet.
+
+Die Bewegungsgleichung wird mit dem Velocity-Verlet-Verfahren
+mit einer festen Schrittweite gelöst, die an die Dauer eines
+Stoßes angepasst ist.
+"""
+
+import numpy as np
+import scipy.sparse
+import scipy.spatial
+
+
+class Nachbarliste:
+    """Verlet-Liste der Teilchenpaare, die sich berühren können.
+
+    Args:
+        radien (np.ndarray):
+            Radien der Teilchen [m] (n_teilchen).
+        haut (float):
+            Zusätzliche Hautdicke [m], um die der Suchradius
+            vergrößert wird.
+    """
+
+    def __init__(self, radien, haut):
+        self.radien = np.asarray(radien)
+        """np.ndarray: Radien der Teilchen [m] (n_teilchen)."""
+        self.haut = haut
+        """float: Hautdicke [m]."""
+        self.i = np.zeros(0, dtype=int)
+        """np.ndarray: Erster Teilchenindex jedes Paares."""
+        self.j = np.zeros(0, dtype=int)
+        """np.ndarray: Zweiter Teilchenindex jedes Paares."""
+        self.radiensummen = np.zeros(0)
+        """np.ndarray: Summe der Radien jedes Paares [m]."""
+        self.inzidenz = scipy.sparse.csr_matrix((self.radien.size, 0))
+        """scipy.sparse.csr_matrix: Matrix (n_teilchen × n_paare),
+        die für jedes Paar in der Zeile i eine 1 und in der Zeile j
+        eine -1 enthält."""
+        self.n_aufbau = 0
+        """int: Anzahl, wie oft die Liste aufgebaut wurde."""
+
+        # Positionen beim letzten Aufbau der Liste.
+        self._r_aufbau = None
+
+    def baue_auf(self, r):
+        """Baue die Nachbarliste für die Positionen r neu auf."""
+        # Suche mit einem k-d-Baum alle Paare, deren Abstand
+        # kleiner als der größtmögliche Suchradius ist.
+        r_such = 2 * np.max(self.radien) + self.haut
+        baum = scipy.spatial.cKDTree(r)
+        paare = baum.query_pairs(r_such, output_type='ndarray')
+        i, j = paare[:, 0], paare[:, 1]
+
+        # Behalte nur die Paare, die bezogen auf ihre eigenen
+        # Radien innerhalb der Hautdicke liegen.
+        radiensummen = self.radien[i] + self.radien[j]
+        abstand = np.linalg.norm(r[i] - r[j], axis=1)
+        nah = abstand < radiensummen + self.haut
+        self.i = i[nah]
+        self.j = j[nah]
+        self.radiensummen = radiensummen[nah]
+
+        # Mit der Inzidenzmatrix lassen sich die Paarkräfte mit einer
+        # einzigen Matrixmultiplikation für jedes Teilchen
+        # aufsummieren.
+        n_paare = self.i.size
+        self.inzidenz = scipy.sparse.csr_matrix(
+            (np.concatenate([np.ones(n_paare), -np.ones(n_paare)]),
+             (np.concatenate([self.i, self.j]),
+              np.tile(np.arange(n_paare), 2))),
+            shape=(self.radien.size, n_paare))
+
+        self._r_aufbau = r.copy()
+        self.n_aufbau += 1
+
+    def aktualisiere(self, r):
+        """Baue die Liste neu auf, falls das notwendig ist.
+
+        Zwei Teilchen können sich seit dem letzten Aufbau
+        höchstens um die doppelte maximale Verschiebung eines
+        Teilchens angenähert haben. Solange diese kleiner als die
+        Hautdicke ist, bleibt die Liste gültig.
+
+        Returns:
+            bool: True, wenn die Liste neu aufgebaut wurde.
+        """
+        if self._r_aufbau is not None:
+            verschiebung = np.sum((r - self._r_aufbau) ** 2, axis=1)
+            if 4 * np.max(verschiebung) < self.haut ** 2:
+                return False
+        self.baue_auf(r)
+        return True
+
+
+class WeicheKugeln:
+    """Stöße von Kugeln, die sich mit einer Federkraft abstoßen.
+
+    Args:
+        r (np.ndarray):
+            Ortsvektoren der Teilchen [m] (n_teilchen × n_dim).
+        v (np.ndarray):
+            Teilchengeschwindigkeiten [m/s] (n_teilchen × n_dim).
+        radien (np.ndarray):
+            Radien der Teilchen [m] (n_teilchen).
+        massen (np.ndarray):
+            Massen der Teilchen [kg] (n_teilchen).
+        D (float):
+            Federkonstante beim Aufprall [N/m].
+        waende (tuple[np.array, np.array]):
+            Der erste Eintrag des Tupels enthält ein Array
+            der Abstände der Wände vom Koordinatenursprung.
+            Der zweite Eintrag enthält ein Array (n_waende × n_dim)
+            der nach außen zeigenden Normalenvektoren. Die Wände
+            stoßen die Teilchen mit der gleichen Federkonstante ab.
+        haut (float):
+            Hautdicke der Nachbarliste [m]. In der Voreinstellung
+            wird der mittlere Radius verwendet.
+        schritte_pro_stoss (int):
+            Anzahl der Zeitschritte während der Dauer eines
+            Stoßes der beiden leichtesten Teilchen.
+    """
+
+    def __init__(self, r, v, radien, massen, D, waende=None,
+                 haut=None, schritte_pro_stoss=20):
+        self.r = np.array(r, dtype=float)
+        """np.ndarray: Ortsvektoren (n_teilchen × n_dim)."""
+        self.v = np.array(v, dtype=float)
+        """np.ndarray: Geschwindigkeiten (n_teilchen × n_dim)."""
+        self.radien = radien * np.ones(self.n_teilchen)
+        """np.ndarray: Radien der Teilchen [m] (n_teilchen)."""
+        self.massen = massen * np.ones(self.n_teilchen)
+        """np.ndarray: Massen der Teilchen [kg] (n_teilchen)."""
+        self.D = D
+        """float: Federkonstante beim Aufprall [N/m]."""
+        self.a = np.zeros((self.n_teilchen, self.n_dim))
+        """np.ndarray: Beschleunigungen (n_teilchen × n_dim)."""
+        self.t = 0.0
+        """float: Bisher insgesamt simulierte Zeit [s]."""
+
+        if waende is None:
+            self.wandabstaende = np.zeros(0)
+            self.wandnormalen = np.zeros((0, self.n_dim))
+        else:
+            self.wandabstaende = np.array(waende[0])
+            self.wandnormalen = np.array(waende[1])
+
+        if haut is None:
+            haut = np.mean(self.radien)
+        self.nachbarn = Nachbarliste(self.radien, haut)
+        """Nachbarliste: Liste der möglichen Stoßpartner."""
+
+        # Die Dauer eines Stoßes zweier Teilchen mit der reduzierten
+        # Masse mu beträgt eine halbe Schwingungsperiode
+        # T/2 = pi * sqrt(mu / D). Die kleinste reduzierte Masse
+        # ergibt sich für die beiden leichtesten Teilchen.
+        m_sortiert = np.sort(self.massen)
+        if self.n_teilchen > 1:
+            mu = m_sortiert[0] * m_sortiert[1] / np.sum(m_sortiert[:2])
+        else:
+            mu = m_sortiert[0]
+        self.dt = np.pi * np.sqrt(mu / D) / schritte_pro_stoss
+        """float: Zeitschrittweite des Integrators [s]."""
+
+        # Lege Arrays an, die in jedem Zeitschritt wiederverwendet
+        # werden. Die Arrays für die Paare der Nachbarliste werden
+        # bei jedem Neuaufbau der Liste angelegt.
+        self._kraft = np.zeros((self.n_teilchen, self.n_dim))
+        self._n_aufbau_paare = -1
+
+        # Berechne die Beschleunigungen zum Anfangszeitpunkt.
+        self.nachbarn.baue_auf(self.r)
+        self.berechne_beschleunigung()
+
+    @property
+    def n_teilchen(self):
+        """int: Anzahl der Teilchen."""
+        return self.r.shape[0]
+
+    @property
+    def n_dim(self):
+        """int: Anzahl der Raumdimensionen."""
+        return self.r.shape[1]
+
+    def _lege_paararrays_an(self):
+        """Lege die Arrays für die Paare der Nachbarliste an."""
+        n_paare = self.nachbarn.i.size
+        self._r_i = np.empty((n_paare, self.n_dim))
+        self._r_j = np.empty((n_paare, self.n_dim))
+        self._abstand = np.empty(n_paare)
+        self._faktor = np.empty(n_paare)
+        self._abstand_positiv = np.empty(n_paare, dtype=bool)
+        self._n_aufbau_paare = self.nachbarn.n_aufbau
+
+    def kraefte(self, r, out=None):
+        """Berechne die Kontaktkräfte auf alle Teilchen.
+
+        Die Nachbarliste muss für die Positionen r gültig sein.
+        Zwei Teilchen, die sich exakt am gleichen Ort befinden,
+        üben keine Kraft aufeinander aus, da die Richtung der Kraft
+        nicht definiert ist.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren der Teilchen (n_teilchen × n_dim).
+            out (np.ndarray):
+                Array (n_teilchen × n_dim), in das das Ergebnis
+                geschrieben wird.
+
+        Returns:
+            np.ndarray: Kräfte [N] (n_teilchen × n_dim).
+        """
+        if out is None:
+            out = np.empty((self.n_teilchen, self.n_dim))
+        if self._n_aufbau_paare != self.nachbarn.n_aufbau:
+            self._lege_paararrays_an()
+
+        # Berechne die Verbindungsvektoren und Abstände aller Paare
+        # der Liste.
+        dr = self._r_i
+        abstand = self._abstand
+        np.take(r, self.nachbarn.i, axis=0, out=dr)
+        np.take(r, self.nachbarn.j, axis=0, out=self._r_j)
+        dr -= self._r_j
+        np.einsum('ij,ij->i', dr, dr, out=abstand)
+        np.sqrt(abstand, out=abstand)
+
+        # Berechne den Faktor D * Federweg / Abstand. Paare, die sich
+        # nicht überlappen, liefern den Federweg null. Für Teilchen
+        # am gleichen Ort bleibt der Faktor null.
+        faktor = self._faktor
+        np.subtract(self.nachbarn.radiensummen, abstand, out=faktor)
+        np.maximum(faktor, 0, out=faktor)
+        faktor *= self.D
+        positiv = self._abstand_positiv
+        np.greater(abstand, 0, out=positiv)
+        faktor *= positiv
+        np.divide(faktor, abstand, out=faktor, where=positiv)
+
+        # Berechne die Paarkräfte und summiere sie für jedes
+        # Teilchen auf.
+        dr *= faktor.reshape(-1, 1)
+        out[:] = self.nachbarn.inzidenz @ dr
+
+        # Berechne die Kräfte der Wände. Der Federweg ist die
+        # Strecke, um die ein Teilchen in die Wand eindringt.
+        if self.wandabstaende.size > 0:
+            z = (r @ self.wandnormalen.T + self.radien.reshape(-1, 1)
+                 - self.wandabstaende)
+            federweg = np.maximum(z, 0)
+            out -= self.D * federweg @ self.wandnormalen
+        return out
+
+    def berechne_beschleunigung(self):
+        """Berechne die Beschleunigungen für die aktuellen Orte."""
+        self.kraefte(self.r, out=self._kraft)
+        np.divide(self._kraft, self.massen.reshape(-1, 1),
+                  out=self.a)
+
+    def dgl(self, t, u):
+        """Rechte Seite der Differentialgleichung für solve_ivp.
+
+        Der Zustandsvektor ist wie in mehrteilchenstoss_dgl.py
+        aufgebaut. Die Nachbarliste wird bei Bedarf neu
+        aufgebaut.
+        """
+        r, v = np.split(u, 2)
+        r = r.reshape(self.n_teilchen, self.n_dim)
+        self.nachbarn.aktualisiere(r)
+        a = self.kraefte(r) / self.massen.reshape(-1, 1)
+        return np.concatenate([v, a.reshape(-1)])
+
+    def verlet_schritt(self, dt):
+        """Führe einen Velocity-Verlet-Schritt der Dauer dt aus."""
+        self.v += 0.5 * dt * self.a
+        self.r += dt * self.v
+        self.nachbarn.aktualisiere(self.r)
+        self.berechne_beschleunigung()
+        self.v += 0.5 * dt * self.a
+        self.t += dt
+
+    def zeitschritt(self, dt):
+        """Bewege alle Teilchen über die angegebene Zeit weiter.
+
+        Das Zeitintervall wird in gleich lange Verlet-Schritte
+        zerlegt, die höchstens so lang wie `self.dt` sind.
+
+        Args:
+            dt (float):
+                Simulationszeit [s].
+        """
+        n_schritte = max(1, int(np.ceil(dt / self.dt)))
+        for _ in range(n_schritte):
+            self.verlet_schritt(dt / n_schritte)
+
+    @property
+    def energie(self):
+        """float: Kinetische plus potentielle Energie [J]."""
+        E_kin = 1 / 2 * self.massen @ np.sum(self.v ** 2, axis=1)
+        i, j = self.nachbarn.i, self.nachbarn.j
+        abstand = np.linalg.norm(self.r[i] - self.r[j], axis=1)
+        federweg = np.maximum(self.nachbarn.radiensummen - abstand, 0)
+        E_pot = 1 / 2 * self.D * np.sum(federweg ** 2)
+        if self.wandabstaende.size > 0:
+            z = (self.r @ self.wandnormalen.T
+                 + self.radien.reshape(-1, 1) - self.wandabstaende)
+            E_pot += 1 / 2 * self.D * np.sum(np.maximum(z, 0) ** 2)
+        return E_kin + E_pot
@@ -0,0 +1,70 @@
+﻿"""Karte der Überschlagszeiten des Dreifachpendels.
+
+Das Dreifachpendel aus dreifachpendel-Anfangsbedingungen.py wird
+für ein Raster von Anfangsauslenkungen der ersten und der zweiten
+Pendelstange simuliert. Für jedes Pendel wird der Zeitpunkt
+dargestellt, an dem sich zum ersten Mal eine der Stangen
+überschlägt. Alternativ kann der Lyapunov-Exponent dargestellt
+werden. Die Karte wird zusätzlich in der Datei
+dreifachpendel_karte.npy gespeichert.
+
+Die Berechnung für das volle Raster von 500 × 500
+Anfangsbedingungen dauert je nach Anzahl der Prozessorkerne
+einige Minuten bis Stunden. Für einen ersten Überblick kann man
+n_raster verkleinern.
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+from pendelschar import PendelSchar, berechne_karte
+
+# Simulationszeit und Zeitschrittweite [s].
+t_max = 10
+dt = 0.001
+# Massen der Pendelkörper [kg].
+m = [1.0, 1.0, 1.0]
+# Längen der Pendelstangen [m].
+l = [0.6, 0.3, 0.15]
+# Betrag der Erdbeschleunigung [m/s²].
+g = 9.81
+# Parameter für die Baumgarte-Stabilisierung [1/s].
+beta = alpha = 10.0
+
+# Anzahl der Rasterpunkte in jeder Richtung.
+n_raster = 500
+
+# Stelle den Lyapunov-Exponenten statt der Überschlagszeit dar.
+lyapunov = False
+
+# Anfangsauslenkungen der ersten und der zweiten Stange [rad].
+werte_phi1 = np.radians(np.linspace(-180, 180, n_raster))
+werte_phi2 = np.radians(np.linspace(-180, 180, n_raster))
+
+pendel = PendelSchar(m, l, g, alpha, beta)
+
+if __name__ == '__main__':
+    rechenzeit = time.perf_counter()
+    karte = berechne_karte(pendel, werte_phi1, werte_phi2, t_max, dt,
+                           lyapunov=lyapunov)
+    rechenzeit = time.perf_counter() - rechenzeit
+    print(f'Rechenzeit: {rechenzeit:.1f} s für {karte.size} Pendel')
+    np.save('dreifachpendel_karte.npy', karte)
+
+    if lyapunov:
+        titel = 'Lyapunov-Exponent [1/s]'
+    else:
+        # Pendel ohne Überschlag erhalten die maximale Zeit.
+        titel = 'Zeit bis zum ersten Überschlag [s]'
+        karte = np.where(np.isnan(karte), t_max, karte)
+
+    fig = plt.figure(figsize=(7, 6))
+    fig.set_tight_layout(True)
+    ax = fig.add_subplot(1, 1, 1)
+    ax.set_title(titel)
+    ax.set_xlabel(r'$\varphi_1$ [°]')
+    ax.set_ylabel(r'$\varphi_2$ [°]')
+    bild = ax.imshow(karte, origin='lower',
+                     extent=(-180, 180, -180, 180))
+    fig.colorbar(bild)
+    plt.show()
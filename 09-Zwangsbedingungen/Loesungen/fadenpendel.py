@@ -5,6 +5,7 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
 import scipy.integrate
+from zwangssystem import Zwangssystem
 
 # Simulationszeit und Zeitschrittweite [s].
 t_max = 20
@@ -30,52 +31,32 @@ beta = alpha = 200.0
 F_g = m * g * np.array([0, -1])
 
 
-def h(r):
-    """Zwangsbedingung."""
-    return r @ r - L ** 2
+def kraft(t, r, v):
+    """Gewichtskraft auf den Pendelkörper."""
+    return F_g
 
 
-def grad_h(r):
-    """Gradient der Zwangsbedingung: g[i] = dh / dx_i."""
-    return 2 * r
-
-
-def hesse_h(r):
-    """Hesse-Matrix: H[i, j] =  d²h / (dx_i dx_j)."""
-    return 2 * np.eye(2)
+# Der Faden hält den Pendelkörper höchstens im Abstand L vom
+# Aufhängepunkt. Die Zwangskraft wirkt daher nur nach innen und
+# verschwindet, wenn der Faden durchhängt.
+system = Zwangssystem([m], 2, kraft, alpha=alpha, beta=beta,
+                      toleranz=toleranz_r)
+system.fixpunkt(0, [0, 0], L, einseitig=True)
 
 
 def dgl(t, u):
     """Berechne die rechte Seite der Differentialgleichung."""
     r, v = np.split(u, 2)
-
-    # Berechne lambda.
-    grad = grad_h(r)
-    hesse = hesse_h(r)
-    A = grad @ grad / m
-    B = (- v @ hesse @ v - grad @ F_g / m
-         - 2 * alpha * grad @ v - beta ** 2 * h(r))
-    lam = B / A
-
-    # Es tritt keine Zwangskraft auf, wenn diese nach außen
-    # gerichtet wäre:
-    lam = min(lam, 0)
-
-    # Es tritt keine Zwangskraft auf, wenn das Seil durchhängt.
-    if r @ r < (L - toleranz_r) ** 2:
-        lam = 0
-
-    # Berechne die Beschleunigung mithilfe der newtonschen
-    # Bewegungsgleichung inkl. Zwangskräften.
-    a = (F_g + lam * grad) / m
+    du = system.dgl(t, u)
 
     # Wenn das Seil wieder straff ist und es eine
     # Geschwindigkeitskomponente nach außen gibt, dann wird
     # diese auf null gesetzt.
+    grad = 2 * r
     if (r @ r > (L + toleranz_r) ** 2) and (grad @ v > 0):
-        v -= (grad @ v) * grad / (grad @ grad)
+        du[:2] -= (grad @ v) * grad / (grad @ grad)
 
-    return np.concatenate([v, a])
+    return du
 
 
 # Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
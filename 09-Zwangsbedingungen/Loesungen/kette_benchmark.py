@@ -0,0 +1,86 @@
+﻿"""Rechenzeit der Zwangskräfte einer Kette.
+
+Für Ketten mit unterschiedlich vielen Gliedern wird gemessen, wie
+lange eine Auswertung der rechten Seite der Differentialgleichung
+mit der Klasse `Zwangssystem` dauert. Dabei werden die drei
+Verfahren zum Lösen des Gleichungssystems für die
+Lagrange-Multiplikatoren verglichen. Beim dichten Verfahren wächst
+die Rechenzeit für lange Ketten mit der dritten Potenz der Anzahl
+der Glieder, beim Verfahren für Bandmatrizen dagegen nur linear.
+"""
+
+import timeit
+import numpy as np
+import matplotlib.pyplot as plt
+from zwangssystem import Zwangssystem
+
+# Untersuchte Anzahlen von Kettengliedern.
+werte_n = np.array([10, 20, 50, 100, 200, 500, 1000, 2000, 5000])
+# Das dichte Verfahren wird nur bis zu dieser Anzahl getestet.
+n_max_dicht = 2000
+# Betrag der Erdbeschleunigung [m/s²].
+g = 9.81
+# Länge eines Kettengliedes [m].
+laenge = 0.01
+
+verfahren = ['dicht', 'duenn', 'band']
+zeiten = {name: np.full(werte_n.size, np.nan) for name in verfahren}
+rng = np.random.default_rng(1234)
+
+
+def kraft(t, r, v):
+    """Gewichtskraft auf die Knoten."""
+    return np.array([0, -g])
+
+
+for i, n_glieder in enumerate(werte_n):
+    # Die Kette hängt zwischen zwei Punkten im Abstand der halben
+    # Kettenlänge. Die Knoten werden auf einem Zickzack-Kurs
+    # angeordnet, damit die Zwangsbedingungen erfüllt sind.
+    n_knoten = n_glieder - 1
+    phi = np.radians(60)
+    k = np.arange(1, n_knoten + 1)
+    r = laenge * np.stack([k * np.cos(phi),
+                           -np.sin(phi) * (k % 2)], axis=1)
+    punkt_ende = laenge * np.array([n_glieder * np.cos(phi),
+                                    -np.sin(phi) * (n_glieder % 2)])
+
+    # Zufällige Geschwindigkeiten, damit alle Terme beitragen.
+    v = rng.normal(size=r.shape)
+    u = np.concatenate([r.reshape(-1), v.reshape(-1)])
+
+    for name in verfahren:
+        if name == 'dicht' and n_glieder > n_max_dicht:
+            continue
+        system = Zwangssystem(np.ones(n_knoten), 2, kraft,
+                              loeser=name)
+        system.fixpunkt(0, [0, 0], laenge)
+        for j in range(n_knoten - 1):
+            system.abstand(j, j + 1, laenge)
+        system.fixpunkt(n_knoten - 1, punkt_ende, laenge)
+
+        # Wähle die Anzahl der Wiederholungen so, dass jede
+        # Messung ungefähr 0.2 s dauert.
+        timer = timeit.Timer(lambda: system.dgl(0, u))
+        anzahl, dauer = timer.autorange()
+        zeiten[name][i] = dauer / anzahl
+
+# Gib eine Tabelle aus.
+print('Glieder;' + ';'.join(f'{name:>12}' for name in verfahren))
+for i, n_glieder in enumerate(werte_n):
+    print(f'{n_glieder:7d};' + ';'.join(
+        f'{zeiten[name][i] * 1e3:9.3f} ms' for name in verfahren))
+
+# Stelle die Rechenzeiten doppelt logarithmisch dar.
+fig = plt.figure()
+fig.set_tight_layout(True)
+ax = fig.add_subplot(1, 1, 1)
+ax.set_xlabel('Anzahl der Kettenglieder')
+ax.set_ylabel('Rechenzeit pro Auswertung [s]')
+ax.set_xscale('log')
+ax.set_yscale('log')
+ax.grid()
+for name in verfahren:
+    ax.plot(werte_n, zeiten[name], 'o-', label=name)
+ax.legend()
+plt.show()
@@ -0,0 +1,164 @@
+﻿"""Simulation einer Kette aus 1000 Gliedern mit Reibung.
+
+Die Kette wird wie in kette_mit_reibung2.py zwischen zwei
+Stützpunkten aufgehängt, besteht aber aus sehr viel mehr Gliedern.
+Die Zwangsbedingungen werden mit der Klasse `Zwangssystem`
+beschrieben, die den Gradienten der Zwangsbedingungen als dünn
+besetzte Matrix aufbaut. Die Form der Kette wird mit der idealen
+Kettenlinie verglichen.
+
+Da die kurzen Kettenglieder sehr schnelle Schwingungen ausführen
+können, wählt `solve_ivp` kleine Zeitschritte. Die Simulation
+dauert daher einige Minuten.
+"""
+
+import time
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import matplotlib.animation
+import scipy.integrate
+import scipy.optimize
+from zwangssystem import Zwangssystem
+
+# Simulationszeit und Zeitschrittweite [s].
+t_max = 5
+dt = 0.02
+# Anzahl der Kettenglieder.
+n_glieder = 1000
+# Gesamtmasse der Kette [kg].
+masse = 1.0
+# Reibungskonstante pro Kilogramm Kettenmasse [1/s].
+b = 1.0
+# Betrag der Erdbeschleunigung [m/s²].
+g = 9.81
+# Parameter für die Baumgarte-Stabilisierung [1/s].
+beta = alpha = 10.0
+
+# Die Kette hängt zu Beginn senkrecht vom linken Stützpunkt
+# herab, verläuft dann waagerecht und steigt senkrecht zum
+# rechten Stützpunkt an [m].
+ecken = np.array([[0, 0], [0, -0.5], [2, -0.5], [2, 0]])
+
+# Verteile die Punkte gleichmäßig entlang dieses Streckenzuges.
+abschnitte = np.linalg.norm(np.diff(ecken, axis=0), axis=1)
+s_ecken = np.concatenate([[0], np.cumsum(abschnitte)])
+s = np.linspace(0, s_ecken[-1], n_glieder + 1)
+punkte = np.stack([np.interp(s, s_ecken, ecken[:, 0]),
+                   np.interp(s, s_ecken, ecken[:, 1])], axis=1)
+
+# Die Länge jedes Gliedes ergibt sich aus den Anfangspositionen.
+laengen = np.linalg.norm(np.diff(punkte, axis=0), axis=1)
+
+# Alle Punkte außer den beiden Stützpunkten sind beweglich.
+n_knoten = n_glieder - 1
+n_dim = 2
+m_knoten = masse / n_knoten * np.ones(n_knoten)
+
+# Array mit den Komponenten der Anfangspositionen [m] und der
+# Anfangsgeschwindigkeiten [m/s].
+r0 = punkte[1:-1].reshape(-1)
+v0 = np.zeros(n_knoten * n_dim)
+
+# Gewichtskraft auf die Knoten in -y-Richtung.
+F_g = np.zeros((n_knoten, n_dim))
+F_g[:, 1] = -m_knoten * g
+
+
+def kraft(t, r, v):
+    """Gewichtskraft und Reibungskraft auf die Knoten."""
+    return F_g - b * m_knoten[:, np.newaxis] * v
+
+
+# Das erste und das letzte Glied sind mit den Stützpunkten
+# verbunden, alle anderen Glieder verbinden zwei Knoten.
+system = Zwangssystem(m_knoten, n_dim, kraft, alpha=alpha, beta=beta)
+system.fixpunkt(0, punkte[0], laengen[0])
+for i in range(n_knoten - 1):
+    system.abstand(i, i + 1, laengen[i + 1])
+system.fixpunkt(n_knoten - 1, punkte[-1], laengen[-1])
+
+# Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
+u0 = np.concatenate((r0, v0))
+
+# Löse die Bewegungsgleichung.
+rechenzeit = time.perf_counter()
+result = scipy.integrate.solve_ivp(system.dgl, [0, t_max], u0,
+                                   rtol=1e-6,
+                                   t_eval=np.arange(0, t_max, dt))
+rechenzeit = time.perf_counter() - rechenzeit
+print(f'Rechenzeit: {rechenzeit:.1f} s, '
+      f'{result.nfev} Auswertungen der rechten Seite')
+t = result.t
+r, v = np.split(result.y, 2)
+
+# Gib die größte relative Abweichung der Gliedlängen aus.
+abweichung = np.max(np.abs(system.h(r[:, -1]))
+                    / laengen ** 2) / 2
+print(f'Maximale relative Längenabweichung: {abweichung:.2e}')
+
+
+def kettenlinie(laenge, breite, n=500):
+    """Berechne eine ideale Kettenlinie.
+
+    Eine Kette der gegebenen Länge wird zwischen den Punkten
+    (x=0, y=0) und (x=breite, y=0) aufgehängt.
+
+    Args:
+        laenge (float):
+            Länge der Kette.
+        breite (float):
+            Abstand der Aufhängepunkte.
+        n (int):
+            Anzahl der zu berechnenden Stützstellen.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            - x-Werte der Kettenlinie.
+            - y-Werte der Kettenlinie.
+    """
+    # Bestimme den Parameter u = breite / (2 * a) aus der
+    # Bogenlänge laenge = breite * sinh(u) / u (siehe
+    # kette_mit_reibung2.py).
+    def func(u):
+        return np.sinh(u) / u - laenge / breite
+    u = scipy.optimize.root(func, 1.0).x[0]
+    a = breite / (2 * u)
+    h = -a * np.cosh(-breite / 2 / a)
+    x = np.linspace(0, breite, n)
+    y = a * np.cosh((x - breite/2) / a) + h
+    return x, y
+
+
+# Erzeuge eine Figure und ein Axes-Objekt.
+fig = plt.figure()
+ax = fig.add_subplot(1, 1, 1)
+ax.set_xlabel('$x$ [m]')
+ax.set_ylabel('$y$ [m]')
+ax.set_xlim(-0.5, 2.5)
+ax.set_ylim(-1.5, 0.5)
+ax.set_aspect('equal')
+ax.grid()
+
+# Plotte die Stützpunkte in Rot und die ideale Kettenlinie.
+ax.plot(punkte[[0, -1], 0], punkte[[0, -1], 1], 'ro', zorder=5)
+x, y = kettenlinie(np.sum(laengen), punkte[-1, 0] - punkte[0, 0])
+ax.plot(x, y, '--r')
+
+# Bei so vielen Gliedern wird die Kette als ein einziger
+# Linienplot dargestellt.
+plot_kette, = ax.plot([], [], color='black', zorder=4)
+
+
+def update(n):
+    """Aktualisiere die Grafik zum n-ten Zeitschritt."""
+    punkt_akt = punkte.copy()
+    punkt_akt[1:-1] = r[:, n].reshape(n_knoten, n_dim)
+    plot_kette.set_data(punkt_akt.T)
+    return plot_kette,
+
+
+# Erzeuge das Animationsobjekt und starte die Animation.
+ani = mpl.animation.FuncAnimation(fig, update, frames=t.size,
+                                  interval=30, blit=True)
+plt.show()
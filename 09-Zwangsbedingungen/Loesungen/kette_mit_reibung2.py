@@ -9,6 +9,7 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
 import scipy.integrate
+from zwangssystem import Zwangssystem
 
 # Simulationszeit und Zeitschrittweite [s].
 t_max = 10
@@ -71,111 +72,36 @@ r0 = punkte[indizes_knoten].reshape(-1)
 # Array mit den Komponenten der Anfangsgeschwindigkeit [m/s].
 v0 = np.zeros(n_knoten * n_dim)
 
-# Array der Massen für jede Koordinate [kg].
-m = np.repeat(massen[indizes_knoten], n_dim)
-
-# Gewichtskraft in -y-Richtung.
+# Gewichtskraft auf die Knoten in -y-Richtung.
 F_g = np.zeros((n_knoten, n_dim))
-F_g[:, 1] = -g
-F_g = m * F_g.reshape(-1)
+F_g[:, 1] = -massen[indizes_knoten] * g
 
 
-def h(r):
-    """Zwangsbedingungen."""
-    # Erzeuge ein Array mit den aktuellen Positionen aller
-    # Punkte, wobei die Positionen der beweglichen Massen aus dem
-    # Array r übernommen werden.
-    punkte_akt = punkte.copy()
-    punkte_akt[indizes_knoten] = r.reshape(n_knoten, n_dim)
-
-    # Die Zwangsbedingungen legen fest, dass die Länge jedes
-    # Stabes konstant ist.
-    h = np.zeros(n_staebe)
-    for i, stab in enumerate(staebe):
-        ra, rb = punkte_akt[stab]
-        h[i] = (ra - rb) @ (ra - rb) - laengen[i] ** 2
-    return h
-
-
-def grad_h(r):
-    """Gradient der Zwangsbed.: g[a, i] =  dh_a / dx_i."""
-    g = np.zeros((n_staebe, n_knoten, n_dim))
-    # Erzeuge ein Array mit den Positionen aller Punkte, wobei
-    # die Positionen der beweglichen Massen aus dem Array r
-    # übernommen werden.
-    punkte_aktuell = punkte.copy()
-    punkte_aktuell[indizes_knoten] = r.reshape(n_knoten, n_dim)
-
-    # In der Zwangsbedingung taucht der quadratische Abstand
-    # der durch einen Stab verbundenen Punkte auf. In der
-    # Ableitung steht daher jeweils die doppelte Differenz der
-    # Ortsvektoren.
-    for i, stab in enumerate(staebe):
-        dr = punkte_aktuell[stab[0]] - punkte_aktuell[stab[1]]
-        if stab[0] in indizes_knoten:
-            k = indizes_knoten.index(stab[0])
-            g[i, k] += 2 * dr
-        if stab[1] in indizes_knoten:
-            k = indizes_knoten.index(stab[1])
-            g[i, k] -= 2 * dr
-
-    return g.reshape(n_staebe, n_knoten * n_dim)
-
-
-def hesse_h(r):
-    """Hesse-Matrix: H[a, i, j] =  d²h_a / (dx_i dx_j)."""
-    h = np.zeros((n_staebe,
-                  n_knoten, n_dim, n_knoten, n_dim))
-
-    # Erstelle eine n_dim × n_dim - Einheitsmatrix.
-    E = np.eye(n_dim)
-
-    # Für die Hesse-Matrix muss ganz analog zum Beispiel mit dem
-    # Drei- oder Vierfachpendel an den entsprechenden Stellen
-    # eine 2 bzw. -2 eingetragen werden.
-    for i, stab in enumerate(staebe):
-        if stab[0] in indizes_knoten:
-            k1 = indizes_knoten.index(stab[0])
-            h[i, k1, :, k1, :] = 2 * E
-        if stab[1] in indizes_knoten:
-            k2 = indizes_knoten.index(stab[1])
-            h[i, k2, :, k2, :] = 2 * E
-        if ((stab[0] in indizes_knoten)
-                and (stab[1] in indizes_knoten)):
-            h[i, k1, :, k2, :] = -2 * E
-            h[i, k2, :, k1, :] = -2 * E
-
-    return h.reshape(n_staebe,
-                     n_knoten * n_dim, n_knoten * n_dim)
-
-
-def dgl(t, u):
-    """Berechne die rechte Seite der Differentialgleichung."""
-    r, v = np.split(u, 2)
-
-    # Berechne die lambdas.
-    grad = grad_h(r)
-    hesse = hesse_h(r)
-    A = grad / m @ grad.T
-    B = (- v @ hesse @ v - grad @ (F_g / m)
-         - 2 * alpha * grad @ v - beta ** 2 * h(r))
-    lam = np.linalg.solve(A, B)
-
-    # Berücksichtige die Reibungskraft.
-    F_reib = - b * v
-
-    # Berechne die Beschleunigung mithilfe der newtonschen
-    # Bewegungsgleichung inkl. Zwangskräften.
-    a = (F_g + F_reib + lam @ grad) / m
-
-    return np.concatenate([v, a])
+def kraft(t, r, v):
+    """Gewichtskraft und Reibungskraft auf die Knoten."""
+    return F_g - b * v
+
 
+# Erzeuge das System der Knoten. Jeder Stab verbindet entweder zwei
+# Knoten oder einen Knoten mit einem Stützpunkt.
+system = Zwangssystem(massen[indizes_knoten], n_dim, kraft,
+                      alpha=alpha, beta=beta)
+for stab, laenge in zip(staebe, laengen):
+    i, j = stab
+    if i in indizes_stuetz:
+        i, j = j, i
+    if j in indizes_stuetz:
+        system.fixpunkt(indizes_knoten.index(i), punkte[j], laenge)
+    else:
+        system.abstand(indizes_knoten.index(i),
+                       indizes_knoten.index(j), laenge)
 
 # Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
 u0 = np.concatenate((r0, v0))
 
 # Löse die Bewegungsgleichung.
-result = scipy.integrate.solve_ivp(dgl, [0, t_max], u0, rtol=1e-6,
+result = scipy.integrate.solve_ivp(system.dgl, [0, t_max], u0,
+                                   rtol=1e-6,
                                    t_eval=np.arange(0, t_max, dt))
 t = result.t
 r, v = np.split(result.y, 2)
@@ -7,6 +7,7 @@ import matplotlib.pyplot as plt
 import matplotlib.animation
 import scipy.integrate
 import mpl_toolkits.mplot3d
+from zwangssystem import Zwangssystem
 
 # Simulationszeit und Zeitschrittweite [s].
 t_max = 100.0
@@ -32,45 +33,21 @@ beta = alpha = 10.0
 F_g = np.array([0, 0, -m * g])
 
 
-def h(r):
-    """Zwangsbedingung."""
-    return r @ r - L ** 2
+def kraft(t, r, v):
+    """Gewichtskraft auf den Pendelkörper."""
+    return F_g
 
 
-def grad_h(r):
-    """Gradient der Zwangsbedingung: g[i] = dh / dx_i."""
-    return 2 * r
-
-
-def hesse_h(r):
-    """Hesse-Matrix: H[i, j] =  d²h / (dx_i dx_j)."""
-    return 2 * np.eye(3)
-
-
-def dgl(t, u):
-    """Berechne die rechte Seite der Differentialgleichung."""
-    r, v = np.split(u, 2)
-
-    # Berechne lambda.
-    grad = grad_h(r)
-    hesse = hesse_h(r)
-    A = grad @ grad / m
-    B = (- v @ hesse @ v - grad @ F_g / m
-         - 2 * alpha * grad @ v - beta ** 2 * h(r))
-    lam = B / A
-
-    # Berechne die Zwangskraft und die Beschleunigung.
-    F_zwang = lam * grad
-    a = (F_zwang + F_g) / m
-
-    return np.concatenate([v, a])
-
+# Der Pendelkörper hat einen festen Abstand vom Aufhängepunkt im
+# Koordinatenursprung.
+system = Zwangssystem([m], 3, kraft, alpha=alpha, beta=beta)
+system.fixpunkt(0, [0, 0, 0], L)
 
 # Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
 u0 = np.concatenate((r0, v0))
 
 # Löse die Bewegungsgleichung.
-result = scipy.integrate.solve_ivp(dgl, [0, t_max], u0,
+result = scipy.integrate.solve_ivp(system.dgl, [0, t_max], u0,
                                    t_eval=np.arange(0, t_max, dt))
 t = result.t
 r, v = np.split(result.y, 2)
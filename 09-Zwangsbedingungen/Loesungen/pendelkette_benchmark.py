@@ -0,0 +1,107 @@
+﻿"""Winkelkoordinaten und kartesische Koordinaten im Vergleich.
+
+Für ebene Mehrfachpendel mit unterschiedlich vielen Gliedern wird
+gemessen, wie lange eine Auswertung der rechten Seite der
+Differentialgleichung dauert:
+
+    - Rekursive Berechnung in Winkelkoordinaten (`Pendelkette`).
+    - Kartesische Koordinaten mit Lagrange-Multiplikatoren
+      (`Zwangssystem`), wobei das Gleichungssystem wie in
+      vierfachpendel.py mit `np.linalg.solve` ('dicht') bzw. als
+      Bandmatrix ('band') gelöst wird.
+
+Zusätzlich wird das Vierfachpendel aus vierfachpendel.py mit
+beiden Verfahren simuliert, und die Orte der Pendelkörper werden
+miteinander verglichen.
+"""
+
+import timeit
+import numpy as np
+import matplotlib.pyplot as plt
+import scipy.integrate
+from pendelkette import Pendelkette
+from zwangssystem import Zwangssystem
+
+# Untersuchte Anzahlen von Pendelkörpern.
+werte_n = np.array([2, 3, 4, 6, 10, 20, 50, 100, 200, 500, 1000])
+# Das dichte Verfahren wird nur bis zu dieser Anzahl getestet.
+n_max_dicht = 500
+# Betrag der Erdbeschleunigung [m/s²].
+g = 9.81
+rng = np.random.default_rng(1234)
+
+
+def zwangssystem(pendel, loeser):
+    """Erzeuge das gleiche Pendel in kartesischen Koordinaten."""
+    F_g = pendel.m[:, np.newaxis] * np.array([0, -g])
+    system = Zwangssystem(pendel.m, 2, lambda t, r, v: F_g,
+                          loeser=loeser)
+    system.fixpunkt(0, [0, 0], pendel.l[0])
+    for i in range(1, pendel.n_glieder):
+        system.abstand(i, i - 1, pendel.l[i])
+    return system
+
+
+def messe(funktion):
+    """Rechenzeit für einen Aufruf der Funktion [s]."""
+    anzahl, dauer = timeit.Timer(funktion).autorange()
+    return dauer / anzahl
+
+
+verfahren = ['Winkel', 'dicht', 'band']
+zeiten = {name: np.full(werte_n.size, np.nan) for name in verfahren}
+for i, n in enumerate(werte_n):
+    # Pendel mit gleichen Massen und einer Gesamtlänge von 1 m in
+    # einem zufälligen Bewegungszustand.
+    pendel = Pendelkette(np.ones(n), np.full(n, 1 / n), g)
+    u = pendel.anfangszustand(rng.uniform(-np.pi, np.pi, n),
+                              rng.normal(size=n))
+    r, v = pendel.kartesisch(u)
+    u_kartesisch = np.concatenate([r, v])
+
+    zeiten['Winkel'][i] = messe(lambda: pendel.dgl(0, u))
+    for name in ['dicht', 'band']:
+        if name == 'dicht' and n > n_max_dicht:
+            continue
+        system = zwangssystem(pendel, name)
+        zeiten[name][i] = messe(
+            lambda: system.dgl(0, u_kartesisch))
+
+# Gib eine Tabelle aus.
+print('Glieder;' + ';'.join(f'{name:>12}' for name in verfahren))
+for i, n in enumerate(werte_n):
+    print(f'{n:7d};' + ';'.join(
+        f'{zeiten[name][i] * 1e6:9.1f} µs' for name in verfahren))
+
+# Simuliere das Vierfachpendel aus vierfachpendel.py mit beiden
+# Verfahren.
+t_max = 2
+t = np.arange(0, t_max, 0.002)
+pendel = Pendelkette([1.0, 1.0, 1.0, 1.0], [0.8, 0.4, 0.2, 0.1], g)
+u0 = pendel.anfangszustand(np.radians([130.0, 0, 0, 0]))
+result = scipy.integrate.solve_ivp(pendel.dgl, [0, t_max], u0,
+                                   method='DOP853', rtol=1e-12,
+                                   atol=1e-12, t_eval=t)
+r_winkel, _ = pendel.kartesisch(result.y)
+system = zwangssystem(pendel, None)
+result = scipy.integrate.solve_ivp(
+    system.dgl, [0, t_max], np.concatenate(pendel.kartesisch(u0)),
+    method='DOP853', rtol=1e-12, atol=1e-12, t_eval=t)
+r_kartesisch, _ = np.split(result.y, 2)
+abweichung = np.max(np.abs(r_winkel - r_kartesisch))
+print(f'\nVierfachpendel: Größte Abweichung der Orte bis '
+      f't = {t_max} s: {abweichung:.2e} m')
+
+# Stelle die Rechenzeiten doppelt logarithmisch dar.
+fig = plt.figure()
+fig.set_tight_layout(True)
+ax = fig.add_subplot(1, 1, 1)
+ax.set_xlabel('Anzahl der Pendelkörper')
+ax.set_ylabel('Rechenzeit pro Auswertung [s]')
+ax.set_xscale('log')
+ax.set_yscale('log')
+ax.grid()
+for name in verfahren:
+    ax.plot(werte_n, zeiten[name], 'o-', label=name)
+ax.legend()
+plt.show()
@@ -0,0 +1,180 @@
+﻿"""Vergleich des RATTLE-Verfahrens mit der Baumgarte-Methode.
+
+Das Dreifachpendel und die Kette aus kette.py werden einerseits
+wie in den übrigen Programmen mit der Baumgarte-Stabilisierung und
+`solve_ivp` (RK45, rtol=1e-6) und andererseits mit dem
+RATTLE-Verfahren für verschiedene feste Zeitschrittweiten gelöst.
+Für jede Rechnung werden die Rechenzeit, die größte Abweichung der
+Gesamtenergie, die größte Verletzung der Zwangsbedingungen und die
+Abweichung der Orte von einer sehr genauen Referenzlösung während
+der ersten Sekunde ausgegeben. Da beide Systeme chaotisch sind,
+ist ein Vergleich der Orte über längere Zeiten nicht sinnvoll.
+"""
+
+import time
+import numpy as np
+import matplotlib.pyplot as plt
+import scipy.integrate
+from zwangssystem import Zwangssystem
+
+# Simulationszeit und Zeitschrittweite für die Ausgabe [s].
+t_max = 5
+dt_ausgabe = 0.01
+# Zeitraum für den Vergleich der Orte mit der Referenzlösung [s].
+t_vergleich = 1.0
+# Zeitschrittweiten für das RATTLE-Verfahren [s].
+werte_dt = [2e-3, 1e-3, 5e-4, 2e-4]
+# Betrag der Erdbeschleunigung [m/s²].
+g = 9.81
+# Parameter für die Baumgarte-Stabilisierung [1/s].
+beta = alpha = 10.0
+
+
+def dreifachpendel():
+    """Erzeuge das Dreifachpendel aus dreifachpendel.py.
+
+    Returns:
+        tuple[Zwangssystem, np.ndarray]:
+            - Das System der Pendelkörper.
+            - Zustandsvektor zum Zeitpunkt t=0.
+    """
+    m = np.array([1.0, 1.0, 1.0])
+    laengen = [0.6, 0.3, 0.15]
+    F_g = m[:, np.newaxis] * np.array([0, -g])
+    system = Zwangssystem(m, 2, lambda t, r, v: F_g,
+                          alpha=alpha, beta=beta)
+    system.fixpunkt(0, [0, 0], laengen[0])
+    system.abstand(1, 0, laengen[1])
+    system.abstand(2, 1, laengen[2])
+
+    # Die erste Stange ist um 130° ausgelenkt, die beiden anderen
+    # hängen senkrecht nach unten.
+    phi1 = np.radians(130.0)
+    r1 = laengen[0] * np.array([np.sin(phi1), -np.cos(phi1)])
+    r0 = np.concatenate([r1,
+                         r1 - [0, laengen[1]],
+                         r1 - [0, laengen[1] + laengen[2]]])
+    return system, np.concatenate([r0, np.zeros(r0.size)])
+
+
+def kette():
+    """Erzeuge die Kette aus kette.py.
+
+    Returns:
+        tuple[Zwangssystem, np.ndarray]:
+            - Das System der Knoten.
+            - Zustandsvektor zum Zeitpunkt t=0.
+    """
+    punkte = np.array([[0, 0], [0, -0.5], [0.5, -0.5], [1, -0.5],
+                       [1.5, -0.5], [2, -0.5], [2, 0]])
+    m = np.ones(5)
+    F_g = m[:, np.newaxis] * np.array([0, -g])
+    system = Zwangssystem(m, 2, lambda t, r, v: F_g,
+                          alpha=alpha, beta=beta)
+    laengen = np.linalg.norm(np.diff(punkte, axis=0), axis=1)
+    system.fixpunkt(0, punkte[0], laengen[0])
+    for i in range(4):
+        system.abstand(i, i + 1, laengen[i + 1])
+    system.fixpunkt(4, punkte[-1], laengen[-1])
+    r0 = punkte[1:-1].reshape(-1)
+    return system, np.concatenate([r0, np.zeros(r0.size)])
+
+
+def energie(system, y):
+    """Berechne die Gesamtenergie für jeden Zeitpunkt.
+
+    Args:
+        system (Zwangssystem):
+            Das System der Massenpunkte.
+        y (np.ndarray):
+            Zustandsvektoren (2⋅N⋅n_dim × n_t).
+
+    Returns:
+        np.ndarray: Gesamtenergie [J] (n_t).
+    """
+    r, v = np.split(y, 2)
+    r = r.reshape(system.n_punkte, system.n_dim, -1)
+    v = v.reshape(system.n_punkte, system.n_dim, -1)
+    m = system.m[:, np.newaxis]
+    return np.sum(m / 2 * np.sum(v ** 2, axis=1)
+                  + m * g * r[:, 1], axis=0)
+
+
+def bewerte(system, t, y, y_ref, rechenzeit, name):
+    """Gib die Kenngrößen einer Rechnung aus.
+
+    Returns:
+        tuple[float, float, float]:
+            - Rechenzeit [s].
+            - Größte Abweichung der Energie [J].
+            - Größte Abweichung der Orte während t_vergleich [m].
+    """
+    n_r = y.shape[0] // 2
+    e = energie(system, y)
+    fehler_e = np.max(np.abs(e - e[0]))
+    fehler_h = np.max([np.max(np.abs(system.h(r)))
+                       for r in y[:n_r].T])
+    vergleich = t <= t_vergleich
+    fehler_r = np.max(np.abs(y[:n_r, vergleich]
+                             - y_ref[:n_r, vergleich]))
+    print(f'{name:>16}; {rechenzeit:7.2f} s; {fehler_e:9.2e} J; '
+          f'{fehler_h:9.2e} m²; {fehler_r:9.2e} m')
+    return rechenzeit, fehler_e, fehler_r
+
+
+fig = plt.figure(figsize=(10, 4.5))
+fig.set_tight_layout(True)
+
+for i_system, (titel, erzeuge) in enumerate(
+        [('Dreifachpendel', dreifachpendel), ('Kette', kette)]):
+    system, u0 = erzeuge()
+    t = np.arange(0, t_max + dt_ausgabe / 2, dt_ausgabe)
+
+    # Referenzlösung mit sehr kleinen Toleranzen.
+    result = scipy.integrate.solve_ivp(system.dgl, [0, t_max], u0,
+                                       method='DOP853', rtol=1e-12,
+                                       atol=1e-12, t_eval=t)
+    y_ref = result.y
+
+    print(f'\n{titel}')
+    print(f'{"Verfahren":>16}; {"Rechenzeit":>9}; {"Energie":>11}; '
+          f'{"h(r)":>12}; {"Ort":>11}')
+
+    # Baumgarte-Stabilisierung mit adaptiver Schrittweite.
+    rechenzeit = time.perf_counter()
+    result = scipy.integrate.solve_ivp(system.dgl, [0, t_max], u0,
+                                       rtol=1e-6, t_eval=t)
+    rechenzeit = time.perf_counter() - rechenzeit
+    baumgarte = bewerte(system, t, result.y, y_ref, rechenzeit,
+                        'RK45 rtol=1e-6')
+
+    # RATTLE-Verfahren mit fester Schrittweite.
+    rattle = []
+    for dt in werte_dt:
+        rechenzeit = time.perf_counter()
+        t_rattle, y = system.rattle(
+            u0, t_max, dt, n_ausgabe=int(round(dt_ausgabe / dt)))
+        rechenzeit = time.perf_counter() - rechenzeit
+        rattle.append(bewerte(system, t_rattle, y, y_ref, rechenzeit,
+                              f'RATTLE dt={dt:g}'))
+    rattle = np.array(rattle)
+
+    # Stelle die Genauigkeit über der Rechenzeit dar.
+    ax = fig.add_subplot(1, 2, i_system + 1)
+    ax.set_title(titel)
+    ax.set_xlabel('Rechenzeit [s]')
+    ax.set_ylabel('Größte Abweichung')
+    ax.set_xscale('log')
+    ax.set_yscale('log')
+    ax.grid()
+    ax.plot(rattle[:, 0], rattle[:, 1], 'o-b',
+            label='Energie [J], RATTLE')
+    ax.plot(rattle[:, 0], rattle[:, 2], 's-r',
+            label='Ort [m], RATTLE')
+    ax.plot(baumgarte[0], baumgarte[1], 'ob', fillstyle='none',
+            label='Energie [J], RK45')
+    ax.plot(baumgarte[0], baumgarte[2], 'sr', fillstyle='none',
+            label='Ort [m], RK45')
+    ax.legend()
+
+plt.show()
@@ -0,0 +1,118 @@
+﻿"""Simulation einer Skifahrt mit Flugphasen.
+
+Der Hang und die Parameter stimmen mit skifahrt.py überein. Die
+Fahrt wird mit der Klasse `Hangfahrt` als hybrides System
+simuliert, das zwischen der Bewegung auf dem Hang und dem freien
+Flug wechselt. Die Zeitpunkte des Abhebens und des Aufsetzens
+werden ausgegeben.
+"""
+
+import time
+import numpy as np
+import matplotlib as mpl
+import matplotlib.pyplot as plt
+import matplotlib.animation
+from hangfahrt import Hang, Hangfahrt
+
+# Stützstellen (Koordinaten) des Hangs [m].
+x_hang = np.array([0.0, 5.0, 10.0, 15.0, 20.0, 30.0, 35.0,
+                   40.0, 45.0, 55.0, 70.0])
+y_hang = np.array([10.0, 8.0, 7.0, 6.0, 5.0, 4.0, 3.0,
+                   3.5, 1.5, 0.02, 0.0])
+
+# Zeitschrittweite für die Animation [s].
+dt = 0.01
+# Masse des Skifahrers [kg].
+m = 90.0
+# Erdbeschleunigung [m/s²].
+g = 9.81
+# Luftdichte [kg/m³].
+rho = 1.3
+# Produkt aus cw-Wert und Frontfläche [m²].
+cwA = 0.47
+# Gleitreibungskoeffizient.
+mu = 0.02
+
+# Anfangsposition [m] und Vektor der Anfangsgeschwindigkeit [m/s].
+r0 = np.array([x_hang[0], y_hang[0]])
+v0 = np.array([0, 0])
+
+# Erzeuge den Hang und löse die Bewegungsgleichung.
+hang = Hang(x_hang, y_hang)
+fahrt = Hangfahrt(hang, m, g, rho, cwA, mu)
+rechenzeit = time.perf_counter()
+phasen = fahrt.simuliere(r0, v0, x_hang[-1], rtol=1e-5)
+rechenzeit = time.perf_counter() - rechenzeit
+
+# Gib die einzelnen Phasen aus.
+for kontakt, result in phasen:
+    art = 'Hang' if kontakt else 'Flug'
+    print(f'{art}: {result.t[0]:5.2f} s bis {result.t[-1]:5.2f} s, '
+          f'x = {result.y[0, 0]:5.2f} m bis {result.y[0, -1]:5.2f} m')
+
+# Berechne die Interpolation auf einem feinen Raster.
+t = np.arange(0, phasen[-1][1].t[-1], dt)
+r, v, F_zwang = fahrt.auswerten(phasen, t)
+
+# Bestimme einige Kenngrößen der Simulation:
+nfev = sum(result.nfev for _, result in phasen)
+v_max = np.max(np.linalg.norm(v, axis=0))
+v_end = np.linalg.norm(v[:, -1])
+print(f'Rechenzeit:              {rechenzeit:4.3f} s')
+print(f'Anzahl Funktionsaufrufe: {nfev}')
+print(f'Fahrtdauer:              {t[-1]:4.2f} s')
+print(f'Maximalgeschwindigkeit:  {v_max*3.6:4.1f} km/h')
+print(f'Endgeschwindigkeit:      {v_end*3.6:4.1f} km/h')
+
+# Erzeuge eine Figure und eine Axes.
+fig = plt.figure(figsize=(12, 3))
+fig.set_tight_layout(True)
+ax_ort = fig.add_subplot(1, 1, 1)
+ax_ort.set_xlabel('$x$ [m]')
+ax_ort.set_ylabel('$y$ [m]')
+ax_ort.grid()
+
+# Plotte den Hang als graue Linie und die Stützpunkte als
+# graue Punkte.
+ax_ort.plot(x_hang, y_hang, '.', color='gray')
+x_hangplot = np.linspace(x_hang[0], x_hang[-1], 501)
+y_hangplot = hang.spline(x_hangplot)
+ax_ort.plot(x_hangplot, y_hangplot, '--', color='gray')
+
+# Erzeuge einen schwarzen Linienplot für die
+# interpolierte Bahnkurve.
+plot_bahn, = ax_ort.plot([], [], '-k')
+
+# Plotte den Geschwindigkeitsbetrag mit einer zweiten y-Achse.
+ax_geschw = ax_ort.twinx()
+ax_geschw.set_ylabel('Geschwindigkeit [km/h]', color='red')
+ax_geschw.tick_params(axis='y', labelcolor='red')
+ax_geschw.plot(r[0], 3.6 * np.linalg.norm(v, axis=0), '-r')
+
+# Plotte den Betrag der Normalbeschleunigung mit einer dritten
+# y-Achse.
+ax_normalbeschl = ax_ort.twinx()
+ax_normalbeschl.set_ylabel('Beinkraft [m·g]', color='blue')
+ax_normalbeschl.tick_params(axis='y', labelcolor='blue')
+ax_normalbeschl.spines['right'].set_position(('outward', 60))
+ax_normalbeschl.plot(r[0], F_zwang / (m * g), '-b')
+ax_normalbeschl.set_ylim(0, 3)
+
+# Erzeuge eine Punktplot für die Position des Skifahrers
+plot_skifahrer, = ax_ort.plot([], [], 'o', color='red', zorder=5)
+
+
+def update(n):
+    """Aktualisiere die Grafik zum n-ten Zeitschritt."""
+    # Aktualisiere die Position des Skifahrers.
+    plot_skifahrer.set_data(r[:, n].reshape(-1, 1))
+
+    # Stelle die Bahnkurve bis zum aktuellen Zeitpunkt dar.
+    plot_bahn.set_data(r[:, :n])
+    return plot_skifahrer, plot_bahn
+
+
+# Erzeuge das Animationsobjekt und starte die Animation.
+ani = mpl.animation.FuncAnimation(fig, update, frames=t.size,
+                                  interval=30, blit=True)
+plt.show()
@@ -6,6 +6,7 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
 import scipy.integrate
+from zwangssystem import Zwangssystem
 
 # Simulationszeit und Zeitschrittweite [s].
 t_max = 10
@@ -40,114 +41,39 @@ r04 = r03 + l4 * np.array([math.sin(phi4), -math.cos(phi4)])
 # Array mit den Komponenten der Anfangspositionen [m].
 r0 = np.concatenate((r01, r02, r03, r04))
 
-# Anzahl der Dimensionen, der Teilchen und der Zwangsbedingungen.
+# Anzahl der Dimensionen und der Teilchen.
 n_dim = len(r01)
 n_teilchen = len(r0) // n_dim
-n_zwangsbed = n_teilchen
 
 # Array mit den Komponenten der Anfangsgeschwindigkeit [m/s].
 v0 = np.zeros(n_teilchen * n_dim)
 
-# Array der Masse für jede Komponente [kg].
-m = np.array([m1, m1, m2, m2, m3, m3, m4, m4])
+# Array der Massen [kg].
+m = np.array([m1, m2, m3, m4])
 
-# Vektor der Gewichtskraft.
-F_g = m * np.array([0, -g, 0, -g, 0, -g, 0, -g])
+# Array der Gewichtskräfte [N].
+F_g = m[:, np.newaxis] * np.array([0, -g])
 
 
-def h(r):
-    """Zwangsbedingungen."""
-    r = r.reshape(n_teilchen, n_dim)
-    d1 = r[0]
-    d2 = r[1] - r[0]
-    d3 = r[2] - r[1]
-    d4 = r[3] - r[2]
-    return np.array([d1 @ d1 - l1 ** 2,
-                     d2 @ d2 - l2 ** 2,
-                     d3 @ d3 - l3 ** 2,
-                     d4 @ d4 - l4 ** 2])
+def kraft(t, r, v):
+    """Gewichtskraft auf die Pendelkörper."""
+    return F_g
 
 
-def grad_h(r):
-    """Gradient der Zwangsbed.: g[a, i] =  dh_a / dx_i."""
-    r = r.reshape(n_teilchen, n_dim)
-    g = np.zeros((n_zwangsbed, n_teilchen, n_dim))
-
-    # Erste Zwangsbedingung.
-    g[0, 0] = 2 * r[0]
-
-    # Zweite Zwangsbedingung.
-    g[1, 0] = 2 * (r[0] - r[1])
-    g[1, 1] = 2 * (r[1] - r[0])
-
-    # Dritte Zwangsbedingung.
-    g[2, 1] = 2 * (r[1] - r[2])
-    g[2, 2] = 2 * (r[2] - r[1])
-
-    # Vierte Zwangsbedingung.
-    g[3, 2] = 2 * (r[2] - r[3])
-    g[3, 3] = 2 * (r[3] - r[2])
-
-    return g.reshape(n_zwangsbed, n_teilchen * n_dim)
-
-
-def hesse_h(r):
-    """Hesse-Matrix: H[a, i, j] =  d²h_a / (dx_i dx_j)."""
-    h = np.zeros((n_zwangsbed,
-                  n_teilchen, n_dim, n_teilchen, n_dim))
-
-    # Erstelle eine n_dim × n_dim - Einheitsmatrix.
-    E = np.eye(n_dim)
-
-    # Erste Zwangsbedingung.
-    h[0, 0, :, 0, :] = 2 * E
-
-    # Zweite Zwangsbedingung.
-    h[1, 0, :, 0, :] = 2 * E
-    h[1, 0, :, 1, :] = -2 * E
-    h[1, 1, :, 0, :] = -2 * E
-    h[1, 1, :, 1, :] = 2 * E
-
-    # Dritte Zwangsbedingung.
-    h[2, 1, :, 1, :] = 2 * E
-    h[2, 1, :, 2, :] = -2 * E
-    h[2, 2, :, 1, :] = -2 * E
-    h[2, 2, :, 2, :] = 2 * E
-
-    # Vierte Zwangsbedingung.
-    h[3, 2, :, 2, :] = 2 * E
-    h[3, 2, :, 3, :] = -2 * E
-    h[3, 3, :, 2, :] = -2 * E
-    h[3, 3, :, 3, :] = 2 * E
-
-    return h.reshape(n_zwangsbed,
-                     n_teilchen * n_dim, n_teilchen * n_dim)
-
-
-def dgl(t, u):
-    """Berechne die rechte Seite der Differentialgleichung."""
-    r, v = np.split(u, 2)
-
-    # Berechne die lambdas.
-    grad = grad_h(r)
-    hesse = hesse_h(r)
-    A = grad / m @ grad.T
-    B = (- v @ hesse @ v - grad @ (F_g / m)
-         - 2 * alpha * grad @ v - beta ** 2 * h(r))
-    lam = np.linalg.solve(A, B)
-
-    # Berechne die Beschleunigung mithilfe der newtonschen
-    # Bewegungsgleichung inkl. Zwangskräften.
-    a = (F_g + lam @ grad) / m
-
-    return np.concatenate([v, a])
-
+# Die erste Masse hängt am Koordinatenursprung. Jede weitere Masse
+# ist mit der vorherigen durch eine Stange verbunden.
+system = Zwangssystem(m, n_dim, kraft, alpha=alpha, beta=beta)
+system.fixpunkt(0, [0, 0], l1)
+system.abstand(1, 0, l2)
+system.abstand(2, 1, l3)
+system.abstand(3, 2, l4)
 
 # Lege den Zustandsvektor zum Zeitpunkt t=0 fest.
 u0 = np.concatenate((r0, v0))
 
 # Löse die Bewegungsgleichung.
-result = scipy.integrate.solve_ivp(dgl, [0, t_max], u0, rtol=1e-6,
+result = scipy.integrate.solve_ivp(system.dgl, [0, t_max], u0,
+                                   rtol=1e-6,
                                    t_eval=np.arange(0, t_max, dt))
 t = result.t
 r, v = np.split(result.y, 2)
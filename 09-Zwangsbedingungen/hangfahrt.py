@@ -0,0 +1,328 @@
+﻿"""Skifahrt auf einem Hang als hybrides System.
+
+In skifahrt.py wird der Skifahrer durch eine Zwangsbedingung mit
+Baumgarte-Stabilisierung auf dem Hang gehalten. Ob er den Hang
+berührt, wird innerhalb der rechten Seite der
+Differentialgleichung mit if-Abfragen entschieden. Dadurch ist die
+rechte Seite unstetig, und `solve_ivp` muss an jedem Übergang sehr
+kleine Zeitschritte wählen. Außerdem wird der Spline für jede
+Auswertung mehrfach aufgerufen.
+
+Hier wird die Fahrt in Phasen zerlegt, die jeweils durch eine
+glatte Differentialgleichung beschrieben werden:
+
+    - Auf dem Hang bewegt sich der Skifahrer entlang der Kurve
+      y = f(x). Der Zustand wird durch x und v_x beschrieben, und
+      y und v_y ergeben sich aus der Hangfunktion. Die
+      Zwangsbedingung ist damit exakt erfüllt.
+    - Im Flug bewegt sich der Skifahrer nur unter dem Einfluss
+      der Gewichtskraft und des Luftwiderstands.
+
+Die Übergänge werden mit Ereignisfunktionen von `solve_ivp`
+bestimmt: Der Skifahrer hebt ab, wenn die Normalkraft null wird,
+und er setzt auf, wenn er die Hangoberfläche erreicht. Beim
+Aufsetzen geht die Geschwindigkeitskomponente senkrecht zum Hang
+verloren.
+
+Die Klasse `Hang` berechnet die Hangfunktion und ihre beiden
+Ableitungen mit einer einzigen Auswertung des Polynoms im
+jeweiligen Abschnitt des Splines.
+"""
+
+import bisect
+import numpy as np
+import scipy.integrate
+import scipy.interpolate
+
+
+class Hang:
+    """Hangprofil, das durch kubische Splines interpoliert wird.
+
+    Args:
+        x (np.ndarray):
+            x-Koordinaten der Stützstellen [m].
+        y (np.ndarray):
+            y-Koordinaten der Stützstellen [m].
+    """
+
+    def __init__(self, x, y):
+        self.spline = scipy.interpolate.CubicSpline(
+            x, y, bc_type='natural')
+        """scipy.interpolate.CubicSpline: Interpolation des Hangs."""
+
+        # Stützstellen und Polynomkoeffizienten jedes Abschnitts als
+        # Python-Listen, da die Auswertung für einzelne Zahlen so
+        # deutlich schneller ist als mit Arrays.
+        self._x = self.spline.x.tolist()
+        self._c = self.spline.c.T.tolist()
+        self._abschnitt = 0
+
+    def __call__(self, x):
+        """Werte die Hangfunktion und ihre Ableitungen aus.
+
+        Aufeinanderfolgende Aufrufe liegen meistens im gleichen
+        Abschnitt des Splines. Daher wird der zuletzt verwendete
+        Abschnitt gespeichert und nur beim Verlassen des Abschnitts
+        neu gesucht.
+
+        Args:
+            x (float):
+                x-Koordinate [m].
+
+        Returns:
+            tuple[float, float, float]:
+                - Höhe f(x) [m].
+                - Steigung f'(x).
+                - Zweite Ableitung f''(x) [1/m].
+        """
+        x = float(x)
+        k = self._abschnitt
+        if not self._x[k] <= x < self._x[k + 1]:
+            k = bisect.bisect_right(self._x, x) - 1
+            k = min(max(k, 0), len(self._x) - 2)
+            self._abschnitt = k
+        c3, c2, c1, c0 = self._c[k]
+        dx = x - self._x[k]
+        f = ((c3 * dx + c2) * dx + c1) * dx + c0
+        df = (3 * c3 * dx + 2 * c2) * dx + c1
+        d2f = 6 * c3 * dx + 2 * c2
+        return f, df, d2f
+
+
+class Hangfahrt:
+    """Bewegung eines Skifahrers auf einem Hang mit Flugphasen.
+
+    Args:
+        hang (Hang):
+            Profil des Hangs.
+        m (float):
+            Masse des Skifahrers [kg].
+        g (float):
+            Betrag der Erdbeschleunigung [m/s²].
+        rho (float):
+            Luftdichte [kg/m³].
+        cwA (float):
+            Produkt aus cw-Wert und Frontfläche [m²].
+        mu (float):
+            Gleitreibungskoeffizient.
+    """
+
+    def __init__(self, hang, m, g=9.81, rho=1.3, cwA=0.47, mu=0.02):
+        self.hang = hang
+        """Hang: Profil des Hangs."""
+        self.m = m
+        """float: Masse des Skifahrers [kg]."""
+        self.g = g
+        """float: Betrag der Erdbeschleunigung [m/s²]."""
+        self.rho = rho
+        """float: Luftdichte [kg/m³]."""
+        self.cwA = cwA
+        """float: Produkt aus cw-Wert und Frontfläche [m²]."""
+        self.mu = mu
+        """float: Gleitreibungskoeffizient."""
+
+    def _andruck(self, d2f, vx):
+        """Berechne den Ausdruck f'' v_x² + g.
+
+        Die Normalkraft auf dem Hang ist F_N = lam * (-f', 1) mit
+        lam = m * (f'' v_x² + g) / (1 + f'²). Der Hang kann den
+        Skifahrer nur tragen, solange dieser Ausdruck positiv ist.
+        """
+        return d2f * vx ** 2 + self.g
+
+    def dgl_hang(self, t, u):
+        """Rechte Seite der Differentialgleichung auf dem Hang.
+
+        Args:
+            t (float):
+                Aktueller Zeitpunkt [s].
+            u (np.ndarray):
+                Zustandsvektor (x, v_x).
+
+        Returns:
+            np.ndarray: Zeitableitung des Zustandsvektors.
+        """
+        x, vx = u
+        f, df, d2f = self.hang(x)
+        n_quadrat = 1 + df ** 2
+        lam = self.m * self._andruck(d2f, vx) / n_quadrat
+
+        # Luftwiderstand und Gleitreibung wirken entgegen der
+        # Geschwindigkeit (v_x, f' v_x). Der Betrag der Normalkraft
+        # ist |lam| * sqrt(1 + f'²), sodass die x-Komponente der
+        # Reibungskraft -mu * |lam| * sign(v_x) ist.
+        v_betrag = abs(vx) * np.sqrt(n_quadrat)
+        Fx = (-df * lam
+              - 0.5 * self.rho * self.cwA * v_betrag * vx
+              - self.mu * abs(lam) * np.sign(vx))
+        return np.array([vx, Fx / self.m])
+
+    def dgl_flug(self, t, u):
+        """Rechte Seite der Differentialgleichung im Flug.
+
+        Args:
+            t (float):
+                Aktueller Zeitpunkt [s].
+            u (np.ndarray):
+                Zustandsvektor (x, y, v_x, v_y).
+
+        Returns:
+            np.ndarray: Zeitableitung des Zustandsvektors.
+        """
+        v = u[2:]
+        k = 0.5 * self.rho * self.cwA / self.m
+        a = -k * np.linalg.norm(v) * v
+        a[1] -= self.g
+        return np.concatenate([v, a])
+
+    def _ereignisse(self, x_ziel, kontakt):
+        """Erzeuge die Ereignisfunktionen für eine Phase.
+
+        Die Simulation endet beim Erreichen des Ziels oder wenn die
+        Geschwindigkeit in x-Richtung von positiv auf negativ
+        wechselt. Die dritte Ereignisfunktion beendet die Phase beim
+        Abheben bzw. Aufsetzen.
+        """
+        i_vx = 1 if kontakt else 2
+
+        def ziel_erreicht(t, u):
+            """Ereignisfunktion: Erreichen des Ziels."""
+            return u[0] - x_ziel
+
+        def stehen_geblieben(t, u):
+            """Ereignisfunktion: Anhalten des Skifahrers."""
+            return u[i_vx]
+
+        def abheben(t, u):
+            """Ereignisfunktion: Abheben vom Hang."""
+            _, _, d2f = self.hang(u[0])
+            return self._andruck(d2f, u[1])
+
+        def aufsetzen(t, u):
+            """Ereignisfunktion: Aufsetzen auf dem Hang."""
+            return u[1] - self.hang(u[0])[0]
+
+        wechsel = abheben if kontakt else aufsetzen
+        stehen_geblieben.direction = -1
+        wechsel.direction = -1
+        for ereignis in ziel_erreicht, stehen_geblieben, wechsel:
+            ereignis.terminal = True
+        return [ziel_erreicht, stehen_geblieben, wechsel]
+
+    def simuliere(self, r0, v0, x_ziel, t_max=np.inf, rtol=1e-5,
+                  max_phasen=1000):
+        """Simuliere die Fahrt vom Start bis zum Ziel.
+
+        Args:
+            r0 (np.ndarray):
+                Anfangsposition [m]. Liegt sie auf dem Hang, so
+                beginnt die Fahrt auf dem Hang, sonst im Flug.
+            v0 (np.ndarray):
+                Anfangsgeschwindigkeit [m/s].
+            x_ziel (float):
+                x-Koordinate des Ziels [m].
+            t_max (float):
+                Maximale Simulationszeit [s].
+            rtol (float):
+                Relative Toleranz für `solve_ivp`.
+            max_phasen (int):
+                Maximale Anzahl von Phasen.
+
+        Returns:
+            list[tuple[bool, scipy.integrate.OdeResult]]: Für jede
+            Phase die Angabe, ob der Skifahrer den Hang berührt, und
+            das Ergebnis von `solve_ivp` mit stetiger Ausgabe.
+
+        Raises:
+            RuntimeError:
+                Wenn die maximale Anzahl von Phasen überschritten
+                wird.
+        """
+        t = 0.0
+        x, y = r0
+        vx, vy = v0
+        f, df, d2f = self.hang(x)
+        kontakt = y <= f + 1e-9 * max(1.0, abs(f))
+
+        phasen = []
+        while len(phasen) < max_phasen:
+            if kontakt:
+                # Projiziere die Geschwindigkeit auf die Tangente
+                # des Hangs. Beim Aufsetzen entspricht dies einem
+                # vollständig inelastischen Stoß.
+                vx = (vx + df * vy) / (1 + df ** 2)
+                if self._andruck(d2f, vx) < 0:
+                    # Der Hang krümmt sich so stark, dass der
+                    # Skifahrer sofort wieder abhebt.
+                    kontakt = False
+                    vy = df * vx
+                    y = f
+                    continue
+                dgl = self.dgl_hang
+                u0 = [x, vx]
+            else:
+                dgl = self.dgl_flug
+                u0 = [x, y, vx, vy]
+
+            result = scipy.integrate.solve_ivp(
+                dgl, [t, t_max], u0, rtol=rtol,
+                events=self._ereignisse(x_ziel, kontakt),
+                dense_output=True)
+            phasen.append((kontakt, result))
+
+            # Beende die Simulation, wenn die maximale Zeit, das
+            # Ziel oder der Umkehrpunkt erreicht wurde.
+            if result.status != 1 or result.t_events[2].size == 0:
+                return phasen
+
+            # Wechsle zwischen Hang und Flug.
+            t = result.t_events[2][0]
+            u = result.y_events[2][0]
+            if kontakt:
+                x, vx = u
+                f, df, d2f = self.hang(x)
+                y, vy = f, df * vx
+            else:
+                x, y, vx, vy = u
+                f, df, d2f = self.hang(x)
+            kontakt = not kontakt
+
+        raise RuntimeError('Die maximale Anzahl von Phasen wurde '
+                           'überschritten.')
+
+    def auswerten(self, phasen, t):
+        """Berechne Orte, Geschwindigkeiten und Normalkräfte.
+
+        Args:
+            phasen (list):
+                Rückgabewert von `simuliere`.
+            t (np.ndarray):
+                Zeitpunkte [s] (n_t).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray, np.ndarray]:
+                - Orte [m] (2 × n_t).
+                - Geschwindigkeiten [m/s] (2 × n_t).
+                - Beträge der Normalkraft [N] (n_t).
+        """
+        t = np.asarray(t)
+        r = np.zeros((2, t.size))
+        v = np.zeros((2, t.size))
+        F_N = np.zeros(t.size)
+        for kontakt, result in phasen:
+            maske = (t >= result.t[0]) & (t <= result.t[-1])
+            if not np.any(maske):
+                continue
+            u = result.sol(t[maske])
+            if kontakt:
+                x, vx = u
+                df = self.hang.spline(x, 1)
+                d2f = self.hang.spline(x, 2)
+                r[:, maske] = x, self.hang.spline(x)
+                v[:, maske] = vx, df * vx
+                F_N[maske] = (self.m * self._andruck(d2f, vx)
+                              / np.sqrt(1 + df ** 2))
+            else:
+                r[:, maske] = u[:2]
+                v[:, maske] = u[2:]
+        return r, v, F_N
@@ -0,0 +1,224 @@
+﻿"""Ebene Mehrfachpendel in Winkelkoordinaten.
+
+In dreifachpendel.py und vierfachpendel.py wird die Bewegung der
+Pendelkörper in kartesischen Koordinaten berechnet, und in jedem
+Zeitschritt muss ein Gleichungssystem für die
+Lagrange-Multiplikatoren gelöst werden. Beschreibt man das Pendel
+dagegen durch die Auslenkungen phi_i der Stangen gegenüber der
+Senkrechten, so sind die Zwangsbedingungen automatisch erfüllt,
+und es gibt nur noch n Freiheitsgrade.
+
+Die Bewegungsgleichung wird hier nicht über die Massenmatrix der
+Lagrange-Gleichungen, sondern rekursiv nach der Methode der
+Artikulierten Körper (Featherstone) berechnet: Der Teil des Pendels
+unterhalb der Masse i wirkt auf diese Masse wie eine Punktmasse mit
+einer richtungsabhängigen, scheinbaren Trägheit, die durch eine
+symmetrische 2×2-Matrix beschrieben wird. Diese Matrizen werden in
+einem Durchlauf vom freien Ende zum Aufhängepunkt bestimmt.
+Anschließend werden die Beschleunigungen in einem zweiten Durchlauf
+vom Aufhängepunkt zum freien Ende berechnet. Der Aufwand wächst
+daher nur linear mit der Anzahl der Pendelkörper.
+
+Da beide Durchläufe sequentiell sind, werden sie mit gewöhnlichen
+Gleitkommazahlen statt mit Arrays programmiert. Für Pendel mit
+wenigen Gliedern ist dies deutlich schneller als die kartesische
+Formulierung. Bei sehr langen Ketten überwiegt dagegen der Aufwand
+der Python-Schleifen, und die Klasse `Zwangssystem` mit dem
+Verfahren für Bandmatrizen ist schneller (siehe
+Loesungen/pendelkette_benchmark.py).
+"""
+
+import math
+import numpy as np
+
+
+class Pendelkette:
+    """Ebenes Mehrfachpendel in Winkelkoordinaten.
+
+    Ein Pendel besteht aus n Massen, die durch masselose Stangen
+    miteinander und die erste Masse mit dem Aufhängepunkt im
+    Koordinatenursprung verbunden sind. Der Zustandsvektor enthält
+    zuerst die Auslenkungen der n Stangen gegenüber der Senkrechten
+    und dann deren Winkelgeschwindigkeiten.
+
+    Args:
+        m (np.ndarray):
+            Massen der Pendelkörper [kg] (n).
+        l (np.ndarray):
+            Längen der Pendelstangen [m] (n).
+        g (float):
+            Betrag der Erdbeschleunigung [m/s²].
+    """
+
+    n_dim = 2
+    """int: Anzahl der Raumdimensionen."""
+
+    def __init__(self, m, l, g=9.81):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Pendelkörper [kg] (n)."""
+        self.l = np.array(l, dtype=float)
+        """np.ndarray: Längen der Pendelstangen [m] (n)."""
+        self.g = g
+        """float: Betrag der Erdbeschleunigung [m/s²]."""
+
+    @property
+    def n_glieder(self):
+        """int: Anzahl der Pendelkörper."""
+        return self.m.size
+
+    def anfangszustand(self, phi, omega=None):
+        """Setze den Zustandsvektor aus den Winkeln zusammen.
+
+        Args:
+            phi (np.ndarray):
+                Auslenkungen der Stangen [rad] (n).
+            omega (np.ndarray):
+                Winkelgeschwindigkeiten der Stangen [rad/s] (n).
+                Bei None ruht das Pendel.
+
+        Returns:
+            np.ndarray: Zustandsvektor (2⋅n).
+        """
+        phi = np.array(phi, dtype=float)
+        if omega is None:
+            omega = np.zeros_like(phi)
+        return np.concatenate([phi, omega])
+
+    def dgl(self, t, u):
+        """Berechne die rechte Seite der Differentialgleichung.
+
+        Die Stange i verbindet die Masse i-1 (bzw. den
+        Aufhängepunkt) mit der Masse i und hat die Richtung
+        e_i = (sin(phi_i), -cos(phi_i)). Der Teil des Pendels ab der
+        Masse i übt über die Stange i auf die Masse i-1 die Kraft
+        f = b_i - I_i @ a_(i-1) aus, wobei a_(i-1) die
+        Beschleunigung der Masse i-1 ist. Mit der Matrix
+        J_i = m_i + I_(i+1) und der Kraft c_i = m_i g + b_(i+1)
+        ergibt sich aus der Bedingung, dass sich die Länge der
+        Stange nicht ändert:
+
+            I_i = e_i e_i^T / s_i,
+            b_i = e_i (e_i @ J_i^-1 @ c_i + l_i omega_i²) / s_i,
+
+        mit s_i = e_i @ J_i^-1 @ e_i.
+
+        Args:
+            t (float):
+                Aktueller Zeitpunkt [s].
+            u (np.ndarray):
+                Zustandsvektor (2⋅n).
+
+        Returns:
+            np.ndarray: Zeitableitung des Zustandsvektors.
+        """
+        n = self.n_glieder
+        phi = u[:n].tolist()
+        omega = u[n:].tolist()
+        m = self.m.tolist()
+        l = self.l.tolist()
+        g = self.g
+
+        # Richtungen der Stangen und zwischengespeicherte Größen
+        # für den zweiten Durchlauf.
+        ex = [math.sin(p) for p in phi]
+        ey = [-math.cos(p) for p in phi]
+        qx = [0.0] * n
+        qy = [0.0] * n
+        xx = [0.0] * n
+        xy = [0.0] * n
+        s = [0.0] * n
+        p = [0.0] * n
+
+        # Durchlauf vom freien Ende zum Aufhängepunkt. Die Matrix
+        # I und die Kraft b der Masse unterhalb der letzten Masse
+        # sind null.
+        Ixx = Ixy = Iyy = bx = by = 0.0
+        for i in range(n - 1, -1, -1):
+            # J = m + I und c = m g + b.
+            Jxx = m[i] + Ixx
+            Jxy = Ixy
+            Jyy = m[i] + Iyy
+            cx = bx
+            cy = by - m[i] * g
+
+            # Berechne q = J⁻¹ e und x = J⁻¹ c.
+            det = Jxx * Jyy - Jxy * Jxy
+            qx[i] = (Jyy * ex[i] - Jxy * ey[i]) / det
+            qy[i] = (Jxx * ey[i] - Jxy * ex[i]) / det
+            xx[i] = (Jyy * cx - Jxy * cy) / det
+            xy[i] = (Jxx * cy - Jxy * cx) / det
+            s[i] = ex[i] * qx[i] + ey[i] * qy[i]
+            p[i] = ex[i] * xx[i] + ey[i] * xy[i]
+
+            # Scheinbare Trägheit und Kraft für die Masse i-1.
+            faktor = (p[i] + l[i] * omega[i] ** 2) / s[i]
+            Ixx = ex[i] * ex[i] / s[i]
+            Ixy = ex[i] * ey[i] / s[i]
+            Iyy = ey[i] * ey[i] / s[i]
+            bx = faktor * ex[i]
+            by = faktor * ey[i]
+
+        # Durchlauf vom Aufhängepunkt zum freien Ende. Aus der
+        # Stangenkraft T_i ergibt sich die Beschleunigung
+        # a_i = J_i⁻¹ (c_i - T_i e_i) und daraus die
+        # Winkelbeschleunigung der Stange i.
+        alpha = [0.0] * n
+        ax = ay = 0.0
+        for i in range(n):
+            T = (p[i] - ex[i] * ax - ey[i] * ay
+                 + l[i] * omega[i] ** 2) / s[i]
+            ax_neu = xx[i] - T * qx[i]
+            ay_neu = xy[i] - T * qy[i]
+            # Die Normale zur Stange ist (-e_y, e_x).
+            alpha[i] = (-ey[i] * (ax_neu - ax)
+                        + ex[i] * (ay_neu - ay)) / l[i]
+            ax = ax_neu
+            ay = ay_neu
+
+        return np.concatenate([u[n:], alpha])
+
+    def kartesisch(self, y):
+        """Rechne Zustandsvektoren in kartesische Koordinaten um.
+
+        Die Ergebnisse haben die gleiche Form wie die Orte und
+        Geschwindigkeiten, die man in dreifachpendel.py mit
+        `np.split(result.y, 2)` erhält, sodass die dortigen
+        Animationen unverändert verwendet werden können.
+
+        Args:
+            y (np.ndarray):
+                Zustandsvektoren (2⋅n × n_t).
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]:
+                - Orte der Pendelkörper [m] (n⋅n_dim × n_t).
+                - Geschwindigkeiten der Pendelkörper [m/s]
+                  (n⋅n_dim × n_t).
+        """
+        n = self.n_glieder
+        phi, omega = y[:n], y[n:]
+        l = self.l.reshape((n,) + (1,) * (y.ndim - 1))
+        richtung = np.stack([np.sin(phi), -np.cos(phi)], axis=1)
+        normale = np.stack([np.cos(phi), np.sin(phi)], axis=1)
+        r = np.cumsum(l[:, np.newaxis] * richtung, axis=0)
+        v = np.cumsum((l * omega)[:, np.newaxis] * normale, axis=0)
+        form = (-1,) + y.shape[1:]
+        return r.reshape(form), v.reshape(form)
+
+    def energie(self, y):
+        """Gesamtenergie des Pendels [J].
+
+        Args:
+            y (np.ndarray):
+                Zustandsvektoren (2⋅n × n_t).
+
+        Returns:
+            np.ndarray: Gesamtenergie für jeden Zeitpunkt (n_t).
+        """
+        r, v = self.kartesisch(y)
+        r = r.reshape((self.n_glieder, self.n_dim) + y.shape[1:])
+        v = v.reshape((self.n_glieder, self.n_dim) + y.shape[1:])
+        m = self.m.reshape((-1,) + (1,) * (y.ndim - 1))
+        e_kin = 0.5 * np.sum(m * np.sum(v ** 2, axis=1), axis=0)
+        e_pot = self.g * np.sum(m * r[:, 1], axis=0)
+        return e_kin + e_pot
@@ -0,0 +1,395 @@
+﻿"""Gleichzeitige Simulation vieler ebener Mehrfachpendel.
+
+Das Programm dreifachpendel-Anfangsbedingungen.py zeigt das
+chaotische Verhalten des Dreifachpendels, indem zwei fast gleiche
+Anfangsbedingungen nacheinander mit `solve_ivp` simuliert werden.
+Um das Verhalten für ein ganzes Raster von Anfangswinkeln
+darzustellen, werden hier viele Pendel gleichzeitig simuliert:
+
+    - Die Klasse `PendelSchar` wertet die Bewegungsgleichung mit
+      Zwangsbedingungen für K Pendel mit Array-Operationen aus.
+      Die Gleichungssysteme für die Lagrange-Multiplikatoren
+      werden mit einem einzigen Aufruf von `np.linalg.solve` für
+      alle Pendel gelöst.
+    - Die Funktion `simuliere` integriert die Schar mit dem
+      klassischen Runge-Kutta-Verfahren mit fester Schrittweite.
+      Für jedes Pendel wird der Zeitpunkt bestimmt, an dem sich
+      zum ersten Mal eine Pendelstange überschlägt. Optional wird
+      der Lyapunov-Exponent für endliche Zeiten berechnet.
+    - Die Funktion `berechne_karte` verteilt ein Raster von
+      Anfangswinkeln (phi1, phi2) zeilenweise auf mehrere Prozesse
+      und setzt die Ergebnisse zu einem Bild zusammen.
+
+Da `berechne_karte` weitere Prozesse startet, muss das aufrufende
+Programm den Aufruf mit `if __name__ == '__main__':` schützen.
+"""
+
+import concurrent.futures
+import numpy as np
+
+
+def _skalar(a, b):
+    """Skalarprodukt über die letzte Achse zweidimensionaler
+    Vektoren."""
+    return a[..., 0] * b[..., 0] + a[..., 1] * b[..., 1]
+
+
+class PendelSchar:
+    """Schar von ebenen Mehrfachpendeln.
+
+    Ein Pendel besteht aus n Massen, die durch masselose Stangen
+    miteinander und die erste Masse mit dem Aufhängepunkt im
+    Koordinatenursprung verbunden sind. Die Zwangsbedingungen
+    werden wie in dreifachpendel.py mit der Baumgarte-Methode
+    stabilisiert.
+
+    Der Zustand einer Schar von K Pendeln ist ein Array
+    (K × 2⋅n⋅2), dessen Zeilen jeweils die Orte und die
+    Geschwindigkeiten aller Massen enthalten.
+
+    Args:
+        m (np.ndarray):
+            Massen der Pendelkörper [kg] (n).
+        l (np.ndarray):
+            Längen der Pendelstangen [m] (n).
+        g (float):
+            Betrag der Erdbeschleunigung [m/s²].
+        alpha (float):
+            Parameter der Baumgarte-Stabilisierung [1/s].
+        beta (float):
+            Parameter der Baumgarte-Stabilisierung [1/s].
+    """
+
+    n_dim = 2
+    """int: Anzahl der Raumdimensionen."""
+
+    def __init__(self, m, l, g=9.81, alpha=10.0, beta=10.0):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Pendelkörper [kg] (n)."""
+        self.l = np.array(l, dtype=float)
+        """np.ndarray: Längen der Pendelstangen [m] (n)."""
+        self.g = g
+        """float: Betrag der Erdbeschleunigung [m/s²]."""
+        self.alpha = alpha
+        """float: Parameter der Baumgarte-Stabilisierung [1/s]."""
+        self.beta = beta
+        """float: Parameter der Baumgarte-Stabilisierung [1/s]."""
+
+    @property
+    def n_glieder(self):
+        """int: Anzahl der Pendelkörper."""
+        return self.m.size
+
+    def anfangszustand(self, phi, omega=None):
+        """Berechne die Zustandsvektoren aus den Winkeln.
+
+        Args:
+            phi (np.ndarray):
+                Auslenkungen der Stangen gegenüber der Senkrechten
+                [rad] (K × n).
+            omega (np.ndarray):
+                Winkelgeschwindigkeiten der Stangen [rad/s]
+                (K × n). Bei None ruhen alle Pendel.
+
+        Returns:
+            np.ndarray: Zustandsvektoren (K × 2⋅n⋅2).
+        """
+        phi = np.atleast_2d(phi)
+        if omega is None:
+            omega = np.zeros_like(phi)
+        richtung = np.stack([np.sin(phi), -np.cos(phi)], axis=2)
+        normale = np.stack([np.cos(phi), np.sin(phi)], axis=2)
+        l = self.l[:, np.newaxis]
+        r = np.cumsum(l * richtung, axis=1)
+        v = np.cumsum(l * omega[..., np.newaxis] * normale, axis=1)
+        return np.concatenate([r.reshape(len(phi), -1),
+                               v.reshape(len(phi), -1)], axis=1)
+
+    def _stangen(self, u):
+        """Gib die Stangenvektoren und deren Ableitungen zurück.
+
+        Stange a verbindet die Masse a-1 (bzw. den Aufhängepunkt)
+        mit der Masse a.
+        """
+        r, v = np.split(u, 2, axis=1)
+        r = r.reshape(len(u), self.n_glieder, self.n_dim)
+        v = v.reshape(len(u), self.n_glieder, self.n_dim)
+        d = np.diff(r, axis=1, prepend=0)
+        w = np.diff(v, axis=1, prepend=0)
+        return d, w
+
+    def winkel(self, u):
+        """Auslenkungen der Stangen gegenüber der Senkrechten [rad].
+
+        Args:
+            u (np.ndarray):
+                Zustandsvektoren (K × 2⋅n⋅2).
+
+        Returns:
+            np.ndarray: Winkel im Bereich -pi bis pi (K × n).
+        """
+        d, _ = self._stangen(u)
+        return np.arctan2(d[..., 0], -d[..., 1])
+
+    def energie(self, u):
+        """Gesamtenergie jedes Pendels [J] (K)."""
+        r, v = np.split(u, 2, axis=1)
+        r = r.reshape(len(u), self.n_glieder, self.n_dim)
+        v = v.reshape(len(u), self.n_glieder, self.n_dim)
+        e_kin = 0.5 * np.sum(self.m * _skalar(v, v), axis=1)
+        e_pot = self.g * np.sum(self.m * r[..., 1], axis=1)
+        return e_kin + e_pot
+
+    def dgl(self, t, u):
+        """Berechne die rechte Seite der Differentialgleichung.
+
+        Die Zwangsbedingung für die Stange a lautet
+        h_a = |d_a|² - l_a², wobei d_a der Stangenvektor ist. Ihr
+        Gradient ist nur bezüglich der Orte der beiden angrenzenden
+        Massen von null verschieden. Daher werden die Matrix A und
+        der Term v @ hesse @ v = 2 |w_a|² direkt aus den
+        Stangenvektoren berechnet.
+
+        Args:
+            t (float):
+                Aktueller Zeitpunkt [s].
+            u (np.ndarray):
+                Zustandsvektoren (K × 2⋅n⋅2).
+
+        Returns:
+            np.ndarray: Zeitableitung der Zustandsvektoren.
+        """
+        n = self.n_glieder
+        d, w = self._stangen(u)
+        d_quadrat = _skalar(d, d)
+        h = d_quadrat - self.l ** 2
+
+        # Matrix A = grad / m @ grad.T. Sie ist tridiagonal, da
+        # benachbarte Stangen eine gemeinsame Masse haben.
+        kehrwert_m = 1 / self.m
+        diagonal = 4 * d_quadrat * kehrwert_m
+        diagonal[:, 1:] += 4 * d_quadrat[:, 1:] * kehrwert_m[:-1]
+        neben = -4 * _skalar(d[:, :-1], d[:, 1:]) * kehrwert_m[:-1]
+        A = np.zeros((len(u), n, n))
+        index = np.arange(n)
+        A[:, index, index] = diagonal
+        A[:, index[:-1], index[1:]] = neben
+        A[:, index[1:], index[:-1]] = neben
+
+        # Rechte Seite. Die Gewichtskraft trägt nur bei der ersten
+        # Stange bei, da alle Massen die gleiche Beschleunigung
+        # erfahren.
+        B = (-2 * _skalar(w, w)
+             - 4 * self.alpha * _skalar(d, w)
+             - self.beta ** 2 * h)
+        B[:, 0] += 2 * self.g * d[:, 0, 1]
+
+        # Löse die Gleichungssysteme aller Pendel gleichzeitig.
+        lam = np.linalg.solve(A, B[..., np.newaxis])[..., 0]
+
+        # Die Stange a zieht mit 2 * lam_a * d_a an der Masse a und
+        # mit der entgegengesetzten Kraft an der Masse a-1.
+        kraft = 2 * lam[..., np.newaxis] * d
+        kraft[:, :-1] -= kraft[:, 1:]
+        a = kraft / self.m[:, np.newaxis]
+        a[..., 1] -= self.g
+
+        v = u[:, n * self.n_dim:]
+        return np.concatenate([v, a.reshape(len(u), -1)], axis=1)
+
+    def schritt(self, t, u, dt):
+        """Führe einen Schritt mit dem Runge-Kutta-Verfahren aus.
+
+        Args:
+            t (float):
+                Aktueller Zeitpunkt [s].
+            u (np.ndarray):
+                Zustandsvektoren (K × 2⋅n⋅2).
+            dt (float):
+                Zeitschrittweite [s].
+
+        Returns:
+            np.ndarray: Zustandsvektoren zum Zeitpunkt t + dt.
+        """
+        k1 = self.dgl(t, u)
+        k2 = self.dgl(t + dt / 2, u + dt / 2 * k1)
+        k3 = self.dgl(t + dt / 2, u + dt / 2 * k2)
+        k4 = self.dgl(t + dt, u + dt * k3)
+        return u + dt / 6 * (k1 + 2 * k2 + 2 * k3 + k4)
+
+
+def simuliere(pendel, u0, t_max, dt, lyapunov=False, d0=1e-8,
+              n_renorm=10):
+    """Simuliere eine Schar von Pendeln mit fester Schrittweite.
+
+    Als Ereignis wird für jedes Pendel der erste Überschlag
+    erfasst, also der Zeitpunkt, an dem der stetig fortgesetzte
+    Winkel einer Stange zum ersten Mal den Betrag pi erreicht. Der
+    Zeitpunkt wird zwischen zwei Zeitschritten linear
+    interpoliert. Wird kein Lyapunov-Exponent berechnet, so wird
+    jedes Pendel nach seinem Überschlag nicht weiter simuliert.
+
+    Für den Lyapunov-Exponenten wird zu jedem Pendel ein zweites
+    Pendel simuliert, dessen erste Stange um d0 ausgelenkt ist.
+    Der Abstand im Zustandsraum wird in Einheiten der Gesamtlänge
+    L und der Zeit sqrt(L / g) gemessen und alle n_renorm Schritte
+    wieder auf d0 zurückgesetzt.
+
+    Args:
+        pendel (PendelSchar):
+            Parameter der Pendel.
+        u0 (np.ndarray):
+            Anfangszustände (K × 2⋅n⋅2).
+        t_max (float):
+            Simulationszeit [s].
+        dt (float):
+            Zeitschrittweite [s].
+        lyapunov (bool):
+            Berechne den Lyapunov-Exponenten.
+        d0 (float):
+            Anfangsabstand der Vergleichspendel.
+        n_renorm (int):
+            Anzahl der Zeitschritte zwischen zwei Normierungen.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]:
+            - Zeitpunkt des ersten Überschlags [s] (K). Pendel, die
+              sich nicht überschlagen, erhalten den Wert NaN.
+            - Lyapunov-Exponent für die Zeit t_max [1/s] (K) oder
+              None.
+    """
+    u = np.array(u0, dtype=float)
+    n_pendel = len(u)
+    n_schritte = int(round(t_max / dt))
+    n_r = pendel.n_glieder * pendel.n_dim
+
+    # Fortgesetzte Winkel der Stangen.
+    phi = pendel.winkel(u)
+    t_ueberschlag = np.full(n_pendel, np.nan)
+
+    # Indizes der Pendel, die noch simuliert werden.
+    aktiv = np.arange(n_pendel)
+
+    if lyapunov:
+        # Zustand der Vergleichspendel. Die Winkel werden aus dem
+        # Anfangszustand bestimmt, damit die Zwangsbedingungen
+        # exakt erfüllt sind.
+        laenge = np.sum(pendel.l)
+        skala = np.concatenate([
+            np.full(n_r, 1 / laenge),
+            np.full(n_r, np.sqrt(laenge / pendel.g) / laenge)])
+        phi_vergleich = phi.copy()
+        phi_vergleich[:, 0] += d0
+        u_vergleich = pendel.anfangszustand(phi_vergleich)
+        u_vergleich[:, n_r:] = u[:, n_r:]
+        summe_log = np.zeros(n_pendel)
+
+    for i in range(n_schritte):
+        t = i * dt
+        if lyapunov:
+            u_neu, u_vergleich = np.split(pendel.schritt(
+                t, np.concatenate([u, u_vergleich]), dt), 2)
+        else:
+            u_neu = u.copy()
+            u_neu[aktiv] = pendel.schritt(t, u[aktiv], dt)
+
+        # Setze die Winkel stetig fort und prüfe, ob eine Stange
+        # den Betrag pi überschritten hat.
+        phi_alt = phi[aktiv]
+        dphi = pendel.winkel(u_neu[aktiv]) - phi_alt
+        dphi = (dphi + np.pi) % (2 * np.pi) - np.pi
+        phi_neu = phi_alt + dphi
+        phi[aktiv] = phi_neu
+        u = u_neu
+
+        ueber = (np.abs(phi_neu) >= np.pi) & (np.abs(phi_alt) < np.pi)
+        neu = np.any(ueber, axis=1) & np.isnan(t_ueberschlag[aktiv])
+        if np.any(neu):
+            betrag_alt = np.abs(phi_alt[neu])
+            betrag_neu = np.abs(phi_neu[neu])
+            anteil = np.full(betrag_alt.shape, np.inf)
+            np.divide(np.pi - betrag_alt, betrag_neu - betrag_alt,
+                      out=anteil, where=ueber[neu])
+            t_ueberschlag[aktiv[neu]] = t + dt * np.min(anteil, axis=1)
+            if not lyapunov:
+                aktiv = aktiv[~neu]
+                if aktiv.size == 0:
+                    break
+
+        if lyapunov and ((i + 1) % n_renorm == 0
+                         or i + 1 == n_schritte):
+            delta = u_vergleich - u
+            abstand = np.linalg.norm(delta * skala, axis=1) / d0
+            summe_log += np.log(abstand)
+            u_vergleich = u + delta / abstand[:, np.newaxis]
+
+    if lyapunov:
+        return t_ueberschlag, summe_log / (n_schritte * dt)
+    return t_ueberschlag, None
+
+
+def _berechne_zeilen(pendel, phi1, phi2, t_max, dt, lyapunov):
+    """Berechne einige Zeilen der Karte in einem Prozess."""
+    phi1, phi2 = np.meshgrid(phi1, phi2)
+    phi = np.zeros((phi1.size, pendel.n_glieder))
+    phi[:, 0] = phi1.reshape(-1)
+    phi[:, 1] = phi2.reshape(-1)
+    u0 = pendel.anfangszustand(phi)
+    t_ueberschlag, exponent = simuliere(pendel, u0, t_max, dt,
+                                        lyapunov=lyapunov)
+    ergebnis = exponent if lyapunov else t_ueberschlag
+    return ergebnis.reshape(phi1.shape)
+
+
+def berechne_karte(pendel, werte_phi1, werte_phi2, t_max, dt,
+                   lyapunov=False, pendel_pro_auftrag=2000,
+                   n_prozesse=None):
+    """Berechne eine Karte über einem Raster von Anfangswinkeln.
+
+    Die Pendel starten aus der Ruhe. Die erste und die zweite
+    Stange haben die Auslenkungen phi1 bzw. phi2. Alle weiteren
+    Stangen hängen senkrecht nach unten. Jeweils einige Zeilen des
+    Rasters werden als eine Schar in einem eigenen Prozess
+    simuliert. Die Scharen sollten nicht zu klein sein, da sonst
+    der Verwaltungsaufwand pro Zeitschritt überwiegt.
+
+    Args:
+        pendel (PendelSchar):
+            Parameter der Pendel.
+        werte_phi1 (np.ndarray):
+            Auslenkungen der ersten Stange [rad] (n_x).
+        werte_phi2 (np.ndarray):
+            Auslenkungen der zweiten Stange [rad] (n_y).
+        t_max (float):
+            Simulationszeit [s].
+        dt (float):
+            Zeitschrittweite [s].
+        lyapunov (bool):
+            Berechne den Lyapunov-Exponenten statt des Zeitpunkts
+            des ersten Überschlags.
+        pendel_pro_auftrag (int):
+            Ungefähre Anzahl der Pendel, die gemeinsam simuliert
+            werden. Es werden immer ganze Zeilen zusammengefasst.
+        n_prozesse (int):
+            Anzahl der Prozesse. Bei None wird für jeden
+            Prozessorkern ein Prozess gestartet.
+
+    Returns:
+        np.ndarray: Zeitpunkt des ersten Überschlags [s] bzw.
+        Lyapunov-Exponent [1/s] (n_y × n_x).
+    """
+    werte_phi1 = np.asarray(werte_phi1, dtype=float)
+    werte_phi2 = np.asarray(werte_phi2, dtype=float)
+    karte = np.empty((werte_phi2.size, werte_phi1.size))
+    n_zeilen = max(1, pendel_pro_auftrag // werte_phi1.size)
+    starts = range(0, werte_phi2.size, n_zeilen)
+
+    with concurrent.futures.ProcessPoolExecutor(n_prozesse) as pool:
+        futures = {
+            pool.submit(_berechne_zeilen, pendel, werte_phi1,
+                        werte_phi2[s:s + n_zeilen], t_max,
+                        dt, lyapunov): s for s in starts}
+        for future in concurrent.futures.as_completed(futures):
+            s = futures[future]
+            karte[s:s + n_zeilen] = future.result()
+    return karte
@@ -0,0 +1,518 @@
+﻿"""Massenpunkte mit Abstands-Zwangsbedingungen.
+
+In den Programmen zum Dreifachpendel oder zur Kette werden die
+Funktionen h, grad_h und hesse_h für jedes System von Hand
+programmiert. Dabei wird die Hesse-Matrix als dichtes Array der
+Größe n_zwangsbed × N⋅n_dim × N⋅n_dim angelegt, sodass bereits
+die Berechnung von v @ hesse @ v bei großen Systemen sehr
+aufwendig wird.
+
+Die Klasse `Zwangssystem` beschreibt ein System von Massenpunkten,
+für das nur noch die Zwangsbedingungen aufgezählt werden:
+
+    - Zwei Massenpunkte haben einen festen Abstand (Stange).
+    - Ein Massenpunkt hat einen festen Abstand von einem
+      raumfesten Punkt (Aufhängung).
+
+Jede dieser Zwangsbedingungen h_a = |d_a|² - l_a² hängt nur vom
+Verbindungsvektor d_a zweier Punkte ab. Der Gradient wird daher als
+dünn besetzte Matrix (`scipy.sparse`) aufgebaut, und der Term
+v @ hesse_a @ v = 2 |w_a|², in dem w_a die Relativgeschwindigkeit
+der beiden Punkte ist, kann für jede Zwangsbedingung mit
+konstantem Aufwand berechnet werden. Das Gleichungssystem für die
+Lagrange-Multiplikatoren ist ebenfalls dünn besetzt: Zwei
+Zwangsbedingungen sind nur dann gekoppelt, wenn sie einen
+gemeinsamen Massenpunkt haben. Die Einträge der Matrix werden daher
+nur für diese Paare berechnet. Für das Lösen des Gleichungssystems
+gibt es drei Verfahren:
+
+    - 'dicht': `np.linalg.solve` ist für kleine Systeme am
+      schnellsten.
+    - 'band': Bei einer Kette ist jede Stange nur mit ihren beiden
+      Nachbarn gekoppelt, sodass die Matrix tridiagonal ist. Auch
+      bei anderen Strukturen mit wenigen Verzweigungen lassen sich
+      die Zwangsbedingungen mit dem Cuthill-McKee-Algorithmus so
+      anordnen, dass nur wenige Nebendiagonalen besetzt sind. Das
+      Gleichungssystem wird dann mit einer Cholesky-Zerlegung für
+      Bandmatrizen (`scipy.linalg.solveh_banded`) mit einem
+      Aufwand proportional zur Anzahl der Zwangsbedingungen
+      gelöst.
+    - 'duenn': Für allgemeine Strukturen, z.B. stark verzweigte
+      Bäume, wird `scipy.sparse.linalg.spsolve` verwendet.
+
+Damit lassen sich auch Ketten aus 1000 Gliedern simulieren.
+
+Neben der Differentialgleichung für `solve_ivp` stellt die Klasse
+mit der Methode `rattle` ein symplektisches Verfahren mit fester
+Zeitschrittweite bereit, das ohne Baumgarte-Stabilisierung
+auskommt.
+"""
+
+import numpy as np
+import scipy.linalg
+import scipy.sparse
+import scipy.sparse.csgraph
+import scipy.sparse.linalg
+
+
+def _skalar(a, b):
+    """Zeilenweises Skalarprodukt zweier Arrays (n × n_dim)."""
+    return np.einsum('ij,ij->i', a, b)
+
+
+class Zwangssystem:
+    """System von Massenpunkten mit Abstands-Zwangsbedingungen.
+
+    Der Zustandsvektor u enthält wie in den übrigen Programmen
+    dieses Kapitels zuerst alle Ortskoordinaten und dann alle
+    Geschwindigkeitskomponenten der N Massenpunkte, jeweils
+    punktweise hintereinander. Die Zwangsbedingungen werden mit der
+    Baumgarte-Methode stabilisiert.
+
+    Eine Zwangsbedingung kann einseitig sein, wie bei einem Faden:
+    Die Zwangskraft darf dann nur die beiden Punkte zueinander
+    ziehen und verschwindet, wenn der Abstand um mehr als
+    `toleranz` kleiner als die Länge ist. Wirken mehrere einseitige
+    Zwangsbedingungen gleichzeitig, so ist dies nur eine Näherung,
+    da die Lagrange-Multiplikatoren einzeln begrenzt werden.
+
+    Args:
+        m (np.ndarray):
+            Massen der Punkte [kg] (N).
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+        kraft (callable):
+            Funktion kraft(t, r, v), die die äußere Kraft [N] auf
+            jeden Punkt als Array (N × n_dim) zurückgibt. Die Orte
+            r und Geschwindigkeiten v werden ebenfalls als Arrays
+            (N × n_dim) übergeben. Bei None wirkt keine äußere
+            Kraft.
+        alpha (float):
+            Parameter der Baumgarte-Stabilisierung [1/s].
+        beta (float):
+            Parameter der Baumgarte-Stabilisierung [1/s].
+        toleranz (float):
+            Toleranz zur Erkennung eines durchhängenden Fadens [m].
+        loeser (str):
+            Verfahren zum Lösen des Gleichungssystems für die
+            Lagrange-Multiplikatoren: 'dicht', 'band' oder 'duenn'.
+            Bei None wird das Verfahren anhand der Anzahl der
+            Zwangsbedingungen und der Bandbreite gewählt.
+    """
+
+    max_dicht = 50
+    """int: Bis zu dieser Anzahl von Zwangsbedingungen wird das
+    Gleichungssystem für die Lagrange-Multiplikatoren mit
+    `np.linalg.solve` gelöst, da der Aufwand für den Aufbau dünn
+    besetzter Matrizen bei kleinen Systemen überwiegt."""
+
+    max_bandbreite = 8
+    """int: Bis zu dieser Anzahl von Nebendiagonalen wird das
+    Gleichungssystem für die Lagrange-Multiplikatoren als
+    Bandmatrix gelöst."""
+
+    def __init__(self, m, n_dim=2, kraft=None, alpha=10.0, beta=10.0,
+                 toleranz=1e-3, loeser=None):
+        self.m = np.array(m, dtype=float)
+        """np.ndarray: Massen der Punkte [kg] (N)."""
+        self.n_dim = n_dim
+        """int: Anzahl der Raumdimensionen."""
+        self.kraft = kraft
+        """callable: Äußere Kraft kraft(t, r, v) [N]."""
+        self.alpha = alpha
+        """float: Parameter der Baumgarte-Stabilisierung [1/s]."""
+        self.beta = beta
+        """float: Parameter der Baumgarte-Stabilisierung [1/s]."""
+        self.toleranz = toleranz
+        """float: Toleranz für einseitige Zwangsbedingungen [m]."""
+        self.loeser = loeser
+        """str: Verfahren zum Lösen des Gleichungssystems."""
+
+        # Für jede Zwangsbedingung die Indizes der beiden Punkte,
+        # die Länge und die Angabe, ob sie einseitig ist. Raumfeste
+        # Punkte erhalten die Indizes N, N+1, ...
+        self._index_a = []
+        self._index_b = []
+        self._laengen = []
+        self._einseitig = []
+        self._fixpunkte = []
+        self._aktuell = False
+
+    @property
+    def n_punkte(self):
+        """int: Anzahl der Massenpunkte."""
+        return self.m.size
+
+    @property
+    def n_zwangsbed(self):
+        """int: Anzahl der Zwangsbedingungen."""
+        return len(self._laengen)
+
+    def abstand(self, i, j, laenge, einseitig=False):
+        """Lege den Abstand zweier Punkte fest.
+
+        Args:
+            i (int):
+                Index des ersten Punktes.
+            j (int):
+                Index des zweiten Punktes.
+            laenge (float):
+                Abstand der Punkte [m].
+            einseitig (bool):
+                Der Abstand darf auch kleiner werden (Faden).
+        """
+        self._index_a.append(i)
+        self._index_b.append(j)
+        self._laengen.append(laenge)
+        self._einseitig.append(einseitig)
+        self._aktuell = False
+
+    def fixpunkt(self, i, punkt, laenge, einseitig=False):
+        """Lege den Abstand eines Punktes von einem festen Ort fest.
+
+        Args:
+            i (int):
+                Index des Punktes.
+            punkt (np.ndarray):
+                Ortsvektor des raumfesten Punktes [m] (n_dim).
+            laenge (float):
+                Abstand vom raumfesten Punkt [m].
+            einseitig (bool):
+                Der Abstand darf auch kleiner werden (Faden).
+        """
+        self._fixpunkte.append(np.array(punkt, dtype=float))
+        self.abstand(i, -len(self._fixpunkte), laenge, einseitig)
+
+    def _aktualisiere(self):
+        """Erzeuge die Index-Arrays aller Zwangsbedingungen."""
+        if self._aktuell:
+            return
+        n = self.n_punkte
+        n_z = self.n_zwangsbed
+        index_a = np.array(self._index_a, dtype=int)
+        index_b = np.array(self._index_b, dtype=int)
+        self._l = np.array(self._laengen, dtype=float)
+        self._ist_einseitig = np.array(self._einseitig, dtype=bool)
+        self._hat_einseitig = np.any(self._ist_einseitig)
+
+        # Negative Indizes bezeichnen die raumfesten Punkte. Für
+        # diese Zwangsbedingungen wird der feste Ort in einem
+        # konstanten Array abgelegt.
+        fest = index_b < 0
+        self._r_fest = np.zeros((n_z, self.n_dim))
+        if np.any(fest):
+            punkte = np.array(self._fixpunkte)
+            self._r_fest[fest] = punkte[-1 - index_b[fest]]
+
+        # Inzidenzmatrix C (N × n_zwangsbed): Der erste Punkt jeder
+        # Zwangsbedingung erhält eine +1, der zweite eine -1. Damit
+        # sind die Verbindungsvektoren d = C.T @ r - r_fest und die
+        # Zwangskräfte C @ (2 * lam * d).
+        zeilen = np.concatenate([index_a, index_b[~fest]])
+        spalten = np.concatenate([np.arange(n_z),
+                                  np.arange(n_z)[~fest]])
+        werte = np.concatenate([np.ones(n_z), -np.ones(np.sum(~fest))])
+        C = scipy.sparse.csr_array((werte, (zeilen, spalten)),
+                                   shape=(n, n_z))
+
+        # Der Eintrag A_ab = grad_a / m @ grad_b ist gleich
+        # 4 * K_ab * (d_a @ d_b) mit der konstanten Matrix
+        # K = C.T @ M⁻¹ @ C. K ist nur für Zwangsbedingungen mit
+        # einem gemeinsamen Punkt von null verschieden.
+        K = (C.T @ scipy.sparse.diags_array(1 / self.m) @ C).tocoo()
+
+        # Ordne die Zwangsbedingungen so an, dass die von null
+        # verschiedenen Einträge möglichst nahe an der Diagonalen
+        # liegen, und bestimme die Anzahl der Nebendiagonalen.
+        self._perm = scipy.sparse.csgraph.reverse_cuthill_mckee(
+            K.tocsr(), symmetric_mode=True)
+        self._inv_perm = np.argsort(self._perm)
+        zeilen_p = self._inv_perm[K.row]
+        spalten_p = self._inv_perm[K.col]
+        bandbreite = np.max(zeilen_p - spalten_p, initial=0)
+
+        self._verfahren = self.loeser
+        if self._verfahren is None:
+            if n_z <= self.max_dicht:
+                self._verfahren = 'dicht'
+            elif bandbreite <= self.max_bandbreite:
+                self._verfahren = 'band'
+            else:
+                self._verfahren = 'duenn'
+
+        if self._verfahren == 'dicht':
+            self._C = C.toarray()
+            self._K = 4 * K.toarray()
+        elif self._verfahren == 'band':
+            # Für die Cholesky-Zerlegung wird nur das untere
+            # Dreieck in der Form ab[i - j, j] = A[i, j] benötigt.
+            unten = zeilen_p >= spalten_p
+            self._C = C
+            self._K_werte = 4 * K.data[unten]
+            self._K_zeilen = K.row[unten]
+            self._K_spalten = K.col[unten]
+            self._band_index = (zeilen_p[unten] - spalten_p[unten],
+                                spalten_p[unten])
+            self._band_form = (bandbreite + 1, n_z)
+        elif self._verfahren == 'duenn':
+            self._C = C
+            self._K_werte = 4 * K.data
+            self._K_zeilen = K.row
+            self._K_spalten = K.col
+        else:
+            raise ValueError(f'Unbekanntes Verfahren: {self.loeser}')
+
+        # Zeilen- und Spaltenindizes der von null verschiedenen
+        # Einträge des Gradienten.
+        k = np.arange(self.n_dim)
+        self._grad_zeilen = np.repeat(spalten, self.n_dim)
+        self._grad_spalten = (self.n_dim * zeilen[:, np.newaxis]
+                              + k).reshape(-1)
+        self._grad_vorzeichen = np.repeat(werte, self.n_dim)
+        self._aktuell = True
+
+    def _differenzen(self, r):
+        """Berechne die Verbindungsvektoren (n_zwangsbed × n_dim)."""
+        self._aktualisiere()
+        r = r.reshape(self.n_punkte, self.n_dim)
+        return self._C.T @ r - self._r_fest
+
+    def h(self, r):
+        """Zwangsbedingungen.
+
+        Args:
+            r (np.ndarray):
+                Ortskoordinaten (N⋅n_dim).
+
+        Returns:
+            np.ndarray: Werte der Zwangsbedingungen (n_zwangsbed).
+        """
+        d = self._differenzen(r)
+        return np.sum(d ** 2, axis=1) - self._l ** 2
+
+    def grad_h(self, r):
+        """Gradient der Zwangsbed.: g[a, i] =  dh_a / dx_i.
+
+        Args:
+            r (np.ndarray):
+                Ortskoordinaten (N⋅n_dim).
+
+        Returns:
+            scipy.sparse.csr_array: Dünn besetzte Matrix
+            (n_zwangsbed × N⋅n_dim).
+        """
+        d = self._differenzen(r)
+        werte = 2 * self._grad_vorzeichen * d[
+            self._grad_zeilen, np.tile(np.arange(self.n_dim),
+                                       len(self._grad_zeilen)
+                                       // self.n_dim)]
+        return scipy.sparse.csr_array(
+            (werte, (self._grad_zeilen, self._grad_spalten)),
+            shape=(self.n_zwangsbed, self.n_punkte * self.n_dim))
+
+    def _loese(self, d, B, diagonale=None):
+        """Löse das Gleichungssystem A @ lam = B.
+
+        Zu der Diagonalen von A wird ggf. das Array `diagonale`
+        addiert.
+        """
+        if self._verfahren == 'dicht':
+            A = self._K * (d @ d.T)
+            if diagonale is not None:
+                A += np.diag(diagonale)
+            return np.linalg.solve(A, B)
+
+        werte = self._K_werte * _skalar(d[self._K_zeilen],
+                                        d[self._K_spalten])
+        if self._verfahren == 'band':
+            A = np.zeros(self._band_form)
+            A[self._band_index] = werte
+            if diagonale is not None:
+                A[0] += diagonale[self._perm]
+            lam = scipy.linalg.solveh_banded(A, B[self._perm],
+                                             lower=True,
+                                             check_finite=False)
+            return lam[self._inv_perm]
+
+        A = scipy.sparse.csc_array(
+            (werte, (self._K_zeilen, self._K_spalten)),
+            shape=(self.n_zwangsbed, self.n_zwangsbed))
+        if diagonale is not None:
+            A = A + scipy.sparse.diags_array(diagonale, format='csc')
+        return scipy.sparse.linalg.spsolve(A, B)
+
+    def _kraft_durch_m(self, t, r, v):
+        """Äußere Kraft geteilt durch die Masse (N × n_dim)."""
+        if self.kraft is None:
+            return np.zeros_like(v)
+        return self.kraft(t, r, v) / self.m[:, np.newaxis]
+
+    def dgl(self, t, u):
+        """Berechne die rechte Seite der Differentialgleichung.
+
+        Args:
+            t (float):
+                Aktueller Zeitpunkt [s].
+            u (np.ndarray):
+                Zustandsvektor (2⋅N⋅n_dim).
+
+        Returns:
+            np.ndarray: Zeitableitung des Zustandsvektors.
+        """
+        n_r = u.size // 2
+        r = u[:n_r].reshape(-1, self.n_dim)
+        v = u[n_r:].reshape(-1, self.n_dim)
+        d = self._differenzen(r)
+        w = self._C.T @ v
+        m = self.m[:, np.newaxis]
+        F_durch_m = self._kraft_durch_m(t, r, v)
+
+        # Berechne die lambdas. Der Term v @ hesse_a @ v ist
+        # 2 * |w_a|² und grad_a @ x = 2 * d_a @ (C.T @ x)_a.
+        d_quadrat = _skalar(d, d)
+        B = (-2 * _skalar(w, w)
+             - 2 * _skalar(d, self._C.T @ F_durch_m)
+             - 4 * self.alpha * _skalar(d, w)
+             - self.beta ** 2 * (d_quadrat - self._l ** 2))
+
+        if self._hat_einseitig:
+            # Einseitige Zwangsbedingungen sind nicht aktiv, wenn
+            # der Faden durchhängt. Ihre Gradienten werden auf null
+            # gesetzt. Damit das Gleichungssystem lösbar bleibt,
+            # erhalten sie eine Eins auf der Diagonalen und die
+            # rechte Seite null.
+            inaktiv = self._ist_einseitig & (
+                d_quadrat < (self._l - self.toleranz) ** 2)
+            d_aktiv = np.where(inaktiv[:, np.newaxis], 0, d)
+            B[inaktiv] = 0
+            lam = np.atleast_1d(self._loese(d_aktiv, B,
+                                            inaktiv.astype(float)))
+
+            # Die Zwangskraft eines Fadens darf nur nach innen
+            # wirken.
+            lam[self._ist_einseitig] = np.minimum(
+                lam[self._ist_einseitig], 0)
+        else:
+            lam = np.atleast_1d(self._loese(d, B))
+
+        # Berechne die Beschleunigung mithilfe der newtonschen
+        # Bewegungsgleichung inkl. Zwangskräften.
+        a = F_durch_m + self._C @ (2 * lam[:, np.newaxis] * d) / m
+
+        return np.concatenate([u[n_r:], a.reshape(-1)])
+
+    def rattle(self, u0, t_max, dt, n_ausgabe=1, toleranz=1e-10,
+               max_iter=100):
+        """Löse die Bewegungsgleichung mit dem RATTLE-Verfahren.
+
+        Das Verfahren erweitert das Leapfrog-Verfahren auf Systeme
+        mit Zwangsbedingungen: In jedem Zeitschritt werden zunächst
+        die neuen Orte so korrigiert, dass die Zwangsbedingungen
+        bis auf die Toleranz erfüllt sind (SHAKE), und anschließend
+        die Geschwindigkeiten so, dass grad_h(r) @ v = 0 gilt. Die
+        Korrekturen erfolgen jeweils entlang der Gradienten der
+        Zwangsbedingungen, sodass sie genau den Zwangskräften
+        entsprechen. Eine Baumgarte-Stabilisierung ist nicht
+        erforderlich. Bei konservativen Kräften ist das Verfahren
+        symplektisch, und die Energie zeigt auch über lange Zeiten
+        keine systematische Drift.
+
+        Bei geschwindigkeitsabhängigen Kräften wird im zweiten
+        Halbschritt die Geschwindigkeit nach dem ersten Halbschritt
+        verwendet. Einseitige Zwangsbedingungen werden nicht
+        unterstützt.
+
+        Args:
+            u0 (np.ndarray):
+                Zustandsvektor zum Zeitpunkt t=0 (2⋅N⋅n_dim). Die
+                Orte sollten die Zwangsbedingungen erfüllen.
+            t_max (float):
+                Simulationszeit [s].
+            dt (float):
+                Zeitschrittweite [s].
+            n_ausgabe (int):
+                Nur jeder n_ausgabe-te Zeitschritt wird gespeichert.
+            toleranz (float):
+                Zulässige relative Abweichung |h_a| / l_a² der
+                Zwangsbedingungen.
+            max_iter (int):
+                Maximale Anzahl der Iterationen pro Zeitschritt.
+
+        Returns:
+            tuple[np.ndarray, np.ndarray]:
+                - Zeitpunkte [s] (n_t).
+                - Zustandsvektoren (2⋅N⋅n_dim × n_t) in der gleichen
+                  Anordnung wie `result.y` bei `solve_ivp`.
+
+        Raises:
+            ValueError:
+                Wenn einseitige Zwangsbedingungen vorhanden sind.
+            RuntimeError:
+                Wenn die Iteration für die Orte nicht konvergiert.
+        """
+        self._aktualisiere()
+        if self._hat_einseitig:
+            raise ValueError('Einseitige Zwangsbedingungen werden '
+                             'vom RATTLE-Verfahren nicht unterstützt.')
+
+        # Lege die Arrays für das Ergebnis an.
+        n_schritte = int(round(t_max / dt))
+        n_t = n_schritte // n_ausgabe + 1
+        t = dt * n_ausgabe * np.arange(n_t)
+        y = np.empty((u0.size, n_t))
+        y[:, 0] = u0
+
+        n_r = u0.size // 2
+        r = u0[:n_r].reshape(-1, self.n_dim).copy()
+        v = u0[n_r:].reshape(-1, self.n_dim).copy()
+        m = self.m[:, np.newaxis]
+        l_quadrat = self._l ** 2
+        d = self._differenzen(r)
+        a = self._kraft_durch_m(0, r, v)
+
+        for schritt in range(1, n_schritte + 1):
+            # Halber Zeitschritt für die Geschwindigkeit und ganzer
+            # Zeitschritt für den Ort ohne Zwangskräfte.
+            v_halb = v + dt / 2 * a
+            r_neu = r + dt * v_halb
+
+            # Verschiebe die Punkte um dr = C @ (lam * d) / m
+            # entlang der Gradienten zum alten Zeitpunkt. Dadurch
+            # ändern sich die Verbindungsvektoren um K @ (lam * d).
+            # Linearisiert man h, so ergibt sich das
+            # Gleichungssystem 2 * K_ab * (d_neu_a @ d_b) * lam_b =
+            # -h_a, wobei d_neu näherungsweise durch d ersetzt
+            # wird, damit die Matrix symmetrisch ist.
+            for _ in range(max_iter):
+                d_neu = self._differenzen(r_neu)
+                fehler = _skalar(d_neu, d_neu) - l_quadrat
+                if np.max(np.abs(fehler) / l_quadrat) < toleranz:
+                    break
+                lam = np.atleast_1d(self._loese(d, -2 * fehler))
+                dr = self._C @ (lam[:, np.newaxis] * d) / m
+                r_neu += dr
+                v_halb += dr / dt
+            else:
+                raise RuntimeError('Die Iteration für die Orte ist '
+                                   f'im Zeitschritt {schritt} nicht '
+                                   'konvergiert.')
+            r = r_neu
+            d = d_neu
+
+            # Zweiter halber Zeitschritt für die Geschwindigkeit.
+            a = self._kraft_durch_m(schritt * dt, r, v_halb)
+            v = v_halb + dt / 2 * a
+
+            # Korrigiere die Geschwindigkeiten entlang der
+            # Gradienten, sodass die Relativgeschwindigkeiten
+            # w_a senkrecht auf den Verbindungsvektoren stehen.
+            w = self._C.T @ v
+            mu = np.atleast_1d(self._loese(d, -4 * _skalar(w, d)))
+            v += self._C @ (mu[:, np.newaxis] * d) / m
+
+            if schritt % n_ausgabe == 0:
+                i = schritt // n_ausgabe
+                y[:n_r, i] = r.reshape(-1)
+                y[n_r:, i] = v.reshape(-1)
+
+        return t, y
@@ -5,6 +5,8 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
 from stossprozess import Mehrteilchenstoss
+from trajektorie import Trajektorienspeicher, lade_trajektorie
+from teilchendarstellung import TeilchenDarstellung
 
 # Anzahl der Teilchen.
 n_teilchen = 150
@@ -44,15 +46,19 @@ stoss.radien[0] = 0.3
 stoss.massen[0] = 1.0
 
 # Führe die Simulation durch, indem die Methode `zeitschritt`
-# mehrfach aufgerufen wird.
+# mehrfach aufgerufen wird. Die Positionen werden direkt in eine
+# Datei geschrieben. Für die Animation reicht einfache Genauigkeit.
 t = np.arange(0, t_max, dt)
-r = []
-for i in range(t.size):
-    stoss.zeitschritt(dt)
-    r.append(stoss.r.copy())
-    # Gib eine Information zum Fortschritt der Simulation aus.
-    print(f'Zeitschritt {i + 1} von {t.size}')
-r = np.array(r)
+with Trajektorienspeicher('brownsche_bewegung.npy', t.size,
+                          stoss.r.shape, dtype=np.float32) as speicher:
+    for i in range(t.size):
+        stoss.zeitschritt(dt)
+        speicher.speichere(stoss.r)
+        # Gib eine Information zum Fortschritt der Simulation aus.
+        print(f'Zeitschritt {i + 1} von {t.size}')
+
+# Öffne die gespeicherte Trajektorie für die Animation.
+r = lade_trajektorie('brownsche_bewegung.npy')
 
 # Erzeuge eine Figure und eine Axes mit entsprechenden
 # Beschriftungen für die Animation der Bewegung der Teilchen.
@@ -68,31 +74,20 @@ ax.grid()
 # Erzeuge einen Plot für die Bahnkurve des Teilchens.
 plot_bahn, = ax.plot([], [], color='red')
 
-# Erstelle die Farbtabelle und erzeuge ein Objekt, das jeder
-# Masse eine Farbe zuordnet.
-mapper = mpl.cm.ScalarMappable(cmap=mpl.cm.jet)
-mapper.set_array(stoss.massen)
-mapper.autoscale()
-
-# Erzeuge für jedes Teilchen einen Kreis mit passendem Radius.
-kreise = []
-for radius, masse in zip(stoss.radien, stoss.massen):
-    kreis = mpl.patches.Circle([0, 0], radius, visible=False,
-                               color=mapper.to_rgba(masse))
-    ax.add_patch(kreis)
-    kreise.append(kreis)
+# Stelle die Teilchen mit passendem Radius dar. Die Farbe
+# richtet sich nach der Masse.
+teilchen = TeilchenDarstellung(ax, stoss.radien,
+                               farbwerte=stoss.massen, cmap='jet')
 
 
 def update(n):
     """Aktualisiere die Grafik zum n-ten Zeitschritt."""
     # Aktualisiere die Positionen der Teilchen.
-    for kreis, ort in zip(kreise, r[n]):
-        kreis.set_center(ort)
-        kreis.set_visible(True)
+    kreise = teilchen.update(r[n])
 
     # Aktualisiere die Trajektorie des Pollenkörpers (Index 0).
     plot_bahn.set_data(r[:n + 1, 0, 0], r[:n + 1, 0, 1])
-    return kreise + [plot_bahn]
+    return kreise, plot_bahn
 
 
 # Erstelle die Animation und starte sie.
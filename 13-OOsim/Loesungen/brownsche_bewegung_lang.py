@@ -0,0 +1,106 @@
+﻿"""Lange Simulation der brownschen Bewegung mit Sicherungen.
+
+Der Zustand der Simulation wird regelmäßig in einer Datei
+gesichert. Wird das Programm abgebrochen und neu gestartet, so
+setzt es die Simulation an der zuletzt gesicherten Stelle fort.
+Das Ergebnis ist dabei bitgenau dasselbe wie bei einem
+ununterbrochenen Programmlauf.
+"""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from stossprozess import Mehrteilchenstoss
+from sicherung import AutomatischeSicherung
+from trajektorie import Trajektorienspeicher, lade_trajektorie
+
+# Anzahl der Teilchen.
+n_teilchen = 150
+
+# Simulationszeit und Zeitschrittweite [s].
+t_max = 5000
+dt = 0.025
+
+# Zeitabstand zwischen zwei Sicherungen (Rechenzeit) [s].
+intervall_sicherung = 300
+
+# Dateinamen für die Sicherung und die Bahn des Pollenkörpers.
+datei_sicherung = 'brownsche_bewegung_lang.npz'
+datei_bahn = 'brownsche_bewegung_lang.npy'
+
+# Für jede Wand wird der Abstand vom Koordinatenursprung
+# wand_d und ein nach außen zeigender Normalenvektor angegeben.
+wandabstaende = np.array([2.0, 2.0, 2.0, 2.0])
+wandnormalen = np.array([[0, -1.0], [0, 1.0], [-1.0, 0], [1.0, 0]])
+
+# Anzahl der Raumdimensionen.
+n_dim = wandnormalen.shape[1]
+
+# Erzeuge einen Zufallszahlengenerator.
+rng = np.random.default_rng(42)
+
+# Erzeuge eine Sicherung, die noch kein Simulationsobjekt kennt.
+sicherung = AutomatischeSicherung(None, datei_sicherung,
+                                  intervall=intervall_sicherung,
+                                  rng=rng)
+
+if sicherung.vorhanden:
+    # Setze die Simulation mit dem gesicherten Zustand fort.
+    stoss = Mehrteilchenstoss.lade_zustand(datei_sicherung, rng)
+else:
+    # Positioniere die Massen zufällig auf einem Kreisring mit
+    # Innenradius 0,5 m und Außenradius 1,9 m.
+    r = np.empty((n_teilchen, n_dim))
+    rho = 0.5 + 1.4 * rng.random(n_teilchen)
+    phi = 2 * np.pi * rng.random(n_teilchen)
+    r[:, 0] = rho * np.cos(phi)
+    r[:, 1] = rho * np.sin(phi)
+
+    # Wähle zufällige Geschwindigkeiten mit Komponenten zwischen
+    # -1 und +1 [m/s].
+    v = 2 * (-0.5 + rng.random((n_teilchen, n_dim)))
+
+    # Erzeuge ein Objekt der Klasse `Mehrteilchenstoß`.
+    stoss = Mehrteilchenstoss(r, v, massen=0.1, radien=0.02,
+                              waende=(wandabstaende, wandnormalen))
+
+    # Das Teilchen mit dem Index 0 stellt den Pollenkörper dar.
+    stoss.r[0] = (0, 0)
+    stoss.v[0] = (0, 0)
+    stoss.radien[0] = 0.3
+    stoss.massen[0] = 1.0
+sicherung.simulation = stoss
+
+# Bestimme den Zeitschritt, an dem die Simulation beginnt.
+t = np.arange(0, t_max, dt)
+i_start = int(round(stoss.t / dt))
+
+# Führe die Simulation durch und speichere die Bahn des
+# Pollenkörpers. Vor jeder Sicherung werden die bisherigen
+# Bahndaten auf die Festplatte geschrieben, damit die Bahn und
+# der gesicherte Zustand zueinander passen.
+with Trajektorienspeicher(datei_bahn, t.size, (n_dim,),
+                          start=i_start) as speicher:
+    for i in range(i_start, t.size):
+        stoss.zeitschritt(dt)
+        speicher.speichere(stoss.r[0])
+        if sicherung.faellig:
+            speicher.schliesse()
+            sicherung.sichere()
+            print(f'Zeitschritt {i + 1} von {t.size} gesichert')
+
+# Sichere den Endzustand, damit ein erneuter Programmstart nicht
+# noch einmal rechnet.
+sicherung.sichere()
+
+# Stelle die Bahn des Pollenkörpers dar.
+bahn = lade_trajektorie(datei_bahn)
+fig = plt.figure()
+ax = fig.add_subplot(1, 1, 1)
+ax.set_aspect('equal')
+ax.set_xlabel('$x$ [m]')
+ax.set_ylabel('$y$ [m]')
+ax.set_xlim(-2.1, 2.1)
+ax.set_ylim(-2.1, 2.1)
+ax.grid()
+ax.plot(bahn[:, 0], bahn[:, 1], color='red')
+plt.show()
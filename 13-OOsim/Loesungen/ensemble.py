@@ -0,0 +1,142 @@
+﻿"""Parallele Simulation unabhängiger Realisierungen eines Gases.
+
+Statistische Größen wie die Geschwindigkeitsverteilung hängen von
+den zufällig gewählten Anfangsbedingungen ab. Um Mittelwerte und
+Fehlerbalken zu bestimmen, werden viele voneinander unabhängige
+Realisierungen (Replikate) eines `Mehrteilchenstoss` simuliert.
+Jedes Replikat erhält einen eigenen Zufallszahlengenerator, der
+über `np.random.SeedSequence.spawn` erzeugt wird, sodass die
+Ergebnisse reproduzierbar und statistisch unabhängig sind. Die
+Replikate werden auf einen Pool von Prozessen verteilt und geben
+nur die ausgewerteten Beobachtungsgrößen zurück.
+
+Da die Funktionen an andere Prozesse übergeben werden, müssen
+`erzeuge_system` und `beobachtungsgroesse` auf Modulebene
+definiert sein, und das aufrufende Programm muss den Start der
+Simulation mit `if __name__ == '__main__':` schützen.
+"""
+
+import concurrent.futures
+import numpy as np
+
+
+class GeschwindigkeitsHistogramm:
+    """Histogramm der Geschwindigkeitsbeträge aller Teilchen.
+
+    Args:
+        v_max (float):
+            Obere Grenze des Histogramms [m/s].
+        n_bins (int):
+            Anzahl der Balken.
+    """
+
+    def __init__(self, v_max, n_bins):
+        self.v_max = v_max
+        """float: Obere Grenze des Histogramms [m/s]."""
+        self.n_bins = n_bins
+        """int: Anzahl der Balken."""
+
+    @property
+    def kanten(self):
+        """np.ndarray: Kanten der Balken [m/s] (n_bins + 1)."""
+        return np.linspace(0, self.v_max, self.n_bins + 1)
+
+    def __call__(self, stoss):
+        betrag_v = np.linalg.norm(stoss.v, axis=1)
+        werte, _ = np.histogram(betrag_v, bins=self.n_bins,
+                                range=[0, self.v_max])
+        return werte
+
+
+def simuliere_replikat(erzeuge_system, beobachtungsgroesse,
+                       t_max, dt, t_einschwing, seed):
+    """Simuliere ein einzelnes Replikat und werte es aus.
+
+    Args:
+        erzeuge_system (callable):
+            Funktion, die aus einem `np.random.Generator` einen
+            `Mehrteilchenstoss` erzeugt.
+        beobachtungsgroesse (callable):
+            Funktion, die aus einem `Mehrteilchenstoss` ein Array
+            von Beobachtungsgrößen berechnet.
+        t_max (float):
+            Simulationszeit [s].
+        dt (float):
+            Zeitabstand, in dem ausgewertet wird [s].
+        t_einschwing (float):
+            Zeit [s], nach der die Auswertung beginnt.
+        seed (np.random.SeedSequence):
+            Startwert für den Zufallszahlengenerator.
+
+    Returns:
+        np.ndarray: Zeitlicher Mittelwert der Beobachtungsgrößen.
+    """
+    rng = np.random.default_rng(seed)
+    stoss = erzeuge_system(rng)
+
+    # Lasse das System zunächst einschwingen.
+    if t_einschwing > 0:
+        stoss.zeitschritt(t_einschwing)
+
+    # Summiere die Beobachtungsgrößen über alle Zeitschritte.
+    n_schritte = max(1, int(round((t_max - t_einschwing) / dt)))
+    summe = np.array(beobachtungsgroesse(stoss), dtype=float)
+    for _ in range(n_schritte - 1):
+        stoss.zeitschritt(dt)
+        summe += beobachtungsgroesse(stoss)
+    return summe / n_schritte
+
+
+def simuliere_ensemble(erzeuge_system, beobachtungsgroesse,
+                       n_replikate, t_max, dt, t_einschwing=0,
+                       seed=None, n_prozesse=None):
+    """Simuliere viele unabhängige Replikate parallel.
+
+    Args:
+        erzeuge_system (callable):
+            Funktion, die aus einem `np.random.Generator` einen
+            `Mehrteilchenstoss` erzeugt.
+        beobachtungsgroesse (callable):
+            Funktion, die aus einem `Mehrteilchenstoss` ein Array
+            von Beobachtungsgrößen berechnet.
+        n_replikate (int):
+            Anzahl der Replikate.
+        t_max (float):
+            Simulationszeit jedes Replikats [s].
+        dt (float):
+            Zeitabstand, in dem ausgewertet wird [s].
+        t_einschwing (float):
+            Zeit [s], nach der die Auswertung beginnt.
+        seed (int):
+            Startwert für die Erzeugung der Zufallszahlen. Bei
+            None wird ein zufälliger Startwert verwendet.
+        n_prozesse (int):
+            Anzahl der Prozesse. Bei None wird für jeden
+            Prozessorkern ein Prozess gestartet.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, np.ndarray]:
+            - Mittelwert der Beobachtungsgrößen über alle
+              Replikate.
+            - Standardfehler des Mittelwerts.
+            - Ergebnisse der einzelnen Replikate
+              (n_replikate × ...).
+    """
+    # Erzeuge für jedes Replikat einen unabhängigen Startwert.
+    seeds = np.random.SeedSequence(seed).spawn(n_replikate)
+
+    # Verteile die Replikate auf die Prozesse. Die Reihenfolge der
+    # Ergebnisse entspricht der Reihenfolge der Startwerte.
+    with concurrent.futures.ProcessPoolExecutor(n_prozesse) as pool:
+        futures = [pool.submit(simuliere_replikat, erzeuge_system,
+                               beobachtungsgroesse, t_max, dt,
+                               t_einschwing, s) for s in seeds]
+        werte = np.array([f.result() for f in futures])
+
+    # Berechne den Mittelwert und den Standardfehler.
+    mittelwert = np.mean(werte, axis=0)
+    if n_replikate > 1:
+        fehler = np.std(werte, axis=0, ddof=1) / np.sqrt(n_replikate)
+    else:
+        fehler = np.full_like(mittelwert, np.nan)
+    return mittelwert, fehler, werte
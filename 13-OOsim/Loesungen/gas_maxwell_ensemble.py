@@ -0,0 +1,58 @@
+﻿"""Geschwindigkeitsverteilung eines Gases aus vielen Replikaten."""
+
+import numpy as np
+import matplotlib.pyplot as plt
+from stossprozess import Mehrteilchenstoss
+from ensemble import GeschwindigkeitsHistogramm, simuliere_ensemble
+
+# Anzahl der Teilchen und der Replikate.
+n_teilchen = 50
+n_replikate = 16
+
+# Simulationszeit, Einschwingzeit und Auswerteintervall [s].
+t_max = 20
+t_einschwing = 5
+dt = 0.1
+
+# Für jede Wand wird der Abstand vom Koordinatenursprung und ein
+# nach außen zeigender Normalenvektor angegeben.
+wandabstaende = np.array([2.0, 2.0, 2.0, 2.0])
+wandnormalen = np.array([[0, -1.0], [0, 1.0], [-1.0, 0], [1.0, 0]])
+
+# Parameter des Histogramms.
+histogramm = GeschwindigkeitsHistogramm(v_max=3.0, n_bins=15)
+
+
+def erzeuge_gas(rng):
+    """Erzeuge ein Gas mit zufälligen Anfangsbedingungen."""
+    r0 = 1.9 * (2 * rng.random((n_teilchen, 2)) - 1)
+    v0 = -0.5 + rng.random((n_teilchen, 2))
+    v0 /= np.linalg.norm(v0, axis=1).reshape(-1, 1)
+    return Mehrteilchenstoss(r0, v0, radien=0.05, massen=1.0,
+                             waende=(wandabstaende, wandnormalen))
+
+
+if __name__ == '__main__':
+    # Simuliere alle Replikate parallel.
+    mittelwert, fehler, _ = simuliere_ensemble(
+        erzeuge_gas, histogramm, n_replikate, t_max, dt,
+        t_einschwing=t_einschwing, seed=1234)
+
+    # Berechne die zweidimensionale Maxwell-Verteilung für die
+    # mittlere kinetische Energie 1/2 m <v²> = 1/2 m (1 m/s)².
+    kanten = histogramm.kanten
+    breite = kanten[1] - kanten[0]
+    v = np.linspace(0, kanten[-1], 500)
+    v_quadrat = 1.0
+    dichte = 2 * v / v_quadrat * np.exp(-v ** 2 / v_quadrat)
+
+    # Stelle das gemittelte Histogramm mit Fehlerbalken dar.
+    fig = plt.figure()
+    ax = fig.add_subplot(1, 1, 1)
+    ax.set_xlabel('$|v|$ [m/s]')
+    ax.set_ylabel('Anzahl der Teilchen')
+    ax.grid()
+    ax.bar(kanten[:-1], mittelwert, width=breite, align='edge',
+           edgecolor='white', yerr=fehler, capsize=3)
+    ax.plot(v, n_teilchen * breite * dichte, '-r')
+    plt.show()
@@ -5,6 +5,8 @@ import matplotlib as mpl
 import matplotlib.pyplot as plt
 import matplotlib.animation
 from stossprozess import Mehrteilchenstoss
+from trajektorie import Trajektorienspeicher, lade_trajektorie
+from teilchendarstellung import TeilchenDarstellung
 
 # Simulationszeit und Zeitschrittweite [s].
 t_max = 10
@@ -28,13 +30,17 @@ stoss = Mehrteilchenstoss(r0, massen=0.2, radien=0.03,
 stoss.v[0, :] = (3.0, 0.0)
 
 # Führe die Simulation durch, indem die Methode `zeitschritt`
-# mehrfach aufgerufen wird.
+# mehrfach aufgerufen wird. Die Positionen werden direkt in eine
+# Datei geschrieben.
 t = np.arange(0, t_max, dt)
-r = []
-for i in range(t.size):
-    stoss.zeitschritt(dt)
-    r.append(stoss.r.copy())
-r = np.array(r)
+with Trajektorienspeicher('mehrteilchenstoss.npy', t.size,
+                          stoss.r.shape) as speicher:
+    for i in range(t.size):
+        stoss.zeitschritt(dt)
+        speicher.speichere(stoss.r)
+
+# Öffne die gespeicherte Trajektorie für die Animation.
+r = lade_trajektorie('mehrteilchenstoss.npy')
 
 # Erzeuge eine Figure und eine Axes.
 fig = plt.figure(figsize=(8, 6))
@@ -46,21 +52,14 @@ ax.set_ylim(-0.6, 0.6)
 ax.set_aspect('equal')
 ax.grid()
 
-# Erzeuge für jedes Teilchen einen Kreis.
-kreise = []
-for radius in stoss.radien:
-    kreis = mpl.patches.Circle([0, 0], radius, visible=False)
-    ax.add_patch(kreis)
-    kreise.append(kreis)
+# Erzeuge die Darstellung der Teilchen.
+teilchen = TeilchenDarstellung(ax, stoss.radien)
 
 
 def update(n):
     """Aktualisiere die Grafik zum n-ten Zeitschritt."""
     # Aktualisiere die Positionen der Teilchen.
-    for kreis, ort in zip(kreise, r[n]):
-        kreis.set_center(ort)
-        kreis.set_visible(True)
-    return kreise
+    return teilchen.update(r[n]),
 
 
 # Erstelle die Animation und starte sie.
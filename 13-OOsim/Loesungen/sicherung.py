@@ -0,0 +1,71 @@
+﻿"""Automatische Sicherung des Zustands langer Simulationen."""
+
+import os
+import time
+
+
+class AutomatischeSicherung:
+    """Sichert eine Simulation in festen Abständen der Rechenzeit.
+
+    Die Methode `pruefe` wird in jedem Zeitschritt der Simulation
+    aufgerufen. Sobald seit der letzten Sicherung mehr als
+    `intervall` Sekunden an realer Zeit (nicht Simulationszeit)
+    vergangen sind, wird der Zustand des Simulationsobjekts mit
+    dessen Methode `speichere_zustand` in eine Datei geschrieben.
+    Damit geht bei einem Abbruch des Programms höchstens die
+    Rechenzeit eines Intervalls verloren.
+
+    Args:
+        simulation:
+            Objekt mit einer Methode `speichere_zustand(dateiname,
+            rng)`, z.B. ein `Mehrteilchenstoss`.
+        dateiname (str):
+            Name der Sicherungsdatei.
+        intervall (float):
+            Zeitabstand zwischen zwei Sicherungen [s].
+        rng (np.random.Generator):
+            Zufallszahlengenerator, der mitgesichert werden soll.
+    """
+
+    def __init__(self, simulation, dateiname, intervall=600,
+                 rng=None):
+        self.simulation = simulation
+        """Objekt, dessen Zustand gesichert wird."""
+        self.dateiname = dateiname
+        """str: Name der Sicherungsdatei."""
+        self.intervall = intervall
+        """float: Zeitabstand zwischen zwei Sicherungen [s]."""
+        self.rng = rng
+        """np.random.Generator: Mitgesicherter Zufallsgenerator."""
+        self.n_sicherungen = 0
+        """int: Anzahl der bisher geschriebenen Sicherungen."""
+
+        self._zeit_letzte_sicherung = time.monotonic()
+
+    @property
+    def vorhanden(self):
+        """bool: Existiert bereits eine Sicherungsdatei?"""
+        return os.path.exists(self.dateiname)
+
+    @property
+    def faellig(self):
+        """bool: Ist seit der letzten Sicherung das Intervall um?"""
+        vergangen = time.monotonic() - self._zeit_letzte_sicherung
+        return vergangen >= self.intervall
+
+    def sichere(self):
+        """Sichere den aktuellen Zustand sofort."""
+        self.simulation.speichere_zustand(self.dateiname, self.rng)
+        self.n_sicherungen += 1
+        self._zeit_letzte_sicherung = time.monotonic()
+
+    def pruefe(self):
+        """Sichere den Zustand, falls das Intervall abgelaufen ist.
+
+        Returns:
+            bool: True, wenn eine Sicherung geschrieben wurde.
+        """
+        if self.faellig:
+            self.sichere()
+            return True
+        return False
@@ -1,5 +1,8 @@
 ﻿"""Behandlung elastischer Stöße von Teilchen in einem Kasten."""
 
+import json
+import os
+import time
 import numpy as np
 
 
@@ -54,6 +57,18 @@ class Mehrteilchenstoss:
         """np.ndarray: Massen der Teilchen [kg] (n_teilchen)."""
         self.delta_t_min = 1e-9
         """float: Zeitdifferenz ab der Stöße gleichzeitig sind."""
+        self.t = 0.0
+        """float: Bisher insgesamt simulierte Zeit [s]."""
+        self.n_stoesse_teilchen = 0
+        """int: Anzahl der bisherigen Teilchen-Teilchen-Stöße."""
+        self.n_stoesse_wand = 0
+        """int: Anzahl der bisherigen Teilchen-Wand-Stöße."""
+        self.n_stoesse_einzeln = 0
+        """int: Anzahl der Stöße, die nicht gebündelt wurden."""
+        self.rechenzeit_vorhersage = 0.0
+        """float: Rechenzeit für die Vorhersage der Stöße [s]."""
+        self.rechenzeit_stoesse = 0.0
+        """float: Rechenzeit für die Ausführung der Stöße [s]."""
 
         # Setze die Geschwindigkeiten auf null, diese nicht
         # angegeben wurden.
@@ -129,6 +144,7 @@ class Mehrteilchenstoss:
         """
         if self._t_naechster_stoss is not None:
             return
+        t_start = time.perf_counter()
 
         # Lösche die vorhandenen Listen mit Kollisionspartnern.
         self._stosspartner_wand.clear()
@@ -145,6 +161,7 @@ class Mehrteilchenstoss:
         if abs(dt_wand - dt) < self.delta_t_min:
             self._stosspartner_wand = stosspartner_wand
         self._t_naechster_stoss = dt
+        self.rechenzeit_vorhersage += time.perf_counter() - t_start
 
     def _koll_teilchen(self):
         """Bestimme die nächste stattfindende Teilchenkollision.
@@ -187,16 +204,16 @@ class Mehrteilchenstoss:
         t[t <= 0] = np.nan
         t_min = np.nanmin(t)
 
-        # Suche die entsprechenden Teilchenindizes heraus.
+        # Suche die entsprechenden Teilchenindizes heraus. Da das
+        # Array t symmetrisch ist, wird nur der Teil oberhalb der
+        # Diagonalen betrachtet, damit jedes Paar genau einmal
+        # (mit teilchen1 < teilchen2) auftritt.
         teilchen1, teilchen2 = np.where(
-            np.abs(t - t_min) < self.delta_t_min)
+            np.triu(np.abs(t - t_min) < self.delta_t_min, k=1))
 
         # Bilde eine Liste mit Tupeln der Kollisionspartner.
         partner = list(zip(teilchen1, teilchen2))
 
-        # Entferne die doppelten Teilchenpaarungen.
-        partner = partner[:len(partner) // 2]
-
         # Setze den Zeitpunkt auf inf, wenn keine Kollision
         # stattfindet.
         if np.isnan(t_min):
@@ -308,6 +325,87 @@ class Mehrteilchenstoss:
         # Erzwinge eine Neuberechnung des nächsten Stoßvorgangs.
         self._t_naechster_stoss = None
 
+    def _stoesse_teilchen(self, partner):
+        """Führe mehrere gleichzeitige Teilchenstöße aus.
+
+        Alle Stöße, an denen kein Teilchen mehrfach beteiligt ist,
+        sind voneinander unabhängig und werden gemeinsam mit
+        Array-Operationen berechnet. Die übrigen Stöße bilden
+        Ketten von Teilchen, die mehrere Partner haben. Diese
+        werden anschließend in der Reihenfolge der Liste einzeln
+        ausgeführt.
+
+        Args:
+            partner (list[tuple[int, int]]):
+                Liste der Paare von Teilchenindizes.
+        """
+        if not partner:
+            return
+        paare = np.array(partner, dtype=int).reshape(-1, 2)
+
+        # Bestimme die Paare, deren Teilchen nur einmal vorkommen.
+        anzahl = np.bincount(paare.reshape(-1),
+                             minlength=self.n_teilchen)
+        unabhaengig = np.all(anzahl[paare] == 1, axis=1)
+        i, j = paare[unabhaengig].T
+
+        # Führe die unabhängigen Stöße gemeinsam aus. Die Formeln
+        # entsprechen denen der Methode `_stoss_teilchen`.
+        m1 = self.massen[i].reshape(-1, 1)
+        m2 = self.massen[j].reshape(-1, 1)
+        v1 = self.v[i]
+        v2 = self.v[j]
+        v_schwerpunkt = (m1 * v1 + m2 * v2) / (m1 + m2)
+        richtung = self.r[i] - self.r[j]
+        richtung /= np.linalg.norm(richtung, axis=1).reshape(-1, 1)
+        dv1 = np.sum((v_schwerpunkt - v1) * richtung, axis=1)
+        dv2 = np.sum((v_schwerpunkt - v2) * richtung, axis=1)
+        self.v[i] = v1 + 2 * dv1.reshape(-1, 1) * richtung
+        self.v[j] = v2 + 2 * dv2.reshape(-1, 1) * richtung
+
+        # Führe die Stöße mit gemeinsamen Teilchen nacheinander aus.
+        for teilch1, teilch2 in paare[~unabhaengig]:
+            self._stoss_teilchen(teilch1, teilch2)
+            self.n_stoesse_einzeln += 1
+
+        self.n_stoesse_teilchen += paare.shape[0]
+        self._t_naechster_stoss = None
+
+    def _stoesse_wand(self, partner):
+        """Führe mehrere gleichzeitige Wandstöße aus.
+
+        Teilchen, die nur mit einer Wand stoßen, werden gemeinsam
+        behandelt. Teilchen, die gleichzeitig zwei Wände treffen
+        (z.B. in einer Ecke), werden anschließend einzeln in der
+        Reihenfolge der Liste behandelt.
+
+        Args:
+            partner (list[tuple[int, int]]):
+                Liste der Paare aus Teilchen- und Wandindex.
+        """
+        if not partner:
+            return
+        paare = np.array(partner, dtype=int).reshape(-1, 2)
+
+        # Bestimme die Teilchen, die nur einmal vorkommen.
+        anzahl = np.bincount(paare[:, 0], minlength=self.n_teilchen)
+        unabhaengig = anzahl[paare[:, 0]] == 1
+        teilchen, wand = paare[unabhaengig].T
+
+        # Spiegele die Geschwindigkeiten an den Wänden.
+        normale = self.wandnormalen[wand]
+        v = self.v[teilchen]
+        v_normal = np.sum(v * normale, axis=1).reshape(-1, 1)
+        self.v[teilchen] = v - 2 * v_normal * normale
+
+        # Behandle die übrigen Stöße nacheinander.
+        for i, j in paare[~unabhaengig]:
+            self._stoss_wand(i, j)
+            self.n_stoesse_einzeln += 1
+
+        self.n_stoesse_wand += paare.shape[0]
+        self._t_naechster_stoss = None
+
     def zeitschritt(self, dt=None):
         """Bewege alle Teilchen über die angegebene Zeit weiter.
 
@@ -343,16 +441,141 @@ class Mehrteilchenstoss:
             # Führe die Stöße gegebenenfalls aus.
             if abs(self._t_naechster_stoss) < self.delta_t_min:
 
+                t_start = time.perf_counter()
+
                 # Lass die Teilchen untereinander kollidieren.
-                for teilch1, teilch2 in self._stosspartner_teilchen:
-                    self._stoss_teilchen(teilch1, teilch2)
+                self._stoesse_teilchen(self._stosspartner_teilchen)
 
                 # Lass die Teilchen mit Wänden kollidieren.
-                for teilchen, wand in self._stosspartner_wand:
-                    self._stoss_wand(teilchen, wand)
+                self._stoesse_wand(self._stosspartner_wand)
+
+                self.rechenzeit_stoesse += time.perf_counter() - t_start
 
                 # Berechne die nächsten Stöße.
                 self._bestimme_naechsten_stoss()
 
+        # Aktualisiere die insgesamt simulierte Zeit.
+        self.t += t
+
         # Gib die simulierte Zeitdauer zurück.
         return t
+
+    def _zusatzdaten(self):
+        """Weitere Daten für `speichere_zustand`.
+
+        Returns:
+            dict: Zusätzliche Arrays, die in der Datei abgelegt
+            werden.
+        """
+        return {}
+
+    def _lade_zusatzdaten(self, daten):
+        """Stelle die mit `_zusatzdaten` gespeicherten Daten wieder her.
+
+        Args:
+            daten (np.lib.npyio.NpzFile):
+                Inhalt der geladenen Datei.
+        """
+
+    def speichere_zustand(self, dateiname, rng=None):
+        """Speichere den vollständigen Zustand in einer .npz-Datei.
+
+        Neben den Orten, Geschwindigkeiten, Radien, Massen und
+        Wänden werden auch die Zähler der Stöße und Rechenzeiten
+        sowie die zwischengespeicherten Daten des nächsten Stoßes
+        abgelegt, damit eine mit `lade_zustand` fortgesetzte
+        Simulation bitgenau dasselbe Ergebnis liefert wie eine
+        ununterbrochene Simulation. Die Datei wird erst unter einem
+        temporären Namen geschrieben und dann umbenannt, sodass bei
+        einem Abbruch während des Schreibens die vorherige Datei
+        erhalten bleibt.
+
+        Args:
+            dateiname (str):
+                Name der .npz-Datei.
+            rng (np.random.Generator):
+                Zufallszahlengenerator, dessen Zustand ebenfalls
+                gespeichert werden soll.
+        """
+        daten = dict(r=self.r, v=self.v, radien=self.radien,
+                     massen=self.massen,
+                     wandabstaende=self.wandabstaende,
+                     wandnormalen=self.wandnormalen,
+                     delta_t_min=self.delta_t_min, t=self.t,
+                     n_stoesse_teilchen=self.n_stoesse_teilchen,
+                     n_stoesse_wand=self.n_stoesse_wand,
+                     n_stoesse_einzeln=self.n_stoesse_einzeln,
+                     rechenzeit_vorhersage=self.rechenzeit_vorhersage,
+                     rechenzeit_stoesse=self.rechenzeit_stoesse)
+
+        # Speichere die Daten des nächsten Stoßes, sofern diese
+        # bereits berechnet wurden.
+        if self._t_naechster_stoss is not None:
+            daten['t_naechster_stoss'] = self._t_naechster_stoss
+            daten['stosspartner_teilchen'] = np.array(
+                self._stosspartner_teilchen, dtype=int).reshape(-1, 2)
+            daten['stosspartner_wand'] = np.array(
+                self._stosspartner_wand, dtype=int).reshape(-1, 2)
+
+        # Abgeleitete Klassen können weitere Daten hinzufügen.
+        daten.update(self._zusatzdaten())
+
+        # Der Zustand des Zufallszahlengenerators ist ein
+        # verschachteltes Dictionary mit beliebig großen ganzen
+        # Zahlen und wird daher als JSON-Zeichenkette abgelegt.
+        if rng is not None:
+            daten['rng_zustand'] = json.dumps(rng.bit_generator.state)
+
+        dateiname_temp = dateiname + '.tmp'
+        with open(dateiname_temp, 'wb') as datei:
+            np.savez(datei, **daten)
+        os.replace(dateiname_temp, dateiname)
+
+    @classmethod
+    def lade_zustand(cls, dateiname, rng=None, **kwargs):
+        """Erzeuge einen Mehrteilchenstoss aus einer .npz-Datei.
+
+        Args:
+            dateiname (str):
+                Name einer mit `speichere_zustand` erzeugten Datei.
+            rng (np.random.Generator):
+                Zufallszahlengenerator, dessen Zustand auf den
+                gespeicherten Zustand gesetzt wird.
+            **kwargs:
+                Weitere Argumente für den Konstruktor, die nicht in
+                der Datei gespeichert sind, z.B. die Anzahl der
+                Gebiete bei abgeleiteten Klassen.
+
+        Returns:
+            Mehrteilchenstoss: Das wiederhergestellte Objekt.
+        """
+        with np.load(dateiname) as daten:
+            stoss = cls(daten['r'], daten['v'],
+                        radien=daten['radien'].copy(),
+                        massen=daten['massen'].copy(),
+                        waende=(daten['wandabstaende'],
+                                daten['wandnormalen']),
+                        **kwargs)
+            stoss.delta_t_min = float(daten['delta_t_min'])
+            stoss.t = float(daten['t'])
+            stoss.n_stoesse_teilchen = int(daten['n_stoesse_teilchen'])
+            stoss.n_stoesse_wand = int(daten['n_stoesse_wand'])
+            stoss.n_stoesse_einzeln = int(daten['n_stoesse_einzeln'])
+            stoss.rechenzeit_vorhersage = float(
+                daten['rechenzeit_vorhersage'])
+            stoss.rechenzeit_stoesse = float(
+                daten['rechenzeit_stoesse'])
+
+            if 't_naechster_stoss' in daten:
+                stoss._t_naechster_stoss = float(
+                    daten['t_naechster_stoss'])
+                stoss._stosspartner_teilchen = [
+                    tuple(p) for p in daten['stosspartner_teilchen']]
+                stoss._stosspartner_wand = [
+                    tuple(p) for p in daten['stosspartner_wand']]
+            stoss._lade_zusatzdaten(daten)
+
+            if rng is not None and 'rng_zustand' in daten:
+                rng.bit_generator.state = json.loads(
+                    str(daten['rng_zustand']))
+        return stoss
@@ -0,0 +1,129 @@
+﻿"""Geschwindigkeitsvergleich der parallelen Stoßsimulation.
+
+Zuerst wird ein kleines Gas sowohl mit der Klasse
+`Mehrteilchenstoss` als auch mit `MehrteilchenstossParallel` und
+einer unterschiedlichen Anzahl von Gebieten simuliert. Die Anzahl
+der Stöße muss übereinstimmen, und die Orte dürfen sich nur um
+Rundungsfehler unterscheiden. Zwischen den verschiedenen Anzahlen
+von Gebieten müssen die Ergebnisse exakt übereinstimmen.
+
+Anschließend wird ein großes Gas mit mehr als 10⁵ Ereignissen
+simuliert. Für jede Anzahl von Gebieten, die höchstens der Anzahl
+der verfügbaren Prozessorkerne entspricht, werden die pro Sekunde
+behandelten Ereignisse und die Beschleunigung gegenüber einem
+einzelnen Gebiet ausgegeben.
+"""
+
+import os
+import time
+import numpy as np
+from stossprozess import Mehrteilchenstoss
+from stossprozess_parallel import MehrteilchenstossParallel
+
+
+def anfangszustand(n_teilchen, abstand, rng):
+    """Erzeuge Teilchen auf einem Gitter in einem quadratischen Kasten.
+
+    Args:
+        n_teilchen (int):
+            Anzahl der Teilchen.
+        abstand (float):
+            Abstand der Wände vom Koordinatenursprung.
+        rng (np.random.Generator):
+            Zufallszahlengenerator für die Geschwindigkeiten.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray, tuple]:
+            - Anfangsorte (n_teilchen × 2).
+            - Anfangsgeschwindigkeiten (n_teilchen × 2).
+            - Wandabstände und Wandnormalen.
+    """
+    n_seite = int(np.ceil(np.sqrt(n_teilchen)))
+    g = np.linspace(-abstand + 0.5, abstand - 0.5, n_seite)
+    x, y = np.meshgrid(g, g)
+    r0 = np.stack([x.reshape(-1), y.reshape(-1)], axis=1)[:n_teilchen]
+    v0 = rng.normal(size=(n_teilchen, 2))
+    waende = (np.full(4, abstand),
+              np.array([[0, -1.0], [0, 1.0], [-1.0, 0], [1.0, 0]]))
+    return r0, v0, waende
+
+
+# Kleines Gas für den Vergleich mit `Mehrteilchenstoss`: Anzahl der
+# Teilchen, Radius, Abstand der Wände und simulierte Zeitdauer [s].
+n_klein = 300
+radius_klein = 0.3
+abstand_klein = 10.0
+t_klein = 1.0
+
+# Großes Gas für die Zeitmessung. Die simulierte Zeitdauer ist so
+# gewählt, dass mehr als 10⁵ Ereignisse auftreten.
+n_gross = 20000
+radius_gross = 0.1
+abstand_gross = 20.0
+t_gross = 0.6
+
+# Zu testende Anzahlen von Gebieten.
+liste_n_gebiete = [1, 2, 4, 8, 16, 32]
+
+if __name__ == '__main__':
+    # Vergleiche mit der seriellen Simulation.
+    r0, v0, waende = anfangszustand(n_klein, abstand_klein,
+                                    np.random.default_rng(3))
+    seriell = Mehrteilchenstoss(r0, v0, radien=radius_klein,
+                                waende=waende)
+    # Die Klasse berechnet auch die Stoßzeiten jedes Teilchens mit
+    # sich selbst, was zu Divisionen durch null führt.
+    with np.errstate(divide='ignore', invalid='ignore'):
+        while seriell.t < t_klein:
+            seriell.zeitschritt(t_klein - seriell.t)
+    print(f'Mehrteilchenstoss: {seriell.n_stoesse_teilchen} '
+          f'Teilchenstöße, {seriell.n_stoesse_wand} Wandstöße')
+
+    r_referenz = None
+    for n_gebiete in [1, 2, 4]:
+        with MehrteilchenstossParallel(
+                r0, v0, radien=radius_klein, n_gebiete=n_gebiete,
+                waende=waende) as stoss:
+            stoss.zeitschritt(t_klein)
+        if r_referenz is None:
+            r_referenz = stoss.r.copy()
+        stoesse_gleich = (
+            stoss.n_stoesse_teilchen == seriell.n_stoesse_teilchen
+            and stoss.n_stoesse_wand == seriell.n_stoesse_wand)
+        abweichung = np.max(np.abs(stoss.r - seriell.r))
+        print(f'{n_gebiete:3d} Gebiete: '
+              f'Stöße gleich: {stoesse_gleich}, '
+              f'größte Abweichung der Orte: {abweichung:.1e}, '
+              f'identisch: {np.array_equal(stoss.r, r_referenz)}')
+
+    # Miss die Rechenzeit für das große Gas.
+    print(f'\nVerfügbare Prozessorkerne: {os.cpu_count()}')
+    r0, v0, waende = anfangszustand(n_gross, abstand_gross,
+                                    np.random.default_rng(1))
+    r_referenz = None
+    zeit_referenz = None
+    for n_gebiete in liste_n_gebiete:
+        if n_gebiete > os.cpu_count():
+            print(f'{n_gebiete:3d} Gebiete: nicht gemessen, da nicht '
+                  f'genügend Prozessorkerne vorhanden sind.')
+            continue
+        with MehrteilchenstossParallel(
+                r0, v0, radien=radius_gross, n_gebiete=n_gebiete,
+                waende=waende) as stoss:
+            zeit = time.perf_counter()
+            stoss.zeitschritt(t_gross)
+            zeit = time.perf_counter() - zeit
+        n_ereignisse = stoss.n_stoesse_teilchen + stoss.n_stoesse_wand
+
+        # Vergleiche das Ergebnis mit dem Durchlauf mit einem Gebiet.
+        if r_referenz is None:
+            r_referenz = stoss.r.copy()
+            zeit_referenz = zeit
+        identisch = np.array_equal(stoss.r, r_referenz)
+
+        print(f'{n_gebiete:3d} Gebiete: {n_ereignisse} Ereignisse, '
+              f'{n_ereignisse / zeit:8.1f} Ereignisse/s, '
+              f'Beschleunigung {zeit_referenz / zeit:5.2f}, '
+              f'identisch: {identisch}, '
+              f'Fenster: {stoss.n_fenster}, '
+              f'Rücksetzungen: {stoss.n_ruecksetzungen}')
@@ -0,0 +1,1017 @@
+﻿"""Ereignisgesteuerte Stoßsimulation in räumlichen Gebieten.
+
+Die Klasse `Mehrteilchenstoss` berechnet nach jedem Stoß die
+Stoßzeitpunkte aller n_teilchen × n_teilchen Teilchenpaare und
+bewegt alle Teilchen bis zum nächsten Stoß weiter. Für sehr viele
+Teilchen ist das nicht mehr durchführbar. Die hier definierte
+Klasse `MehrteilchenstossParallel` verwendet stattdessen die
+üblichen Techniken der ereignisgesteuerten Molekulardynamik:
+
+    - Der Kasten wird in quadratische bzw. würfelförmige Zellen
+      eingeteilt, die mindestens so groß sind wie der größte
+      Teilchendurchmesser. Stoßen können nur Teilchen in
+      benachbarten Zellen.
+    - Jedes Teilchen speichert seinen Ort und seine
+      Geschwindigkeit zum Zeitpunkt seines letzten Stoßes. Nach
+      einem Stoß werden nur die beiden beteiligten Teilchen
+      aktualisiert.
+    - Alle vorhergesagten Ereignisse stehen in einer
+      Warteschlange (`heapq`). Neben den Stößen ist auch das
+      Überschreiten einer Zellgrenze ein Ereignis. Danach werden
+      nur die Paare mit den Teilchen der neu benachbarten Zellen
+      vorhergesagt. Ein Ereignis wird verworfen, wenn eines der
+      beteiligten Teilchen seit der Vorhersage gestoßen ist.
+
+Der Kasten wird entlang der x-Achse in Streifen aus ganzen
+Zellspalten zerlegt (`Gebiet`). Jedes Gebiet wird von einem
+eigenen Prozess mit einer eigenen Warteschlange bearbeitet und
+enthält neben den eigenen Teilchen Kopien der Teilchen, die
+höchstens `n_rand` Spalten von seinem Rand entfernt sind
+(Geisterteilchen). Die Gebiete werden optimistisch synchronisiert:
+Alle Prozesse simulieren unabhängig voneinander ein Zeitfenster.
+Anschließend wird für jedes Geisterteilchen geprüft, ob es dieselben
+Stöße erfahren hat wie das Original, und ob ein Teilchen einem
+fremden Gebiet zu nahe gekommen ist, ohne dort als Geisterteilchen
+vorhanden zu sein. Ist das nicht der Fall, so bleiben alle
+richtigen Kopien erhalten, und es werden nur die Teilchen
+übertragen, die in einem Gebiet neu hinzukommen oder dort falsch
+sind. Andernfalls werden alle Gebiete auf den Anfang des Fensters
+zurückgesetzt (Rollback), und das Fenster wird verkürzt.
+
+Die Stoßzeit eines Paares wird nur aus den gespeicherten Zuständen
+der beiden Teilchen berechnet. Daher liefert die Simulation für
+jede Anzahl von Gebieten bitgenau dasselbe Ergebnis. Mit der Klasse
+`Mehrteilchenstoss` stimmen die Stöße überein, die Orte aber nur bis
+auf Rundungsfehler, da dort alle Teilchen nach jedem Ereignis
+gemeinsam weiterbewegt werden. Gleichzeitige Stöße werden hier
+nacheinander in der Reihenfolge der Stoßzeitpunkte behandelt. Das
+Attribut `delta_t_min` wird daher nicht verwendet.
+"""
+
+import bisect
+import heapq
+import itertools
+import math
+import multiprocessing
+import operator
+import numpy as np
+from stossprozess import Mehrteilchenstoss
+
+# Arten von Ereignissen in der Warteschlange. Bei gleichen Zeiten
+# werden Teilchenstöße vor Wandstößen und diese vor Zellwechseln
+# behandelt.
+_PAAR, _WAND, _WECHSEL = 0, 1, 2
+
+
+class Teilchen:
+    """Zustand eines Teilchens innerhalb eines Gebiets.
+
+    Zwischen zwei Stößen ergibt sich der Ort zum Zeitpunkt t' aus
+    r + v * (t' - t). Die Nummern `nummer` und `wechsel` werden bei
+    jedem Stoß bzw. Zellwechsel neu vergeben. Ein Ereignis in der
+    Warteschlange ist nur gültig, solange die Nummern mit den bei der
+    Vorhersage gespeicherten Nummern übereinstimmen.
+    """
+
+    __slots__ = ['r', 'v', 't', 'zelle', 'radius', 'masse', 'eigen',
+                 'nummer', 'wechsel']
+
+    def __init__(self, r, v, t, zelle, radius, masse, eigen):
+        self.r = r
+        """tuple[float]: Ort zum Zeitpunkt t."""
+        self.v = v
+        """tuple[float]: Geschwindigkeit."""
+        self.t = t
+        """float: Zeitpunkt des letzten Stoßes."""
+        self.zelle = zelle
+        """tuple[int]: Index der Zelle."""
+        self.radius = radius
+        """float: Radius des Teilchens."""
+        self.masse = masse
+        """float: Masse des Teilchens."""
+        self.eigen = eigen
+        """bool: True, wenn das Teilchen zum Gebiet gehört."""
+        self.nummer = 0
+        """int: Nummer des letzten Stoßes."""
+        self.wechsel = 0
+        """int: Nummer des letzten Zellwechsels."""
+
+
+def _buendel(liste, n_dim):
+    """Fasse Teilchendaten zu Arrays zusammen.
+
+    Args:
+        liste (list[tuple]):
+            Für jedes Teilchen ein Tupel aus Index, Ort,
+            Geschwindigkeit, Zeit, Zelle, Radius und Masse.
+        n_dim (int):
+            Anzahl der Raumdimensionen.
+
+    Returns:
+        tuple[np.ndarray]: Arrays der sieben Größen.
+    """
+    if not liste:
+        return (np.zeros(0, dtype=int), np.zeros((0, n_dim)),
+                np.zeros((0, n_dim)), np.zeros(0),
+                np.zeros((0, n_dim), dtype=int), np.zeros(0),
+                np.zeros(0))
+    spalten = list(zip(*liste))
+    return (np.array(spalten[0], dtype=int), np.array(spalten[1]),
+            np.array(spalten[2]), np.array(spalten[3]),
+            np.array(spalten[4], dtype=int), np.array(spalten[5]),
+            np.array(spalten[6]))
+
+
+def _auswahl(buendel, maske):
+    """Wähle Teilchen aus einem Bündel von Arrays aus."""
+    return tuple(a[maske] for a in buendel)
+
+
+def _verbinde(liste_buendel, n_dim):
+    """Füge mehrere Bündel von Arrays zusammen."""
+    if not liste_buendel:
+        return _buendel([], n_dim)
+    return tuple(np.concatenate(arrays)
+                 for arrays in zip(*liste_buendel))
+
+
+class Gebiet:
+    """Ereignisgesteuerte Simulation der Teilchen eines Gebiets.
+
+    Das Gebiet umfasst die Zellspalten von `spalte_min` bis
+    ausschließlich `spalte_max`. Die Spalte c gehört zum Gebiet
+    `bisect.bisect_right(grenzen, c)`.
+
+    Args:
+        index (int):
+            Index des Gebiets.
+        grenzen (list[int]):
+            Erste Spalte der Gebiete 1, 2, ..., n_gebiete - 1.
+        n_rand (int):
+            Breite des Randbereichs in Spalten.
+        zellgroesse (float):
+            Kantenlänge der Zellen.
+        wandabstaende (np.ndarray):
+            Abstände der Wände vom Koordinatenursprung.
+        wandnormalen (np.ndarray):
+            Nach außen zeigende Normalenvektoren der Wände.
+        ruecksetzbar (bool):
+            Wenn True, werden die Daten für das Zurücksetzen auf
+            den Anfang eines Zeitfensters und für die Prüfung der
+            Randbereiche aufgezeichnet.
+    """
+
+    def __init__(self, index, grenzen, n_rand, zellgroesse,
+                 wandabstaende, wandnormalen, ruecksetzbar=True):
+        self.index = index
+        """int: Index des Gebiets."""
+        self.grenzen = list(grenzen)
+        """list[int]: Erste Spalte der Gebiete 1, 2, ..."""
+        self.n_rand = n_rand
+        """int: Breite des Randbereichs in Spalten."""
+        self.zellgroesse = zellgroesse
+        """float: Kantenlänge der Zellen."""
+        self.wandabstaende = [float(d) for d in wandabstaende]
+        """list[float]: Abstände der Wände vom Ursprung."""
+        self.wandnormalen = [tuple(float(x) for x in n)
+                             for n in wandnormalen]
+        """list[tuple[float]]: Normalenvektoren der Wände."""
+        self.ruecksetzbar = ruecksetzbar
+        """bool: Zeichne Daten für das Zurücksetzen auf."""
+        self.spalte_min = (grenzen[index - 1] if index > 0
+                           else -math.inf)
+        """int: Erste Spalte des Gebiets."""
+        self.spalte_max = (grenzen[index] if index < len(grenzen)
+                           else math.inf)
+        """int: Erste Spalte hinter dem Gebiet."""
+        self.n_stoesse_teilchen = 0
+        """int: Anzahl der Teilchenstöße im Gebiet."""
+        self.n_stoesse_wand = 0
+        """int: Anzahl der Wandstöße im Gebiet."""
+
+        n_dim = len(self.wandnormalen[0])
+        # Relative Lage der Nachbarzellen und der Zellen, die nach
+        # einem Zellwechsel in Richtung 2 * k + (v_k > 0) neu
+        # benachbart sind.
+        self._nachbarn = list(itertools.product((-1, 0, 1),
+                                                repeat=n_dim))
+        self._schichten = [[n for n in self._nachbarn
+                            if n[code // 2] == 2 * (code % 2) - 1]
+                           for code in range(2 * n_dim)]
+
+        # Teilchen, Belegung der Zellen und der Spalten sowie die
+        # Indizes der Geisterteilchen.
+        self._teilchen = {}
+        self._zellen = {}
+        self._spalten = {}
+        self._geister = set()
+        self._warteschlange = []
+        self._nummer = 0
+
+        # Aufzeichnungen während eines Zeitfensters: Zustände der
+        # Teilchen vor ihrer ersten Änderung, entnommene Ereignisse,
+        # Stoßprotokolle und Spaltenverläufe der Randteilchen, die
+        # Gebiete, in denen die eigenen Randteilchen Geister sind,
+        # und die im Fenster gezählten Stöße.
+        self._gesichert = {}
+        self._entnommen = []
+        self._protokoll = {}
+        self._spaltenverlauf = {}
+        self._zugehoerigkeit = {}
+        self._fenster_teilchen = 0
+        self._fenster_wand = 0
+
+    def gebiet_von(self, spalte):
+        """Index des Gebiets, zu dem eine Zellspalte gehört."""
+        return bisect.bisect_right(self.grenzen, spalte)
+
+    def _kopien(self, spalte):
+        """Gebiete, die ein Teilchen der Spalte enthalten."""
+        return frozenset(self.gebiet_von(spalte + d)
+                         for d in range(-self.n_rand, self.n_rand + 1))
+
+    def _im_gebiet(self, spalte):
+        """Prüfe, ob eine Spalte zum Gebiet gehört."""
+        return self.spalte_min <= spalte < self.spalte_max
+
+    def _im_rand(self, spalte):
+        """Prüfe, ob eine Spalte zum Randbereich gehört."""
+        return (self.spalte_min - self.n_rand <= spalte
+                < self.spalte_max + self.n_rand
+                and not self._im_gebiet(spalte))
+
+    def _nahe(self, spalte):
+        """Fremde Gebiete, die an die Spalte grenzen."""
+        return {self.gebiet_von(spalte - 1), self.gebiet_von(spalte),
+                self.gebiet_von(spalte + 1)} - {self.index}
+
+    def _randspalten(self):
+        """Eigene Spalten, deren Teilchen in fremden Gebieten sind."""
+        spalten = set()
+        for rand, richtung in [(self.spalte_min, 1),
+                               (self.spalte_max - 1, -1)]:
+            if math.isfinite(rand):
+                spalten.update(range(
+                    rand, rand + richtung * self.n_rand, richtung))
+        return sorted(c for c in spalten if self._im_gebiet(c))
+
+    def _neue_nummer(self):
+        """Vergib eine neue Nummer für Stöße und Zellwechsel."""
+        self._nummer += 1
+        return self._nummer
+
+    def _einsortieren(self, i, zelle):
+        """Trage ein Teilchen in eine Zelle und eine Spalte ein."""
+        self._zellen.setdefault(zelle, set()).add(i)
+        self._spalten.setdefault(zelle[0], set()).add(i)
+
+    def _aussortieren(self, i, zelle):
+        """Entferne ein Teilchen aus einer Zelle und einer Spalte."""
+        for menge, schluessel in [(self._zellen, zelle),
+                                  (self._spalten, zelle[0])]:
+            eintrag = menge[schluessel]
+            eintrag.discard(i)
+            if not eintrag:
+                del menge[schluessel]
+
+    def _fuege_hinzu(self, buendel):
+        """Füge Teilchen hinzu und sage ihre Ereignisse vorher.
+
+        Teilchen außerhalb der eigenen Spalten werden als
+        Geisterteilchen hinzugefügt.
+        """
+        neu = []
+        for i, r, v, t, zelle, radius, masse in zip(
+                *(a.tolist() for a in buendel)):
+            eigen = self._im_gebiet(zelle[0])
+            p = Teilchen(tuple(r), tuple(v), t, tuple(zelle), radius,
+                         masse, eigen)
+            p.nummer = self._neue_nummer()
+            p.wechsel = self._neue_nummer()
+            self._teilchen[i] = p
+            self._einsortieren(i, p.zelle)
+            if not eigen:
+                self._geister.add(i)
+            neu.append(i)
+        for i in neu:
+            self._sage_vorher(i, self._teilchen[i])
+
+    def _entferne(self, i):
+        """Entferne ein Teilchen aus dem Gebiet."""
+        p = self._teilchen.pop(i)
+        self._aussortieren(i, p.zelle)
+        self._geister.discard(i)
+        return p
+
+    def _sage_paare_vorher(self, i, p, versaetze):
+        """Sage die Stöße mit den Teilchen benachbarter Zellen vorher.
+
+        Beide Teilchen eines Paares werden zum späteren ihrer beiden
+        Stoßzeitpunkte betrachtet. Vertauscht man die Teilchen, so
+        ändern alle Differenzen nur ihr Vorzeichen. Die Stoßzeit ist
+        daher bitgenau dieselbe, egal von welchem der beiden
+        Teilchen aus sie berechnet wird.
+
+        Args:
+            i (int):
+                Index des Teilchens.
+            p (Teilchen):
+                Zustand des Teilchens.
+            versaetze (list[tuple[int]]):
+                Lage der Zellen relativ zur Zelle des Teilchens.
+        """
+        teilchen = self._teilchen
+        zellen = self._zellen
+        warteschlange = self._warteschlange
+        mul = operator.mul
+        sub = operator.sub
+        t_p, r_p, v_p, radius_p = p.t, p.r, p.v, p.radius
+        for versatz in versaetze:
+            nachbarn = zellen.get(tuple(map(operator.add, p.zelle,
+                                            versatz)))
+            if not nachbarn:
+                continue
+            for j in nachbarn:
+                if j == i:
+                    continue
+                q = teilchen[j]
+                t_q = q.t
+                if t_q > t_p:
+                    t0 = t_q
+                    dr = [a + va * (t0 - t_p) - b for a, va, b in
+                          zip(r_p, v_p, q.r)]
+                else:
+                    t0 = t_p
+                    dr = [a - (b + vb * (t0 - t_q)) for a, b, vb in
+                          zip(r_p, q.r, q.v)]
+                dv = list(map(sub, v_p, q.v))
+                b = sum(map(mul, dr, dv))
+                if b >= 0:
+                    continue
+                dv2 = sum(map(mul, dv, dv))
+                a = b / dv2
+                c = (sum(map(mul, dr, dr))
+                     - (radius_p + q.radius) ** 2) / dv2
+                d = a * a - c
+                if d < 0:
+                    continue
+                tau = -a - math.sqrt(d)
+                if tau <= 0:
+                    continue
+                if i < j:
+                    ereignis = (t0 + tau, _PAAR, i, j, p.nummer,
+                                q.nummer)
+                else:
+                    ereignis = (t0 + tau, _PAAR, j, i, q.nummer,
+                                p.nummer)
+                heapq.heappush(warteschlange, ereignis)
+
+    def _sage_wand_vorher(self, i, p):
+        """Sage die Stöße eines Teilchens mit den Wänden vorher."""
+        for k, (d, n) in enumerate(zip(self.wandabstaende,
+                                       self.wandnormalen)):
+            vn = sum(map(operator.mul, p.v, n))
+            if vn <= 0:
+                continue
+            tau = (d - p.radius - sum(map(operator.mul, p.r, n))) / vn
+            if tau > 0:
+                heapq.heappush(self._warteschlange,
+                               (p.t + tau, _WAND, i, k, p.nummer, 0))
+
+    def _sage_wechsel_vorher(self, i, p):
+        """Sage den nächsten Zellwechsel eines Teilchens vorher."""
+        s = self.zellgroesse
+        tau_min = math.inf
+        code_min = -1
+        for k, (x, vk, c) in enumerate(zip(p.r, p.v, p.zelle)):
+            if vk > 0:
+                tau = ((c + 1) * s - x) / vk
+                code = 2 * k + 1
+            elif vk < 0:
+                tau = (c * s - x) / vk
+                code = 2 * k
+            else:
+                continue
+            if tau < tau_min:
+                tau_min = tau
+                code_min = code
+        if code_min >= 0:
+            heapq.heappush(self._warteschlange,
+                           (p.t + max(tau_min, 0.0), _WECHSEL, i,
+                            code_min, p.nummer, p.wechsel))
+
+    def _sage_vorher(self, i, p):
+        """Sage alle Ereignisse eines Teilchens vorher."""
+        self._sage_paare_vorher(i, p, self._nachbarn)
+        self._sage_wand_vorher(i, p)
+        self._sage_wechsel_vorher(i, p)
+
+    def _sichere(self, i, p):
+        """Sichere den Zustand vor der ersten Änderung im Fenster."""
+        if i not in self._gesichert:
+            self._gesichert[i] = (p.r, p.v, p.t, p.zelle, p.nummer,
+                                  p.wechsel)
+
+    def _protokolliere(self, i, p, partner):
+        """Zeichne einen Stoß eines Randteilchens auf.
+
+        Neben dem Zeitpunkt und dem Stoßpartner wird die neue
+        Geschwindigkeit gespeichert. Stimmen die Protokolle zweier
+        Kopien eines Teilchens überein, so stimmen damit auch ihre
+        Bahnen überein.
+        """
+        liste = self._protokoll.get(i)
+        if liste is not None:
+            liste.append((p.t, partner, p.v))
+
+    def _stoss_teilchen(self, t, i, p, j, q):
+        """Führe einen Stoß zweier Teilchen zum Zeitpunkt t aus."""
+        if self.ruecksetzbar:
+            self._sichere(i, p)
+            self._sichere(j, q)
+        if p.eigen:
+            self._fenster_teilchen += 1
+
+        # Bewege beide Teilchen bis zum Stoßzeitpunkt und wende
+        # dieselben Formeln wie `Mehrteilchenstoss._stoss_teilchen`
+        # an.
+        r1 = [x + vx * (t - p.t) for x, vx in zip(p.r, p.v)]
+        r2 = [x + vx * (t - q.t) for x, vx in zip(q.r, q.v)]
+        m1, m2 = p.masse, q.masse
+        v_schwerpunkt = [(m1 * a + m2 * b) / (m1 + m2)
+                         for a, b in zip(p.v, q.v)]
+        dr = [a - b for a, b in zip(r1, r2)]
+        betrag = math.sqrt(sum(map(operator.mul, dr, dr)))
+        richtung = [x / betrag for x in dr]
+        dv1 = 2 * sum((a - b) * e for a, b, e in
+                      zip(v_schwerpunkt, p.v, richtung))
+        dv2 = 2 * sum((a - b) * e for a, b, e in
+                      zip(v_schwerpunkt, q.v, richtung))
+
+        p.r, p.t = tuple(r1), t
+        q.r, q.t = tuple(r2), t
+        p.v = tuple(a + dv1 * e for a, e in zip(p.v, richtung))
+        q.v = tuple(a + dv2 * e for a, e in zip(q.v, richtung))
+        for x in p, q:
+            x.nummer = self._neue_nummer()
+            x.wechsel = self._neue_nummer()
+        if self.ruecksetzbar:
+            self._protokolliere(i, p, j)
+            self._protokolliere(j, q, i)
+        self._sage_vorher(i, p)
+        self._sage_vorher(j, q)
+
+    def _stoss_wand(self, t, i, p, k):
+        """Führe einen Stoß mit der Wand k zum Zeitpunkt t aus."""
+        if self.ruecksetzbar:
+            self._sichere(i, p)
+        if p.eigen:
+            self._fenster_wand += 1
+
+        n = self.wandnormalen[k]
+        vn = 2 * sum(map(operator.mul, p.v, n))
+        p.r = tuple(x + vx * (t - p.t) for x, vx in zip(p.r, p.v))
+        p.t = t
+        p.v = tuple(vx - vn * nx for vx, nx in zip(p.v, n))
+        p.nummer = self._neue_nummer()
+        p.wechsel = self._neue_nummer()
+        if self.ruecksetzbar:
+            self._protokolliere(i, p, -1 - k)
+        self._sage_vorher(i, p)
+
+    def _zellwechsel(self, t, i, p, code):
+        """Verschiebe ein Teilchen in die benachbarte Zelle.
+
+        Returns:
+            bool: False, wenn ein eigenes Teilchen einem Gebiet zu
+            nahe kommt, in dem es nicht als Geist vorhanden ist.
+        """
+        k = code // 2
+        alt = p.zelle
+        neu = alt[:k] + (alt[k] + 2 * (code % 2) - 1,) + alt[k + 1:]
+        if self.ruecksetzbar:
+            self._sichere(i, p)
+        self._aussortieren(i, alt)
+        self._einsortieren(i, neu)
+        p.zelle = neu
+        p.wechsel = self._neue_nummer()
+
+        # Sage die Stöße mit den Teilchen der neu benachbarten Zellen
+        # und den nächsten Zellwechsel vorher.
+        self._sage_paare_vorher(i, p, self._schichten[code])
+        self._sage_wechsel_vorher(i, p)
+
+        if k != 0 or not self.ruecksetzbar or not p.eigen:
+            return True
+        verlauf = self._spaltenverlauf.get(i)
+        if verlauf is not None:
+            verlauf.append((t, neu[0]))
+        if self.spalte_min < neu[0] < self.spalte_max - 1:
+            return True
+        return self._nahe(neu[0]) <= self._zugehoerigkeit.get(
+            i, frozenset())
+
+    def _beginne_fenster(self):
+        """Bereite die Aufzeichnungen für ein Zeitfenster vor."""
+        self._gesichert = {}
+        self._entnommen = []
+        self._fenster_teilchen = 0
+        self._fenster_wand = 0
+        self._protokoll = {i: [] for i in self._geister}
+        self._spaltenverlauf = {}
+        self._zugehoerigkeit = {}
+        for spalte in self._randspalten():
+            gebiete = self._kopien(spalte) - {self.index}
+            if not gebiete:
+                continue
+            for i in self._spalten.get(spalte, ()):
+                self._zugehoerigkeit[i] = gebiete
+                self._protokoll[i] = []
+                self._spaltenverlauf[i] = [(-math.inf, spalte)]
+
+    def simuliere(self, t_ende, neue=None):
+        """Behandle alle Ereignisse vor dem Zeitpunkt t_ende.
+
+        Args:
+            t_ende (float):
+                Ende des Zeitfensters.
+            neue (tuple[np.ndarray]):
+                Teilchen, die vorher in das Gebiet aufgenommen
+                werden.
+
+        Returns:
+            tuple[bool, dict]:
+                - True, wenn ein eigenes Teilchen einem fremden
+                  Gebiet zu nahe gekommen ist.
+                - Für jedes Nachbargebiet die Stoßprotokolle und
+                  Spaltenverläufe der Teilchen, die dort Geister
+                  sind.
+        """
+        if neue is not None:
+            self._fuege_hinzu(neue)
+        if self.ruecksetzbar:
+            self._beginne_fenster()
+
+        warteschlange = self._warteschlange
+        teilchen = self._teilchen
+        entnommen = self._entnommen
+        ruecksetzbar = self.ruecksetzbar
+        while warteschlange and warteschlange[0][0] < t_ende:
+            ereignis = heapq.heappop(warteschlange)
+            if ruecksetzbar:
+                entnommen.append(ereignis)
+            t, art, i, j, n_i, n_j = ereignis
+            p = teilchen.get(i)
+            if p is None or p.nummer != n_i:
+                continue
+            if art == _PAAR:
+                q = teilchen.get(j)
+                if q is not None and q.nummer == n_j:
+                    self._stoss_teilchen(t, i, p, j, q)
+            elif art == _WAND:
+                self._stoss_wand(t, i, p, j)
+            elif p.wechsel == n_j:
+                if not self._zellwechsel(t, i, p, j):
+                    return True, {}
+
+        randdaten = {}
+        for i, gebiete in self._zugehoerigkeit.items():
+            for f in gebiete:
+                randdaten.setdefault(f, {})[i] = (
+                    self._protokoll[i], self._spaltenverlauf[i])
+        return False, randdaten
+
+    def pruefe(self, randdaten):
+        """Prüfe die Geisterteilchen am Ende eines Zeitfensters.
+
+        Für jedes Geisterteilchen wird der erste Stoß bestimmt, in
+        dem sich sein Stoßprotokoll von dem des Originals
+        unterscheidet. Ab diesem Zeitpunkt ist die Kopie falsch. Das
+        Fenster ist ungültig, wenn die falsche Kopie danach mit
+        einem eigenen Teilchen gestoßen ist oder das Original danach
+        diesem Gebiet nahe gekommen ist.
+
+        Args:
+            randdaten (dict):
+                Stoßprotokolle und Spaltenverläufe der Originale
+                aller Geisterteilchen dieses Gebiets.
+
+        Returns:
+            tuple[bool, set[int]]:
+                - True, wenn das Zeitfenster gültig ist.
+                - Die Indizes der falschen Kopien.
+        """
+        abweichend = set()
+        for g in self._geister:
+            original, verlauf = randdaten[g]
+            kopie = self._protokoll[g]
+            n = min(len(original), len(kopie))
+            k = 0
+            while k < n and original[k] == kopie[k]:
+                k += 1
+            if k == len(original) == len(kopie):
+                continue
+            abweichend.add(g)
+            t_abweichung = min(liste[k][0] for liste in
+                               [original, kopie] if k < len(liste))
+            for _, partner, _ in kopie[k:]:
+                if partner >= 0 and self._teilchen[partner].eigen:
+                    return False, abweichend
+            for m, (t, spalte) in enumerate(verlauf):
+                naechster = (verlauf[m + 1][0] if m + 1 < len(verlauf)
+                             else math.inf)
+                if (naechster >= t_abweichung and self.spalte_min - 1
+                        <= spalte <= self.spalte_max):
+                    return False, abweichend
+        return True, abweichend
+
+    def uebernehme(self, abweichend):
+        """Übernimm das Ergebnis des Zeitfensters.
+
+        Alle Kopien, die nicht falsch sind, bleiben erhalten. Ob ein
+        Teilchen zum Gebiet gehört oder ein Geisterteilchen ist,
+        ergibt sich aus seiner Spalte. Teilchen, die sich weder im
+        Gebiet noch im Randbereich befinden, werden entfernt. Die
+        eigenen Teilchen werden an die Gebiete gesendet, die keine
+        richtige Kopie besitzen, aber eine benötigen.
+
+        Args:
+            abweichend (list[set[int]]):
+                Für jedes Gebiet die Indizes der falschen Kopien.
+
+        Returns:
+            dict: Für jedes Gebiet die zu sendenden Teilchen.
+        """
+        self.n_stoesse_teilchen += self._fenster_teilchen
+        self.n_stoesse_wand += self._fenster_wand
+        self._fenster_teilchen = 0
+        self._fenster_wand = 0
+        self._gesichert = {}
+        self._entnommen = []
+
+        for g in abweichend[self.index]:
+            self._entferne(g)
+
+        # Bestimme die zu sendenden Teilchen. Ein Teilchen, das am
+        # Anfang des Fensters zum Gebiet gehörte, war in den Gebieten
+        # `_zugehoerigkeit` als Geist vorhanden.
+        exporte = {}
+        spalten = set(self._randspalten())
+        spalten.update(c for c in self._spalten
+                       if not self._im_gebiet(c))
+        for spalte in spalten:
+            kopien = self._kopien(spalte) - {self.index}
+            for i in self._spalten.get(spalte, ()):
+                p = self._teilchen[i]
+                if not p.eigen:
+                    continue
+                vorher = self._zugehoerigkeit.get(i, frozenset())
+                for f in kopien:
+                    if f not in vorher or i in abweichend[f]:
+                        exporte.setdefault(f, []).append(
+                            (i, p.r, p.v, p.t, p.zelle, p.radius,
+                             p.masse))
+
+        # Lege anhand der Spalten fest, welche Teilchen zum Gebiet
+        # gehören, welche Geister sind und welche entfernt werden.
+        for g in list(self._geister):
+            spalte = self._teilchen[g].zelle[0]
+            if self._im_gebiet(spalte):
+                self._teilchen[g].eigen = True
+                self._geister.remove(g)
+            elif not self._im_rand(spalte):
+                self._entferne(g)
+        for spalte in [c for c in self._spalten
+                       if not self._im_gebiet(c)]:
+            for i in list(self._spalten[spalte]):
+                p = self._teilchen[i]
+                if not p.eigen:
+                    continue
+                if self._im_rand(spalte):
+                    p.eigen = False
+                    self._geister.add(i)
+                else:
+                    self._entferne(i)
+        self._protokoll = {}
+        self._spaltenverlauf = {}
+        self._zugehoerigkeit = {}
+
+        # Entferne ungültige Ereignisse, wenn die Warteschlange im
+        # Vergleich zur Anzahl der Teilchen zu groß geworden ist.
+        if len(self._warteschlange) > 50 * len(self._teilchen) + 1000:
+            self._warteschlange = [e for e in self._warteschlange
+                                   if self._gueltig(e)]
+            heapq.heapify(self._warteschlange)
+
+        n_dim = len(self.wandnormalen[0])
+        return {f: _buendel(liste, n_dim)
+                for f, liste in exporte.items()}
+
+    def _gueltig(self, ereignis):
+        """Prüfe, ob ein Ereignis der Warteschlange gültig ist."""
+        _, art, i, j, n_i, n_j = ereignis
+        p = self._teilchen.get(i)
+        if p is None or p.nummer != n_i:
+            return False
+        if art == _PAAR:
+            q = self._teilchen.get(j)
+            return q is not None and q.nummer == n_j
+        return art == _WAND or p.wechsel == n_j
+
+    def verwerfe(self):
+        """Setze das Gebiet auf den Anfang des Zeitfensters zurück."""
+        for i, (r, v, t, zelle, nummer, wechsel) in \
+                self._gesichert.items():
+            p = self._teilchen[i]
+            if p.zelle != zelle:
+                self._aussortieren(i, p.zelle)
+                self._einsortieren(i, zelle)
+            p.r, p.v, p.t, p.zelle = r, v, t, zelle
+            p.nummer, p.wechsel = nummer, wechsel
+        for ereignis in self._entnommen:
+            heapq.heappush(self._warteschlange, ereignis)
+        self._gesichert = {}
+        self._entnommen = []
+        self._fenster_teilchen = 0
+        self._fenster_wand = 0
+
+    def zustaende(self, neue=None):
+        """Gib die Zustände aller eigenen Teilchen zurück.
+
+        Args:
+            neue (tuple[np.ndarray]):
+                Teilchen, die vorher in das Gebiet aufgenommen
+                werden.
+
+        Returns:
+            tuple: Bündel der eigenen Teilchen sowie die Anzahl der
+            Teilchenstöße und der Wandstöße.
+        """
+        if neue is not None:
+            self._fuege_hinzu(neue)
+        liste = [(i, p.r, p.v, p.t, p.zelle, p.radius, p.masse)
+                 for i, p in self._teilchen.items() if p.eigen]
+        return (_buendel(liste, len(self.wandnormalen[0])),
+                self.n_stoesse_teilchen, self.n_stoesse_wand)
+
+
+def _arbeitsprozess(verbindung, argumente):
+    """Bearbeite die Aufträge für ein Gebiet in einem Prozess.
+
+    Jeder Auftrag besteht aus dem Namen einer Methode der Klasse
+    `Gebiet` und den Argumenten. Der Rückgabewert wird an den
+    Hauptprozess gesendet. Der Auftrag None beendet den Prozess.
+    """
+    gebiet = Gebiet(*argumente)
+    while True:
+        auftrag = verbindung.recv()
+        if auftrag is None:
+            break
+        methode, args = auftrag
+        verbindung.send(getattr(gebiet, methode)(*args))
+    verbindung.close()
+
+
+class MehrteilchenstossParallel(Mehrteilchenstoss):
+    """Ereignisgesteuerte Stoßsimulation in räumlichen Gebieten.
+
+    Die Schnittstelle entspricht der Klasse `Mehrteilchenstoss`.
+    Die Arbeitsprozesse werden beim ersten Aufruf von `zeitschritt`
+    gestartet und mit `schliesse` bzw. am Ende eines with-Blocks
+    beendet.
+
+    Args:
+        *args:
+            Positionsargumente für `Mehrteilchenstoss`.
+        n_gebiete (int):
+            Anzahl der räumlichen Gebiete. Bei n_gebiete=1 wird
+            kein zusätzlicher Prozess gestartet.
+        n_rand (int):
+            Breite des Randbereichs der Gebiete in Zellspalten. Es
+            sind mindestens zwei Spalten erforderlich, da sonst
+            bereits ein einzelner Zellwechsel eines Teilchens am
+            Rand das Zeitfenster ungültig machen kann.
+        zellgroesse (float):
+            Kantenlänge der Zellen. Bei None wird der größte
+            Teilchendurchmesser verwendet.
+        **kwargs:
+            Schlüsselwortargumente für `Mehrteilchenstoss`.
+    """
+
+    def __init__(self, *args, n_gebiete=1, n_rand=3, zellgroesse=None,
+                 **kwargs):
+        super().__init__(*args, **kwargs)
+        if n_rand < 2:
+            raise ValueError('Der Randbereich muss mindestens zwei '
+                             'Spalten breit sein.')
+        self.n_gebiete = n_gebiete
+        """int: Anzahl der räumlichen Gebiete."""
+        self.n_rand = n_rand
+        """int: Breite des Randbereichs in Zellspalten."""
+        if zellgroesse is None:
+            zellgroesse = 2 * np.max(self.radien) * (1 + 1e-9)
+        self.zellgroesse = float(zellgroesse)
+        """float: Kantenlänge der Zellen."""
+        self.n_fenster = 0
+        """int: Anzahl der simulierten Zeitfenster."""
+        self.n_ruecksetzungen = 0
+        """int: Anzahl der verworfenen Zeitfenster."""
+
+        # Orte zum Zeitpunkt des letzten Stoßes jedes Teilchens,
+        # diese Zeitpunkte und die Zellen der Teilchen. Bei None
+        # werden sie beim Start aus dem aktuellen Zustand bestimmt.
+        self._r_stoss = None
+        self._t_stoss = None
+        self._zellen = None
+
+        # Gebiete bzw. Verbindungen zu den Arbeitsprozessen und die
+        # noch nicht übergebenen Teilchen.
+        self._gebiete = None
+        self._prozesse = []
+        self._importe = None
+        self._fensterdauer = None
+        self._stoesse_start = None
+
+    def schliesse(self):
+        """Beende die Arbeitsprozesse."""
+        for verbindung in self._gebiete or []:
+            if isinstance(verbindung, Gebiet):
+                continue
+            verbindung.send(None)
+            verbindung.close()
+        for prozess in self._prozesse:
+            prozess.join()
+        self._gebiete = None
+        self._prozesse = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.schliesse()
+
+    def _zusatzdaten(self):
+        """Speichere die Orte und Zellen zum letzten Stoß."""
+        if self._r_stoss is None:
+            return {}
+        return dict(r_stoss=self._r_stoss, t_stoss=self._t_stoss,
+                    zellen=self._zellen, zellgroesse=self.zellgroesse)
+
+    def _lade_zusatzdaten(self, daten):
+        """Lade die Orte und Zellen zum letzten Stoß."""
+        if 'r_stoss' in daten:
+            self._r_stoss = daten['r_stoss'].copy()
+            self._t_stoss = daten['t_stoss'].copy()
+            self._zellen = daten['zellen'].copy()
+            self.zellgroesse = float(daten['zellgroesse'])
+
+    def _starte(self):
+        """Zerlege den Kasten in Gebiete und starte die Prozesse."""
+        if self._r_stoss is None:
+            self._r_stoss = self.r.copy()
+            self._t_stoss = np.full(self.n_teilchen, self.t)
+            self._zellen = np.floor(
+                self.r / self.zellgroesse).astype(int)
+        self._stoesse_start = (self.n_stoesse_teilchen,
+                               self.n_stoesse_wand)
+
+        # Wähle die Grenzen so, dass jedes Gebiet etwa gleich viele
+        # Teilchen enthält.
+        spalten = self._zellen[:, 0]
+        sortiert = np.sort(spalten)
+        grenzen = [int(sortiert[k * self.n_teilchen // self.n_gebiete])
+                   for k in range(1, self.n_gebiete)]
+        if np.any(np.diff([sortiert[0]] + grenzen) <= 0):
+            raise ValueError('Zu wenige Zellspalten für die Anzahl '
+                             'der Gebiete.')
+
+        argumente = [(k, grenzen, self.n_rand, self.zellgroesse,
+                      self.wandabstaende, self.wandnormalen,
+                      self.n_gebiete > 1)
+                     for k in range(self.n_gebiete)]
+        if self.n_gebiete == 1:
+            self._gebiete = [Gebiet(*argumente[0])]
+        else:
+            self._gebiete = []
+            for arg in argumente:
+                verbindung, verbindung_prozess = multiprocessing.Pipe()
+                prozess = multiprocessing.Process(
+                    target=_arbeitsprozess,
+                    args=(verbindung_prozess, arg), daemon=True)
+                prozess.start()
+                verbindung_prozess.close()
+                self._gebiete.append(verbindung)
+                self._prozesse.append(prozess)
+
+        # Jedes Gebiet erhält die Teilchen seiner Spalten und der
+        # angrenzenden n_rand Spalten.
+        buendel = (np.arange(self.n_teilchen), self._r_stoss, self.v,
+                   self._t_stoss, self._zellen, self.radien,
+                   self.massen)
+        grenzen = [-np.inf] + grenzen + [np.inf]
+        self._importe = [
+            _auswahl(buendel,
+                     (spalten >= grenzen[k] - self.n_rand)
+                     & (spalten < grenzen[k + 1] + self.n_rand))
+            for k in range(self.n_gebiete)]
+
+        # Wähle die erste Fensterdauer so, dass ein Teilchen mit
+        # der mittleren Geschwindigkeit nur einen kleinen Teil einer
+        # Zelle durchquert. Die Dauer wird anschließend angepasst.
+        v_mittel = np.mean(np.linalg.norm(self.v, axis=1))
+        self._fensterdauer = 0.1 * self.zellgroesse / max(
+            v_mittel, np.finfo(float).tiny)
+
+    def _auftrag(self, methode, liste_argumente):
+        """Führe eine Methode in allen Gebieten aus."""
+        if self.n_gebiete == 1:
+            return [getattr(self._gebiete[0], methode)(
+                *liste_argumente[0])]
+        for verbindung, args in zip(self._gebiete, liste_argumente):
+            verbindung.send((methode, args))
+        return [verbindung.recv() for verbindung in self._gebiete]
+
+    def _neue_teilchen(self):
+        """Gib die noch nicht übergebenen Teilchen zurück."""
+        importe = self._importe or [None] * self.n_gebiete
+        self._importe = None
+        return importe
+
+    def zeitschritt(self, dt=None):
+        """Bewege die Teilchen um die Zeitdauer dt weiter.
+
+        Args:
+            dt (float):
+                Zeitdauer. Anders als bei `Mehrteilchenstoss` muss
+                die Zeitdauer angegeben werden.
+
+        Returns:
+            float: Die simulierte Zeitdauer.
+        """
+        if dt is None:
+            raise ValueError('Die Zeitdauer muss angegeben werden.')
+        if self._gebiete is None:
+            self._starte()
+
+        t_ende = self.t + dt
+        t = self.t
+        while t < t_ende:
+            # Simuliere ein Zeitfenster in allen Gebieten. Bei nur
+            # einem Gebiet gibt es keine Ränder, und das Fenster
+            # umfasst die gesamte Zeitdauer.
+            if self.n_gebiete == 1:
+                t_fenster = t_ende
+            else:
+                t_fenster = min(t + self._fensterdauer, t_ende)
+            ergebnisse = self._auftrag(
+                'simuliere', [(t_fenster, neue)
+                              for neue in self._neue_teilchen()])
+            self.n_fenster += 1
+
+            # Prüfe die Geisterteilchen anhand der Stoßprotokolle
+            # ihrer Originale.
+            gueltig = not any(verletzt for verletzt, _ in ergebnisse)
+            abweichend = [set()] * self.n_gebiete
+            if gueltig and self.n_gebiete > 1:
+                randdaten = [{} for _ in range(self.n_gebiete)]
+                for _, daten in ergebnisse:
+                    for f, d in daten.items():
+                        randdaten[f].update(d)
+                gueltig, abweichend = zip(*self._auftrag(
+                    'pruefe', [(d,) for d in randdaten]))
+                gueltig = all(gueltig)
+
+            if not gueltig:
+                self.n_ruecksetzungen += 1
+                self._auftrag('verwerfe', [()] * self.n_gebiete)
+                self._fensterdauer /= 2
+                continue
+
+            # Übernimm das Ergebnis und leite die Teilchen an die
+            # Gebiete weiter, die eine neue Kopie benötigen.
+            exporte = self._auftrag('uebernehme', [(abweichend,)]
+                                    * self.n_gebiete)
+            self._importe = [
+                _verbinde([e[k] for e in exporte if k in e], self.n_dim)
+                for k in range(self.n_gebiete)]
+            self._fensterdauer *= 1.1
+            t = t_fenster
+
+        # Bestimme die Orte aller Teilchen zum Zeitpunkt t_ende.
+        n_teilchen, n_wand = self._stoesse_start
+        for buendel, n_t, n_w in self._auftrag(
+                'zustaende',
+                [(neue,) for neue in self._neue_teilchen()]):
+            i = buendel[0]
+            self._r_stoss[i] = buendel[1]
+            self.v[i] = buendel[2]
+            self._t_stoss[i] = buendel[3]
+            self._zellen[i] = buendel[4]
+            n_teilchen += n_t
+            n_wand += n_w
+        self.n_stoesse_teilchen = n_teilchen
+        self.n_stoesse_wand = n_wand
+        self.t = t_ende
+        self.r = (self._r_stoss
+                  + self.v * (self.t - self._t_stoss)[:, np.newaxis])
+        return dt
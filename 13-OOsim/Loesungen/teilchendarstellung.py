@@ -0,0 +1,91 @@
+﻿"""Schnelle Darstellung vieler Teilchen mit Matplotlib.
+
+Anstatt für jedes Teilchen ein eigenes `Circle`-Objekt anzulegen
+und in jedem Bild einzeln zu verschieben, werden alle Teilchen in
+einer einzigen `EllipseCollection` zusammengefasst. Die Positionen
+aller Teilchen werden dann mit einem Aufruf von `set_offsets`
+aktualisiert.
+"""
+
+import numpy as np
+import matplotlib as mpl
+import matplotlib.collections
+
+
+class TeilchenDarstellung:
+    """Darstellung kreisförmiger Teilchen in einer Axes.
+
+    Die Radien werden in Datenkoordinaten angegeben. Damit die
+    Teilchen als Kreise erscheinen, sollte die Axes mit
+    `ax.set_aspect('equal')` eingestellt sein.
+
+    Die Teilchen können entweder mit festen Farben dargestellt
+    oder über eine Colormap eingefärbt werden, z.B. nach der Sorte
+    oder dem Geschwindigkeitsbetrag.
+
+    Args:
+        ax (mpl.axes.Axes):
+            Axes, in die geplottet werden soll.
+        radien (np.ndarray):
+            Radien der Teilchen [m] (n_teilchen).
+        farbwerte (np.ndarray):
+            Werte (n_teilchen), die über die Colormap auf Farben
+            abgebildet werden. Bei None wird die Farbe `farbe`
+            verwendet.
+        cmap (str):
+            Name der Colormap.
+        vmin (float):
+            Wert, der der unteren Grenze der Colormap entspricht.
+        vmax (float):
+            Wert, der der oberen Grenze der Colormap entspricht.
+        farbe:
+            Einheitliche Farbe aller Teilchen, falls keine
+            Farbwerte angegeben sind.
+        **kwargs:
+            Weitere Schlüsselwortargumente für die
+            `EllipseCollection`.
+    """
+
+    def __init__(self, ax, radien, farbwerte=None, cmap='jet',
+                 vmin=None, vmax=None, farbe='tab:blue', **kwargs):
+        self.ax = ax
+        """mpl.axes.Axes: Axes, in die geplottet wird."""
+        durchmesser = 2 * np.asarray(radien)
+        n_teilchen = durchmesser.size
+
+        self.kreise = mpl.collections.EllipseCollection(
+            durchmesser, durchmesser, np.zeros(n_teilchen),
+            units='xy', offsets=np.zeros((n_teilchen, 2)),
+            offset_transform=ax.transData, cmap=cmap, **kwargs)
+        """mpl.collections.EllipseCollection: Die Teilchen."""
+
+        if farbwerte is None:
+            self.kreise.set_facecolor(farbe)
+        else:
+            self.kreise.set_array(np.asarray(farbwerte))
+            self.kreise.set_clim(vmin, vmax)
+
+        # Die Teilchen werden erst nach dem ersten Aufruf von
+        # `update` angezeigt.
+        self.kreise.set_visible(False)
+        ax.add_collection(self.kreise)
+
+    def update(self, r, farbwerte=None):
+        """Aktualisiere die Positionen und ggf. die Farben.
+
+        Args:
+            r (np.ndarray):
+                Ortsvektoren der Teilchen (n_teilchen × 2).
+            farbwerte (np.ndarray):
+                Neue Werte für die Colormap (n_teilchen).
+
+        Returns:
+            mpl.collections.EllipseCollection: Das veränderte
+            Grafikelement.
+        """
+        self.kreise.set_offsets(r)
+        if farbwerte is not None:
+            self.kreise.set_array(farbwerte)
+        self.kreise.set_visible(True)
+        return self.kreise
+
@@ -0,0 +1,116 @@
+﻿"""Speichern von Teilchenbahnen in einer Datei auf der Festplatte.
+
+Anstatt die Ortsvektoren in jedem Zeitschritt an eine Liste
+anzuhängen und diese am Ende in ein Array umzuwandeln, werden die
+Daten direkt in ein vorab angelegtes Array geschrieben, das mit
+`np.memmap` auf eine .npy-Datei abgebildet ist. Damit können auch
+Simulationen durchgeführt werden, deren Ergebnis nicht in den
+Arbeitsspeicher passt, und ein späteres Programm kann die Datei
+öffnen, ohne sie vollständig einzulesen.
+"""
+
+import numpy as np
+
+
+class Trajektorienspeicher:
+    """Schreibt die Zustände einer Simulation in eine .npy-Datei.
+
+    Beim Erzeugen des Objekts wird eine Datei angelegt, die Platz
+    für alle Einzelbilder (Frames) bietet. Mit der Methode
+    `speichere` wird in jedem Zeitschritt ein Array der Form
+    `form` übergeben. Mit dem Argument `dezimierung` kann man
+    festlegen, dass nur jeder n-te übergebene Zustand tatsächlich
+    gespeichert wird.
+
+    Das Objekt kann als Kontextmanager verwendet werden. Beim
+    Verlassen des `with`-Blocks werden die Daten auf die
+    Festplatte geschrieben.
+
+    Args:
+        dateiname (str):
+            Name der anzulegenden .npy-Datei.
+        n_schritte (int):
+            Anzahl der Zeitschritte, die übergeben werden.
+        form (tuple[int]):
+            Form des Arrays, das pro Zeitschritt gespeichert wird,
+            z.B. (n_teilchen, n_dim).
+        dtype (np.dtype):
+            Datentyp der gespeicherten Werte. Mit np.float32 halbiert
+            sich der Speicherbedarf.
+        dezimierung (int):
+            Es wird nur jeder `dezimierung`-te Zustand gespeichert.
+        start (int):
+            Anzahl der Zeitschritte, die bereits in einem früheren
+            Programmlauf gespeichert wurden. Bei start > 0 wird die
+            vorhandene Datei geöffnet und fortgeschrieben, anstatt
+            sie neu anzulegen.
+    """
+
+    def __init__(self, dateiname, n_schritte, form, dtype=np.float64,
+                 dezimierung=1, start=0):
+        self.dateiname = dateiname
+        """str: Name der .npy-Datei."""
+        self.dezimierung = int(dezimierung)
+        """int: Nur jeder n-te Zustand wird gespeichert."""
+
+        # Anzahl der übergebenen Zustände.
+        self._n_aufrufe = start
+
+        self.n_gespeichert = -(-start // self.dezimierung)
+        """int: Anzahl der bisher gespeicherten Frames."""
+
+        # Lege die Datei mit einem Header im .npy-Format an, sodass
+        # sie später mit np.load gelesen werden kann. Beim Fortsetzen
+        # wird die vorhandene Datei zum Schreiben geöffnet.
+        n_frames = -(-n_schritte // self.dezimierung)
+        if start > 0:
+            self.daten = np.lib.format.open_memmap(dateiname,
+                                                   mode='r+')
+        else:
+            self.daten = np.lib.format.open_memmap(
+                dateiname, mode='w+', dtype=dtype,
+                shape=(n_frames,) + tuple(form))
+        """np.memmap: Auf die Datei abgebildetes Array."""
+
+    @property
+    def n_frames(self):
+        """int: Anzahl der Frames, für die Platz reserviert ist."""
+        return self.daten.shape[0]
+
+    def speichere(self, zustand):
+        """Übergib den Zustand des aktuellen Zeitschritts.
+
+        Args:
+            zustand (np.ndarray):
+                Array der beim Erzeugen angegebenen Form.
+        """
+        if self._n_aufrufe % self.dezimierung == 0:
+            self.daten[self.n_gespeichert] = zustand
+            self.n_gespeichert += 1
+        self._n_aufrufe += 1
+
+    def schliesse(self):
+        """Schreibe alle Daten auf die Festplatte."""
+        self.daten.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.schliesse()
+
+
+def lade_trajektorie(dateiname):
+    """Öffne eine gespeicherte Trajektorie, ohne sie einzulesen.
+
+    Die Daten werden erst dann von der Festplatte gelesen, wenn auf
+    die entsprechenden Elemente des Arrays zugegriffen wird.
+
+    Args:
+        dateiname (str):
+            Name der .npy-Datei.
+
+    Returns:
+        np.memmap: Array der Form (n_frames, ...).
+    """
+    return np.load(dateiname, mmap_mode='r')